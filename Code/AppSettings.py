@@ -12,9 +12,14 @@ class AppSettings:
         #flags for feature activation
         self.EnableUI = os.getenv('ENABLEUI', '1') == '1' #enabled by default
         self.EnableAPI = os.getenv('ENABLEAPI', '0') == '1' #disabled by default
+        self.CliOnlyMode = os.getenv('CLI_ONLY', '0') == '1' #skips Flask entirely
         # Environment configuration
         self.Environment = os.getenv('ENVIRONMENT', 'development')
         self.LogLevel = os.getenv('LOG_LEVEL', 'INFO')
+        # Timing spans around the hot paths, reports written on exit when a path is given
+        self.EnableInstrumentation = os.getenv('ENABLE_INSTRUMENTATION', '0') == '1'
+        self.InstrumentationReportPath = os.getenv('INSTRUMENTATION_REPORT', '')
+        self.InstrumentationTracePath = os.getenv('INSTRUMENTATION_TRACE', '')
         # Web interface settings
         self.WebInterfaceHost = os.getenv('WEB_HOST', 'localhost')
         self.WebInterfacePort = int(os.getenv('WEB_PORT', '5000'))
@@ -0,0 +1,527 @@
+"""
+BatchRunner - Headless runner for scripted studies
+Runs the studies listed in a manifest (JSON, or YAML when PyYAML is installed) in one process so
+that parsed ETYS workbooks, the DataModels built from them and the engine sessions stay warm
+between studies. Independent manifests can be fanned out across worker processes. Every analysis
+is snapshotted into the columnar result store and a JSON summary of the batch is written.
+
+Manifest layout:
+    {
+        "name": "overnight",
+        "result_store": "ResultStore",              # optional, relative to the manifest
+        "defaults": {"engine": "ipsa", "analyses": ["loadflow"]},
+        "studies": [
+            {"name": "full_grid_lf", "etys_file": "Full_Grid.xlsx",
+             "analyses": ["loadflow"], "loadflow_settings": {"calculation_method": "ac"}},
+            {"name": "refinery_sc", "network": "Refinery.i2f",
+             "analyses": ["loadflow", "shortcircuit"], "outputs": {"csv": "Results/refinery"}}
+        ]
+    }
+A study takes its network either from an ETYS workbook ('etys_file', built into the engine when
+the engine supports it) or from an engine network ('network': a file path, or a dict of
+opennetwork arguments for PowerFactory). Study keys override the manifest defaults.
+
+Usage:
+    python -m Code.BatchRunner overnight.json
+    python -m Code.BatchRunner winter.yaml summer.yaml --workers 2 --summary batch_summary.json
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, List, Optional, Any
+import os
+import sys
+import json
+import time
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Allow running the file directly as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span
+from Code.LazyImports import lazyimport
+
+yaml = lazyimport('yaml')
+
+
+# ==============================================================================
+# CONFIGURATION
+# ==============================================================================
+
+SUPPORTED_ENGINES = ['ipsa', 'powerfactory', 'simulated']
+SUPPORTED_ANALYSES = ['loadflow', 'shortcircuit']
+
+# Keys a study may take from the manifest defaults
+STUDY_DEFAULT_KEYS = ['engine', 'analyses', 'loadflow_settings', 'shortcircuit_settings',
+                      'outputs', 'build_engine_model']
+
+# Parsed sources and DataModels kept warm between studies
+DEFAULT_MAX_CACHED_SOURCES = 4
+
+
+# ==============================================================================
+# MANIFESTS
+# ==============================================================================
+
+def loadmanifest(manifest_path: str) -> Dict[str, Any]:
+    """
+    Load and check a study manifest
+    Args:
+        manifest_path (str): JSON or YAML manifest file
+    Returns:
+        Dict[str, Any]: Manifest with the defaults merged into every study and all file paths
+            made absolute relative to the manifest
+    Raises:
+        ValueError: If the manifest cannot be read or a study is not valid
+    """
+    manifest_path = os.path.abspath(manifest_path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if manifest_path.lower().endswith(('.yaml', '.yml')):
+            if not yaml.isavailable():
+                raise ValueError("PyYAML is required for YAML manifests; install it or use JSON")
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('studies'), list):
+        raise ValueError(f"Manifest {manifest_path} must be a mapping with a 'studies' list")
+    base_path = os.path.dirname(manifest_path)
+    manifest.setdefault('name', os.path.splitext(os.path.basename(manifest_path))[0])
+    manifest['path'] = manifest_path
+    if manifest.get('result_store'):
+        manifest['result_store'] = _resolvepath(manifest['result_store'], base_path)
+    defaults = manifest.get('defaults', {})
+    studies = []
+    names = set()
+    for index, study in enumerate(manifest['studies']):
+        study = dict(study)
+        for key in STUDY_DEFAULT_KEYS:
+            if key not in study and key in defaults:
+                study[key] = defaults[key]
+        study.setdefault('name', f"study_{index + 1}")
+        study.setdefault('engine', 'ipsa')
+        study.setdefault('analyses', ['loadflow'])
+        study.setdefault('outputs', {})
+        study['engine'] = str(study['engine']).lower()
+        _checkstudy(study, names)
+        if study.get('etys_file'):
+            study['etys_file'] = _resolvepath(study['etys_file'], base_path)
+        if isinstance(study.get('network'), str):
+            study['network'] = _resolvepath(study['network'], base_path)
+        if study['outputs'].get('csv'):
+            study['outputs']['csv'] = _resolvepath(study['outputs']['csv'], base_path)
+        names.add(study['name'])
+        studies.append(study)
+    manifest['studies'] = studies
+    return manifest
+
+
+def _checkstudy(study: Dict[str, Any], names: set):
+    """Reject studies the runner cannot execute before any of the batch has run"""
+    name = study['name']
+    if name in names:
+        raise ValueError(f"Duplicate study name: {name}")
+    if study['engine'] not in SUPPORTED_ENGINES:
+        raise ValueError(f"Study {name}: unsupported engine '{study['engine']}'")
+    if bool(study.get('etys_file')) == bool(study.get('network')):
+        raise ValueError(f"Study {name}: give exactly one of 'etys_file' or 'network'")
+    for analysis in study['analyses']:
+        if analysis not in SUPPORTED_ANALYSES:
+            raise ValueError(f"Study {name}: unsupported analysis '{analysis}'")
+
+
+def _resolvepath(path: str, base_path: str) -> str:
+    """Make a manifest path absolute relative to the manifest directory"""
+    return os.path.normpath(os.path.join(base_path, os.path.expanduser(path)))
+
+
+# ==============================================================================
+# RUNNER
+# ==============================================================================
+
+class BatchRunner:
+    """Runs manifests of studies in one process, reusing parsed data and engine sessions"""
+
+    def __init__(self, result_store_path: Optional[str] = None, log_level: str = 'WARNING',
+                 max_cached_sources: int = DEFAULT_MAX_CACHED_SOURCES, use_result_store: bool = True):
+        self.result_store_path = result_store_path
+        self.default_result_store_path = None
+        # Study worker processes return their rows to the parent and open neither the store nor the cache
+        self.use_result_store = use_result_store
+        self.log_level = log_level
+        self.max_cached_sources = max_cached_sources
+        self.initialised = False
+        # source key -> standardised ETYS tables, and source key -> DataModel built from them
+        self._sources = OrderedDict()
+        self._datamodels = OrderedDict()
+        # engine name -> globals of the engine session
+        self._sessions = {}
+        self._active_engine = None
+        self.statistics = {'source_hits': 0, 'source_misses': 0,
+                           'datamodel_hits': 0, 'datamodel_misses': 0,
+                           'engine_sessions': 0, 'engine_model_builds': 0}
+
+    # ==========================================================================
+    # INITIALISATION
+    # ==========================================================================
+
+    def initialise(self) -> bool:
+        """
+        Initialise the engine independent part of the framework, without the web interface.
+        Engines are started on demand by the first study that needs them.
+        Returns:
+            bool: True if the framework is ready
+        """
+        if self.initialised:
+            return True
+        from Code.FrameworkInitialiser import FrameworkInitialiser
+        self.framework = FrameworkInitialiser()
+        bOK = self.framework.initialise_messaging()
+        if bOK:
+            gbl.Msg.set_log_level(self.log_level)
+            bOK = self.framework.initialisestudysettings()
+        if bOK:
+            self.default_result_store_path = gbl.StudySettingsContainer.resultstorepath
+        if bOK and self.result_store_path:
+            gbl.StudySettingsContainer.resultstorepath = self.result_store_path
+        if bOK:
+            bOK = self.framework.initialisedatafactory()
+        if bOK:
+            bOK = self.framework.initialisedatamodelmanager()
+        if bOK:
+            bOK = self.framework.initialise_network_data_manager()
+        if bOK:
+            bOK = self.framework.initialise_data_source_interface()
+        if bOK and self.use_result_store:
+            bOK = self.framework.initialise_result_store()
+        self.initialised = bOK
+        return bOK
+
+    def _openresultstore(self, manifest_store_path: Optional[str]):
+        """
+        Make the result store of a manifest current. A store given to the runner overrides the manifests,
+        otherwise each manifest writes to the store it names, or to the study settings store if it names none.
+        The result cache moves with the store unless the study settings give it a path of its own.
+        """
+        if not self.use_result_store:
+            return
+        store_path = self.result_store_path or manifest_store_path or self.default_result_store_path
+        if gbl.ResultStore is None or gbl.ResultStore.root_path != os.path.abspath(store_path):
+            from Code.Results.ResultStore import ResultStore
+            gbl.ResultStore = ResultStore(store_path)
+        settings = gbl.StudySettingsContainer
+        settings.resultstorepath = store_path
+        cache_path = os.path.abspath(settings.get_result_cache_path())
+        if settings.UseResultCache and (gbl.ResultCache is None or gbl.ResultCache.store.root_path != cache_path):
+            from Code.Results.StudyResultCache import StudyResultCache
+            gbl.ResultCache = StudyResultCache(cache_path, settings.resultcachemaxentries, settings.resultcachemaxsizemb)
+
+    def activateengine(self, engine_name: str) -> Dict[str, Any]:
+        """Make an engine session current, starting it the first time it is used"""
+        session = self._sessions.get(engine_name)
+        if session is None:
+            with span("batch.engine_session", engine=engine_name):
+                session = self._createenginesession(engine_name)
+            self._sessions[engine_name] = session
+            self.statistics['engine_sessions'] += 1
+        if self._active_engine != engine_name:
+            gbl.EngineContainer = session['engine']
+            gbl.EngineLoadFlowContainer = session['loadflow']
+            gbl.EngineShortCircuitContainer = session['shortcircuit']
+            gbl.EngineHarmonicsContainer = session['harmonics']
+            gbl.DataModelInterfaceContainer = session['datamodel_interface']
+            self.framework.configurecomponenttemplates()
+            self._active_engine = engine_name
+        return session
+
+    def _createenginesession(self, engine_name: str) -> Dict[str, Any]:
+        """Start an engine through the framework initialiser and capture the containers it set up"""
+        gbl.EngineShortCircuitContainer = None
+        gbl.EngineHarmonicsContainer = None
+        gbl.DataModelInterfaceContainer = None
+        if engine_name == 'simulated':
+            from Code.Benchmarks.SimulatedLoadFlow import SimulatedDCLoadFlow
+            from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+            from Code.Framework.Native.EngineNativeHarmonics import EngineNativeHarmonics
+            gbl.EngineContainer = None
+            gbl.EngineLoadFlowContainer = SimulatedDCLoadFlow()
+            gbl.EngineShortCircuitContainer = EngineNativeShortCircuit()
+            gbl.EngineHarmonicsContainer = EngineNativeHarmonics()
+        else:
+            gbl.StudySettingsContainer.ipsa = engine_name == 'ipsa'
+            gbl.StudySettingsContainer.powerfactory = engine_name == 'powerfactory'
+            bOK = self.framework.initialisestudyengine(engine_type=engine_name)
+            if bOK:
+                bOK = self.framework.initialisedatamodelinterface()
+            if not bOK:
+                raise RuntimeError(f"Failed to start the {engine_name} engine")
+        self._active_engine = None
+        return {'engine': gbl.EngineContainer, 'loadflow': gbl.EngineLoadFlowContainer,
+                'shortcircuit': gbl.EngineShortCircuitContainer, 'harmonics': gbl.EngineHarmonicsContainer,
+                'datamodel_interface': gbl.DataModelInterfaceContainer, 'network_key': None}
+
+    # ==========================================================================
+    # NETWORK PREPARATION
+    # ==========================================================================
+
+    def _getsourcekey(self, file_path: str) -> str:
+        """Identify a source file by path, modification time and size so edits invalidate the cache"""
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def _getstandardiseddata(self, file_path: str, source_key: str):
+        """Parse, validate and standardise an ETYS workbook once per batch"""
+        if source_key in self._sources:
+            self._sources.move_to_end(source_key)
+            self.statistics['source_hits'] += 1
+            return self._sources[source_key]
+        self.statistics['source_misses'] += 1
+        standardised_data = gbl.NetworkDataManager.get_standardized_data('etys', file_path=file_path)
+        self._sources[source_key] = standardised_data
+        self._trimcache(self._sources)
+        return standardised_data
+
+    def _loadetysdatamodel(self, file_path: str, session: Dict[str, Any]) -> str:
+        """Make the DataModel of an ETYS workbook current, building it only the first time"""
+        source_key = self._getsourcekey(file_path)
+        datamodel = self._datamodels.get(source_key)
+        if datamodel is not None:
+            self._datamodels.move_to_end(source_key)
+            self.statistics['datamodel_hits'] += 1
+        else:
+            self.statistics['datamodel_misses'] += 1
+            standardised_data = self._getstandardiseddata(file_path, source_key)
+            from Code.DataModel.DataModelManager import DataModelManager
+            datamodel = DataModelManager()
+            gbl.DataModelManager = datamodel
+            with span("batch.ingest", source=os.path.basename(file_path)):
+                if not gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(
+                        standardised_data, load_strategy='datamodel'):
+                    raise RuntimeError(f"Failed to load {file_path} into the DataModel")
+            self._datamodels[source_key] = datamodel
+            self._trimcache(self._datamodels)
+        gbl.DataModelManager = datamodel
+        datamodel.BasicEngineModelupdater = session['datamodel_interface']
+        return source_key
+
+    def _buildenginemodel(self, session: Dict[str, Any], network_key: str):
+        """Push the current DataModel into the engine unless the engine already holds it"""
+        if session['engine'] is None or session['network_key'] == network_key:
+            return
+        if not hasattr(session['engine'], 'load_network_from_datamodel'):
+            raise RuntimeError(f"The {self._active_engine} engine cannot build a network from ETYS data; "
+                               "use a 'network' study instead")
+        with span("batch.engine_build", engine=self._active_engine):
+            if not session['engine'].load_network_from_datamodel():
+                raise RuntimeError("Failed to build the engine network from the DataModel")
+        session['network_key'] = network_key
+        self.statistics['engine_model_builds'] += 1
+
+    def _openenginenetwork(self, network, session: Dict[str, Any]):
+        """Open an engine network and read it into the DataModel unless it is already open"""
+        if session['engine'] is None:
+            raise RuntimeError(f"The {self._active_engine} engine cannot open network files")
+        network_key = json.dumps(network, sort_keys=True) if isinstance(network, dict) else network
+        if session['network_key'] == network_key:
+            return
+        kwargs = dict(network) if isinstance(network, dict) else {'filepath': network}
+        from Code.DataModel.DataModelManager import DataModelManager
+        gbl.DataModelManager = DataModelManager()
+        gbl.DataModelManager.BasicEngineModelupdater = session['datamodel_interface']
+        with span("batch.open_network", engine=self._active_engine):
+            if session['engine'].opennetwork(**kwargs) is False:
+                raise RuntimeError(f"Failed to open network {network_key}")
+            session['datamodel_interface'].passelementsfromnetworktodatamodelmanager()
+        session['network_key'] = network_key
+
+    def _trimcache(self, cache: OrderedDict):
+        """Drop the least recently used entries beyond the cache bound"""
+        while len(cache) > self.max_cached_sources:
+            cache.popitem(last=False)
+
+    # ==========================================================================
+    # STUDIES
+    # ==========================================================================
+
+    def runstudy(self, study: Dict[str, Any], batch_name: str = '') -> Dict[str, Any]:
+        """
+        Run one study of a manifest
+        Args:
+            study (Dict[str, Any]): Study entry as returned by loadmanifest
+            batch_name (str): Manifest name, kept in the result store metadata
+        Returns:
+            Dict[str, Any]: Study summary with status, timings, run ids and any error
+        """
+        summary = {'name': study['name'], 'engine': study['engine'], 'status': 'failed',
+                   'analyses': {}, 'error': None}
+        start = time.perf_counter()
+        try:
+            with span("batch.study", study=study['name']):
+                session = self.activateengine(study['engine'])
+                if study.get('etys_file'):
+                    network_key = self._loadetysdatamodel(study['etys_file'], session)
+                    if study.get('build_engine_model', True):
+                        self._buildenginemodel(session, network_key)
+                else:
+                    self._openenginenetwork(study['network'], session)
+                for analysis in study['analyses']:
+                    summary['analyses'][analysis] = self._runanalysis(analysis, study, batch_name)
+            bFailed = any(result['status'] != 'ok' for result in summary['analyses'].values())
+            summary['status'] = 'failed' if bFailed else 'ok'
+        except Exception as e:
+            summary['error'] = str(e)
+            gbl.Msg.AddError(f"Batch study {study['name']} failed: {e}")
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+
+    def _runanalysis(self, analysis: str, study: Dict[str, Any], batch_name: str) -> Dict[str, Any]:
+        """Run one analysis through the cached study path and store its results"""
+        settings = dict(study.get(f"{analysis}_settings") or {})
+        if analysis == 'loadflow':
+            container = gbl.EngineLoadFlowContainer
+            bOK = container is not None and container.runloadflowcached(**settings)
+        else:
+            container = gbl.EngineShortCircuitContainer
+            if container is None:
+                return {'status': 'failed', 'error': f"The {study['engine']} engine has no short circuit analysis"}
+            bOK = container.runshortcircuitcached(**settings)
+        result = {'status': 'ok' if bOK else 'failed', 'from_cache': bool(getattr(container, 'm_bLastRunFromCache', False))}
+        if not bOK:
+            result['error'] = f"{analysis} did not complete"
+            return result
+        outputs = study.get('outputs', {})
+        if outputs.get('result_store', True) and gbl.ResultStore is not None:
+            metadata = {'batch': batch_name, 'study': study['name'], 'engine': study['engine'],
+                        'source': study.get('etys_file') or study.get('network')}
+            result['run_id'] = gbl.ResultStore.snapshotstudy(analysis, settings, metadata=metadata)
+        if outputs.get('csv'):
+            result['csv'] = self._exportcsv(analysis, study['name'], outputs['csv'])
+        return result
+
+    def _exportcsv(self, analysis: str, study_name: str, output_path: str) -> List[str]:
+        """Write the result tables of an analysis as CSV files"""
+        from Code.Results.ResultTables import extractresulttables
+        os.makedirs(output_path, exist_ok=True)
+        file_paths = []
+        for table_name, df in extractresulttables(analysis).items():
+            file_path = os.path.join(output_path, f"{study_name}_{analysis}_{table_name}.csv")
+            df.to_csv(file_path, index=False)
+            file_paths.append(file_path)
+        return file_paths
+
+    def runmanifest(self, manifest) -> Dict[str, Any]:
+        """
+        Run every study of a manifest in order
+        Args:
+            manifest: Manifest path, or a manifest already returned by loadmanifest
+        Returns:
+            Dict[str, Any]: Batch summary with one entry per study and the cache statistics
+        """
+        if not isinstance(manifest, dict):
+            manifest = loadmanifest(manifest)
+        if not self.initialise():
+            raise RuntimeError("Failed to initialise the framework for the batch")
+        self._openresultstore(manifest.get('result_store'))
+        start = time.perf_counter()
+        studies = [self.runstudy(study, manifest['name']) for study in manifest['studies']]
+        gbl.Msg.Flush()
+        return {
+            'manifest': manifest['name'],
+            'path': manifest.get('path'),
+            'pid': os.getpid(),
+            'studies': studies,
+            'succeeded': sum(1 for study in studies if study['status'] == 'ok'),
+            'failed': sum(1 for study in studies if study['status'] != 'ok'),
+            'seconds': time.perf_counter() - start,
+            'cache': dict(self.statistics),
+        }
+
+
+# ==============================================================================
+# MULTIPLE MANIFESTS
+# ==============================================================================
+
+def _runmanifestinworker(manifest_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker process entry point, each worker keeps its own warm caches"""
+    try:
+        return BatchRunner(**options).runmanifest(manifest_path)
+    except Exception as e:
+        return {'manifest': manifest_path, 'path': manifest_path, 'pid': os.getpid(), 'studies': [],
+                'succeeded': 0, 'failed': 1, 'error': str(e)}
+
+
+def runmanifests(manifest_paths: List[str], workers: int = 1, **options) -> List[Dict[str, Any]]:
+    """
+    Run several independent manifests, optionally one worker process per manifest
+    Args:
+        manifest_paths (List[str]): Manifest files
+        workers (int): Maximum number of worker processes (1 runs everything in this process)
+        **options: BatchRunner arguments
+    Returns:
+        List[Dict[str, Any]]: One batch summary per manifest, in the order given
+    """
+    # Check every manifest up front so a typo does not surface hours into the batch
+    for manifest_path in manifest_paths:
+        loadmanifest(manifest_path)
+    if workers <= 1 or len(manifest_paths) <= 1:
+        runner = BatchRunner(**options)
+        summaries = []
+        for manifest_path in manifest_paths:
+            try:
+                summaries.append(runner.runmanifest(manifest_path))
+            except Exception as e:
+                summaries.append({'manifest': manifest_path, 'path': manifest_path, 'pid': os.getpid(),
+                                  'studies': [], 'succeeded': 0, 'failed': 1, 'error': str(e)})
+        return summaries
+    with ProcessPoolExecutor(max_workers=min(workers, len(manifest_paths))) as executor:
+        futures = [executor.submit(_runmanifestinworker, manifest_path, options)
+                   for manifest_path in manifest_paths]
+        return [future.result() for future in futures]
+
+
+def formatsummaries(summaries: List[Dict[str, Any]]) -> str:
+    """Format batch summaries as a plain text table"""
+    lines = []
+    for summary in summaries:
+        lines.append(f"{summary['manifest']}: {summary['succeeded']} ok, {summary['failed']} failed"
+                     f" in {summary.get('seconds', 0.0):.2f} s")
+        if summary.get('error'):
+            lines.append(f"  error: {summary['error']}")
+        for study in summary['studies']:
+            analyses = ', '.join(f"{name}{' (cached)' if result.get('from_cache') else ''}"
+                                 for name, result in study['analyses'].items())
+            lines.append(f"  {study['status']:<7}{study['name']:<32}{study['seconds']:>8.2f} s  {analyses}")
+            if study['error']:
+                lines.append(f"         {study['error']}")
+            for name, result in study['analyses'].items():
+                if result.get('error'):
+                    lines.append(f"         {name}: {result['error']}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point, returns a non-zero exit code when any study failed"""
+    parser = argparse.ArgumentParser(description="Run the studies listed in one or more manifests")
+    parser.add_argument('manifests', nargs='+', help="JSON or YAML study manifests")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Run independent manifests in up to this many worker processes")
+    parser.add_argument('--result-store', default=None, help="Result store directory (overrides the manifests)")
+    parser.add_argument('--summary', default=None, help="Write the batch summary to this JSON file")
+    parser.add_argument('--log-level', default='WARNING', help="Framework message level (default WARNING)")
+    args = parser.parse_args(argv)
+    try:
+        summaries = runmanifests(args.manifests, workers=args.workers,
+                                 result_store_path=args.result_store, log_level=args.log_level)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {e}")
+        return 2
+    print(formatsummaries(summaries))
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2, default=str)
+    return 1 if any(summary['failed'] for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""
+FakeIPSA - In-memory stand-in for the PyIPSA `ipsa` module
+Implements the part of the IscInterface/IscNetwork API used to build networks from the DataModel
+(CreateBusbar, CreateBranch, Delete*, Set*Value, WriteFile, ...) so that the IPSA model build can be
+benchmarked and tested on machines without an IPSA licence. Components only store the values
+written to them; no analysis is performed.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, Any
+import sys
+import json
+import types
+
+
+# ==============================================================================
+# FIELD CONSTANTS
+# ==============================================================================
+
+class _FieldConstants:
+    """Stands in for the ipsa.IscBusbar/IscBranch/... field enumerations; each field is its own name"""
+
+    def __init__(self, strClassName: str):
+        self._strClassName = strClassName
+
+    def __getattr__(self, strField: str) -> str:
+        if strField.startswith('__'):
+            raise AttributeError(strField)
+        return strField
+
+    def __repr__(self):
+        return f"<FakeIPSA field constants {self._strClassName}>"
+
+
+# ==============================================================================
+# NETWORK COMPONENTS
+# ==============================================================================
+
+class FakeIscComponent:
+    """Network component holding the values written through the Set*Value API"""
+
+    def __init__(self, strType: str, nUID: int, strName: str, dictConnections: Dict[str, int]):
+        self.strType = strType
+        self.nUID = nUID
+        self.dictValues = {'Name': strName}
+        self.dictConnections = dictConnections
+        self.dictRatings = {}
+
+    def GetUID(self) -> int:
+        return self.nUID
+
+    def GetName(self) -> str:
+        return self.dictValues.get('Name', '')
+
+    def SetDValue(self, field, value):
+        self.dictValues[field] = float(value)
+        return True
+
+    def SetIValue(self, field, value):
+        self.dictValues[field] = int(value)
+        return True
+
+    def SetSValue(self, field, value):
+        self.dictValues[field] = str(value)
+        return True
+
+    def SetBValue(self, field, value):
+        self.dictValues[field] = bool(value)
+        return True
+
+    def SetLineDValue(self, field, value):
+        # Transformers carry their winding impedance as line values
+        self.dictValues['Line.' + field] = float(value)
+        return True
+
+    def SetListDValue(self, field, listValues):
+        self.dictValues[field] = [float(value) for value in listValues]
+        return True
+
+    def SetRatingMVA(self, nIndex, value):
+        self.dictRatings[nIndex] = float(value)
+        return True
+
+    def GetDValue(self, field) -> float:
+        return float(self.dictValues.get(field, 0.0))
+
+    def GetIValue(self, field) -> int:
+        return int(self.dictValues.get(field, 0))
+
+    def GetSValue(self, field) -> str:
+        return str(self.dictValues.get(field, ''))
+
+    def GetBValue(self, field) -> bool:
+        return bool(self.dictValues.get(field, False))
+
+
+class FakeIscNetwork:
+    """Network of FakeIscComponents indexed by type and UID"""
+
+    COMPONENT_TYPES = ('Busbar', 'Branch', 'Transformer', 'Load', 'SynMachine')
+
+    def __init__(self):
+        self.nNextUID = 1
+        self.dictComponents = {strType: {} for strType in self.COMPONENT_TYPES}
+        self.strSlackBusbar = None
+
+    def _create(self, strType: str, strName: str, **dictConnections) -> int:
+        nUID = self.nNextUID
+        self.nNextUID += 1
+        self.dictComponents[strType][nUID] = FakeIscComponent(strType, nUID, strName, dictConnections)
+        return nUID
+
+    def _checkbusbar(self, nUID: int):
+        if nUID not in self.dictComponents['Busbar']:
+            raise ValueError(f"Unknown busbar UID {nUID}")
+
+    def CreateBusbar(self, strName: str) -> int:
+        return self._create('Busbar', strName)
+
+    def CreateBranch(self, nFromUID: int, nToUID: int, strName: str) -> int:
+        self._checkbusbar(nFromUID)
+        self._checkbusbar(nToUID)
+        return self._create('Branch', strName, FromUID=nFromUID, ToUID=nToUID)
+
+    def CreateTransformer(self, nFromUID: int, nToUID: int, strName: str) -> int:
+        self._checkbusbar(nFromUID)
+        self._checkbusbar(nToUID)
+        return self._create('Transformer', strName, FromUID=nFromUID, ToUID=nToUID)
+
+    def CreateLoad(self, nBusUID: int, strName: str) -> int:
+        self._checkbusbar(nBusUID)
+        return self._create('Load', strName, BusUID=nBusUID)
+
+    def CreateSynMachine(self, nBusUID: int, strName: str) -> int:
+        self._checkbusbar(nBusUID)
+        return self._create('SynMachine', strName, BusUID=nBusUID)
+
+    def _delete(self, strType: str, nUID: int) -> bool:
+        return self.dictComponents[strType].pop(nUID, None) is not None
+
+    def DeleteBusbar(self, nUID: int) -> bool:
+        for strType in self.COMPONENT_TYPES[1:]:
+            if any(nUID in oComponent.dictConnections.values() for oComponent in self.dictComponents[strType].values()):
+                raise ValueError(f"Busbar UID {nUID} still has connected components")
+        return self._delete('Busbar', nUID)
+
+    def DeleteBranch(self, nUID): return self._delete('Branch', nUID)
+    def DeleteTransformer(self, nUID): return self._delete('Transformer', nUID)
+    def DeleteLoad(self, nUID): return self._delete('Load', nUID)
+    def DeleteSynMachine(self, nUID): return self._delete('SynMachine', nUID)
+
+    def GetBusbar(self, nUID): return self.dictComponents['Busbar'][nUID]
+    def GetBranch(self, nUID): return self.dictComponents['Branch'][nUID]
+    def GetTransformer(self, nUID): return self.dictComponents['Transformer'][nUID]
+    def GetLoad(self, nUID): return self.dictComponents['Load'][nUID]
+    def GetSynMachine(self, nUID): return self.dictComponents['SynMachine'][nUID]
+
+    def GetBusbars(self): return dict(self.dictComponents['Busbar'])
+    def GetBranches(self): return dict(self.dictComponents['Branch'])
+    def GetTransformers(self): return dict(self.dictComponents['Transformer'])
+    def GetLoads(self): return dict(self.dictComponents['Load'])
+    def GetSynMachines(self): return dict(self.dictComponents['SynMachine'])
+
+    def GetBusbarCount(self) -> int:
+        return len(self.dictComponents['Busbar'])
+
+    def GetBranchCount(self) -> int:
+        return len(self.dictComponents['Branch'])
+
+    def SetBusbarSlack(self, strName: str):
+        self.strSlackBusbar = strName
+
+    def getcomponentcounts(self) -> Dict[str, int]:
+        """Number of components per type"""
+        return {strType: len(dictByUID) for strType, dictByUID in self.dictComponents.items()}
+
+    def getsnapshot(self) -> Dict[str, list]:
+        """
+        Values, ratings and connected busbar names of every component, sorted per type. Independent of the UIDs,
+        so networks built in a different order compare equal.
+        """
+        dictBusbarNames = {nUID: oBusbar.GetName() for nUID, oBusbar in self.dictComponents['Busbar'].items()}
+        return {strType: sorted((repr(sorted(oComponent.dictValues.items())),
+                                 repr(sorted(oComponent.dictRatings.items())),
+                                 tuple(sorted((strKey, dictBusbarNames[nUID])
+                                              for strKey, nUID in oComponent.dictConnections.items())))
+                                for oComponent in dictByUID.values())
+                for strType, dictByUID in self.dictComponents.items()}
+
+    def WriteFile(self, strFilePath: str) -> bool:
+        """Writes the component values as JSON, which is enough to check what a build produced"""
+        dictContents = {strType: {str(nUID): {'values': oComponent.dictValues,
+                                              'connections': oComponent.dictConnections,
+                                              'ratings': oComponent.dictRatings}
+                                  for nUID, oComponent in dictByUID.items()}
+                        for strType, dictByUID in self.dictComponents.items()}
+        with open(strFilePath, 'w', encoding='utf-8') as oFile:
+            json.dump(dictContents, oFile)
+        return True
+
+
+class FakeIscInterface:
+    """Process wide interface object, holds the active network"""
+
+    def __init__(self):
+        self.m_network = None
+
+    def CreateNewNetwork(self, base_mva=100.0, freq_hz=50.0, with_diagram=True, single_line=True,
+                         geo_scale=1.0, units=1) -> bool:
+        self.m_network = FakeIscNetwork()
+        return True
+
+    def GetNetwork(self):
+        return self.m_network
+
+    def ReadFile(self, strFilePath: str):
+        raise NotImplementedError("FakeIPSA cannot read IPSA network files")
+
+    def CloseNetwork(self) -> bool:
+        self.m_network = None
+        return True
+
+    def GetDiagram(self, network, key):
+        return None
+
+
+# ==============================================================================
+# MODULE INSTALLATION
+# ==============================================================================
+
+def createfakeipsamodule() -> types.ModuleType:
+    """Build a module object exposing the fake API under the PyIPSA names"""
+    module = types.ModuleType('ipsa')
+    module.__doc__ = "FakeIPSA stand-in for PyIPSA"
+    module.IS_FAKE_IPSA = True
+    module.IscInterface = FakeIscInterface
+    module.IscNetwork = FakeIscNetwork
+    for strClassName in ('IscBusbar', 'IscBranch', 'IscTransformer', 'IscLoad', 'IscSynMachine',
+                         'Isc3WTransformer', 'IscGridInfeed', 'IscStaticVC', 'IscMechSwCapacitor',
+                         'IscAnalysisLF'):
+        setattr(module, strClassName, _FieldConstants(strClassName))
+    return module
+
+
+def installfakeipsa(bForce: bool = False) -> bool:
+    """
+    Register the fake module as `ipsa` when PyIPSA is not installed
+    Args:
+        bForce (bool): Replace PyIPSA even when it is installed
+    Returns:
+        bool: True if the fake module is the one now imported as `ipsa`
+    """
+    existing = sys.modules.get('ipsa')
+    if existing is not None and not bForce:
+        return getattr(existing, 'IS_FAKE_IPSA', False)
+    if not bForce:
+        try:
+            import ipsa  # noqa: F401
+            return False
+        except ImportError:
+            pass
+    sys.modules['ipsa'] = createfakeipsamodule()
+    return True
+
+
+def isfakeipsa(module: Any = None) -> bool:
+    """Check whether the given (or the currently imported) ipsa module is the fake one"""
+    module = module if module is not None else sys.modules.get('ipsa')
+    return getattr(module, 'IS_FAKE_IPSA', False)
@@ -0,0 +1,437 @@
+"""
+PipelineBenchmark - End-to-end benchmark of the ETYS -> DataModel -> engine pipeline
+Times each stage of the pipeline (read, validate, standardise, ingest, IPSA model build and load
+flow) on synthetic ETYS networks and on Full_Grid.xlsx, records peak memory per stage with
+tracemalloc, stores the results as a JSON baseline and flags regressions against it.
+
+The IPSA model build runs against FakeIPSA and the load flow against SimulatedDCLoadFlow so the
+numbers are comparable between machines with and without engine licences. With --strategies the
+IPSA build time and peak memory of the datamodel load strategy are compared with the direct one.
+
+Usage:
+    python -m Code.Benchmarks.PipelineBenchmark --cases synthetic-1000 full-grid
+    python -m Code.Benchmarks.PipelineBenchmark --save-baseline
+    python -m Code.Benchmarks.PipelineBenchmark --threshold 0.25 --trace pipeline_trace.json
+    python -m Code.Benchmarks.PipelineBenchmark --strategies --cases synthetic-10000
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, List, Optional, Any
+import os
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+# Allow running the file directly as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Code.Benchmarks.FakeIPSA import installfakeipsa
+
+
+# ==============================================================================
+# CONFIGURATION
+# ==============================================================================
+
+BENCHMARK_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_PATH = os.path.join(BENCHMARK_PATH, 'Data')
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_PATH, 'Baselines', 'pipeline_baseline.json')
+FULL_GRID_PATH = os.path.join(os.path.dirname(BENCHMARK_PATH), 'DataSources', 'Full_Grid.xlsx')
+
+DEFAULT_CASES = ['synthetic-1000', 'synthetic-10000', 'synthetic-50000', 'full-grid']
+PIPELINE_STAGES = ['read', 'validate', 'standardise', 'ingest', 'ipsa_build', 'loadflow']
+# Ways of building the engine network from standardised data, compared with --strategies
+LOAD_STRATEGIES = ['datamodel', 'direct']
+
+# Differences below these floors are treated as noise whatever the relative change
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_MB = 5.0
+
+
+# ==============================================================================
+# PIPELINE
+# ==============================================================================
+
+def getcasefilepath(case_name: str, data_path: str = DEFAULT_DATA_PATH, seed: int = 0) -> str:
+    """
+    Get the workbook for a benchmark case, generating synthetic workbooks on first use
+    Args:
+        case_name (str): 'full-grid' or 'synthetic-<busbars>'
+        data_path (str): Directory for generated workbooks
+        seed (int): Random seed of synthetic networks
+    Returns:
+        str: Workbook path
+    """
+    if case_name == 'full-grid':
+        return FULL_GRID_PATH
+    if case_name.startswith('synthetic-'):
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import getsyntheticworkbook
+        return getsyntheticworkbook(int(case_name.split('-', 1)[1]), data_path, seed)
+    raise ValueError(f"Unknown benchmark case: {case_name}")
+
+
+def _resetframework():
+    """Fresh DataModel, factory and data source interface for each pipeline run"""
+    from Code import GlobalEngineRegistry as gbl
+    from Code.Messaging import Messaging
+    from Code.DataModel.ComponentFactory import ComponentFactory
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataSources.ETYS.ETYSDataModelInterface import ETYSDataModelInterface
+    if gbl.Msg is None:
+        gbl.Msg = Messaging()
+        gbl.Msg.set_log_level('ERROR')
+    gbl.DataFactory = ComponentFactory()
+    gbl.DataModelManager = DataModelManager()
+    gbl.DataSourceInterfaceContainer = ETYSDataModelInterface()
+    gbl.ResultCache = None
+
+
+def runpipeline(file_path: str, trace_memory: bool = False, quiet: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Run the full pipeline once and measure every stage
+    Args:
+        file_path (str): ETYS workbook
+        trace_memory (bool): Record the tracemalloc peak of each stage (slows the run down)
+        quiet (bool): Swallow the framework console output while the stages run
+    Returns:
+        Dict[str, Dict[str, float]]: 'seconds' and, when traced, 'peak_mb' per stage
+    """
+    from Code import GlobalEngineRegistry as gbl
+    from Code.NetworkDataManager import NetworkDataManager
+    from Code.DataSources.ETYS.ETYSDataReader import ETYSDataReader
+    from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+    from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+    from Code.Benchmarks.SimulatedLoadFlow import SimulatedDCLoadFlow
+
+    _resetframework()
+    state = {}
+
+    def read():
+        state['raw'] = ETYSDataReader().load_data(file_path=file_path)
+
+    def validate():
+        state['validation'] = ETYSDataValidator().validate(state['raw'])
+
+    def standardise():
+        cleaned = state['validation'].cleaned_data
+        state['standard'] = NetworkDataManager()._standardize_to_common_format(
+            cleaned if cleaned is not None else state['raw'], 'etys')
+
+    def ingest():
+        if not gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(state['standard'], 'datamodel'):
+            raise RuntimeError("DataModel ingestion failed")
+
+    def ipsa_build():
+        if not EngineIPSA().load_network_from_datamodel():
+            raise RuntimeError("IPSA model build failed")
+
+    def loadflow():
+        oLoadFlow = SimulatedDCLoadFlow()
+        if not (oLoadFlow.runloadflow() and oLoadFlow.getallloadflowresults()):
+            raise RuntimeError("Simulated load flow failed")
+
+    stages = {'read': read, 'validate': validate, 'standardise': standardise,
+              'ingest': ingest, 'ipsa_build': ipsa_build, 'loadflow': loadflow}
+    results = {}
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for stage_name in PIPELINE_STAGES:
+            with _quietoutput(quiet):
+                if trace_memory:
+                    tracemalloc.reset_peak()
+                    current_bytes = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter()
+                stages[stage_name]()
+                seconds = time.perf_counter() - start
+                gbl.Msg.Flush()
+            results[stage_name] = {'seconds': seconds}
+            if trace_memory:
+                results[stage_name]['peak_mb'] = (tracemalloc.get_traced_memory()[1] - current_bytes) / 2 ** 20
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    results['counts'] = {
+        'busbars': len(gbl.DataModelManager.Busbar_TAB),
+        'branches': len(gbl.DataModelManager.Branch_TAB),
+        'generators': len(gbl.DataModelManager.Gen_TAB),
+        'loads': len(gbl.DataModelManager.Load_TAB),
+    }
+    return results
+
+
+def benchmarkcase(case_name: str, repeats: int = 3, trace_memory: bool = True,
+                  data_path: str = DEFAULT_DATA_PATH, seed: int = 0) -> Dict[str, Any]:
+    """
+    Benchmark one case: timed repeats, then a separate traced run for peak memory
+    Args:
+        case_name (str): Benchmark case
+        repeats (int): Number of timed pipeline runs, the median is reported
+        trace_memory (bool): Add a tracemalloc run for peak memory per stage
+        data_path (str): Directory for generated workbooks
+        seed (int): Random seed of synthetic networks
+    Returns:
+        Dict[str, Any]: Per stage 'seconds' (median), 'min_seconds' and 'peak_mb', plus component counts
+    """
+    file_path = getcasefilepath(case_name, data_path, seed)
+    runs = [runpipeline(file_path) for _ in range(max(1, repeats))]
+    result = {'file': os.path.basename(file_path), 'repeats': len(runs), 'counts': runs[-1]['counts'],
+              'stages': {}}
+    for stage_name in PIPELINE_STAGES:
+        timings = [run[stage_name]['seconds'] for run in runs]
+        result['stages'][stage_name] = {'seconds': statistics.median(timings), 'min_seconds': min(timings)}
+    if trace_memory:
+        traced = runpipeline(file_path, trace_memory=True)
+        for stage_name in PIPELINE_STAGES:
+            result['stages'][stage_name]['peak_mb'] = traced[stage_name]['peak_mb']
+    result['total_seconds'] = sum(stage['seconds'] for stage in result['stages'].values())
+    return result
+
+
+# ==============================================================================
+# LOAD STRATEGIES
+# ==============================================================================
+
+def loadstandardiseddata(file_path: str, quiet: bool = True) -> Dict[str, Any]:
+    """Read, validate and standardise an ETYS workbook"""
+    from Code.NetworkDataManager import NetworkDataManager
+    from Code.DataSources.ETYS.ETYSDataReader import ETYSDataReader
+    from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+    with _quietoutput(quiet):
+        raw = ETYSDataReader().load_data(file_path=file_path)
+        cleaned = ETYSDataValidator().validate(raw).cleaned_data
+        return NetworkDataManager()._standardize_to_common_format(cleaned if cleaned is not None else raw, 'etys')
+
+
+def runloadstrategy(standard: Dict[str, Any], strategy: str, trace_memory: bool = False,
+                    quiet: bool = True) -> Dict[str, float]:
+    """
+    Build the IPSA network of standardised data with one load strategy: 'datamodel' ingests the data into the
+    DataModel and builds the engine network from it, 'direct' creates the engine components from the sheets
+    Args:
+        standard (Dict[str, Any]): Standardised ETYS sheets
+        strategy (str): 'datamodel' or 'direct'
+        trace_memory (bool): Record the tracemalloc peak of the build
+        quiet (bool): Swallow the framework console output during the build
+    Returns:
+        Dict[str, float]: 'seconds', 'components' built in the engine and, when traced, 'peak_mb'
+    """
+    from Code import GlobalEngineRegistry as gbl
+    from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+
+    _resetframework()
+    previous_engine = gbl.EngineContainer
+    engine = EngineIPSA()
+    gbl.EngineContainer = engine
+    try:
+        with _quietoutput(quiet):
+            if trace_memory:
+                tracemalloc.start()
+            try:
+                start = time.perf_counter()
+                if strategy == 'datamodel':
+                    bOK = (gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, 'datamodel')
+                           and engine.load_network_from_datamodel())
+                else:
+                    bOK = gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, strategy)
+                result = {'seconds': time.perf_counter() - start}
+                if trace_memory:
+                    result['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                if trace_memory:
+                    tracemalloc.stop()
+            gbl.Msg.Flush()
+        if not bOK:
+            raise RuntimeError(f"IPSA build with the {strategy} load strategy failed")
+        result['components'] = sum(engine.m_network.getcomponentcounts().values())
+        return result
+    finally:
+        gbl.EngineContainer = previous_engine
+
+
+def comparestrategies(standard: Dict[str, Any], repeats: int = 3, trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Time the datamodel and direct load strategies on the same standardised data
+    Returns:
+        Dict[str, Any]: Per strategy 'seconds' (median), 'min_seconds', 'components' and 'peak_mb'
+    """
+    results = {}
+    for strategy in LOAD_STRATEGIES:
+        runs = [runloadstrategy(standard, strategy) for _ in range(max(1, repeats))]
+        timings = [run['seconds'] for run in runs]
+        results[strategy] = {'seconds': statistics.median(timings), 'min_seconds': min(timings),
+                             'components': runs[-1]['components']}
+        if trace_memory:
+            results[strategy]['peak_mb'] = runloadstrategy(standard, strategy, trace_memory=True)['peak_mb']
+    return results
+
+
+# ==============================================================================
+# BASELINES
+# ==============================================================================
+
+def loadbaseline(baseline_path: str) -> Optional[Dict[str, Any]]:
+    """Load a stored baseline, or None if there is none"""
+    if not os.path.isfile(baseline_path):
+        return None
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def savebaseline(results: Dict[str, Any], baseline_path: str) -> str:
+    """
+    Store benchmark results as the baseline, merging with cases already in the file
+    Returns:
+        str: Baseline path
+    """
+    baseline = loadbaseline(baseline_path) or {'cases': {}}
+    baseline['cases'].update(results['cases'])
+    baseline['environment'] = results['environment']
+    baseline['created'] = results['created']
+    os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+    with open(baseline_path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+    return baseline_path
+
+
+def findregressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline
+    Args:
+        results (Dict[str, Any]): Current benchmark results
+        baseline (Dict[str, Any]): Stored baseline
+        threshold (float): Relative increase treated as a regression (0.2 = 20 %)
+    Returns:
+        List[Dict[str, Any]]: One entry per regressed case, stage and metric
+    """
+    regressions = []
+    for case_name, case in results['cases'].items():
+        baseline_case = baseline.get('cases', {}).get(case_name)
+        if baseline_case is None:
+            continue
+        for stage_name, stage in case['stages'].items():
+            baseline_stage = baseline_case['stages'].get(stage_name, {})
+            for metric, floor in (('seconds', MIN_REGRESSION_SECONDS), ('peak_mb', MIN_REGRESSION_MB)):
+                if metric not in stage or metric not in baseline_stage:
+                    continue
+                current, reference = stage[metric], baseline_stage[metric]
+                if current - reference > floor and current > reference * (1.0 + threshold):
+                    regressions.append({'case': case_name, 'stage': stage_name, 'metric': metric,
+                                        'baseline': reference, 'current': current,
+                                        'change': current / reference - 1.0 if reference else float('inf')})
+    return regressions
+
+
+# ==============================================================================
+# REPORTING AND CLI
+# ==============================================================================
+
+@contextlib.contextmanager
+def _quietoutput(quiet: bool):
+    """Redirect stdout while the framework prints its progress messages"""
+    if not quiet:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def formatresults(results: Dict[str, Any], regressions: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a fixed width table"""
+    flagged = {(r['case'], r['stage']) for r in regressions}
+    lines = [f"{'case':<18}{'stage':<13}{'median s':>10}{'min s':>10}{'peak MB':>10}"]
+    for case_name, case in results['cases'].items():
+        for stage_name, stage in case['stages'].items():
+            peak = f"{stage['peak_mb']:.1f}" if 'peak_mb' in stage else '-'
+            flag = '  REGRESSION' if (case_name, stage_name) in flagged else ''
+            lines.append(f"{case_name:<18}{stage_name:<13}{stage['seconds']:>10.3f}"
+                         f"{stage['min_seconds']:>10.3f}{peak:>10}{flag}")
+        counts = ', '.join(f"{k}={v}" for k, v in case['counts'].items())
+        lines.append(f"{'':<18}{'total':<13}{case['total_seconds']:>10.3f}   ({counts})")
+    return '\n'.join(lines)
+
+
+def formatstrategies(results: Dict[str, Dict[str, Any]]) -> str:
+    """Format load strategy comparisons as a fixed width table"""
+    lines = [f"{'case':<18}{'strategy':<13}{'median s':>10}{'min s':>10}{'peak MB':>10}{'components':>12}"]
+    for case_name, strategies in results.items():
+        for strategy, result in strategies.items():
+            peak = f"{result['peak_mb']:.1f}" if 'peak_mb' in result else '-'
+            lines.append(f"{case_name:<18}{strategy:<13}{result['seconds']:>10.3f}{result['min_seconds']:>10.3f}"
+                         f"{peak:>10}{result['components']:>12}")
+    return '\n'.join(lines)
+
+
+def runbenchmarks(cases: List[str], repeats: int = 3, trace_memory: bool = True,
+                  data_path: str = DEFAULT_DATA_PATH, seed: int = 0) -> Dict[str, Any]:
+    """Run the given cases and collect the results with the environment they ran in"""
+    results = {
+        'created': datetime.now().isoformat(),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'processor': platform.processor()},
+        'cases': {},
+    }
+    for case_name in cases:
+        results['cases'][case_name] = benchmarkcase(case_name, repeats, trace_memory, data_path, seed)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ETYS -> DataModel -> engine pipeline")
+    parser.add_argument('--cases', nargs='+', default=DEFAULT_CASES,
+                        help="Cases to run: full-grid and/or synthetic-<busbars>")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed runs per case")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc run")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    parser.add_argument('--output', help="Write the results JSON here")
+    parser.add_argument('--trace', help="Write a Chrome trace of the instrumented spans here")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help="Directory for synthetic workbooks")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic networks")
+    parser.add_argument('--strategies', action='store_true',
+                        help="Compare the IPSA build time and peak memory of the datamodel and direct load strategies")
+    args = parser.parse_args(argv)
+
+    # The benchmark always builds against the fake engine so results are comparable between machines
+    installfakeipsa(bForce=True)
+    if args.strategies:
+        results = {case_name: comparestrategies(loadstandardiseddata(getcasefilepath(case_name, args.data, args.seed)),
+                                                args.repeats, not args.no_memory)
+                   for case_name in args.cases}
+        print(formatstrategies(results))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({'strategies': results}, f, indent=2)
+        return 0
+    if args.trace:
+        from Code.Instrumentation import Recorder
+        Recorder.enable()
+    results = runbenchmarks(args.cases, args.repeats, not args.no_memory, args.data, args.seed)
+    baseline = loadbaseline(args.baseline)
+    regressions = findregressions(results, baseline, args.threshold) if baseline else []
+    print(formatresults(results, regressions))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({**results, 'regressions': regressions}, f, indent=2)
+    if args.trace:
+        Recorder.exportchrometrace(args.trace)
+    if args.save_baseline:
+        print(f"Baseline saved to {savebaseline(results, args.baseline)}")
+    if regressions:
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} {regression['stage']} {regression['metric']}: "
+                  f"{regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change']:+.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
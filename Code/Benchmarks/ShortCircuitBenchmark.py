@@ -0,0 +1,195 @@
+"""
+ShortCircuitBenchmark - Benchmark of the generator short circuit contribution lookup
+Builds a synthetic network with thousands of machines, computes the fault contributions with the
+native short circuit engine and serves them through an in-memory stand-in for the PowerFactory
+application. The PowerFactory contribution read-back is then timed with the former per generator
+scan of Gen_TAB and with the indexed array implementation, and checked against the native results.
+
+Usage:
+    python -m Code.Benchmarks.ShortCircuitBenchmark --generators 1000 5000
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, List, Optional, Any
+import os
+import sys
+import time
+import types
+import argparse
+
+import numpy as np
+
+# Allow running the file directly as well as with -m
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from Code import GlobalEngineRegistry as gbl
+
+
+# ==============================================================================
+# POWERFACTORY STAND-IN
+# ==============================================================================
+
+class FakePFObject:
+    """PowerFactory data object holding its attributes in a dict"""
+
+    def __init__(self, strClassName: str, dictAttributes: Dict[str, Any], oParent: 'FakePFObject' = None):
+        self.strClassName = strClassName
+        self.dictAttributes = dictAttributes
+        self.oParent = oParent
+
+    def GetAttribute(self, strName: str) -> Any:
+        return self.dictAttributes.get(strName)
+
+    def GetClassName(self) -> str:
+        return self.strClassName
+
+    def GetParent(self) -> Optional['FakePFObject']:
+        return self.oParent
+
+
+class FakePFApp:
+    """Application object serving a fixed list of generators"""
+
+    def __init__(self, listGenerators: List[FakePFObject]):
+        self.listGenerators = listGenerators
+
+    def GetCalcRelevantObjects(self, strPattern: str) -> List[FakePFObject]:
+        return list(self.listGenerators)
+
+    def GetFromStudyCase(self, strName: str) -> FakePFObject:
+        return FakePFObject(strName, {})
+
+
+# ==============================================================================
+# BENCHMARK
+# ==============================================================================
+
+def buildcontributionnetwork(generators: int, busbars_per_generator: float = 0.5):
+    """
+    Build a meshed DataModel with the given number of machines and busbar IDs in the PowerFactory terminal format
+    Args:
+        generators (int): Number of generators
+        busbars_per_generator (float): Busbars per generator
+    Returns:
+        DataModelManager: The network
+    """
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataModel.ComponentManager import Busbar, Branch, Generator
+    datamodel = DataModelManager()
+    busbars = max(2, int(generators * busbars_per_generator))
+    for index in range(busbars):
+        busbar = Busbar(f"T{index}_T{index}_400.0")
+        busbar.kV = 400.0
+        datamodel.addbusbartotab(busbar)
+    for index in range(busbars):
+        for step in (1, 7):
+            bus1, bus2 = datamodel.Busbar_TAB[index].BusID, datamodel.Busbar_TAB[(index + step) % busbars].BusID
+            datamodel.Branch_TAB.append(Branch(bus1, bus2, 0, f"L{index}_{step}"))
+    for index in range(generators):
+        generator = Generator(datamodel.Busbar_TAB[index % busbars].BusID, f"G{index}")
+        generator.MWCapacity = 100.0 + index % 10 * 50.0
+        datamodel.addgentotab(generator)
+    return datamodel
+
+
+def buildfakepowerfactory(datamodel, contributions: Dict[str, np.ndarray]) -> FakePFApp:
+    """Create PowerFactory generator objects carrying the given contributions as their m: results"""
+    terminals = {}
+    generators = []
+    for row, gen_index in enumerate(contributions['gen_index'].tolist()):
+        generator = datamodel.Gen_TAB[gen_index]
+        name = generator.BusID.split('_')[0]
+        if name not in terminals:
+            terminals[name] = FakePFObject('ElmTerm', {'loc_name': name, 'uknom': 400.0})
+        cubicle = FakePFObject('StaCubic', {}, terminals[name])
+        generators.append(FakePFObject('ElmSym', {
+            'loc_name': generator.GenID, 'bus1': cubicle,
+            'm:Skss:bus1': float(contributions['skss'][row]), 'm:Ikss:bus1': float(contributions['ikss'][row]),
+            'm:phii:bus1': float(contributions['ikss_angle'][row]), 'm:Ip:bus1': float(contributions['ip'][row])}))
+    # Engine order differs from the DataModel order
+    return FakePFApp(generators[::-1])
+
+
+def _scangencontributions(app: FakePFApp) -> List[Dict[str, Any]]:
+    """The former read-back: every engine generator scans Gen_TAB for its GenID and BusID"""
+    data = []
+    for gen in app.GetCalcRelevantObjects("*.ElmGen, *.ElmGenstat, *.ElmSym"):
+        gen_id = gen.GetAttribute("loc_name")
+        bus_id = gbl.DataModelInterfaceContainer.standardize_terminal_id(gen.GetAttribute("bus1"))
+        for gen_obj in gbl.DataModelManager.Gen_TAB:
+            if gen_obj.GenID == gen_id and gen_obj.BusID == bus_id:
+                data.append({"GenID": gen_id, "BusID": bus_id, "Skss": gen.GetAttribute("m:Skss:bus1"),
+                             "Ikss": gen.GetAttribute("m:Ikss:bus1"), "Ikss_Angle": gen.GetAttribute("m:phii:bus1"),
+                             "Ip": gen.GetAttribute("m:Ip:bus1")})
+                break
+    return data
+
+
+def benchmarkcontributions(generators: int) -> Dict[str, Any]:
+    """
+    Time the generator contribution read-back for one network size
+    Args:
+        generators (int): Number of generators
+    Returns:
+        Dict[str, Any]: Seconds of the native engine, the former scan and the indexed read-back (cold and warm index)
+    """
+    from Code.Messaging import Messaging
+    from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+    from Code.Framework.PowerFactory.EnginePowerFactoryShortCircuit import EnginePowerFactoryShortCircuit
+    from Code.Framework.PowerFactory.EnginePowerFactoryDataModelInterface import EnginePowerFactoryDataModelInterface
+    saved = (gbl.Msg, gbl.DataModelManager, gbl.EngineContainer, gbl.DataModelInterfaceContainer)
+    try:
+        if gbl.Msg is None:
+            gbl.Msg = Messaging()
+            gbl.Msg.set_log_level('ERROR')
+        gbl.DataModelManager = buildcontributionnetwork(generators)
+        native = EngineNativeShortCircuit()
+        if not native.runshortcircuitanalysisforallbusbars():
+            raise RuntimeError("Native short circuit analysis failed")
+        start = time.perf_counter()
+        native.getgenshortcircuitcontributions()
+        result = {'generators': generators, 'native_seconds': time.perf_counter() - start}
+        expected = dict(native.m_dictGenContributions)
+        app = buildfakepowerfactory(gbl.DataModelManager, expected)
+        gbl.EngineContainer = types.SimpleNamespace(m_pFApp=app)
+        gbl.DataModelInterfaceContainer = EnginePowerFactoryDataModelInterface()
+        start = time.perf_counter()
+        scanned = _scangencontributions(app)
+        result['scan_seconds'] = time.perf_counter() - start
+        powerfactory = EnginePowerFactoryShortCircuit()
+        for key in ('indexed_cold_seconds', 'indexed_warm_seconds'):
+            start = time.perf_counter()
+            powerfactory.getgenshortcircuitcontributions()
+            result[key] = time.perf_counter() - start
+        table = powerfactory.m_dictGenContributions
+        order = np.argsort(table['gen_index'])
+        result['matches_native'] = bool(
+            len(scanned) == generators and np.array_equal(table['gen_index'][order], expected['gen_index'])
+            and all(np.allclose(table[column][order], expected[column]) for column in EnginePowerFactoryShortCircuit.GEN_CONTRIBUTION_COLUMNS))
+        return result
+    finally:
+        gbl.Msg, gbl.DataModelManager, gbl.EngineContainer, gbl.DataModelInterfaceContainer = saved
+
+
+def formatresults(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a text table"""
+    lines = [f"{'generators':>10} {'native':>10} {'scan':>10} {'indexed':>10} {'warm':>10}  matches"]
+    for result in results:
+        lines.append(f"{result['generators']:>10} {result['native_seconds']:>9.3f}s {result['scan_seconds']:>9.3f}s "
+                     f"{result['indexed_cold_seconds']:>9.3f}s {result['indexed_warm_seconds']:>9.3f}s  "
+                     f"{result['matches_native']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the generator short circuit contribution lookup")
+    parser.add_argument('--generators', type=int, nargs='+', default=[500, 2000, 5000],
+                        help="Network sizes in generators")
+    args = parser.parse_args(argv)
+    results = [benchmarkcontributions(generators) for generators in args.generators]
+    print(formatresults(results))
+    return 0 if all(result['matches_native'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# Simulated load flow engine for benchmarking the framework without IPSA or PowerFactory.
+# Solves a DC load flow directly on the DataModel with SciPy so the load flow stage of the pipeline
+# (matrix build, solve, result write-back) scales like a real engine call.
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+from Code.Framework.BaseTemplates.EngineLoadFlowContainer import EngineLoadFlowContainer
+
+
+class SimulatedDCLoadFlow(EngineLoadFlowContainer):
+    """DC load flow on the DataModel, one slack busbar per island"""
+
+    DEFAULT_REACTANCE_PU = 0.01
+    BASE_MVA = 100.0
+    SOLVES_DATAMODEL = True
+
+    def __init__(self):
+        EngineLoadFlowContainer.__init__(self)
+        self.m_arrAnglesRad = None
+        self.m_arrBranchFlowsMW = None
+        self.m_listBranchIndices = []
+        self.m_nIslands = 0
+        # Factorised reduced B' matrix kept for warm started time steps with unchanged topology
+        self.m_tFactorKey = None
+        self.m_oFactor = None
+        self.m_arrFree = None
+        self.m_bReuseFactor = False
+
+    #__________________________ENGINE LOAD FLOW METHODS________________________
+    @timed("loadflow.simulated.runloadflow")
+    def runloadflow(self, **kwargs):
+        """Build the susceptance matrix from the DataModel and solve for the busbar angles"""
+        self.m_dictLastRunSettings = dict(kwargs)
+        oDataModel = gbl.DataModelManager
+        nBusbars = len(oDataModel.Busbar_TAB)
+        if nBusbars == 0:
+            gbl.Msg.AddError("Simulated load flow: the DataModel has no busbars.")
+            return False
+        listFrom, listTo, listSusceptance, self.m_listBranchIndices = [], [], [], []
+        for nIndex, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom = oDataModel.BusbarIdToIndex.get(oBranch.BusID1)
+            nTo = oDataModel.BusbarIdToIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo:
+                continue
+            fReactance = abs(getattr(oBranch, 'X', 0.0) or 0.0) or self.DEFAULT_REACTANCE_PU
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listSusceptance.append(1.0 / fReactance)
+            self.m_listBranchIndices.append(nIndex)
+        arrFrom = np.array(listFrom, dtype=np.int64)
+        arrTo = np.array(listTo, dtype=np.int64)
+        arrB = np.array(listSusceptance)
+        arrInjection = np.zeros(nBusbars)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON:
+                arrInjection[nBus] += (oGen.MW or 0.0) / self.BASE_MVA
+        for oLoad in oDataModel.Load_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oLoad.BusID)
+            if nBus is not None and oLoad.ON:
+                arrInjection[nBus] -= (oLoad.MW or 0.0) / self.BASE_MVA
+        tFactorKey = (nBusbars, arrFrom.tobytes(), arrTo.tobytes(), arrB.tobytes())
+        if not (self.m_bReuseFactor and tFactorKey == self.m_tFactorKey):
+            self._factorise(nBusbars, arrFrom, arrTo, arrB)
+            self.m_tFactorKey = tFactorKey
+        self.m_arrAnglesRad = np.zeros(nBusbars)
+        if self.m_oFactor is not None:
+            self.m_arrAnglesRad[self.m_arrFree] = self.m_oFactor.solve(arrInjection[self.m_arrFree])
+        self.m_arrBranchFlowsMW = (self.m_arrAnglesRad[arrFrom] - self.m_arrAnglesRad[arrTo]) * arrB * self.BASE_MVA
+        return True
+
+    def _factorise(self, nBusbars, arrFrom, arrTo, arrB):
+        """Builds and factorises the reduced susceptance matrix"""
+        # B' = A^T diag(b) A, assembled straight from the branch list
+        mtxB = sp.coo_matrix((np.concatenate([arrB, arrB, -arrB, -arrB]),
+                              (np.concatenate([arrFrom, arrTo, arrFrom, arrTo]),
+                               np.concatenate([arrFrom, arrTo, arrTo, arrFrom]))),
+                             shape=(nBusbars, nBusbars)).tocsr()
+        # Every island needs its own angle reference, the first busbar of each island is the slack
+        self.m_nIslands, arrLabels = connected_components(mtxB, directed=False)
+        _, arrSlacks = np.unique(arrLabels, return_index=True)
+        self.m_arrFree = np.ones(nBusbars, dtype=bool)
+        self.m_arrFree[arrSlacks] = False
+        self.m_oFactor = splu(mtxB[self.m_arrFree][:, self.m_arrFree].tocsc()) if self.m_arrFree.any() else None
+
+    def runloadflowtimestep(self, bWarmStart=False, **kwargs):
+        """Time series step, reusing the factorisation of the previous step while the topology is unchanged"""
+        self.m_bReuseFactor = bWarmStart
+        try:
+            return EngineLoadFlowContainer.runloadflowtimestep(self, bWarmStart, **kwargs)
+        finally:
+            self.m_bReuseFactor = False
+
+    #__________________________RESULT WRITE BACK________________________
+    def getandupdatebusbarloadflowresults(self):
+        for oBusbar, fAngle in zip(gbl.DataModelManager.Busbar_TAB, np.degrees(self.m_arrAnglesRad)):
+            oBusbar.voltage = 1.0
+            oBusbar.angle = float(fAngle)
+        return True
+
+    def getandupdatelineloadflowresults(self):
+        oBranchTab = gbl.DataModelManager.Branch_TAB
+        for nIndex, fFlowMW in zip(self.m_listBranchIndices, self.m_arrBranchFlowsMW):
+            oBranch = oBranchTab[nIndex]
+            fRating = oBranch.RatingA or 0.0
+            oBranch.loading = float(abs(fFlowMW) / fRating * 100.0) if fRating > 0 else 0.0
+            oBranch.lossMW = 0.0
+            oBranch.lossMVAr = 0.0
+        return True
+
+    def getandupdatetransformerflowresults(self):
+        # Transformers are held on Branch_TAB and updated with the lines
+        return True
+
+    def getandupdateloadflowgeneratorresults(self):
+        for oGen in gbl.DataModelManager.Gen_TAB:
+            oGen.MWLoadFlow = oGen.MW if oGen.ON else 0.0
+            oGen.MVarLoadFlow = 0.0
+        return True
+
+    @timed("loadflow.simulated.getallloadflowresults")
+    def getallloadflowresults(self):
+        if self.m_arrAnglesRad is None:
+            gbl.Msg.AddError("Simulated load flow: no results, run the load flow first.")
+            return False
+        bOK = self.getandupdatebusbarloadflowresults()
+        if bOK:
+            bOK = self.getandupdatelineloadflowresults()
+        if bOK:
+            bOK = self.getandupdatetransformerflowresults()
+        if bOK:
+            bOK = self.getandupdateloadflowgeneratorresults()
+        return bOK
@@ -0,0 +1,294 @@
+"""
+SyntheticETYSNetworkGenerator - Synthetic transmission networks in the ETYS workbook schema
+Generates seeded, connected networks of any size with the same sheets and columns as the ETYS
+Full_Grid.xlsx so that the data source, DataModel and engine pipeline can be benchmarked well
+beyond the size of the real dataset. Component counts per busbar follow the ratios of Full_Grid.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, Optional
+import os
+import string
+
+import numpy as np
+import pandas as pd
+
+
+# ==============================================================================
+# SCHEMA AND RATIOS
+# ==============================================================================
+
+# Components per busbar, taken from Full_Grid.xlsx
+COMPONENT_RATIOS = {
+    'extra_branches': 0.5,      # meshing circuits on top of the spanning tree
+    'voltage_inheritance': 0.5,  # nodes on the same voltage as their spanning tree parent
+    'Demand Data': 0.46,
+    'TEC Register': 0.79,
+    'IC Register': 0.016,
+    'Shunt Reactor': 0.1,
+    'Mechanically Switched Capacitor': 0.08,
+}
+
+# Share of same-voltage circuits placed on each line sheet
+LINE_SHEET_SHARES = {'OHL': 0.55, 'Cable': 0.3, 'Composite': 0.15}
+
+VOLTAGE_LEVELS = np.array([400.0, 275.0, 132.0])
+VOLTAGE_SHARES = np.array([0.25, 0.25, 0.5])
+VOLTAGE_DIGITS = {400.0: '4', 275.0: '2', 132.0: '1'}
+RATING_RANGES = {400.0: (2000.0, 3500.0), 275.0: (800.0, 1500.0), 132.0: (100.0, 300.0)}
+
+PLANT_TYPES = ['Wind Offshore', 'Wind Onshore', 'PV Array (Photo Voltaic/solar)',
+               'Energy Storage System', 'CCGT (Combined Cycle Gas Turbine)', 'Nuclear', 'Demand']
+
+# Maximum index distance between the two ends of a circuit, keeps the network geographically local
+_NEIGHBOURHOOD = 50
+
+
+# ==============================================================================
+# GENERATION
+# ==============================================================================
+
+def generatesyntheticetysdata(nBusbars: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """
+    Generate a connected synthetic network in the ETYS workbook schema
+    Args:
+        nBusbars (int): Number of nodes to generate
+        seed (int): Random seed, the same seed always gives the same network
+    Returns:
+        Dict[str, pd.DataFrame]: DataFrames keyed by ETYS sheet name, as returned by ETYSDataReader
+    """
+    if nBusbars < 2:
+        raise ValueError("A synthetic network needs at least two busbars")
+    rng = np.random.default_rng(seed)
+    # Spanning tree to a nearby earlier node keeps the network connected, extra circuits mesh it
+    tree_from = np.arange(1, nBusbars)
+    tree_to = np.maximum(tree_from - rng.integers(1, _NEIGHBOURHOOD + 1, nBusbars - 1), 0)
+    # Half of the nodes share the voltage of their tree parent, which gives Full_Grid's line/transformer mix
+    voltages = rng.choice(VOLTAGE_LEVELS, nBusbars, p=VOLTAGE_SHARES)
+    voltages[0] = 400.0
+    bInherit = rng.random(nBusbars) < COMPONENT_RATIOS['voltage_inheritance']
+    for i in np.flatnonzero(bInherit[1:]) + 1:
+        voltages[i] = voltages[tree_to[i - 1]]
+    node_names = np.array([_getsitecode(i) + VOLTAGE_DIGITS[kv] + 'A' for i, kv in enumerate(voltages)])
+    data = {'Nodes': _generatenodes(rng, node_names, voltages)}
+
+    nExtra = int(COMPONENT_RATIOS['extra_branches'] * nBusbars)
+    extra_from = rng.integers(1, nBusbars, nExtra)
+    extra_to = np.maximum(extra_from - rng.integers(1, _NEIGHBOURHOOD + 1, nExtra), 0)
+    branch_from = np.concatenate([tree_from, extra_from])
+    branch_to = np.concatenate([tree_to, extra_to])
+    bSameVoltage = voltages[branch_from] == voltages[branch_to]
+
+    line_from, line_to = branch_from[bSameVoltage], branch_to[bSameVoltage]
+    line_sheet = rng.choice(list(LINE_SHEET_SHARES), len(line_from), p=list(LINE_SHEET_SHARES.values()))
+    for sheet_name in LINE_SHEET_SHARES:
+        bSheet = line_sheet == sheet_name
+        data[sheet_name] = _generatelines(rng, sheet_name, node_names, voltages,
+                                          line_from[bSheet], line_to[bSheet])
+    data['Transformer'] = _generatetransformers(rng, node_names, branch_from[~bSameVoltage],
+                                                branch_to[~bSameVoltage])
+    data['Demand Data'] = _generatedemand(rng, node_names, voltages,
+                                          int(COMPONENT_RATIOS['Demand Data'] * nBusbars))
+    data['TEC Register'] = _generatetecregister(rng, node_names,
+                                                int(COMPONENT_RATIOS['TEC Register'] * nBusbars))
+    data['IC Register'] = _generateicregister(rng, node_names,
+                                              max(1, int(COMPONENT_RATIOS['IC Register'] * nBusbars)))
+    for sheet_name in ('Shunt Reactor', 'Mechanically Switched Capacitor'):
+        data[sheet_name] = _generateshunts(rng, sheet_name, node_names, voltages,
+                                           int(COMPONENT_RATIOS[sheet_name] * nBusbars))
+    return data
+
+
+def writesyntheticworkbook(nBusbars: int, file_path: str, seed: int = 0) -> str:
+    """
+    Write a synthetic network to an Excel workbook readable by ETYSDataReader
+    Args:
+        nBusbars (int): Number of nodes to generate
+        file_path (str): Workbook path
+        seed (int): Random seed
+    Returns:
+        str: Path of the written workbook
+    """
+    data = generatesyntheticetysdata(nBusbars, seed)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = file_path + '.tmp.xlsx'
+    with pd.ExcelWriter(temp_path, engine='openpyxl') as writer:
+        for sheet_name, df in data.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    os.replace(temp_path, file_path)
+    return file_path
+
+
+def getsyntheticworkbook(nBusbars: int, data_path: str, seed: int = 0) -> str:
+    """
+    Get the path of a cached synthetic workbook, writing it on first use
+    Args:
+        nBusbars (int): Number of nodes
+        data_path (str): Directory holding the generated workbooks
+        seed (int): Random seed
+    Returns:
+        str: Path of the workbook
+    """
+    file_path = os.path.join(data_path, f"Synthetic_ETYS_{nBusbars}_seed{seed}.xlsx")
+    if not os.path.isfile(file_path):
+        writesyntheticworkbook(nBusbars, file_path, seed)
+    return file_path
+
+
+# ==============================================================================
+# SHEET BUILDERS
+# ==============================================================================
+
+def _getsitecode(index: int) -> str:
+    """Four letter site code, unique for the first 26^4 sites"""
+    letters = []
+    for _ in range(4):
+        index, remainder = divmod(index, 26)
+        letters.append(string.ascii_uppercase[remainder])
+    return ''.join(reversed(letters))
+
+
+def _generatenodes(rng, node_names, voltages) -> pd.DataFrame:
+    nBusbars = len(node_names)
+    zones = rng.integers(1, 18, nBusbars)
+    return pd.DataFrame({
+        'Node': node_names,
+        'Voltage (Derived)': voltages,
+        'Sheet_Name': 'B-1-1',
+        'Relevant TO': rng.choice(['NGET', 'SPT', 'SHET'], nBusbars, p=[0.7, 0.2, 0.1]),
+        'latitude': rng.uniform(50.0, 58.5, nBusbars),
+        'longitude': rng.uniform(-5.5, 1.8, nBusbars),
+        'Minor Flop Zone': [f"F{zone}" for zone in zones],
+        'Major Flop Zone': [f"Z{zone // 3}" for zone in zones],
+        'DESNZ T-Zone': [f"T{zone % 6}" for zone in zones],
+        'User Defined Zone': None,
+        'Type': 'Substation',
+        'Indoor/Outdoor': rng.choice(['Indoor', 'Outdoor'], nBusbars),
+        'Site Name': [f"SYNTHETIC SITE {name[:4]}" for name in node_names],
+    })
+
+
+def _getratings(rng, voltages) -> np.ndarray:
+    lower = np.array([RATING_RANGES[kv][0] for kv in voltages])
+    upper = np.array([RATING_RANGES[kv][1] for kv in voltages])
+    return np.round(rng.uniform(lower, upper), 0)
+
+
+def _generatelines(rng, sheet_name, node_names, voltages, line_from, line_to) -> pd.DataFrame:
+    nLines = len(line_from)
+    length = np.round(rng.uniform(1.0, 60.0, nLines), 3)
+    x_pct = np.round(rng.uniform(0.5, 8.0, nLines), 4)
+    winter = _getratings(rng, voltages[line_from])
+    return pd.DataFrame({
+        'Node 1': node_names[line_from],
+        'Node 2': node_names[line_to],
+        'OHL Length (km)': length if sheet_name != 'Cable' else 0.0,
+        'Cable Length (km)': length if sheet_name == 'Cable' else 0.0,
+        'Circuit Type': sheet_name,
+        'R (% on 100MVA)': np.round(x_pct * rng.uniform(0.05, 0.15, nLines), 4),
+        'X (% on 100MVA)': x_pct,
+        'B (% on 100MVA)': np.round(rng.uniform(0.1, 5.0, nLines), 4),
+        'Winter Rating (MVA)': winter,
+        'Spring Rating (MVA)': np.round(winter * 0.93, 0),
+        'Summer Rating (MVA)': np.round(winter * 0.85, 0),
+        'Autumn Rating (MVA)': np.round(winter * 0.93, 0),
+        'Sheet_Name': 'B-2-1',
+        'Year': None,
+        'Status': None,
+    })
+
+
+def _generatetransformers(rng, node_names, tx_from, tx_to) -> pd.DataFrame:
+    nTransformers = len(tx_from)
+    x_pct = np.round(rng.uniform(3.0, 30.0, nTransformers), 4)
+    return pd.DataFrame({
+        'Node 1': node_names[tx_from],
+        'Node 2': node_names[tx_to],
+        'R (% on 100MVA)': np.round(x_pct * rng.uniform(0.01, 0.05, nTransformers), 4),
+        'X (% on 100MVA)': x_pct,
+        'B (% on 100MVA)': 0.0,
+        'Winter Rating (MVA)': np.round(rng.uniform(60.0, 1000.0, nTransformers), 0),
+        'Sheet_Name': 'B-3-1',
+        'Year': None,
+        'Status': None,
+        'Transformer Type': 'Transformer',
+    })
+
+
+def _generatedemand(rng, node_names, voltages, nLoads) -> pd.DataFrame:
+    candidates = np.flatnonzero(voltages != 400.0)
+    nodes = node_names[rng.choice(candidates, nLoads)]
+    peak = np.round(rng.uniform(5.0, 300.0, nLoads), 3)
+    return pd.DataFrame({
+        'scenario': 'HT',
+        'year': 30,
+        'DemandPk': peak,
+        'DemandAM': np.round(peak * 0.4, 3),
+        'DemandPM': np.round(peak * 0.7, 3),
+        'type': 'C,D,E,H,I,R,Z',
+        'Node_Name': [node[:5] for node in nodes],
+        'Name': [f"Synthetic GSP {node[:4]}" for node in nodes],
+        'Minor Flop': None,
+        'Major Flop': None,
+        'ETYS_Node': nodes,
+        'GSP': [node[:5] for node in nodes],
+    })
+
+
+def _generatetecregister(rng, node_names, nGenerators) -> pd.DataFrame:
+    nodes = node_names[rng.integers(0, len(node_names), nGenerators)]
+    capacity = np.round(rng.uniform(0.0, 600.0, nGenerators), 2)
+    capacity[rng.random(nGenerators) < 0.1] = 0.0
+    return pd.DataFrame({
+        'Project Name': [f"Synthetic Project {i}" for i in range(nGenerators)],
+        'Customer Name': 'SYNTHETIC LTD',
+        'Connection Site': [f"{node[:4]} Substation" for node in nodes],
+        'Stage': None,
+        'MW Connected': capacity,
+        'MW Increase / Decrease': 0.0,
+        'Cumulative Total Capacity (MW)': capacity,
+        'Project Status': 'Built',
+        'Agreement Type': 'Direct Connection',
+        'HOST TO': 'NGET',
+        'Plant Type': rng.choice(PLANT_TYPES, nGenerators),
+        'Project Number': [f"PRO-{i:06d}" for i in range(nGenerators)],
+        'Node_Name': [node[:5] for node in nodes],
+        'MW_Capacity': capacity,
+        'ETYS_Node': nodes,
+    })
+
+
+def _generateicregister(rng, node_names, nInterconnectors) -> pd.DataFrame:
+    nodes = node_names[rng.integers(0, len(node_names), nInterconnectors)]
+    capacity = np.round(rng.uniform(500.0, 2000.0, nInterconnectors), 0)
+    return pd.DataFrame({
+        'Project Name': [f"Synthetic Interconnector {i}" for i in range(nInterconnectors)],
+        'Customer Name': 'SYNTHETIC LTD',
+        'Connection Site': [f"{node[:4]} Substation" for node in nodes],
+        'Project Status': 'Built',
+        'HOST TO': 'NGET',
+        'Project Number': [f"PRO-IC{i:04d}" for i in range(nInterconnectors)],
+        'Node_Name': [node[:5] for node in nodes],
+        'MW_Import_Capacity': capacity,
+        'MW_Export_Capacity': capacity,
+        'ETYS_Node': nodes,
+    })
+
+
+def _generateshunts(rng, sheet_name, node_names, voltages, nShunts) -> pd.DataFrame:
+    indices = rng.integers(0, len(node_names), nShunts)
+    size = np.round(rng.uniform(20.0, 200.0, nShunts), 0)
+    bReactor = sheet_name == 'Shunt Reactor'
+    return pd.DataFrame({
+        'Site Name': [f"SYNTHETIC SITE {node[:4]}" for node in node_names[indices]],
+        'Node': node_names[indices],
+        'Unit Number': 1,
+        'MVAr Generation': 0.0 if bReactor else size,
+        'MVAr Absorption': size if bReactor else 0.0,
+        'Compensation Type': sheet_name,
+        'Connection Voltage (kV)': voltages[indices],
+        'Sheet_Name': 'B-4-1',
+        'Year': None,
+        'Status': None,
+    })
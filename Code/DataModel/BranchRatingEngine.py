@@ -0,0 +1,221 @@
+# Thermal rating sets of the DataModel branches held as arrays aligned to Branch_TAB.
+# Every rating attribute (RatingA/B/C and the ETYS seasonal ratings) is read in one pass into its own array, and read
+# again when a study asks for the ratings so edits of the attributes are seen. Further sets, e.g. per time of year, can
+# be added from arrays or BranchID keyed values. One set is active: studies read its array, so switching season is a
+# pointer change rather than a pass over the branch objects. Unless a set is chosen, RatingA is active, or the winter
+# ratings when no branch has a RatingA (ETYS data carries seasonal ratings only). The last branch flows are kept as well, and the percent
+# loading of every branch against any set is one vectorised division.
+import numpy as np
+
+
+class BranchRatingEngine:
+    """Rating sets (MVA) of every branch of a DataModel, one of them active"""
+
+    # Sets read from the branch attributes of the same name when the engine is built
+    ATTRIBUTE_SETS = ("RatingA", "RatingB", "RatingC", "WinterRating", "SpringAutumnRating", "SummerRating")
+    DEFAULT_SET = "RatingA"
+    # Seasonal sets and their months, ETYS seasons (winter Dec-Feb, summer May-Aug)
+    SEASON_SETS = {"winter": "WinterRating", "summer": "SummerRating", "spring_autumn": "SpringAutumnRating"}
+    SEASON_MONTHS = {"winter": (12, 1, 2), "summer": (5, 6, 7, 8), "spring_autumn": (3, 4, 9, 10, 11)}
+    # Sets standing in for a season without ratings of its own, or for the branches a seasonal set has no rating
+    # for, the more onerous first
+    SEASON_FALLBACK = {"winter": ("RatingA",), "summer": ("RatingA",), "spring_autumn": ("SummerRating", "RatingA")}
+
+    def __init__(self, oDataModel):
+        self.m_oDataModel = oDataModel
+        # Set name -> ratings aligned to Branch_TAB (MVA), zero where a branch is not monitored
+        self.m_dictSets = {}
+        # Rating attributes as last read, before the seasonal fallbacks
+        self.m_dictAttributes = {}
+        self.m_strActive = self.DEFAULT_SET
+        self.m_arrActive = None
+        # Set activated with setactiveratingset / setactiveseason, None while the default set is in use
+        self.m_strChosen = None
+        # Last flow of every branch (MVA), NaN where no flow has been set
+        self.m_arrFlowMVA = None
+        self.m_dictBranchIndex = {}
+        self.build()
+
+    #__________________________RATING SETS________________________
+    def build(self):
+        """Reads the rating attributes of every branch, dropping added sets and flows"""
+        listBranches = self.m_oDataModel.Branch_TAB
+        self.m_dictBranchIndex = {id(oBranch): nIdx for nIdx, oBranch in enumerate(listBranches)}
+        self.m_dictSets = {}
+        self.m_dictAttributes = {}
+        self.m_arrFlowMVA = np.full(len(listBranches), np.nan)
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """
+        Reads the rating attributes again in one pass and updates their sets when a value has changed; seasonal sets
+        fall back per branch where zero. Added sets, the active set and the flows are kept. Returns True on a change.
+        """
+        if self.isstale():
+            self.build()
+            return True
+        listBranches = self.m_oDataModel.Branch_TAB
+        dictAttributes = {}
+        for strAttribute in self.ATTRIBUTE_SETS:
+            arrRatings = np.array([getattr(oBranch, strAttribute, None) or 0.0 for oBranch in listBranches],
+                                  dtype=np.float64)
+            if strAttribute == self.DEFAULT_SET or arrRatings.any():
+                dictAttributes[strAttribute] = arrRatings
+        if self.m_dictAttributes and dictAttributes.keys() == self.m_dictAttributes.keys() and \
+                all(np.array_equal(arrRatings, self.m_dictAttributes[strAttribute])
+                    for strAttribute, arrRatings in dictAttributes.items()):
+            return False
+        for strAttribute in self.m_dictAttributes.keys() - dictAttributes.keys():
+            self.m_dictSets.pop(strAttribute, None)
+        self.m_dictAttributes = dictAttributes
+        self.m_dictSets.update(dictAttributes)
+        for strSeason, strSet in self.SEASON_SETS.items():
+            if strSet not in self.m_dictSets:
+                continue
+            for strFallback in self.SEASON_FALLBACK[strSeason]:
+                if strFallback in self.m_dictSets:
+                    arrRatings = self.m_dictSets[strSet]
+                    self.m_dictSets[strSet] = np.where(arrRatings > 0, arrRatings, self.m_dictSets[strFallback])
+                    break
+        strActive = self.m_strChosen if self.m_strChosen in self.m_dictSets else self.getdefaultset()
+        self.m_arrActive = self.m_dictSets[strActive]
+        self.m_strActive = strActive
+        return True
+
+    def getnumberofbranches(self):
+        return len(self.m_arrFlowMVA)
+
+    def isstale(self):
+        """True when branches were added to or removed from the DataModel since the engine was built"""
+        return self.m_arrFlowMVA is None or len(self.m_oDataModel.Branch_TAB) != self.getnumberofbranches()
+
+    def addratingset(self, strName, ratings, strFillSet=None):
+        """
+        Adds (or replaces) a rating set from an array aligned to Branch_TAB or a {BranchID: rating} dict. Branches
+        missing from the dict take the rating of strFillSet, zero (not monitored) without one.
+        """
+        nBranches = self.getnumberofbranches()
+        if isinstance(ratings, dict):
+            arrRatings = self.m_dictSets[strFillSet].copy() if strFillSet else np.zeros(nBranches)
+            dictRatings = {str(strId): fRating for strId, fRating in ratings.items()}
+            for nIdx, oBranch in enumerate(self.m_oDataModel.Branch_TAB):
+                fRating = dictRatings.get(str(oBranch.BranchID))
+                if fRating is not None:
+                    arrRatings[nIdx] = fRating
+        else:
+            arrRatings = np.array(ratings, dtype=np.float64)
+            if arrRatings.shape != (nBranches,):
+                raise ValueError(f"Rating set {strName} has {arrRatings.size} ratings for {nBranches} branches")
+        self.m_dictSets[strName] = np.nan_to_num(arrRatings, nan=0.0)
+        if strName == self.m_strActive:
+            self.m_arrActive = self.m_dictSets[strName]
+        return True
+
+    def copyratingset(self, strName, strFromSet, bWriteBack=False):
+        """Copies a rating set under a new name, bWriteBack also sets the branch attribute strName"""
+        self.addratingset(strName, self.getratings(strFromSet))
+        if bWriteBack:
+            for oBranch, fRating in zip(self.m_oDataModel.Branch_TAB, self.m_dictSets[strName].tolist()):
+                setattr(oBranch, strName, fRating)
+        return True
+
+    def getratingsets(self):
+        return list(self.m_dictSets)
+
+    def getratings(self, strName=None):
+        """Ratings of a set (by default the active one) aligned to Branch_TAB"""
+        if strName is None:
+            return self.m_arrActive
+        if strName not in self.m_dictSets:
+            raise KeyError(f"No rating set {strName}, sets are {', '.join(self.m_dictSets)}")
+        return self.m_dictSets[strName]
+
+    def getbranchratings(self, oBranch, listSets, fDefault=0.0):
+        """
+        Ratings of one branch in each of listSets (seasons resolve through their fallbacks), fDefault where zero.
+        A branch that is not in the DataModel, e.g. one loaded straight into an engine, is rated from its own
+        rating attributes with the same fallbacks.
+        """
+        nIdx = self.m_dictBranchIndex.get(id(oBranch))
+        if nIdx is None:
+            return self.resolvebranchratings(oBranch, listSets, fDefault)
+        listRatings = []
+        for strSet in listSets:
+            strSet = self.getseasonset(strSet) if strSet in self.SEASON_SETS else strSet
+            fRating = float(self.m_dictSets[strSet][nIdx]) if strSet in self.m_dictSets else 0.0
+            listRatings.append(fRating if fRating > 0 else fDefault)
+        return listRatings
+
+    @classmethod
+    def resolvebranchratings(cls, oBranch, listSets, fDefault=0.0):
+        """Ratings of a branch read from its attributes, a season taking the first of its fallbacks rated above zero"""
+        listRatings = []
+        for strSet in listSets:
+            tAttributes = (cls.SEASON_SETS[strSet],) + cls.SEASON_FALLBACK[strSet] if strSet in cls.SEASON_SETS \
+                else (strSet,)
+            fRating = next((fValue for fValue in (float(getattr(oBranch, strAttribute, None) or 0.0)
+                                                  for strAttribute in tAttributes) if fValue > 0), 0.0)
+            listRatings.append(fRating if fRating > 0 else fDefault)
+        return listRatings
+
+    #__________________________ACTIVE SET________________________
+    def setactiveratingset(self, strName):
+        """Makes a rating set the active one, no branch object is touched"""
+        self.m_arrActive = self.getratings(strName)
+        self.m_strActive = strName
+        self.m_strChosen = strName
+        return True
+
+    def getdefaultset(self):
+        """Set active until another is chosen: RatingA, or the winter ratings when no branch has a RatingA"""
+        if self.m_dictSets[self.DEFAULT_SET].any():
+            return self.DEFAULT_SET
+        return self.getseasonset("winter")
+
+    def getactiveratingset(self):
+        return self.m_strActive
+
+    def getseasonset(self, strSeason):
+        """Rating set of a season, through its fallbacks when the season has no ratings of its own"""
+        if strSeason not in self.SEASON_SETS:
+            raise KeyError(f"Unknown season {strSeason}, seasons are {', '.join(self.SEASON_SETS)}")
+        for strSet in (self.SEASON_SETS[strSeason],) + self.SEASON_FALLBACK[strSeason]:
+            if strSet in self.m_dictSets:
+                return strSet
+        return self.DEFAULT_SET
+
+    def setactiveseason(self, strSeason):
+        return self.setactiveratingset(self.getseasonset(strSeason))
+
+    def setactivemonth(self, nMonth):
+        """Activates the seasonal ratings of a month (1-12), or of the month of a date / datetime"""
+        nMonth = getattr(nMonth, "month", nMonth)
+        for strSeason, tMonths in self.SEASON_MONTHS.items():
+            if nMonth in tMonths:
+                return self.setactiveseason(strSeason)
+        raise ValueError(f"Month {nMonth} is not in 1-12")
+
+    #__________________________LOADING________________________
+    def setflows(self, arrFlowMVA, arrBranchIdx=None):
+        """Keeps branch flows (MVA) of Branch_TAB indices arrBranchIdx (by default every branch)"""
+        if arrBranchIdx is None:
+            self.m_arrFlowMVA[:] = arrFlowMVA
+        else:
+            self.m_arrFlowMVA[np.asarray(arrBranchIdx, dtype=np.int64)] = arrFlowMVA
+        return True
+
+    def getloading(self, strName=None, arrFlowMVA=None):
+        """Percent loading of every branch against a rating set (by default the active one), zero where not monitored"""
+        arrFlowMVA = self.m_arrFlowMVA if arrFlowMVA is None else np.asarray(arrFlowMVA, dtype=np.float64)
+        arrRatings = self.getratings(strName)
+        arrMonitored = arrRatings > 0
+        return np.where(arrMonitored, np.abs(arrFlowMVA) / np.where(arrMonitored, arrRatings, 1.0) * 100.0, 0.0)
+
+    def updateloading(self, strName=None):
+        """Writes the loading of every branch with a flow against a rating set onto Branch.loading"""
+        arrLoading = self.getloading(strName)
+        listBranches = self.m_oDataModel.Branch_TAB
+        for nIdx in np.flatnonzero(~np.isnan(self.m_arrFlowMVA)).tolist():
+            listBranches[nIdx].loading = float(arrLoading[nIdx])
+        return arrLoading
@@ -72,6 +72,7 @@ class Busbar(ComponentBaseTemplate):
         self.Loads = []
         self.Type = 0
         self.Area = 0
+        self.Zone = ''
         self.Owner = ''
         self.Disconnected = False
         self.Slack = False
@@ -90,6 +91,7 @@ class Busbar(ComponentBaseTemplate):
         self.breakingshortcircuitmva = 0.0
         self.steadystateshortcircuitcurrent = 0.0
         self.steadystateshortcircuitmva = 0.0
+        self.singlephaseshortcircuitcurrent = 0.0
         self.realshortcircuitimpedance = 0.0
         self.imaginaryshortcircuitimpedance = 0.0
 
@@ -172,6 +174,7 @@ class Generator(ComponentBaseTemplate):
         self.oBus1 = None
         self.BusType = None
         self.IsExternalGrid = False
+        self.PlantType = ''
 
         #gen operational attributes
         self.MW = 0.0
@@ -191,7 +194,9 @@ class Generator(ComponentBaseTemplate):
         self.VMagPu = 1.0
         self.powerFactor = 1.0
         self.parallelmachines = 1
-        
+
+        #Harmonic attributes: current source spectrum {order: (percent of fundamental current, angle in degrees)}
+        self.HarmonicSpectrum = None
 
         # Engine model updater based on the type of analysis
         self.BasicEngineModelUpdater = None
@@ -260,8 +265,10 @@ class Load(ComponentBaseTemplate):
         self.VMagPu = 1.0
         self.powerFactor = 1.0
         self.parallelmachines = 1
-        
-        
+
+        #Harmonic attributes: current source spectrum {order: (percent of fundamental current, angle in degrees)}
+        self.HarmonicSpectrum = None
+
         # Engine model updater based on the type of analysis
         self.BasicEngineModelUpdater = None
         self.LoadFlowEngineModelUpdater = None
@@ -0,0 +1,378 @@
+# Pickle-free, columnar serialisation of the DataModel for worker processes.
+# Every scalar attribute of the components in a tab becomes one flat numpy column (bool, int64, float64 or codes into
+# a shared string table). The columns are laid out in one contiguous buffer behind a small JSON header, so the
+# buffer can be placed in multiprocessing.shared_memory or a memory mapped file once and every worker attaches
+# views onto that single copy instead of unpickling thousands of objects with their back references.
+# Object and container attributes (oBus1, updaters, Branches lists, result dicts) are not serialised; the bus
+# references are rebuilt from the BusIndex columns when a worker asks for a full DataModel.
+import json
+import mmap
+
+import numpy as np
+
+from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+
+MAGIC = b"DMARR001"
+ALIGNMENT = 64
+PREFIX_BYTES = 16
+
+# Tab -> (component class, constructor argument attributes)
+TAB_COMPONENTS = {
+    "Busbar_TAB": (Busbar, ("BusID",)),
+    "Branch_TAB": (Branch, ("BusID1", "BusID2", "BusID3", "BranchID")),
+    "Gen_TAB": (Generator, ("BusID", "GenID")),
+    "Load_TAB": (Load, ("BusID", "LoadID")),
+}
+
+# Value type tags of mixed columns
+_TAG_STR, _TAG_INT, _TAG_FLOAT, _TAG_BOOL = 0, 1, 2, 3
+_TAG_TYPES = {_TAG_STR: str, _TAG_INT: int, _TAG_FLOAT: float, _TAG_BOOL: lambda strValue: strValue == "True"}
+
+# Marks attributes that only some components of a tab carry (e.g. IsHVDC)
+_ABSENT = object()
+
+
+def _alignup(nOffset):
+    return (nOffset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class _StringTable:
+    """Deduplicated strings shared by all string columns"""
+
+    def __init__(self):
+        self.m_dictCodes = {}
+        self.m_listStrings = []
+
+    def getcode(self, strValue):
+        nCode = self.m_dictCodes.get(strValue)
+        if nCode is None:
+            nCode = self.m_dictCodes[strValue] = len(self.m_listStrings)
+            self.m_listStrings.append(strValue)
+        return nCode
+
+    def toarrays(self):
+        """Returns the UTF-8 bytes of all strings and the byte offset of each"""
+        listEncoded = [strValue.encode("utf-8") for strValue in self.m_listStrings]
+        arrOffsets = np.zeros(len(listEncoded) + 1, dtype=np.int64)
+        np.cumsum([len(bValue) for bValue in listEncoded], out=arrOffsets[1:])
+        return np.frombuffer(b"".join(listEncoded), dtype=np.uint8), arrOffsets
+
+
+class DataModelArrays:
+    """Columnar copy of the DataModel held in one flat buffer"""
+
+    def __init__(self, dictHeader, dictArrays, oSharedMemory=None, oMmap=None, oFile=None, bViews=False):
+        self.m_dictHeader = dictHeader
+        # (tab, column, part) -> numpy array; part is 'values', 'mask', 'tags' or 'absent'
+        self.m_dictArrays = dictArrays
+        self.m_oSharedMemory = oSharedMemory
+        self.m_oMmap = oMmap
+        self.m_oFile = oFile
+        # True when the arrays are views onto shared memory or a memory map rather than owned by this object
+        self.m_bViews = bViews
+        self.m_listStrings = None
+
+    #__________________________PACKING________________________
+    @classmethod
+    def fromdatamodel(cls, oDataModel, dictAttributes=None):
+        """
+        Packs the scalar attributes of every component into columns.
+        dictAttributes optionally limits the columns per tab, e.g. {"Branch_TAB": ["ON", "RatingA"]};
+        the constructor attributes are always included.
+        """
+        oStrings = _StringTable()
+        dictHeader = {"version": 1, "tabs": {}, "UsebusbarMap": oDataModel.b_UsebusbarMap}
+        dictArrays = {}
+        for strTab, (_, tConstructor) in TAB_COMPONENTS.items():
+            listComponents = getattr(oDataModel, strTab)
+            if dictAttributes is not None and strTab in dictAttributes:
+                listNames = list(tConstructor) + [strName for strName in dictAttributes[strTab]
+                                                  if strName not in tConstructor]
+            else:
+                dictNames = dict.fromkeys(tConstructor)
+                for oComponent in listComponents:
+                    dictNames.update(dict.fromkeys(oComponent.__dict__))
+                listNames = list(dictNames)
+            dictColumns = {}
+            for strName in listNames:
+                listValues = [oComponent.__dict__.get(strName, _ABSENT) for oComponent in listComponents]
+                dictParts = cls._packcolumn(listValues, oStrings)
+                if dictParts is None:
+                    continue
+                dictColumns[strName] = {"kind": dictParts.pop("kind")}
+                for strPart, arrPart in dictParts.items():
+                    dictArrays[(strTab, strName, strPart)] = arrPart
+            dictHeader["tabs"][strTab] = {"length": len(listComponents), "columns": dictColumns}
+        arrData, arrOffsets = oStrings.toarrays()
+        dictArrays[("", "strings", "data")] = arrData
+        dictArrays[("", "strings", "offsets")] = arrOffsets
+        return cls(dictHeader, dictArrays)
+
+    @staticmethod
+    def _packcolumn(listValues, oStrings):
+        """Encodes one attribute column, returns None for attributes that are not scalars"""
+        bNone = bStr = bInt = bFloat = bBool = bAbsent = False
+        for value in listValues:
+            if value is None:
+                bNone = True
+            elif value is _ABSENT:
+                bAbsent = True
+            elif isinstance(value, bool):
+                bBool = True
+            elif isinstance(value, int):
+                bInt = True
+            elif isinstance(value, float):
+                bFloat = True
+            elif isinstance(value, str):
+                bStr = True
+            else:
+                return None
+        dictParts = {}
+        if bAbsent:
+            dictParts["absent"] = np.array([value is _ABSENT for value in listValues], dtype=np.bool_)
+            listValues = [None if value is _ABSENT else value for value in listValues]
+        if bStr and (bInt or bFloat or bBool):
+            # Mixed identifiers such as BusID: keep the text and the original type of every value
+            dictParts["kind"] = "mixed"
+            dictParts["values"] = np.array([-1 if value is None else oStrings.getcode(str(value))
+                                            for value in listValues], dtype=np.int32)
+            dictParts["tags"] = np.array([_TAG_STR if isinstance(value, str) or value is None
+                                          else _TAG_BOOL if isinstance(value, bool)
+                                          else _TAG_INT if isinstance(value, int) else _TAG_FLOAT
+                                          for value in listValues], dtype=np.uint8)
+            return dictParts
+        if bStr:
+            dictParts["kind"] = "str"
+            dictParts["values"] = np.array([-1 if value is None else oStrings.getcode(value)
+                                            for value in listValues], dtype=np.int32)
+            return dictParts
+        if bFloat or (bInt and bBool):
+            dictParts["kind"], dtype, fill = "float64", np.float64, np.nan
+        elif bInt:
+            dictParts["kind"], dtype, fill = "int64", np.int64, 0
+        elif bBool:
+            dictParts["kind"], dtype, fill = "bool", np.bool_, False
+        else:
+            # Attribute that is None on every component
+            dictParts["kind"], dtype, fill = "float64", np.float64, np.nan
+        dictParts["values"] = np.array([fill if value is None else value for value in listValues], dtype=dtype)
+        if bNone:
+            dictParts["mask"] = np.array([value is None for value in listValues], dtype=np.bool_)
+        return dictParts
+
+    #__________________________BUFFER LAYOUT________________________
+    def _layout(self):
+        """Assigns an aligned offset to every array, returns the header bytes and the total size"""
+        listArrays = []
+        for (strTab, strName, strPart), arrValues in self.m_dictArrays.items():
+            listArrays.append({"tab": strTab, "column": strName, "part": strPart,
+                               "dtype": arrValues.dtype.str, "length": int(arrValues.shape[0])})
+        dictHeader = dict(self.m_dictHeader, arrays=listArrays)
+        # The offsets depend on the header size and the header holds the offsets, so repeat until the data start settles
+        nDataStart = 0
+        while True:
+            nOffset = nDataStart
+            for dictArray, arrValues in zip(listArrays, self.m_dictArrays.values()):
+                dictArray["offset"] = nOffset
+                nOffset = _alignup(nOffset + arrValues.nbytes)
+            bHeader = json.dumps(dictHeader).encode("utf-8")
+            if PREFIX_BYTES + len(bHeader) <= nDataStart:
+                return bHeader, nOffset
+            nDataStart = _alignup(PREFIX_BYTES + len(bHeader) + ALIGNMENT)
+
+    def _writeinto(self, oBuffer, bHeader):
+        """Writes the prefix, header and arrays into a writable buffer"""
+        oView = memoryview(oBuffer)
+        oView[:8] = MAGIC
+        oView[8:PREFIX_BYTES] = len(bHeader).to_bytes(8, "little")
+        oView[PREFIX_BYTES:PREFIX_BYTES + len(bHeader)] = bHeader
+        for dictArray, arrValues in zip(json.loads(bHeader)["arrays"], self.m_dictArrays.values()):
+            nOffset = dictArray["offset"]
+            oView[nOffset:nOffset + arrValues.nbytes] = arrValues.tobytes()
+        oView.release()
+
+    def tobytes(self):
+        """Returns the packed buffer as bytes"""
+        bHeader, nSize = self._layout()
+        oBuffer = bytearray(nSize)
+        self._writeinto(oBuffer, bHeader)
+        return bytes(oBuffer)
+
+    def tosharedmemory(self, strName=None):
+        """
+        Copies the packed DataModel into a new shared memory block and returns the block name for the workers.
+        The caller owns the block and must call unlink() once the workers are done.
+        """
+        from multiprocessing import shared_memory
+        bHeader, nSize = self._layout()
+        oSharedMemory = shared_memory.SharedMemory(name=strName, create=True, size=nSize)
+        self._writeinto(oSharedMemory.buf, bHeader)
+        self.m_oSharedMemory = oSharedMemory
+        return oSharedMemory.name
+
+    def tofile(self, strFilePath):
+        """Writes the packed DataModel to a file that workers can memory map"""
+        bHeader, nSize = self._layout()
+        with open(strFilePath, "wb") as oFile:
+            oFile.truncate(nSize)
+        with open(strFilePath, "r+b") as oFile:
+            with mmap.mmap(oFile.fileno(), nSize) as oMmap:
+                self._writeinto(oMmap, bHeader)
+        return strFilePath
+
+    #__________________________ATTACHING________________________
+    @classmethod
+    def frombuffer(cls, oBuffer, oSharedMemory=None, oMmap=None, oFile=None):
+        """Creates numpy views onto a packed buffer without copying the column data"""
+        oView = memoryview(oBuffer)
+        if bytes(oView[:8]) != MAGIC:
+            raise ValueError("Buffer does not hold a packed DataModel")
+        nHeaderBytes = int.from_bytes(oView[8:PREFIX_BYTES], "little")
+        dictHeader = json.loads(bytes(oView[PREFIX_BYTES:PREFIX_BYTES + nHeaderBytes]).decode("utf-8"))
+        dictArrays = {}
+        for dictArray in dictHeader.pop("arrays"):
+            dictArrays[(dictArray["tab"], dictArray["column"], dictArray["part"])] = np.frombuffer(
+                oBuffer, dtype=np.dtype(dictArray["dtype"]), count=dictArray["length"], offset=dictArray["offset"])
+        oView.release()
+        return cls(dictHeader, dictArrays, oSharedMemory, oMmap, oFile, bViews=True)
+
+    @classmethod
+    def attachsharedmemory(cls, strName):
+        """Attaches to a shared memory block written by tosharedmemory(), typically inside a worker process"""
+        from multiprocessing import shared_memory
+        try:
+            oSharedMemory = shared_memory.SharedMemory(name=strName, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching always registers the block with the resource tracker, which worker
+            # processes share with the parent that created it
+            oSharedMemory = shared_memory.SharedMemory(name=strName)
+        return cls.frombuffer(oSharedMemory.buf, oSharedMemory=oSharedMemory)
+
+    @classmethod
+    def openfile(cls, strFilePath):
+        """Memory maps a file written by tofile() read-only"""
+        oFile = open(strFilePath, "rb")
+        oMmap = mmap.mmap(oFile.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.frombuffer(oMmap, oMmap=oMmap, oFile=oFile)
+
+    def close(self):
+        """Drops the views and detaches from the shared memory block or file; arrays handed out must be released first"""
+        if self.m_bViews:
+            self.m_dictArrays = {}
+            self.m_listStrings = None
+        if self.m_oSharedMemory is not None:
+            self.m_oSharedMemory.close()
+        if self.m_oMmap is not None:
+            self.m_oMmap.close()
+            self.m_oMmap = None
+        if self.m_oFile is not None:
+            self.m_oFile.close()
+            self.m_oFile = None
+
+    def unlink(self):
+        """Frees the shared memory block; called once by the process that created it"""
+        self.close()
+        if self.m_oSharedMemory is not None:
+            self.m_oSharedMemory.unlink()
+            self.m_oSharedMemory = None
+
+    #__________________________COLUMN ACCESS________________________
+    def getlength(self, strTab):
+        """Returns the number of components in a tab"""
+        return self.m_dictHeader["tabs"][strTab]["length"]
+
+    def getcolumnnames(self, strTab):
+        """Returns the attribute columns stored for a tab"""
+        return list(self.m_dictHeader["tabs"][strTab]["columns"])
+
+    def getcolumn(self, strTab, strName):
+        """
+        Returns a column of a tab. Numeric and boolean columns are zero-copy numpy views (entries that were None
+        are flagged by getmask); string and mixed columns are returned as Python lists.
+        """
+        strKind = self.m_dictHeader["tabs"][strTab]["columns"][strName]["kind"]
+        arrValues = self.m_dictArrays[(strTab, strName, "values")]
+        if strKind not in ("str", "mixed"):
+            return arrValues
+        listStrings = self.getstrings()
+        listValues = [None if nCode < 0 else listStrings[nCode] for nCode in arrValues.tolist()]
+        if strKind == "mixed":
+            listTags = self.m_dictArrays[(strTab, strName, "tags")].tolist()
+            listValues = [value if value is None or nTag == _TAG_STR else _TAG_TYPES[nTag](value)
+                          for value, nTag in zip(listValues, listTags)]
+        return listValues
+
+    def getmask(self, strTab, strName):
+        """Returns a boolean array marking the entries that were None, or None when there were none"""
+        return self.m_dictArrays.get((strTab, strName, "mask"))
+
+    def getstrings(self):
+        """Returns the decoded string table, decoding it on first use"""
+        if self.m_listStrings is None:
+            bData = self.m_dictArrays[("", "strings", "data")].tobytes()
+            listOffsets = self.m_dictArrays[("", "strings", "offsets")].tolist()
+            self.m_listStrings = [bData[nStart:nEnd].decode("utf-8")
+                                  for nStart, nEnd in zip(listOffsets[:-1], listOffsets[1:])]
+        return self.m_listStrings
+
+    def getnbytes(self):
+        """Returns the size of the column data in bytes"""
+        return sum(arrValues.nbytes for arrValues in self.m_dictArrays.values())
+
+    #__________________________UNPACKING________________________
+    def todatamodel(self):
+        """Rebuilds a DataModelManager with fresh components, reconnecting the bus references from the BusIndex columns"""
+        from Code.DataModel.DataModelManager import DataModelManager
+        oDataModel = DataModelManager()
+        for strTab, (cComponent, tConstructor) in TAB_COMPONENTS.items():
+            dictTab = self.m_dictHeader["tabs"][strTab]
+            dictColumns = {}
+            for strName in dictTab["columns"]:
+                listValues = self.getcolumn(strTab, strName)
+                listValues = listValues.tolist() if isinstance(listValues, np.ndarray) else listValues
+                arrMask = self.getmask(strTab, strName)
+                if arrMask is not None:
+                    listValues = [None if bNull else value for value, bNull in zip(listValues, arrMask.tolist())]
+                dictColumns[strName] = listValues
+            listNames = list(dictColumns)
+            # Attributes that are not serialised take the constructor defaults, with fresh lists and dicts per component
+            oPrototype = cComponent(*(dictColumns[strName][0] if dictTab["length"] else "" for strName in tConstructor))
+            dictDefaults = {strName: value for strName, value in oPrototype.__dict__.items() if strName not in dictColumns}
+            listMutable = [(strName, type(value)) for strName, value in dictDefaults.items()
+                           if isinstance(value, (list, dict))]
+            listComponents = getattr(oDataModel, strTab)
+            for tRow in zip(*(dictColumns[strName] for strName in listNames)):
+                oComponent = cComponent.__new__(cComponent)
+                dictState = oComponent.__dict__
+                dictState.update(dictDefaults)
+                dictState.update(zip(listNames, tRow))
+                for strName, cType in listMutable:
+                    dictState[strName] = cType()
+                listComponents.append(oComponent)
+            for strName in listNames:
+                arrAbsent = self.m_dictArrays.get((strTab, strName, "absent"))
+                if arrAbsent is not None:
+                    for nIndex in np.flatnonzero(arrAbsent).tolist():
+                        del listComponents[nIndex].__dict__[strName]
+        self._reconnect(oDataModel)
+        oDataModel.b_UsebusbarMap = self.m_dictHeader["UsebusbarMap"]
+        return oDataModel
+
+    @staticmethod
+    def _reconnect(oDataModel):
+        """Rebuilds the busbar map and the references the serialisation leaves out"""
+        listBusbars = oDataModel.Busbar_TAB
+        for nIndex, oBusbar in enumerate(listBusbars):
+            oDataModel.BusbarIdToIndex[oBusbar.BusID] = nIndex
+        nBusbars = len(listBusbars)
+        for oBranch in oDataModel.Branch_TAB:
+            for nSide in (1, 2, 3):
+                nBusIndex = getattr(oBranch, f"BusIndex{nSide}", -1)
+                if nBusIndex is not None and 0 <= nBusIndex < nBusbars:
+                    setattr(oBranch, f"oBus{nSide}", listBusbars[nBusIndex])
+        for strTab, strList in (("Gen_TAB", "Generators"), ("Load_TAB", "Loads")):
+            for nIndex, oRadial in enumerate(getattr(oDataModel, strTab)):
+                nBusIndex = oDataModel.BusbarIdToIndex.get(oRadial.BusID)
+                if nBusIndex is not None:
+                    oRadial.oBus1 = listBusbars[nBusIndex]
+                    getattr(listBusbars[nBusIndex], strList).append(nIndex)
@@ -16,10 +16,22 @@
 #The class also outlines the paths for different input files ranging from network files to actual input data files in excel format.
 import os
 import sys
+import hashlib
 
 
 class DataModelManager:
 
+    # Input attributes that define the network state. Result attributes written back after a
+    # study are deliberately excluded so that the hash only changes when the inputs change.
+    NetworkHashAttributes = {
+        "Busbar_TAB": ("BusID", "name", "kV", "ON", "Disconnected", "Slack", "Type"),
+        "Branch_TAB": ("BranchID", "BusID1", "BusID2", "BusID3", "ON", "IsTransformer",
+                       "R", "X", "B", "RatingA", "RatingB", "RatingC"),
+        "Gen_TAB": ("BusID", "GenID", "ON", "MW", "MVar", "MWCapacity", "Qmax", "Qmin",
+                    "IsExternalGrid"),
+        "Load_TAB": ("BusID", "LoadID", "ON", "MW", "MVar"),
+    }
+
     def __init__(self):
         self.Busbar_TAB = []
         self.Branch_TAB = []
@@ -28,6 +40,11 @@ class DataModelManager:
 
         self.BusbarIdToIndex = {}
         self.b_UsebusbarMap = False
+        # (BusID, GenID) -> index in Gen_TAB, kept up to date by addgentotab and rebuilt when found stale
+        self.GenKeyToIndex = {}
+        self.nIndexedGens = 0
+        # Branch rating sets aligned to Branch_TAB, built on first use
+        self.RatingEngine = None
 
     def addbusbartotab(self, oBusbar):
         """Add a busbar to the Busbar_TAB list."""
@@ -156,6 +173,8 @@ class DataModelManager:
             return bOK
         gen_index = len(self.Gen_TAB)
         self.Gen_TAB.append(oGenerator)
+        self.GenKeyToIndex.setdefault(self.getgenkey(oGenerator.BusID, oGenerator.GenID), gen_index)
+        self.nIndexedGens += 1
 
         # If using busbar map, add generator index to the busbar's generator list
         if self.b_UsebusbarMap:
@@ -170,32 +189,48 @@ class DataModelManager:
                     bOK = True
         return bOK
 
+    @staticmethod
+    def getgenkey(BusID, GenID):
+        """Generator index key, with the bus ID normalised the way the Generator constructor stores it"""
+        try:
+            BusID = int(BusID)
+        except (TypeError, ValueError):
+            BusID = str(BusID)
+        return BusID, str(GenID).strip()
+
+    def rebuildgenindex(self):
+        """Rebuilds GenKeyToIndex from Gen_TAB, e.g. after the tab was edited directly or restored from a snapshot"""
+        self.GenKeyToIndex = {}
+        for nGenIdx, gen in enumerate(self.Gen_TAB):
+            self.GenKeyToIndex.setdefault(self.getgenkey(gen.BusID, gen.GenID), nGenIdx)
+        self.nIndexedGens = len(self.Gen_TAB)
+
+    def getgenindex(self, BusID, GenID):
+        """
+        Returns the Gen_TAB index of a generator given a busID and gen ID in O(1)
+        If not found returns -1
+        """
+        tKey = self.getgenkey(BusID, GenID)
+        for _ in range(2):
+            nGenIdx = self.GenKeyToIndex.get(tKey, -1)
+            if nGenIdx >= 0 and nGenIdx < len(self.Gen_TAB):
+                gen = self.Gen_TAB[nGenIdx]
+                if self.getgenkey(gen.BusID, gen.GenID) == tKey:
+                    return nGenIdx
+            elif nGenIdx < 0 and self.nIndexedGens == len(self.Gen_TAB):
+                return -1
+            # Stale entry or generators added without addgentotab
+            self.rebuildgenindex()
+        return -1
+
     def findgen(self, BusID, GenID):
         """
         Finds a generator object and its index given a busID and gen ID
         If not found returns None, -1
         """
-        oObj = None
-        nIndex = -1
-        GenID = str(GenID).strip()
-
-        if self.b_UsebusbarMap:
-            # Use fast busbar map lookup
-            oBus, _ = self.findbusbar(BusID)
-            if oBus is not None and hasattr(oBus, 'Generators'):
-                for nGenIdx in oBus.Generators:
-                    gen = self.Gen_TAB[nGenIdx]
-                    strGenID = str(gen.__getattribute__("GenID")).strip()
-                    if strGenID == GenID:
-                        return gen, nGenIdx
-        else:
-            # Fall back to linear search
-            for nGenIdx, gen in enumerate(self.Gen_TAB):
-                gen_bus_id = gen.__getattribute__("BusID")
-                strGenID = str(gen.__getattribute__("GenID")).strip()
-                if gen_bus_id == BusID and strGenID == GenID:
-                    return gen, nGenIdx
-
+        nIndex = self.getgenindex(BusID, GenID)
+        if nIndex >= 0:
+            return self.Gen_TAB[nIndex], nIndex
         # Not found
         return None, -1
 
@@ -293,3 +328,53 @@ class DataModelManager:
                     generators.append((gen, nGenIdx))
 
         return generators
+
+    def getnetworkhash(self):
+        """
+        Returns a deterministic SHA-256 hex digest of the network inputs held in the tabs.
+        Two DataModels with identical components, parameters and switching give the same hash.
+        """
+        oHasher = hashlib.sha256()
+        for strTab, tAttributes in self.NetworkHashAttributes.items():
+            lTab = getattr(self, strTab)
+            oHasher.update(f"{strTab}:{len(lTab)}".encode())
+            for oComponent in lTab:
+                tValues = tuple(getattr(oComponent, strAttribute, None) for strAttribute in tAttributes)
+                oHasher.update(repr(tValues).encode())
+        return oHasher.hexdigest()
+
+    def getratingengine(self, bRefresh=False):
+        """
+        Returns the rating sets of the branches (BranchRatingEngine), built from the branch rating attributes on
+        first use and again when branches are added or removed, so switching the active set reads no branch. Pass
+        bRefresh=True once per study or model build to read edited rating attributes.
+        """
+        if self.RatingEngine is None:
+            from Code.DataModel.BranchRatingEngine import BranchRatingEngine
+            self.RatingEngine = BranchRatingEngine(self)
+        elif bRefresh:
+            self.RatingEngine.refresh()
+        elif self.RatingEngine.isstale():
+            self.RatingEngine.build()
+        return self.RatingEngine
+
+    def snapshot(self):
+        """
+        Takes a copy-on-write snapshot of the DataModel and returns it. Changes made afterwards are journalled
+        and can be undone with snapshot.restore(); snapshot.release() keeps them. Used as a context manager the
+        DataModel is restored on exit, also when the block raises:
+            with gbl.DataModelManager.snapshot():
+                branch.ON = False
+                gbl.EngineLoadFlowContainer.runloadflow()
+        """
+        from Code.DataModel.DataModelSnapshot import DataModelSnapshot
+        return DataModelSnapshot(self).take()
+
+    def toarrays(self, dictAttributes=None):
+        """
+        Packs the DataModel into flat columns and a string table (DataModelArrays) without pickling. The result can
+        be copied once into shared memory (tosharedmemory) or a memory mapped file (tofile) and attached by worker
+        processes with DataModelArrays.attachsharedmemory / openfile.
+        """
+        from Code.DataModel.DataModelArrays import DataModelArrays
+        return DataModelArrays.fromdatamodel(self, dictAttributes)
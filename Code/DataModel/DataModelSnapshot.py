@@ -0,0 +1,173 @@
+# Copy-on-write snapshots of the DataModel.
+# Taking a snapshot copies nothing but the tab lists; instead the component attribute hook journals the previous
+# value of an attribute the first time it is changed after the snapshot. Restoring writes back only those values
+# and truncates the tabs, so the cost of a restore follows the number of changes rather than the network size.
+# Scenarios and contingencies can fork the model, run and discard, even when the run fails half way.
+#
+# Changes are journalled through attribute assignment. In place edits of list or dict attributes
+# (e.g. Busbar.Branches.append) are not seen; assign a new value instead if it has to be undone.
+from Code.DataModel.ComponentManager import ComponentBaseTemplate
+
+_MISSING = object()
+
+# Journals of all active snapshots, innermost last
+_ACTIVE_JOURNALS = []
+
+
+def _journalledsetattr(self, strName, value):
+    """Attribute hook installed on ComponentBaseTemplate while at least one snapshot is active"""
+    for oSnapshot in _ACTIVE_JOURNALS:
+        oSnapshot.recordchange(self, strName)
+    object.__setattr__(self, strName, value)
+
+
+def _journalleddelattr(self, strName):
+    for oSnapshot in _ACTIVE_JOURNALS:
+        oSnapshot.recordchange(self, strName)
+    object.__delattr__(self, strName)
+
+
+class DataModelSnapshot:
+    """Journal of the component changes made to a DataModel since the snapshot was taken"""
+
+    # DataModelManager attributes holding the component tabs
+    TAB_NAMES = ("Busbar_TAB", "Branch_TAB", "Gen_TAB", "Load_TAB")
+
+    def __init__(self, oDataModel):
+        self.m_oDataModel = oDataModel
+        # id(component) -> (component, {attribute: value before the first change})
+        self.m_dictChanges = {}
+        # ids of the components in the tabs at the snapshot; only these are journalled, so changes to components of
+        # other DataModels or created after the snapshot are ignored. The copied tabs keep the ids from being reused.
+        self.m_setComponentIds = set()
+        self.m_dictTabs = {}
+        self.m_dictBusbarIdToIndex = {}
+        self.m_bUseBusbarMap = False
+        self.bActive = False
+
+    #__________________________SNAPSHOT CONTROL________________________
+    def take(self):
+        """Start journalling. The tabs are copied by reference, the components themselves are not copied."""
+        oDataModel = self.m_oDataModel
+        self.m_dictTabs = {strTab: list(getattr(oDataModel, strTab)) for strTab in self.TAB_NAMES}
+        self.m_setComponentIds = {id(oComponent) for listTab in self.m_dictTabs.values() for oComponent in listTab}
+        self.m_dictBusbarIdToIndex = dict(oDataModel.BusbarIdToIndex)
+        self.m_bUseBusbarMap = oDataModel.b_UsebusbarMap
+        self.m_dictChanges = {}
+        if not self.bActive:
+            if not _ACTIVE_JOURNALS:
+                ComponentBaseTemplate.__setattr__ = _journalledsetattr
+                ComponentBaseTemplate.__delattr__ = _journalleddelattr
+            _ACTIVE_JOURNALS.append(self)
+            self.bActive = True
+        return self
+
+    def release(self):
+        """Stop journalling and keep the DataModel as it is now"""
+        if not self.bActive:
+            return
+        _ACTIVE_JOURNALS.remove(self)
+        self.bActive = False
+        self.m_dictChanges = {}
+        self.m_setComponentIds = set()
+        if not _ACTIVE_JOURNALS:
+            # Back to plain attribute assignment, so there is no overhead without a snapshot
+            del ComponentBaseTemplate.__setattr__
+            del ComponentBaseTemplate.__delattr__
+
+    def recordchange(self, oComponent, strName):
+        """Keep the value an attribute had when the snapshot was taken, the first time it changes"""
+        tEntry = self.m_dictChanges.get(id(oComponent))
+        if tEntry is None:
+            if id(oComponent) not in self.m_setComponentIds:
+                return
+            tEntry = self.m_dictChanges[id(oComponent)] = (oComponent, {})
+        dictOriginal = tEntry[1]
+        if strName not in dictOriginal:
+            dictOriginal[strName] = oComponent.__dict__.get(strName, _MISSING)
+
+    #__________________________RESTORE________________________
+    def restore(self, bUpdateEngine=False, fnOnRestore=None):
+        """
+        Return the DataModel to the state it had when the snapshot was taken; the snapshot stays active
+        so a loop of contingencies can restore after every run.
+        If bUpdateEngine is True, components whose status changed are switched back in the engine as well.
+        fnOnRestore(oComponent, listAttributes) is called for every restored component, e.g. to push other
+        restored parameters to the engine.
+        Returns the number of restored components.
+        """
+        dictChanges = self.m_dictChanges
+        self.m_dictChanges = {}
+        # Suspend this journal while writing back, other active snapshots still see the restore
+        bWasActive = self.bActive
+        if bWasActive:
+            _ACTIVE_JOURNALS.remove(self)
+        try:
+            for oComponent, dictOriginal in dictChanges.values():
+                for strName, value in dictOriginal.items():
+                    if value is _MISSING:
+                        if strName in oComponent.__dict__:
+                            delattr(oComponent, strName)
+                    else:
+                        setattr(oComponent, strName, value)
+            oDataModel = self.m_oDataModel
+            for strTab, listTab in self.m_dictTabs.items():
+                listCurrent = getattr(oDataModel, strTab)
+                if listCurrent != listTab:
+                    listCurrent[:] = listTab
+            if oDataModel.BusbarIdToIndex != self.m_dictBusbarIdToIndex:
+                oDataModel.BusbarIdToIndex.clear()
+                oDataModel.BusbarIdToIndex.update(self.m_dictBusbarIdToIndex)
+            oDataModel.b_UsebusbarMap = self.m_bUseBusbarMap
+        finally:
+            if bWasActive:
+                _ACTIVE_JOURNALS.append(self)
+        for oComponent, dictOriginal in dictChanges.values():
+            if bUpdateEngine and "ON" in dictOriginal:
+                try:
+                    oComponent.setdatamodelcomponentstatustoengine()
+                except NotImplementedError:
+                    pass
+            if fnOnRestore is not None:
+                fnOnRestore(oComponent, list(dictOriginal))
+        return len(dictChanges)
+
+    #__________________________INSPECTION________________________
+    def getchangecount(self):
+        """Returns the number of components changed since the snapshot was taken"""
+        return len(self.m_dictChanges)
+
+    def getchanges(self):
+        """Returns (component, {attribute: (value at snapshot, current value)}) for every changed component"""
+        listChanges = []
+        for oComponent, dictOriginal in self.m_dictChanges.values():
+            dictDelta = {}
+            for strName, value in dictOriginal.items():
+                current = oComponent.__dict__.get(strName, _MISSING)
+                if current is not value and current != value:
+                    dictDelta[strName] = (None if value is _MISSING else value,
+                                          None if current is _MISSING else current)
+            if dictDelta:
+                listChanges.append((oComponent, dictDelta))
+        return listChanges
+
+    def getaddedcomponents(self):
+        """Returns the components appended to each tab since the snapshot was taken"""
+        dictAdded = {}
+        for strTab, listTab in self.m_dictTabs.items():
+            listCurrent = getattr(self.m_oDataModel, strTab)
+            dictAdded[strTab] = listCurrent[len(listTab):]
+        return dictAdded
+
+    #__________________________CONTEXT MANAGER________________________
+    def __enter__(self):
+        if not self.bActive:
+            self.take()
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        try:
+            self.restore()
+        finally:
+            self.release()
+        return False
@@ -2,7 +2,7 @@
 BaseDataValidator - Abstract base class for data validators
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Tuple
 from enum import Enum
 import pandas as pd
 from Code.DataSources.ValidationResult import ValidationResult
@@ -20,6 +20,22 @@ class BaseDataValidator(ABC):
             ValidationResult: Validation results
         """
         pass
+    def validate_batches(self, batches: Iterator[Tuple[str, pd.DataFrame]],
+                         result: ValidationResult) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Validate streamed (sheet name, batch) pairs as they pass, each batch on its own by default
+        Args:
+            batches (Iterator[Tuple[str, pd.DataFrame]]): Batches from a streaming reader
+            result (ValidationResult): Collects the messages, is_valid turns False on the first error
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: The cleaned batches, each yielded once its messages are in result
+        """
+        for sheet_name, batch in batches:
+            batch_result = self.validate({sheet_name: batch})
+            result.messages.extend(batch_result.messages)
+            result.is_valid = result.is_valid and batch_result.is_valid
+            cleaned = batch_result.cleaned_data
+            yield sheet_name, cleaned[sheet_name] if cleaned and sheet_name in cleaned else batch
     def get_validation_rules(self) -> Dict[str, Any]:
         """
         Return metadata about validation rules
@@ -2,8 +2,14 @@ class DataSourceDataModelInterface:
     def load_from_source_to_datamodel(self, source_data):
         """Load data from source into DataModel"""
         pass
-    def export_from_datamodel_to_source(self, format_type):
-        """Export DataModel data back to source format"""
+    def load_batches_to_datamodel(self, source_batches):
+        """Load streamed (sheet name, batch) pairs into DataModel, each batch as a one sheet dataset"""
+        for sheet_name, batch in source_batches:
+            if not self.load_from_source_to_datamodel({sheet_name: batch}):
+                return False
+        return True
+    def export_from_datamodel_to_source(self, format_type, output_path=None):
+        """Export DataModel data back to source format, written to output_path when given"""
         pass
     def orchestrate_source_data_loading(self, source_data, load_strategy="datamodel"):
         """Default orchestration - only supports datamodel strategy"""
@@ -0,0 +1,65 @@
+"""
+StreamingDataReader - Abstract base class for data readers that stream record batches
+Readers yield (sheet name, DataFrame) batches of at most chunk_size rows, so a dataset can flow through
+validation and DataModel ingestion without ever being held in memory as a whole.
+"""
+from abc import abstractmethod
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+
+from Code.DataSources.BaseTemplates.BaseDataReader import BaseDataReader
+
+
+class StreamingDataReader(BaseDataReader):
+    """Abstract base class for readers producing batches of records"""
+
+    # Rows per batch unless the caller asks for another size
+    DEFAULT_CHUNK_SIZE = 50000
+    # Sheet vocabulary of the batches, used to standardise them ('etys': ETYS workbook sheet and column names)
+    SCHEMA = 'etys'
+    # Order the sheets are streamed in: busbars before the branches and equipment connected to them
+    SHEET_ORDER = [
+        'Nodes', 'OHL', 'Cable', 'Composite', 'Zero Length', 'Transformer', 'Quadbooster', 'Series Compensation',
+        'SSSC', 'Series Reactor', 'Series Capacitor', 'Demand Data', 'Shunt Reactor',
+        'Mechanically Switched Capacitor', 'SVC', 'STATCOM', 'TEC Register', 'IC Register', 'Sync Comp', 'Intra_HVDC'
+    ]
+
+    def __init__(self, chunk_size: int = None):
+        self.chunk_size = int(chunk_size or self.DEFAULT_CHUNK_SIZE)
+        if self.chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+
+    @abstractmethod
+    def iter_batches(self, **kwargs) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream the source as record batches, every batch of a sheet with the same columns
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: (sheet name, batch of at most chunk_size rows) in SHEET_ORDER
+        """
+        pass
+
+    def load_data(self, **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Materialise the whole source, for callers that need every sheet at once
+        Returns:
+            Dict[str, pd.DataFrame]: Dictionary mapping sheet name to DataFrame
+        """
+        batches = {}
+        for sheet_name, batch in self.iter_batches(**kwargs):
+            batches.setdefault(sheet_name, []).append(batch)
+        return {sheet_name: pd.concat(frames, ignore_index=True) for sheet_name, frames in batches.items()}
+
+    def get_data_source_info(self) -> Dict[str, object]:
+        info = super().get_data_source_info()
+        info.update({'streaming': True, 'chunk_size': self.chunk_size, 'schema': self.SCHEMA})
+        return info
+
+    def order_sheets(self, sheet_names: List[str]) -> List[str]:
+        """Sheets in streaming order, sheets outside SHEET_ORDER last in their given order"""
+        rank = {sheet_name: position for position, sheet_name in enumerate(self.SHEET_ORDER)}
+        return sorted(sheet_names, key=lambda sheet_name: rank.get(sheet_name, len(rank)))
+
+    def iter_frame_batches(self, sheet_name: str, df: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Slice a DataFrame into batches of chunk_size rows"""
+        for start in range(0, len(df), self.chunk_size):
+            yield sheet_name, df.iloc[start:start + self.chunk_size].reset_index(drop=True)
@@ -0,0 +1,170 @@
+"""
+DataExporter - Writes sheet datasets (standardised data, DataModel exports) to Parquet, Arrow, CSV or Excel
+Parquet, Arrow and CSV datasets are written as a directory holding one file per sheet, named after the sheet, so
+they read back through the format plugins; the sheets are written in parallel. Excel workbooks are written
+row by row through the openpyxl write-only mode, which keeps one row in memory instead of the whole sheet.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from Code.Instrumentation import span
+from Code.LazyImports import lazyimport
+
+pd = lazyimport('pandas')
+pa = lazyimport('pyarrow')
+pq = lazyimport('pyarrow.parquet')
+pacsv = lazyimport('pyarrow.csv')
+
+
+class DataExporter:
+    """Exports {sheet name: DataFrame} datasets in the supported file formats"""
+
+    # File extension per export format, the Excel format is one workbook rather than a directory
+    FORMATS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv', 'xlsx': '.xlsx'}
+    FORMAT_ALIASES = {'excel': 'xlsx', 'feather': 'arrow', 'ipc': 'arrow'}
+    # File suffix of the CSV compression codecs, which pandas.read_csv infers the codec from
+    CSV_COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2'}
+    # Excel limits on sheet names
+    EXCEL_SHEET_NAME_LENGTH = 31
+    EXCEL_INVALID_CHARACTERS = '/\\?*:[]'
+    # Rows of a sheet converted to Python values at a time for the workbook
+    EXCEL_CHUNK_ROWS = 10000
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or min(self.DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+
+    def get_supported_formats(self):
+        return list(self.FORMATS)
+
+    def resolve_format(self, export_format: str) -> str:
+        """
+        Export format of a format name or alias ('excel', 'feather', ...)
+        Raises:
+            ValueError: If the format is not supported
+        """
+        export_format = self.FORMAT_ALIASES.get(str(export_format).lower(), str(export_format).lower())
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}, "
+                             f"supported formats are {self.get_supported_formats()}")
+        return export_format
+
+    # =====================================================================
+    # Export
+    # =====================================================================
+
+    def export(self, data: Dict[str, pd.DataFrame], output_path: str, export_format: str = 'parquet',
+               compression: Optional[str] = None) -> Dict[str, str]:
+        """
+        Write a dataset
+        Args:
+            data (Dict[str, pd.DataFrame]): Sheets to write
+            output_path (str): Directory of the sheet files, or the workbook for xlsx
+            export_format (str): 'parquet', 'arrow', 'csv' or 'xlsx'
+            compression (Optional[str]): Codec of the files, none by default. Parquet takes 'snappy', 'gzip',
+                'zstd', 'lz4' or 'brotli', Arrow 'lz4' or 'zstd' and CSV 'gzip' or 'bz2'; xlsx is always zipped
+        Returns:
+            Dict[str, str]: Path written for every sheet
+        Raises:
+            ValueError: If the format or compression is not supported
+        """
+        export_format = self.resolve_format(export_format)
+        if export_format == 'csv' and compression and compression not in self.CSV_COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported CSV compression: {compression}, "
+                             f"supported codecs are {list(self.CSV_COMPRESSION_EXTENSIONS)}")
+        with span("datasource.export", format=export_format, sheets=len(data)):
+            if export_format == 'xlsx':
+                self.write_xlsx(data, output_path)
+                return {sheet_name: output_path for sheet_name in data}
+            os.makedirs(output_path, exist_ok=True)
+            sheet_paths = {sheet_name: os.path.join(output_path, self.get_sheet_file_name(sheet_name, export_format,
+                                                                                          compression))
+                           for sheet_name in data}
+            writer = getattr(self, f"write_{export_format}")
+            # pyarrow releases the GIL while encoding, compressing and writing, so threads write sheets in parallel
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [executor.submit(writer, df, sheet_paths[sheet_name], compression)
+                           for sheet_name, df in data.items()]
+                for future in futures:
+                    future.result()
+            return sheet_paths
+
+    def get_sheet_file_name(self, sheet_name: str, export_format: str, compression: Optional[str] = None) -> str:
+        """File name of a sheet, e.g. 'Demand Data.parquet' or 'Nodes.csv.gz'"""
+        file_name = str(sheet_name).replace('/', '_').replace('\\', '_') + self.FORMATS[export_format]
+        if export_format == 'csv' and compression:
+            file_name += self.CSV_COMPRESSION_EXTENSIONS[compression]
+        return file_name
+
+    # =====================================================================
+    # Format Writers
+    # =====================================================================
+
+    def write_parquet(self, df: pd.DataFrame, path: str, compression: Optional[str] = None):
+        pq.write_table(self.to_arrow_table(df), path, compression=compression or 'none')
+
+    def write_arrow(self, df: pd.DataFrame, path: str, compression: Optional[str] = None):
+        table = self.to_arrow_table(df)
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def write_csv(self, df: pd.DataFrame, path: str, compression: Optional[str] = None):
+        table = self.to_arrow_table(df)
+        if compression:
+            with pa.CompressedOutputStream(path, compression) as sink:
+                pacsv.write_csv(table, sink)
+        else:
+            pacsv.write_csv(table, path)
+
+    def write_xlsx(self, data: Dict[str, pd.DataFrame], output_path: str):
+        """
+        Write every sheet to one workbook in write-only mode. openpyxl workbooks cannot be written from several
+        threads, so the sheets are written one after the other.
+        """
+        from openpyxl import Workbook
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        workbook = Workbook(write_only=True)
+        used_names = set()
+        for sheet_name, df in data.items():
+            worksheet = workbook.create_sheet(self.get_excel_sheet_name(sheet_name, used_names))
+            worksheet.append([str(column) for column in df.columns])
+            # Object columns turn numpy scalars into Python values and missing values into empty cells, a chunk
+            # of rows at a time rather than as a copy of the whole sheet
+            for start in range(0, len(df), self.EXCEL_CHUNK_ROWS):
+                chunk = df.iloc[start:start + self.EXCEL_CHUNK_ROWS]
+                for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                    worksheet.append(row)
+        workbook.save(output_path)
+
+    def get_excel_sheet_name(self, sheet_name: str, used_names: set) -> str:
+        """Sheet name without the characters Excel rejects, cut to 31 characters and made unique"""
+        name = ''.join('_' if char in self.EXCEL_INVALID_CHARACTERS else char for char in str(sheet_name))
+        name = name[:self.EXCEL_SHEET_NAME_LENGTH] or 'Sheet'
+        candidate, index = name, 1
+        while candidate.lower() in used_names:
+            suffix = f"_{index}"
+            candidate = name[:self.EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix
+            index += 1
+        used_names.add(candidate.lower())
+        return candidate
+
+    @staticmethod
+    def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+        """
+        Arrow table of a sheet without its index. Source sheets often hold numbers and text in one column, such
+        columns are written as text.
+        """
+        df = df.rename(columns=str)
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.copy()
+            for column in df.columns[df.dtypes == object]:
+                df[column] = df[column].map(lambda value: None if value is None or value != value else str(value))
+            return pa.Table.from_pandas(df, preserve_index=False)
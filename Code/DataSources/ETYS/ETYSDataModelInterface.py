@@ -1,54 +1,90 @@
-import pandas as pd
+from Code.LazyImports import lazyimport
+pd = lazyimport('pandas')
+np = lazyimport('numpy')
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.DataSources.BaseTemplates.DataSourceDataModelInterface import DataSourceDataModelInterface
 class ETYSDataModelInterface(DataSourceDataModelInterface):
 
+    # Standardised sheets per DataModel loader, loaded in this order after the nodes
+    BRANCH_SHEETS = ['overhead_lines', 'cables', 'composite_lines', 'zero_length_lines',
+                     'transformers', 'quadboosters', 'series_compensation', 'sssc_devices',
+                     'series_reactors', 'series_capacitors']
+    SHUNT_SHEETS = ['shunt_reactors', 'switched_capacitors', 'svc_devices', 'statcom_devices']
+    GENERATOR_SHEETS = ['tec_generators', 'interconnectors', 'sync_compensators']
+    TRANSFORMER_SHEETS = ['transformers', 'quadboosters']
+    # Nodes (busbars) first, then the branches, loads, shunts and generators connected to them
+    SHEET_LOAD_ORDER = ['nodes'] + BRANCH_SHEETS + ['loads'] + SHUNT_SHEETS + GENERATOR_SHEETS + ['hvdc_links']
+
+    # Branch attribute -> electrical parameter column of ETYSDataReader.calculate_branch_parameters, per unit values
+    # on 100 MVA, ohms and microsiemens
+    BRANCH_PARAMETER_ATTRIBUTES = {
+        'R': 'r_pu', 'X': 'x_pu', 'B': 'b_pu', 'ROhm': 'r_ohm', 'XOhm': 'x_ohm', 'BuS': 'b_us',
+        'WinterRating': 'winter_rating', 'SpringAutumnRating': 'spring_autumn_rating', 'SummerRating': 'summer_rating',
+    }
+    LINE_PARAMETER_ATTRIBUTES = dict(BRANCH_PARAMETER_ATTRIBUTES, Length='length_km')
+    TRANSFORMER_PARAMETER_ATTRIBUTES = dict(BRANCH_PARAMETER_ATTRIBUTES, Vsc='vsc_percent',
+                                            CopperLossKW='copper_loss_kw', RatedMVA='rating_mva')
+
+    @timed("datamodel.load_from_source_to_datamodel")
     def load_from_source_to_datamodel(self, etys_standardized_data):
         """Load ETYS data into framework DataModel"""
         gbl.Msg.AddRawMessage("Loading ETYS data into DataModel...")
         bOK = True
-        # Process nodes first (busbars)
-        if bOK and 'nodes' in etys_standardized_data:
-            bOK = self._load_nodes_to_datamodel(etys_standardized_data['nodes'])
-        # Process branches (lines, cables, transformers)
-        if bOK:
-            branch_sheets = ['overhead_lines', 'cables', 'composite_lines', 'zero_length_lines',
-                            'transformers', 'quadboosters', 'series_compensation', 'sssc_devices',
-                            'series_reactors', 'series_capacitors']
-            for sheet_name in branch_sheets:
-                if sheet_name in etys_standardized_data:
-                    bOK = self._load_branches_to_datamodel(etys_standardized_data[sheet_name], sheet_name)
-                    if not bOK:
-                        break
-        # Process loads
-        if bOK and 'loads' in etys_standardized_data:
-            bOK = self._load_loads_to_datamodel(etys_standardized_data['loads'])
-        # Process shunt elements (as zero-impedance branches or special loads)
-        if bOK:
-            shunt_sheets = ['shunt_reactors', 'switched_capacitors', 'svc_devices',  'statcom_devices']
-            for sheet_name in shunt_sheets:
-                if sheet_name in etys_standardized_data:
-                    bOK = self._load_shunt_elements_to_datamodel(etys_standardized_data[sheet_name], sheet_name)
-                    if not bOK:
-                        break
-        # Process generators
-        if bOK:
-            # Update generator sheets
-            gen_sheets = ['tec_generators', 'interconnectors', 'sync_compensators']
-            for sheet_name in gen_sheets:
-                if sheet_name in etys_standardized_data:
-                    bOK = self._load_generators_to_datamodel(etys_standardized_data[sheet_name], sheet_name)
-                    if not bOK:
-                        break
-        # Process HVDC links
-        if bOK and 'hvdc_links' in etys_standardized_data:
-            bOK = self._load_hvdc_links_to_datamodel(etys_standardized_data['hvdc_links'])
+        # Nodes (busbars) first, then branches, loads, shunt elements, generators and HVDC links
+        for sheet_name, sheet_df in self._iter_sheets_in_load_order(etys_standardized_data):
+            bOK = self._load_sheet_to_datamodel(sheet_name, sheet_df)
+            if not bOK:
+                break
         if bOK:
             gbl.Msg.AddRawMessage("ETYS data successfully loaded into DataModel")
         else:
             gbl.Msg.AddError("Failed to load ETYS data into DataModel")
         return bOK
 
+    @timed("datamodel.load_batches_to_datamodel")
+    def load_batches_to_datamodel(self, standardised_batches):
+        """
+        Load streamed standardised (sheet name, batch) pairs into DataModel as they arrive, so only one batch is
+        held at a time. Node batches must come before the batches connected to them.
+        """
+        gbl.Msg.AddRawMessage("Streaming ETYS data into DataModel...")
+        bOK = True
+        nBatches = 0
+        for sheet_name, batch in standardised_batches:
+            bOK = self._load_sheet_to_datamodel(sheet_name, batch)
+            if not bOK:
+                break
+            nBatches += 1
+        if bOK:
+            gbl.Msg.AddRawMessage(f"ETYS data successfully streamed into DataModel in {nBatches} batches")
+        else:
+            gbl.Msg.AddError("Failed to stream ETYS data into DataModel")
+        return bOK
+
+    def _iter_sheets_in_load_order(self, standardised_data):
+        """(sheet name, sheet) pairs of a standardised dataset in SHEET_LOAD_ORDER, other sheets are skipped"""
+        for sheet_name in self.SHEET_LOAD_ORDER:
+            if sheet_name in standardised_data:
+                yield sheet_name, standardised_data[sheet_name]
+
+    def _load_sheet_to_datamodel(self, sheet_name, sheet_df):
+        """Load one standardised sheet (or batch of it) with its DataModel loader, other sheets are skipped"""
+        if sheet_name == 'nodes':
+            return self._load_nodes_to_datamodel(sheet_df)
+        if sheet_name in self.BRANCH_SHEETS:
+            return self._load_branches_to_datamodel(sheet_df, sheet_name)
+        if sheet_name == 'loads':
+            return self._load_loads_to_datamodel(sheet_df)
+        if sheet_name in self.SHUNT_SHEETS:
+            return self._load_shunt_elements_to_datamodel(sheet_df, sheet_name)
+        if sheet_name in self.GENERATOR_SHEETS:
+            return self._load_generators_to_datamodel(sheet_df, sheet_name)
+        if sheet_name == 'hvdc_links':
+            return self._load_hvdc_links_to_datamodel(sheet_df)
+        return True
+
+    @timed("datamodel.load_nodes_to_datamodel")
     def _load_nodes_to_datamodel(self, nodes_df):
         """Load nodes (busbars) into DataModel"""
         if nodes_df.empty:
@@ -66,6 +102,9 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
             busbar.name = str(row.get('Site Name', node_id))
             busbar.kV = float(row['voltage_kv']) if 'voltage_kv' in row and pd.notna(row['voltage_kv']) else float(row.get('Voltage (Derived)', 0))
             busbar.Disconnected = False  # Default to connected
+            # Boundary zone, used for transfer directions between zones
+            if 'Major Flop Zone' in row and pd.notna(row['Major Flop Zone']):
+                busbar.Zone = str(row['Major Flop Zone']).strip()
             # Add to DataModel
             if not gbl.DataModelManager.addbusbartotab(busbar):
                 gbl.Msg.AddError(f"Failed to add busbar {node_id} to DataModel")
@@ -73,15 +112,15 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
         gbl.Msg.AddRawMessage(f"Loaded {len(nodes_df)} nodes into DataModel")
         return True
 
+    @timed("datamodel.load_branches_to_datamodel")
     def _load_branches_to_datamodel(self, branches_df, sheet_type):
-        """Load branches (lines/transformers) into DataModel"""
+        """Load branches (lines/transformers) into DataModel, with the electrical parameters of the whole sheet"""
         if branches_df.empty:
             return True
-        for _, row in branches_df.iterrows():
-            node1 = str(row['node_1']).strip() if 'node_1' in row else str(row.get('Node 1', '')).strip()
-            node2 = str(row['node_2']).strip() if 'node_2' in row else str(row.get('Node 2', '')).strip()
-            if not node1 or not node2 or node1 == 'nan' or node2 == 'nan':
-                continue
+        busbar_kv = {str(busbar.BusID): busbar.kV for busbar in gbl.DataModelManager.Busbar_TAB}
+        is_transformer = sheet_type in self.TRANSFORMER_SHEETS
+        attributes, rows = self._get_branch_rows(branches_df, sheet_type, busbar_kv)
+        for node1, node2, name, values in rows:
             branch_id = f"{node1}_{node2}_{sheet_type}"
             # Create branch using DataFactory
             branch = gbl.DataFactory.createbranch(node1, node2, 0, branch_id)
@@ -89,16 +128,54 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
                 gbl.Msg.AddError(f"Failed to create branch {branch_id}")
                 continue
             # Set branch properties
-            branch.name = str(row.get('Name', branch_id))
+            branch.name = str(name if name is not None and pd.notna(name) else branch_id)
             branch.ON = True  # Default to energized
             # Set transformer flag for transformer sheets
-            if sheet_type in ['transformers', 'quadboosters']:
+            if is_transformer:
                 branch.IsTransformer = True
+            # Impedances, lengths, transformer data and the seasonal ratings read by the branch rating engine,
+            # set in one update as the branch is new
+            branch.__dict__.update(zip(attributes, values))
             # Add to DataModel
             gbl.DataModelManager.Branch_TAB.append(branch)
         gbl.Msg.AddRawMessage(f"Loaded {len(branches_df)} {sheet_type} into DataModel")
         return True
 
+    def _get_branch_rows(self, branches_df, sheet_type, busbar_kv):
+        """
+        Connected rows of a branch sheet with their electrical parameters, calculated for the whole sheet
+        Args:
+            branches_df: Standardised branch sheet (or batch of it)
+            sheet_type: Standardised sheet name
+            busbar_kv: Busbar kV by str(BusID), the base voltage of each row (the HV side of transformers)
+        Returns:
+            (attributes, rows): Branch attribute names, and (node1, node2, name, attribute values) per row
+        """
+        node1s = self._get_node_column(branches_df, 'node_1', 'Node 1')
+        node2s = self._get_node_column(branches_df, 'node_2', 'Node 2')
+        is_transformer = sheet_type in self.TRANSFORMER_SHEETS
+        kv1 = node1s.map(busbar_kv).astype(float).to_numpy()
+        kv2 = node2s.map(busbar_kv).astype(float).to_numpy()
+        v_base = np.fmax(kv1, kv2) if is_transformer else np.where(np.isnan(kv1), kv2, kv1)
+        from Code.DataSources.ETYS.ETYSDataReader import ETYSDataReader
+        params = ETYSDataReader().calculate_branch_parameters(branches_df, v_base)
+        names = branches_df['Name'].to_numpy() if 'Name' in branches_df.columns else np.full(len(branches_df), None)
+        attributes = self.TRANSFORMER_PARAMETER_ATTRIBUTES if is_transformer else self.LINE_PARAMETER_ATTRIBUTES
+        columns = [params[column].to_numpy().tolist() for column in attributes.values()]
+        rows = [(node1, node2, name, values)
+                for node1, node2, name, values in zip(node1s.tolist(), node2s.tolist(), names.tolist(), zip(*columns))
+                if node1 and node2 and node1 != 'nan' and node2 != 'nan']
+        return list(attributes), rows
+
+    @staticmethod
+    def _get_node_column(df, standard_column, etys_column):
+        """Stripped node names of a sheet, from the standardised column when present"""
+        column = standard_column if standard_column in df.columns else etys_column
+        if column not in df.columns:
+            return pd.Series([''] * len(df), index=df.index)
+        return df[column].astype(str).str.strip()
+
+    @timed("datamodel.load_loads_to_datamodel")
     def _load_loads_to_datamodel(self, loads_df):
         """Load loads into DataModel"""
         if loads_df.empty:
@@ -126,6 +203,7 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
         gbl.Msg.AddRawMessage(f"Loaded {len(loads_df)} loads into DataModel")
         return True
 
+    @timed("datamodel.load_generators_to_datamodel")
     def _load_generators_to_datamodel(self, generators_df, sheet_type):
         """Load generators into DataModel"""
         if generators_df.empty:
@@ -147,15 +225,20 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
             if sheet_type == 'tec_generators':
                 gen_item.MW = float(row.get('MW_Capacity', 0)) if 'MW_Capacity' in row and pd.notna(row['MW_Capacity']) else 0.0
                 gen_item.MWCapacity = gen_item.MW
+                gen_item.PlantType = str(row['Plant Type']).strip() if 'Plant Type' in row and pd.notna(row['Plant Type']) else ''
             elif sheet_type == 'interconnectors':
                 gen_item.MW = float(row.get('MW_Import_Capacity', 0)) if 'MW_Import_Capacity' in row and pd.notna(row['MW_Import_Capacity']) else 0.0
                 gen_item.MWCapacity = gen_item.MW
+                gen_item.PlantType = 'Interconnector'
+            elif sheet_type == 'sync_compensators':
+                gen_item.PlantType = 'Reactive Compensation'
             # Add to DataModel
             if not gbl.DataModelManager.addgentotab(gen_item):
                 gbl.Msg.AddError(f"Failed to add generator {gen_id} to DataModel")
                 return False
         gbl.Msg.AddRawMessage(f"Loaded {len(generators_df)} {sheet_type} into DataModel")
         return True
+    @timed("datamodel.load_shunt_elements_to_datamodel")
     def _load_shunt_elements_to_datamodel(self, shunt_df, sheet_type):
         """Load shunt elements (reactors, capacitors, SVC, STATCOM) into DataModel"""
         if shunt_df.empty:
@@ -194,6 +277,7 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
                     return False
         gbl.Msg.AddRawMessage(f"Loaded {len(shunt_df)} {sheet_type} into DataModel")
         return True
+    @timed("datamodel.load_hvdc_links_to_datamodel")
     def _load_hvdc_links_to_datamodel(self, hvdc_df):
         """Load HVDC links into DataModel as special branches"""
         if hvdc_df.empty:
@@ -218,20 +302,143 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
         gbl.Msg.AddRawMessage(f"Loaded {len(hvdc_df)} HVDC links into DataModel")
         return True
 
-    def export_from_datamodel_to_source(self, format_type='excel'):
-        """Export current DataModel back to ETYS format"""
-        print("Exporting DataModel to ETYS format...")
-        # TODO: Implement actual export logic
-        return {}
+    def export_from_datamodel_to_source(self, format_type='excel', output_path=None, compression=None):
+        """
+        Export current DataModel back to ETYS format. The sheets read back through the ETYS standardisation,
+        so a DataModel exported to parquet, arrow or csv can be streamed into a fresh DataModel.
+        Args:
+            format_type (str): 'excel'/'xlsx', 'parquet', 'arrow' or 'csv'
+            output_path (str): Workbook, or directory of sheet files, to write; the sheets are only returned if None
+            compression (str): Codec of the sheet files, see DataExporter.export
+        Returns:
+            Dict[str, pd.DataFrame]: ETYS sheets of the DataModel
+        """
+        from Code.DataSources.DataExporter import DataExporter
+        exporter = DataExporter()
+        format_type = exporter.resolve_format(format_type)
+        gbl.Msg.AddRawMessage("Exporting DataModel to ETYS format...")
+        etys_sheets = self._build_etys_sheets_from_datamodel()
+        if output_path is not None:
+            exporter.export(etys_sheets, output_path, format_type, compression)
+            gbl.Msg.AddRawMessage(f"Exported {len(etys_sheets)} ETYS sheets to {output_path}")
+        return etys_sheets
+
+    @timed("datamodel.build_etys_sheets_from_datamodel")
+    def _build_etys_sheets_from_datamodel(self):
+        """ETYS sheets of the DataModel components, the inverse of the DataModel loaders; empty sheets are left out"""
+        datamodel = gbl.DataModelManager
+        busbars = datamodel.Busbar_TAB
+        sheets = {'Nodes': pd.DataFrame({
+            'Node': [str(busbar.BusID) for busbar in busbars],
+            'Site Name': [busbar.name for busbar in busbars],
+            'Voltage (Derived)': [float(busbar.kV) for busbar in busbars],
+            'Major Flop Zone': [busbar.Zone or None for busbar in busbars],
+            'Relevant TO': [busbar.Owner or None for busbar in busbars],
+            # Columns the validator expects that the DataModel holds no data for
+            'latitude': np.nan, 'longitude': np.nan, 'Type': None, 'Indoor/Outdoor': None,
+        })}
+        transformers = [branch for branch in datamodel.Branch_TAB if branch.IsTransformer]
+        lines = [branch for branch in datamodel.Branch_TAB if not branch.IsTransformer
+                 and not getattr(branch, 'IsHVDC', False)]
+        hvdc_links = [branch for branch in datamodel.Branch_TAB if getattr(branch, 'IsHVDC', False)]
+        sheets['OHL'] = self._build_etys_branch_sheet(lines)
+        sheets['Transformer'] = self._build_etys_branch_sheet(transformers)
+        sheets['Intra_HVDC'] = pd.DataFrame({
+            'Node 1': [str(branch.BusID1) for branch in hvdc_links],
+            'Node 2': [str(branch.BusID2) for branch in hvdc_links],
+            'Name': [getattr(branch, 'name', branch.BranchID) for branch in hvdc_links],
+        })
+        # Shunts are held as reactive loads and dynamic compensation as generators, told apart by their loader IDs
+        loads = [load for load in datamodel.Load_TAB if not str(load.LoadID).startswith('Shunt_')]
+        sheets['Demand Data'] = pd.DataFrame({
+            'ETYS_Node': [str(load.BusID) for load in loads],
+            'Name': [getattr(load, 'name', load.LoadID) for load in loads],
+            'MW': [float(load.MW) for load in loads],
+            'MVar': [float(load.MVar) for load in loads],
+        })
+        for sheet_name, sheet_type in (('Shunt Reactor', 'shunt_reactors'),
+                                       ('Mechanically Switched Capacitor', 'switched_capacitors')):
+            shunts = [load for load in datamodel.Load_TAB if str(load.LoadID).startswith(f"Shunt_{sheet_type}_")]
+            sheets[sheet_name] = pd.DataFrame({
+                'Node': [str(shunt.BusID) for shunt in shunts],
+                'Name': [getattr(shunt, 'name', shunt.LoadID) for shunt in shunts],
+                'MVar': [float(shunt.MVar) for shunt in shunts],
+            })
+        for sheet_name, sheet_type in (('SVC', 'svc_devices'), ('STATCOM', 'statcom_devices')):
+            devices = [gen for gen in datamodel.Gen_TAB if str(gen.GenID).startswith(f"DynComp_{sheet_type}_")]
+            sheets[sheet_name] = pd.DataFrame({
+                'Node': [str(device.BusID) for device in devices],
+                'Name': [getattr(device, 'name', device.GenID) for device in devices],
+            })
+        generators = [gen for gen in datamodel.Gen_TAB if not str(gen.GenID).startswith('DynComp_')]
+        interconnectors = [gen for gen in generators if gen.PlantType == 'Interconnector']
+        sync_compensators = [gen for gen in generators if gen.PlantType == 'Reactive Compensation']
+        plants = [gen for gen in generators if gen.PlantType not in ('Interconnector', 'Reactive Compensation')]
+        sheets['TEC Register'] = pd.DataFrame({
+            'ETYS_Node': [str(gen.BusID) for gen in plants],
+            'Plant Name': [getattr(gen, 'name', gen.GenID) for gen in plants],
+            'MW_Capacity': [float(gen.MWCapacity or gen.MW) for gen in plants],
+            'Plant Type': [gen.PlantType or None for gen in plants],
+        })
+        sheets['IC Register'] = pd.DataFrame({
+            'ETYS_Node': [str(gen.BusID) for gen in interconnectors],
+            'Plant Name': [getattr(gen, 'name', gen.GenID) for gen in interconnectors],
+            'MW_Import_Capacity': [float(gen.MWCapacity or gen.MW) for gen in interconnectors],
+        })
+        sheets['Sync Comp'] = pd.DataFrame({
+            'ETYS_Node': [str(gen.BusID) for gen in sync_compensators],
+            'Plant Name': [getattr(gen, 'name', gen.GenID) for gen in sync_compensators],
+        })
+        return {sheet_name: df for sheet_name, df in sheets.items() if not df.empty}
+
+    @staticmethod
+    def _build_etys_branch_sheet(branches):
+        """OHL or Transformer sheet of DataModel branches, impedances back to % on 100 MVA"""
+        def values(attribute, default=0.0):
+            return np.array([getattr(branch, attribute, default) for branch in branches], dtype=float)
+        # Branches not loaded from ETYS only have their first rating
+        winter = np.array([getattr(branch, 'WinterRating', branch.RatingA) for branch in branches], dtype=float)
+        spring_autumn = values('SpringAutumnRating')
+        return pd.DataFrame({
+            'Node 1': [str(branch.BusID1) for branch in branches],
+            'Node 2': [str(branch.BusID2) for branch in branches],
+            'Name': [getattr(branch, 'name', branch.BranchID) for branch in branches],
+            'R (% on 100MVA)': values('R') * 100.0,
+            'X (% on 100MVA)': values('X') * 100.0,
+            'B (% on 100MVA)': values('B') * 100.0,
+            'Winter Rating (MVA)': winter,
+            'Spring Rating (MVA)': spring_autumn,
+            'Summer Rating (MVA)': np.array([getattr(branch, 'SummerRating', branch.RatingA) for branch in branches],
+                                            dtype=float),
+            'Autumn Rating (MVA)': spring_autumn,
+            'OHL Length (km)': values('Length'),
+        })
+
     def orchestrate_source_data_loading(self, standardised_etys_data, load_strategy="datamodel"):
+        """
+        Load standardised ETYS data with a load strategy: 'datamodel' fills the DataModel, 'direct' builds the
+        network of the active study engine without it (from a dict of sheets or streamed (sheet name, batch) pairs)
+        """
         if load_strategy == "datamodel":
             return self.load_from_source_to_datamodel(standardised_etys_data)
-        elif load_strategy == "direct" and gbl.EngineContainer.engine_type == "PowerFactory":
-            return self.load_from_source_to_engine(standardised_etys_data, "PowerFactory")
-        elif load_strategy == "direct" and gbl.EngineContainer.engine_type == "ipsa":
-            return self.load_from_source_to_engine(standardised_etys_data, "ipsa")
+        elif load_strategy == "direct":
+            engine_type = self._get_engine_type()
+            if engine_type is None:
+                raise RuntimeError("No study engine initialized for the direct load strategy")
+            return self.load_from_source_to_engine(standardised_etys_data, engine_type)
         else:
             raise ValueError(f"Unsupported load strategy: {load_strategy}")
+    @staticmethod
+    def _get_engine_type():
+        """Type of the active study engine ('ipsa', 'PowerFactory'), None without one"""
+        engine = getattr(gbl, 'EngineContainer', None)
+        if engine is None:
+            return None
+        if engine.isipsa():
+            return "ipsa"
+        if engine.ispowerfactory():
+            return "PowerFactory"
+        return None
     def load_from_source_to_engine(self, standardised_etys_data, engine_type):
         """Load ETYS data directly to specified engine, bypassing DataModel"""
         if engine_type == "PowerFactory":
@@ -243,10 +450,148 @@ class ETYSDataModelInterface(DataSourceDataModelInterface):
     def _load_to_powerfactory_engine(self, standardised_etys_data):
         if not gbl.EngineContainer or not gbl.EngineContainer.m_pFApp:
             raise RuntimeError("PowerFactory engine not initialized")
-        # TODO: Implement PowerFactory direct loading
-        pass
+        raise NotImplementedError("Direct loading is not implemented for PowerFactory, use the datamodel strategy")
 
+    @timed("datamodel.load_to_ipsa_engine")
     def _load_to_ipsa_engine(self, standardised_etys_data):
-        """Load ETYS data directly to IPSA engine"""
-        # TODO: Implement IPSA direct loading
-        pass
+        """
+        Load ETYS data directly to IPSA engine. Each standardised sheet, or streamed batch of one, is turned into IPSA
+        component objects that are created in the engine before the next batch is read, so neither the DataModel nor
+        an IPSA_Network_Model of the whole network is held. The network matches the one of the datamodel strategy.
+        """
+        engine = gbl.EngineContainer
+        if engine is None or not engine.isipsa():
+            raise RuntimeError("IPSA engine not initialized")
+        if isinstance(standardised_etys_data, dict):
+            standardised_etys_data = self._iter_sheets_in_load_order(standardised_etys_data)
+        gbl.Msg.AddRawMessage("Loading ETYS data directly to IPSA...")
+        data_factory = engine.data_factory
+        return engine.load_network_from_components(
+            self._iter_ipsa_component_batches(standardised_etys_data, data_factory))
+
+    def _iter_ipsa_component_batches(self, standardised_batches, data_factory):
+        """
+        IPSA components of every standardised batch. The rows become the framework components the DataModel loaders
+        would create, with the same IDs and attributes, but are not added to DataModel; the IPSA data factory then
+        converts them as it converts the DataModel.
+        """
+        from Code.DataModel.ComponentManager import Busbar, Branch, Load, Generator
+        # Busbar kV by str(BusID) for the branch base voltages, and the load and generator counts the DataModel
+        # loaders number their IDs with
+        busbar_kv = {}
+        counts = {'loads': 0, 'generators': 0}
+
+        def make_load(node_id, prefix, name, mw, mvar):
+            load_id = f"{prefix}_{counts['loads']}"
+            load_item = Load(node_id, load_id)
+            load_item.name = str(load_id if name is None else name)
+            load_item.MW, load_item.MVar, load_item.ON = mw, mvar, True
+            counts['loads'] += 1
+            return data_factory.convert_framework_load_to_ipsa(load_item)
+
+        def make_generator(node_id, prefix, name, mw, plant_type=None):
+            gen_id = f"{prefix}_{counts['generators']}"
+            gen_item = Generator(node_id, gen_id)
+            gen_item.name = str(gen_id if name is None else name)
+            gen_item.ON = True
+            gen_item.MW = mw
+            # Dynamic compensation has no plant type or capacity
+            if plant_type is not None:
+                gen_item.MWCapacity = mw
+                gen_item.PlantType = plant_type
+            counts['generators'] += 1
+            return data_factory.convert_framework_generator_to_ipsa(gen_item)
+
+        for sheet_name, sheet_df in standardised_batches:
+            if sheet_df.empty:
+                continue
+            components = []
+            if sheet_name == 'nodes':
+                node_ids = self._get_node_column(sheet_df, 'node_id', 'Node')
+                names = self._get_text_column(sheet_df, 'Site Name')
+                kv = self._get_float_column(sheet_df, 'voltage_kv')
+                kv = np.where(np.isnan(kv), self._get_float_column(sheet_df, 'Voltage (Derived)', 0.0), kv)
+                for node_id, name, node_kv in zip(node_ids.tolist(), names, kv.tolist()):
+                    if not node_id or node_id == 'nan':
+                        continue
+                    busbar = Busbar(node_id)
+                    busbar.name = node_id if name is None else name
+                    busbar.kV = node_kv
+                    busbar.Disconnected = False
+                    busbar_kv[str(busbar.BusID)] = busbar.kV
+                    components.append(data_factory.convert_framework_busbar_to_ipsa(busbar))
+            elif sheet_name in self.BRANCH_SHEETS:
+                is_transformer = sheet_name in self.TRANSFORMER_SHEETS
+                attributes, rows = self._get_branch_rows(sheet_df, sheet_name, busbar_kv)
+                for node1, node2, name, values in rows:
+                    branch_id = f"{node1}_{node2}_{sheet_name}"
+                    branch = Branch(node1, node2, 0, branch_id)
+                    branch.name = str(name if name is not None and pd.notna(name) else branch_id)
+                    branch.IsTransformer = is_transformer
+                    branch.__dict__.update(zip(attributes, values))
+                    components.append(data_factory.convert_framework_transformer_to_ipsa(branch) if is_transformer
+                                      else data_factory.convert_framework_branch_to_ipsa(branch))
+            elif sheet_name == 'loads':
+                node_ids = self._get_node_column(sheet_df, 'node_id', 'ETYS_Node')
+                rows = zip(node_ids.tolist(), self._get_text_column(sheet_df, 'Name'),
+                           np.nan_to_num(self._get_float_column(sheet_df, 'MW')).tolist(),
+                           np.nan_to_num(self._get_float_column(sheet_df, 'MVar')).tolist())
+                components = [make_load(node_id, f"Load_{node_id}", name, mw, mvar)
+                              for node_id, name, mw, mvar in rows if node_id and node_id != 'nan']
+            elif sheet_name in self.SHUNT_SHEETS:
+                node_ids = self._get_node_column(sheet_df, 'Node', 'Node')
+                rows = zip(node_ids.tolist(), self._get_text_column(sheet_df, 'Name'),
+                           np.nan_to_num(self._get_float_column(sheet_df, 'MVar')).tolist())
+                rows = [row for row in rows if row[0] and row[0] != 'nan']
+                if sheet_name in ['shunt_reactors', 'switched_capacitors']:
+                    components = [make_load(node_id, f"Shunt_{sheet_name}_{node_id}", name, 0.0, mvar)
+                                  for node_id, name, mvar in rows]
+                else:
+                    components = [make_generator(node_id, f"DynComp_{sheet_name}_{node_id}", name, 0.0)
+                                  for node_id, name, _ in rows]
+            elif sheet_name in self.GENERATOR_SHEETS:
+                node_ids = self._get_node_column(sheet_df, 'node_id', 'ETYS_Node')
+                names = self._get_text_column(sheet_df, 'Plant Name')
+                if sheet_name == 'tec_generators':
+                    mws = np.nan_to_num(self._get_float_column(sheet_df, 'MW_Capacity')).tolist()
+                    plant_types = [plant_type or '' for plant_type in self._get_text_column(sheet_df, 'Plant Type',
+                                                                                           bStrip=True)]
+                elif sheet_name == 'interconnectors':
+                    mws = np.nan_to_num(self._get_float_column(sheet_df, 'MW_Import_Capacity')).tolist()
+                    plant_types = ['Interconnector'] * len(sheet_df)
+                else:
+                    mws = [0.0] * len(sheet_df)
+                    plant_types = ['Reactive Compensation'] * len(sheet_df)
+                components = [make_generator(node_id, f"Gen_{node_id}_{sheet_name}", name, mw, plant_type)
+                              for node_id, name, mw, plant_type in zip(node_ids.tolist(), names, mws, plant_types)
+                              if node_id and node_id != 'nan']
+            elif sheet_name == 'hvdc_links':
+                node1s = self._get_node_column(sheet_df, 'node_1', 'Node 1')
+                node2s = self._get_node_column(sheet_df, 'node_2', 'Node 2')
+                names = self._get_text_column(sheet_df, 'Name')
+                for node1, node2, name in zip(node1s.tolist(), node2s.tolist(), names):
+                    if not node1 or not node2 or node1 == 'nan' or node2 == 'nan':
+                        continue
+                    hvdc_id = f"HVDC_{node1}_{node2}"
+                    hvdc_branch = Branch(node1, node2, 0, hvdc_id)
+                    hvdc_branch.name = str(hvdc_id if name is None else name)
+                    hvdc_branch.IsHVDC = True
+                    components.append(data_factory.convert_framework_branch_to_ipsa(hvdc_branch))
+            yield components
+            gbl.Msg.AddRawMessage(f"Loaded {len(sheet_df)} {sheet_name} directly to IPSA")
+
+    @staticmethod
+    def _get_text_column(df, column, bStrip=False):
+        """Values of a sheet column as str (None where the column is missing, or blank when stripped)"""
+        if column not in df.columns:
+            return [None] * len(df)
+        if bStrip:
+            return [str(value).strip() if pd.notna(value) else None for value in df[column].tolist()]
+        return [str(value) for value in df[column].tolist()]
+
+    @staticmethod
+    def _get_float_column(df, column, default=None):
+        """Numeric values of a sheet column, NaN where not numeric; default (or NaN) where the column is missing"""
+        if column not in df.columns:
+            return np.full(len(df), np.nan if default is None else default, dtype=float)
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
@@ -127,6 +127,20 @@ class ETYSDataReader(BaseDataReader):
         except (ValueError, TypeError):
             return default
 
+    def safe_float_column(self, df: pd.DataFrame, column: str, default: float = 0.0) -> np.ndarray:
+        """
+        Convert a whole column to floats, the vectorised safe_float.
+        Args:
+            df (pd.DataFrame): Sheet data
+            column (str): Column to convert, missing columns give the default for every row
+            default (float): Value of missing and non-numeric entries
+        Returns:
+            np.ndarray: Float values aligned with df
+        """
+        if column not in df.columns:
+            return np.full(len(df), default, dtype=float)
+        return pd.to_numeric(df[column], errors='coerce').fillna(default).to_numpy(dtype=float)
+
     # =====================================================================
     # Data Extraction Functions
     # =====================================================================
@@ -358,6 +372,53 @@ class ETYSDataReader(BaseDataReader):
     # Impedance and Electrical Parameter Processing
     # =====================================================================
 
+    def calculate_branch_parameters(self, df_branches: pd.DataFrame, v_base) -> pd.DataFrame:
+        """
+        Calculate the electrical parameters of a whole line or transformer sheet at once.
+        Per-unit values are on the 100 MVA base of the sheet; ohmic values use the base voltage of each row.
+        Args:
+            df_branches (pd.DataFrame): Branch sheet data
+            v_base (float or array-like): Base voltage in kV, one value or one per row (NaN or 0 leaves the
+                ohmic columns at zero)
+        Returns:
+            pd.DataFrame: aligned with df_branches, with r_pu, x_pu, b_pu, length_km, r_ohm, x_ohm, b_us,
+                the per-km type values r/x/b_ohm_per_km, the transformer vsc_percent, copper_loss_kw and
+                rating_mva, and the winter, spring_autumn and summer ratings (MVA, 0 where not given)
+        """
+        r_pu = self.safe_float_column(df_branches, 'R (% on 100MVA)') / 100.0
+        x_pu = self.safe_float_column(df_branches, 'X (% on 100MVA)') / 100.0
+        b_pu = self.safe_float_column(df_branches, 'B (% on 100MVA)') / 100.0
+        length_km = (self.safe_float_column(df_branches, 'OHL Length (km)') +
+                     self.safe_float_column(df_branches, 'Cable Length (km)'))
+        # 100 MVA base impedance per row
+        v_base = np.broadcast_to(np.nan_to_num(np.asarray(v_base, dtype=float), nan=0.0), r_pu.shape)
+        z_base = v_base ** 2 / 100.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b_us = np.where(z_base > 0, b_pu / z_base, 0.0) * 1e6
+        # Per km type values, lines shorter than 10 m are taken as 1 km
+        type_len = np.where(length_km > 0.01, length_km, 1.0)
+        winter = self.safe_float_column(df_branches, 'Winter Rating (MVA)')
+        summer = self.safe_float_column(df_branches, 'Summer Rating (MVA)')
+        # Spring and autumn ratings share one season, the lower of the two is used
+        spring = self.safe_float_column(df_branches, 'Spring Rating (MVA)', np.nan)
+        autumn = self.safe_float_column(df_branches, 'Autumn Rating (MVA)', np.nan)
+        spring_autumn = np.nan_to_num(np.fmin(spring, autumn), nan=0.0)
+        # Transformer short circuit voltage and copper loss on the transformer rating
+        rating_mva = winter
+        r_pct = r_pu * rating_mva
+        x_pct = x_pu * rating_mva
+        return pd.DataFrame({
+            'r_pu': r_pu, 'x_pu': x_pu, 'b_pu': b_pu, 'length_km': length_km,
+            'r_ohm': r_pu * z_base, 'x_ohm': x_pu * z_base, 'b_us': b_us,
+            'r_ohm_per_km': np.clip(r_pu * z_base / type_len, 0.01, 0.1),
+            'x_ohm_per_km': np.clip(x_pu * z_base / type_len, 0.1, 1.0),
+            'b_ohm_per_km': np.clip(b_pu * z_base / type_len, 0.0, 0.0),
+            'vsc_percent': np.hypot(r_pct, x_pct),
+            'copper_loss_kw': r_pct * rating_mva * 10,  # (r_pct / 100) * rating_mva * 1000
+            'rating_mva': rating_mva,
+            'winter_rating': winter, 'spring_autumn_rating': spring_autumn, 'summer_rating': summer,
+        }, index=df_branches.index)
+
     def calculate_line_impedances(self, row: pd.Series, v_base: float) -> Tuple[float, float, float]:
         """
         Calculate per-km impedances for line from per-unit values.
@@ -367,23 +428,8 @@ class ETYSDataReader(BaseDataReader):
         Returns:
             Tuple[float, float, float]: (r_ohm_per_km, x_ohm_per_km, b_ohm_per_km)
         """
-        total_len = (
-            self.safe_float(row.get('OHL Length (km)')) +
-            self.safe_float(row.get('Cable Length (km)'))
-        )
-        total_len = total_len if total_len > 0.01 else 1.0
-
-        # Calculate per-unit impedances on 100MVA base
-        z_base = v_base ** 2 / 100.0  # 100 MVA base
-        r_pu = self.safe_float(row.get('R (% on 100MVA)')) / 100.0
-        x_pu = self.safe_float(row.get('X (% on 100MVA)')) / 100.0
-        b_pu = self.safe_float(row.get('B (% on 100MVA)')) / 100.0
-
-        r_ohm_per_km = np.clip((r_pu * z_base) / total_len, 0.01, 0.1)
-        x_ohm_per_km = np.clip((x_pu * z_base) / total_len, 0.1, 1.0)
-        b_ohm_per_km = np.clip((b_pu * z_base) / total_len, 0.0, 0.0)
-
-        return r_ohm_per_km, x_ohm_per_km, b_ohm_per_km
+        params = self.calculate_branch_parameters(row.to_frame().T, v_base).iloc[0]
+        return params['r_ohm_per_km'], params['x_ohm_per_km'], params['b_ohm_per_km']
 
     def calculate_transformer_parameters(self, row: pd.Series, trafo_rating: float) -> Tuple[float, float]:
         """
@@ -394,9 +440,9 @@ class ETYSDataReader(BaseDataReader):
         Returns
             Tuple[float, float]: (vsc_percent, copper_loss_kw)
         """
-        r_pct = self.safe_float(row.get('R (% on 100MVA)')) * trafo_rating / 100
-        x_pct = self.safe_float(row.get('X (% on 100MVA)')) * trafo_rating / 100
-        vsc_percent = (r_pct ** 2 + x_pct ** 2) ** 0.5
-        copper_loss_kw = r_pct * trafo_rating * 10  # (r_pct / 100) * trafo_rating * 1000
+        row = row.copy()
+        row['Winter Rating (MVA)'] = trafo_rating
+        params = self.calculate_branch_parameters(row.to_frame().T, 0.0).iloc[0]
+        vsc_percent, copper_loss_kw = params['vsc_percent'], params['copper_loss_kw']
 
         return vsc_percent, copper_loss_kw
\ No newline at end of file
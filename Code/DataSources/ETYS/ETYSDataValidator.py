@@ -6,7 +6,7 @@ Part of the Jesse PowerFactory Modelling Framework.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any, Set
+from typing import Dict, Iterator, List, Tuple, Optional, Any, Set
 
 from Code.DataSources.BaseTemplates.BaseDataValidator import BaseDataValidator
 from Code.DataSources.ValidationResult import ValidationResult, ValidationMessage, ValidationSeverity
@@ -18,6 +18,23 @@ class ETYSDataValidator(BaseDataValidator):
     Validates ETYS-specific data structure, electrical parameters, and engineering constraints.
     """
 
+    # Sheets referencing nodes through 'Node 1' / 'Node 2', and the node column of single node equipment sheets
+    BRANCH_SHEETS = [
+        'OHL', 'Cable', 'Composite', 'Zero Length',
+        'Transformer', 'Quadbooster', 'Series Compensation', 'SSSC',
+        'Series Reactor', 'Series Capacitor', 'Intra_HVDC'
+    ]
+    EQUIPMENT_NODE_COLUMNS = {
+        'Demand Data': 'ETYS_Node',
+        'TEC Register': 'ETYS_Node',
+        'IC Register': 'ETYS_Node',
+        'Shunt Reactor': 'Node',
+        'Mechanically Switched Capacitor': 'Node',
+        'SVC': 'Node',
+        'STATCOM': 'Node',
+        'Sync Comp': 'Node'
+    }
+
     def __init__(self):
         self.required_node_columns = [
             'Node', 'Voltage (Derived)', 'latitude', 'longitude',
@@ -73,6 +90,66 @@ class ETYSDataValidator(BaseDataValidator):
             cleaned_data=self._clean_and_normalize_data(data_dict) if not has_critical_errors else None
         )
 
+    def validate_batches(self, batches: Iterator[Tuple[str, pd.DataFrame]],
+                         result: ValidationResult) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Validate a streamed dataset batch by batch, without holding it. Node batches must come first: node names
+        are kept across batches to find duplicates between batches and to check the references of later sheets.
+        Args:
+            batches (Iterator[Tuple[str, pd.DataFrame]]): (sheet name, batch) pairs from a streaming reader
+            result (ValidationResult): Collects the messages, is_valid turns False on the first error
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: The cleaned batches, each yielded once its messages are in result
+        """
+        valid_nodes = set()
+        sheet_rows = {}
+        for sheet_name, batch in batches:
+            batch_data = {sheet_name: batch}
+            messages = []
+            if sheet_name == 'Nodes':
+                if 'Nodes' not in sheet_rows:
+                    messages.extend(msg for msg in self._validate_excel_structure(batch_data)
+                                    if msg.severity != ValidationSeverity.INFO)
+                messages.extend(self._validate_data_quality(batch_data))
+                messages.extend(self._validate_business_rules(batch_data))
+                batch_nodes = batch['Node'].dropna().astype(str)
+                repeated = sorted(set(batch_nodes) & valid_nodes)
+                if repeated:
+                    messages.append(ValidationMessage(
+                        severity=ValidationSeverity.ERROR,
+                        category="Data Quality",
+                        message=f"Duplicate node names found: {repeated}",
+                        suggestion="Remove or rename duplicate nodes"
+                    ))
+                valid_nodes.update(batch_nodes)
+            else:
+                messages.extend(self._validate_electrical_parameters(batch_data))
+                if sheet_name in self.BRANCH_SHEETS:
+                    messages.extend(self._validate_node_references(batch, valid_nodes, sheet_name))
+                elif sheet_name in self.EQUIPMENT_NODE_COLUMNS:
+                    messages.extend(self._validate_equipment_node_references(
+                        batch, valid_nodes, sheet_name, self.EQUIPMENT_NODE_COLUMNS[sheet_name]))
+            sheet_rows[sheet_name] = sheet_rows.get(sheet_name, 0) + len(batch)
+            result.messages.extend(messages)
+            if any(msg.severity in [ValidationSeverity.ERROR, ValidationSeverity.CRITICAL] for msg in messages):
+                result.is_valid = False
+            yield sheet_name, self._clean_and_normalize_data(batch_data)[sheet_name]
+        # Whole dataset checks once every batch has passed
+        if 'Nodes' not in sheet_rows:
+            result.is_valid = False
+            result.messages.append(ValidationMessage(
+                severity=ValidationSeverity.CRITICAL,
+                category="Structure",
+                message="Required sheet 'Nodes' not found in the streamed data",
+                suggestion="Ensure the data source provides node data before other sheets"
+            ))
+        for sheet_name, rows in sheet_rows.items():
+            result.messages.append(ValidationMessage(
+                severity=ValidationSeverity.INFO,
+                category="Structure",
+                message=f"Sheet '{sheet_name}' streamed with {rows} rows"
+            ))
+
     def validate_excel_structure(self, data_dict: Dict[str, pd.DataFrame]) -> ValidationResult:
         """
         Validate Excel file structure and required sheets/columns.
@@ -361,26 +438,11 @@ class ETYSDataValidator(BaseDataValidator):
         # Get all valid node names
         valid_nodes = set(data_dict['Nodes']['Node'].dropna().astype(str))
         # Check node references in branch sheets
-        branch_sheets = [
-            'OHL', 'Cable', 'Composite', 'Zero Length',
-            'Transformer', 'Quadbooster', 'Series Compensation', 'SSSC',
-            'Series Reactor', 'Series Capacitor', 'Intra_HVDC'
-        ]
-        for sheet in branch_sheets:
+        for sheet in self.BRANCH_SHEETS:
             if sheet in data_dict:
                 messages.extend(self._validate_node_references(data_dict[sheet], valid_nodes, sheet))
         # Check node references in equipment sheets
-        equipment_sheets = {
-            'Demand Data': 'ETYS_Node',
-            'TEC Register': 'ETYS_Node',
-            'IC Register': 'ETYS_Node',
-            'Shunt Reactor': 'Node',
-            'Mechanically Switched Capacitor': 'Node',
-            'SVC': 'Node',
-            'STATCOM': 'Node',
-            'Sync Comp': 'Node'
-        }
-        for sheet, node_col in equipment_sheets.items():
+        for sheet, node_col in self.EQUIPMENT_NODE_COLUMNS.items():
             if sheet in data_dict:
                 messages.extend(self._validate_equipment_node_references(
                     data_dict[sheet], valid_nodes, sheet, node_col
@@ -0,0 +1,37 @@
+"""
+ArrowDataReader - Streams datasets stored as one Arrow IPC (Feather v2) file or stream per sheet
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+from typing import Iterator, List
+import pandas as pd
+
+from Code.LazyImports import lazyimport
+from Code.DataSources.Plugins.TabularDataReader import TabularDataReader
+
+pa = lazyimport('pyarrow')
+
+
+class ArrowDataReader(TabularDataReader):
+    """Reads memory mapped Arrow sheets record batch by record batch, larger batches are sliced to chunk_size"""
+
+    def iter_file_batches(self, path: str, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Stream an Arrow IPC file, or an IPC stream when the file has no footer
+        Args:
+            path (str): Arrow file of one sheet
+        Returns:
+            Iterator[pd.DataFrame]: Batches of at most chunk_size rows
+        """
+        with pa.memory_map(path, 'r') as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                record_batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                record_batches = pa.ipc.open_stream(source)
+            for record_batch in record_batches:
+                for start in range(0, record_batch.num_rows, self.chunk_size):
+                    yield record_batch.slice(start, self.chunk_size).to_pandas()
+
+    def get_supported_formats(self) -> List[str]:
+        return ['.arrow', '.feather', '.ipc']
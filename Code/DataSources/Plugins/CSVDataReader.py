@@ -0,0 +1,27 @@
+"""
+CSVDataReader - Streams datasets stored as one CSV file per sheet
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+from typing import Iterator, List
+import pandas as pd
+
+from Code.DataSources.Plugins.TabularDataReader import TabularDataReader
+
+
+class CSVDataReader(TabularDataReader):
+    """Reads CSV sheets through the chunked pandas parser"""
+
+    def iter_file_batches(self, path: str, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV file
+        Args:
+            path (str): CSV file of one sheet
+            **kwargs: Arguments passed to pandas.read_csv (e.g. sep, encoding)
+        Returns:
+            Iterator[pd.DataFrame]: Batches of at most chunk_size rows
+        """
+        with pd.read_csv(path, chunksize=self.chunk_size, **kwargs) as chunks:
+            yield from chunks
+
+    def get_supported_formats(self) -> List[str]:
+        return ['.csv', '.txt']
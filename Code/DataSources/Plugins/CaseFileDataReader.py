@@ -0,0 +1,167 @@
+"""
+CaseFileDataReader - Base class of the load flow case file plugins (PSS/E RAW, MATPOWER)
+Case files are parsed line by line into records; consecutive records of one kind are converted in batches to the
+ETYS sheets (Nodes, OHL, Transformer, Demand Data, TEC Register, shunt sheets) so they standardise, validate and
+ingest like an ETYS workbook. Impedances on the case's system base become % on 100 MVA.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+import os
+from abc import abstractmethod
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from Code.DataSources.BaseTemplates.StreamingDataReader import StreamingDataReader
+
+
+class CaseFileDataReader(StreamingDataReader):
+    """Streams a case file as ETYS sheets"""
+
+    # Base the ETYS impedance columns are given on (MVA)
+    ETYS_BASE_MVA = 100.0
+
+    def __init__(self, chunk_size: int = None):
+        super().__init__(chunk_size)
+        # System base of the case being read, set by iter_records from the file header
+        self.base_mva = self.ETYS_BASE_MVA
+        # Records numbered so far per key, e.g. circuits per bus pair, over the whole stream
+        self._record_counts = {}
+
+    def iter_batches(self, file_path: str = None, **kwargs) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream a case file as ETYS sheet batches, in the order of its sections
+        Args:
+            file_path (str): Case file
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: (sheet name, batch) pairs
+        """
+        if file_path is None or not os.path.isfile(file_path):
+            raise FileNotFoundError(f"Case file not found: {file_path}")
+        self.base_mva = self.ETYS_BASE_MVA
+        self._record_counts = {}
+        record_type, records = None, []
+        for next_type, record in self.iter_records(file_path):
+            if records and (next_type != record_type or len(records) >= self.chunk_size):
+                yield from self._iter_converted(record_type, records)
+                records = []
+            record_type = next_type
+            records.append(record)
+        if records:
+            yield from self._iter_converted(record_type, records)
+
+    def _iter_converted(self, record_type: str, records: List[Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for sheet_name, batch in self.convert_records(record_type, records):
+            if not batch.empty:
+                yield sheet_name, batch
+
+    @abstractmethod
+    def iter_records(self, file_path: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse a case file into (record type, record) pairs, records of one section being consecutive
+        Args:
+            file_path (str): Case file
+        Returns:
+            Iterator[Tuple[str, Any]]: Record type and its parsed fields
+        """
+        pass
+
+    @abstractmethod
+    def convert_records(self, record_type: str, records: List[Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Convert a batch of records of one type to ETYS sheet batches
+        Args:
+            record_type (str): Type of every record of the batch
+            records (List[Any]): Parsed records
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: (sheet name, batch) pairs
+        """
+        pass
+
+    # =====================================================================
+    # ETYS Sheet Builders
+    # =====================================================================
+
+    def to_etys_percent(self, values_pu, base_mva=None) -> np.ndarray:
+        """Per unit values on base_mva (by default the system base) as % on 100 MVA"""
+        base_mva = self.base_mva if base_mva is None else np.asarray(base_mva, dtype=float)
+        return np.asarray(values_pu, dtype=float) * 100.0 * self.ETYS_BASE_MVA / base_mva
+
+    def make_nodes(self, bus_ids, kv, names=None) -> pd.DataFrame:
+        """Nodes sheet batch, the ETYS columns a case file has no data for are left empty"""
+        nodes = [self.format_bus_id(bus_id) for bus_id in bus_ids]
+        return pd.DataFrame({
+            'Node': nodes,
+            'Voltage (Derived)': np.asarray(kv, dtype=float),
+            'latitude': np.nan, 'longitude': np.nan,
+            'Site Name': list(names) if names is not None else nodes,
+            'Relevant TO': None, 'Type': None, 'Indoor/Outdoor': None,
+        })
+
+    def make_branches(self, from_buses, to_buses, circuits, r_pu, x_pu, b_pu, ratings,
+                      lengths=None, base_mva=None) -> pd.DataFrame:
+        """OHL or Transformer sheet batch, impedances given per unit on base_mva (by default the system base)"""
+        nodes1 = [self.format_bus_id(bus_id) for bus_id in from_buses]
+        nodes2 = [self.format_bus_id(bus_id) for bus_id in to_buses]
+        ratings = np.asarray(ratings, dtype=float)
+        return pd.DataFrame({
+            'Node 1': nodes1, 'Node 2': nodes2,
+            'Name': [f"{node1}_{node2}_{circuit}" for node1, node2, circuit in zip(nodes1, nodes2, circuits)],
+            'R (% on 100MVA)': self.to_etys_percent(r_pu, base_mva),
+            'X (% on 100MVA)': self.to_etys_percent(x_pu, base_mva),
+            'B (% on 100MVA)': self.to_etys_percent(b_pu, base_mva),
+            # A case file has one set of normal ratings, used for every season
+            'Winter Rating (MVA)': ratings, 'Summer Rating (MVA)': ratings,
+            'OHL Length (km)': np.zeros(len(nodes1)) if lengths is None else np.asarray(lengths, dtype=float),
+        })
+
+    def make_loads(self, bus_ids, load_ids, mw, mvar) -> pd.DataFrame:
+        """Demand Data sheet batch"""
+        nodes = [self.format_bus_id(bus_id) for bus_id in bus_ids]
+        return pd.DataFrame({
+            'ETYS_Node': nodes,
+            'Name': [f"{node}_{load_id}" for node, load_id in zip(nodes, load_ids)],
+            'MW': np.asarray(mw, dtype=float), 'MVar': np.asarray(mvar, dtype=float),
+        })
+
+    def make_generators(self, bus_ids, gen_ids, mw, plant_type='Unknown') -> pd.DataFrame:
+        """TEC Register sheet batch; the ETYS loader dispatches generators at MW_Capacity, so the scheduled
+        output of the case is given there"""
+        nodes = [self.format_bus_id(bus_id) for bus_id in bus_ids]
+        return pd.DataFrame({
+            'ETYS_Node': nodes,
+            'Plant Name': [f"{node}_{gen_id}" for node, gen_id in zip(nodes, gen_ids)],
+            'MW_Capacity': np.asarray(mw, dtype=float),
+            'Plant Type': plant_type,
+        })
+
+    def make_shunts(self, bus_ids, shunt_ids, b_mvar) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Shunt Reactor and Mechanically Switched Capacitor batches from the MVAr injected at 1 pu voltage; the ETYS
+        loader holds shunts as loads, so MVar is the reactive power consumed"""
+        b_mvar = np.asarray(b_mvar, dtype=float)
+        shunts = pd.DataFrame({
+            'Node': [self.format_bus_id(bus_id) for bus_id in bus_ids],
+            'Name': [f"{self.format_bus_id(bus_id)}_{shunt_id}" for bus_id, shunt_id in zip(bus_ids, shunt_ids)],
+            'MVar': -b_mvar,
+        })
+        yield 'Shunt Reactor', shunts[b_mvar < 0].reset_index(drop=True)
+        yield 'Mechanically Switched Capacitor', shunts[b_mvar > 0].reset_index(drop=True)
+
+    def number_records(self, keys) -> List[str]:
+        """Number records sharing a key 1, 2, ... in stream order, e.g. parallel circuits of a bus pair"""
+        numbers = []
+        for key in keys:
+            self._record_counts[key] = self._record_counts.get(key, 0) + 1
+            numbers.append(str(self._record_counts[key]))
+        return numbers
+
+    @staticmethod
+    def format_bus_id(bus_id) -> str:
+        """Node name of a bus number, integral floats without their decimals"""
+        if isinstance(bus_id, float) and bus_id.is_integer():
+            bus_id = int(bus_id)
+        return str(bus_id).strip()
+
+    def get_data_source_info(self) -> Dict[str, Any]:
+        info = super().get_data_source_info()
+        info['base_mva'] = self.base_mva
+        return info
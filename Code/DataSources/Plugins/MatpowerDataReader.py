@@ -0,0 +1,93 @@
+"""
+MatpowerDataReader - Streams MATPOWER case files (.m) as ETYS sheets
+The mpc.bus, mpc.gen and mpc.branch matrices are read row by row; bus demand and shunts become Demand Data and
+shunt sheets, branches with an off-nominal ratio or phase shift become transformers.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+import re
+from typing import Any, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from Code.DataSources.Plugins.CaseFileDataReader import CaseFileDataReader
+
+
+class MatpowerDataReader(CaseFileDataReader):
+    """Reads MATPOWER version 2 case files"""
+
+    # Matrices converted, other mpc fields (gencost, bus_name, ...) are skipped
+    MATRICES = ('bus', 'gen', 'branch')
+    # Column positions of the MATPOWER case format
+    BUS_I, BUS_TYPE, PD, QD, GS, BS, BASE_KV = 0, 1, 2, 3, 4, 5, 9
+    GEN_BUS, PG, GEN_STATUS = 0, 1, 7
+    F_BUS, T_BUS, BR_R, BR_X, BR_B, RATE_A, TAP, SHIFT, BR_STATUS = 0, 1, 2, 3, 4, 5, 8, 9, 10
+    ISOLATED_BUS = 4
+
+    _FIELD_START = re.compile(r'^\s*mpc\.(\w+)\s*=\s*(.*)$')
+
+    def iter_records(self, file_path: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse the bus, gen and branch matrices of a MATPOWER case, one numeric row per record
+        Args:
+            file_path (str): MATPOWER .m case file
+        Returns:
+            Iterator[Tuple[str, Any]]: ('bus' | 'gen' | 'branch', row values)
+        """
+        matrix = None
+        with open(file_path, 'r') as case_file:
+            for line in case_file:
+                line = line.split('%', 1)[0].strip()
+                if not line:
+                    continue
+                if matrix is None:
+                    match = self._FIELD_START.match(line)
+                    if match is None:
+                        continue
+                    name, value = match.groups()
+                    if name == 'baseMVA':
+                        self.base_mva = float(value.rstrip(';').strip())
+                        continue
+                    if not value.startswith(('[', '{')):
+                        continue
+                    matrix = name if name in self.MATRICES else ''
+                    line = value[1:]
+                end = re.search(r'[\]}]', line)
+                for row in (line[:end.start()] if end else line).split(';'):
+                    values = row.replace(',', ' ').split()
+                    if values and matrix:
+                        yield matrix, [float(value) for value in values]
+                if end:
+                    matrix = None
+
+    def convert_records(self, record_type: str, records: List[Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        width = max(len(row) for row in records)
+        rows = np.array([row + [0.0] * (width - len(row)) for row in records], dtype=float)
+        if record_type == 'bus':
+            yield 'Nodes', self.make_nodes(rows[:, self.BUS_I].tolist(), rows[:, self.BASE_KV])
+            connected = rows[:, self.BUS_TYPE] != self.ISOLATED_BUS
+            demand = connected & ((rows[:, self.PD] != 0) | (rows[:, self.QD] != 0))
+            yield 'Demand Data', self.make_loads(rows[demand, self.BUS_I].tolist(), ['1'] * int(demand.sum()),
+                                                 rows[demand, self.PD], rows[demand, self.QD])
+            shunt = connected & (rows[:, self.BS] != 0)
+            yield from self.make_shunts(rows[shunt, self.BUS_I].tolist(), ['SH'] * int(shunt.sum()),
+                                        rows[shunt, self.BS])
+        elif record_type == 'gen':
+            rows = rows[rows[:, self.GEN_STATUS] > 0]
+            # Generators of a bus are numbered in file order
+            buses = rows[:, self.GEN_BUS].tolist()
+            yield 'TEC Register', self.make_generators(buses, self.number_records(('gen', bus) for bus in buses),
+                                                       rows[:, self.PG])
+        elif record_type == 'branch':
+            if width > self.BR_STATUS:
+                rows = rows[rows[:, self.BR_STATUS] > 0]
+            transformer = (rows[:, self.TAP] != 0) | (rows[:, self.SHIFT] != 0)
+            for sheet_name, sheet_rows in (('OHL', rows[~transformer]), ('Transformer', rows[transformer])):
+                from_buses, to_buses = sheet_rows[:, self.F_BUS].tolist(), sheet_rows[:, self.T_BUS].tolist()
+                circuits = self.number_records(('branch', bus1, bus2) for bus1, bus2 in zip(from_buses, to_buses))
+                yield sheet_name, self.make_branches(
+                    from_buses, to_buses, circuits,
+                    sheet_rows[:, self.BR_R], sheet_rows[:, self.BR_X], sheet_rows[:, self.BR_B],
+                    sheet_rows[:, self.RATE_A])
+
+    def get_supported_formats(self) -> List[str]:
+        return ['.m']
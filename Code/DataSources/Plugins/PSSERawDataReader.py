@@ -0,0 +1,188 @@
+"""
+PSSERawDataReader - Streams PSS/E RAW case files (revisions 33 and 34) as ETYS sheets
+Buses, loads, fixed shunts, generators, branches and transformers are read; the sections after the transformer
+data are not needed by the DataModel and the file is closed once they are reached. Out of service equipment is
+left out, three winding transformers become the three branches of their delta equivalent.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+import csv
+import shlex
+from typing import Any, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from Code.DataSources.Plugins.CaseFileDataReader import CaseFileDataReader
+
+
+class PSSERawDataReader(CaseFileDataReader):
+    """Reads PSS/E RAW revision 33 and 34 case files"""
+
+    SUPPORTED_REVISIONS = (33, 34)
+    # Data sections in file order up to the transformers, each ended by a record starting with 0
+    SECTIONS = {
+        33: ('bus', 'load', 'fixed_shunt', 'generator', 'branch', 'transformer'),
+        34: ('bus', 'load', 'fixed_shunt', 'generator', 'branch', 'switching_device', 'transformer'),
+    }
+    # Field positions per revision: branch R, X, B, first rating, status and length; generator PG and status
+    BRANCH_FIELDS = {33: (3, 4, 5, 6, 13, 15), 34: (3, 4, 5, 7, 23, 25)}
+    GENERATOR_FIELDS = {33: (2, 14), 34: (2, 15)}
+
+    def __init__(self, chunk_size: int = None):
+        super().__init__(chunk_size)
+        self.revision = 33
+
+    # =====================================================================
+    # Record Parsing
+    # =====================================================================
+
+    def iter_records(self, file_path: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Parse the equipment sections of a RAW file, one list of fields per record (a list of lines of fields for
+        transformers)
+        Args:
+            file_path (str): PSS/E RAW case file
+        Returns:
+            Iterator[Tuple[str, Any]]: (section name, record fields)
+        Raises:
+            ValueError: If the RAW revision is not supported
+        """
+        with open(file_path, 'r') as case_file:
+            header = self.split_record(case_file.readline())
+            self.base_mva = float(header[1]) if len(header) > 1 else self.ETYS_BASE_MVA
+            self.revision = int(float(header[2])) if len(header) > 2 and header[2] else 33
+            if self.revision not in self.SUPPORTED_REVISIONS:
+                raise ValueError(f"PSS/E RAW revision {self.revision} is not supported, "
+                                 f"supported revisions are {self.SUPPORTED_REVISIONS}")
+            # Two case title lines
+            case_file.readline()
+            case_file.readline()
+            for section in self.SECTIONS[self.revision]:
+                while True:
+                    line = case_file.readline()
+                    if not line:
+                        return
+                    fields = self.split_record(line)
+                    if not fields:
+                        continue
+                    if fields[0] == 'Q':
+                        return
+                    if fields[0] == '0':
+                        break
+                    if section == 'transformer':
+                        # Four lines for two winding transformers, five for three winding ones
+                        lines = [fields] + [self.split_record(case_file.readline())
+                                            for _ in range(3 if self._to_int(fields[2]) == 0 else 4)]
+                        yield section, lines
+                    elif section != 'switching_device':
+                        yield section, fields
+
+    @staticmethod
+    def split_record(line: str) -> List[str]:
+        """Fields of a RAW record, quotes removed and the '/' comment cut off"""
+        in_quotes = False
+        for position, char in enumerate(line):
+            if char == "'":
+                in_quotes = not in_quotes
+            elif char == '/' and not in_quotes:
+                line = line[:position]
+                break
+        line = line.strip()
+        if not line:
+            return []
+        if ',' in line:
+            fields = next(csv.reader([line], quotechar="'", skipinitialspace=True))
+        else:
+            fields = shlex.split(line)
+        return [field.strip() for field in fields]
+
+    @staticmethod
+    def _to_int(value) -> int:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _column(records: List[List[str]], position: int, default: float = 0.0) -> np.ndarray:
+        """Numeric field of every record, default where missing or blank"""
+        return pd.to_numeric(pd.Series([record[position] if position < len(record) else None for record in records]),
+                             errors='coerce').fillna(default).to_numpy(dtype=float)
+
+    # =====================================================================
+    # Record Conversion
+    # =====================================================================
+
+    def convert_records(self, record_type: str, records: List[Any]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        if record_type == 'bus':
+            yield 'Nodes', self.make_nodes([abs(self._to_int(record[0])) for record in records],
+                                           self._column(records, 2), [record[1] for record in records])
+        elif record_type == 'load':
+            records = [record for record in records if self._to_int(record[2]) == 1]
+            # Constant current and admittance parts taken at 1 pu voltage, YQ is positive for capacitive load
+            mw = self._column(records, 5) + self._column(records, 7) + self._column(records, 9)
+            mvar = self._column(records, 6) + self._column(records, 8) - self._column(records, 10)
+            yield 'Demand Data', self.make_loads([self._to_int(record[0]) for record in records],
+                                                 [record[1] for record in records], mw, mvar)
+        elif record_type == 'fixed_shunt':
+            records = [record for record in records if self._to_int(record[2]) == 1]
+            yield from self.make_shunts([self._to_int(record[0]) for record in records],
+                                        [record[1] for record in records], self._column(records, 4))
+        elif record_type == 'generator':
+            pg, status = self.GENERATOR_FIELDS[self.revision]
+            records = [record for record in records if self._to_int(record[status]) > 0]
+            yield 'TEC Register', self.make_generators([self._to_int(record[0]) for record in records],
+                                                       [record[1] for record in records], self._column(records, pg))
+        elif record_type == 'branch':
+            r, x, b, rating, status, length = self.BRANCH_FIELDS[self.revision]
+            records = [record for record in records if self._to_int(record[status]) > 0]
+            yield 'OHL', self.make_branches(
+                [abs(self._to_int(record[0])) for record in records],
+                [abs(self._to_int(record[1])) for record in records], [record[2] for record in records],
+                self._column(records, r), self._column(records, x), self._column(records, b),
+                self._column(records, rating), self._column(records, length))
+        elif record_type == 'transformer':
+            yield 'Transformer', self.convert_transformers(records)
+
+    def convert_transformers(self, records: List[List[List[str]]]) -> pd.DataFrame:
+        """
+        Two winding transformers as one branch, three winding ones as the three branches of their delta
+        Args:
+            records (List[List[List[str]]]): Lines of fields of every transformer
+        Returns:
+            pd.DataFrame: Transformer sheet batch with impedances on 100 MVA
+        """
+        windings = []
+        for lines in records:
+            first, impedances = lines[0], lines[1]
+            if self._to_int(first[11]) == 0:
+                continue
+            buses = [abs(self._to_int(first[index])) for index in range(3)]
+            # Winding pairs 1-2, 2-3 and 3-1 with their impedance fields and the winding line giving the rating
+            pairs = [(0, 1, 0, 2)] if buses[2] == 0 else [(0, 1, 0, 2), (1, 2, 3, 3), (2, 0, 6, 4)]
+            for from_winding, to_winding, field, rating_line in pairs:
+                circuit = first[3] if len(pairs) == 1 else f"{first[3]}-{from_winding + 1}{to_winding + 1}"
+                windings.append((buses[from_winding], buses[to_winding], circuit,
+                                 self._to_int(first[5]) or 1, self._field(impedances, field),
+                                 self._field(impedances, field + 1), self._field(impedances, field + 2),
+                                 self._field(lines[rating_line], 3)))
+        if not windings:
+            return pd.DataFrame()
+        from_buses, to_buses, circuits, cz, r, x, winding_mva, ratings = (np.array(column) for column in zip(*windings))
+        cz, r, x = cz.astype(int), r.astype(float), x.astype(float)
+        winding_mva = np.where(winding_mva.astype(float) > 0, winding_mva.astype(float), self.base_mva)
+        # CZ 1: per unit on the system base; 2: per unit on the winding base; 3: load loss (W) and |Z| (pu) on it
+        r = np.where(cz == 3, r / (winding_mva * 1e6), r)
+        x = np.where(cz == 3, np.sqrt(np.maximum(x ** 2 - r ** 2, 0.0)), x)
+        base = np.where(cz == 1, self.base_mva, winding_mva)
+        return self.make_branches(from_buses.tolist(), to_buses.tolist(), circuits.tolist(), r, x,
+                                  np.zeros(len(r)), ratings.astype(float), base_mva=base)
+
+    @staticmethod
+    def _field(fields: List[str], position: int, default: float = 0.0) -> float:
+        try:
+            return float(fields[position])
+        except (IndexError, TypeError, ValueError):
+            return default
+
+    def get_supported_formats(self) -> List[str]:
+        return ['.raw']
@@ -0,0 +1,31 @@
+"""
+ParquetDataReader - Streams datasets stored as one Parquet file per sheet
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+from typing import Iterator, List
+import pandas as pd
+
+from Code.LazyImports import lazyimport
+from Code.DataSources.Plugins.TabularDataReader import TabularDataReader
+
+pq = lazyimport('pyarrow.parquet')
+
+
+class ParquetDataReader(TabularDataReader):
+    """Reads Parquet sheets record batch by record batch, only the row groups being read are held"""
+
+    def iter_file_batches(self, path: str, columns: List[str] = None, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Stream a Parquet file
+        Args:
+            path (str): Parquet file of one sheet
+            columns (List[str]): Columns to read, by default all of them
+        Returns:
+            Iterator[pd.DataFrame]: Batches of at most chunk_size rows
+        """
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns):
+            yield record_batch.to_pandas()
+
+    def get_supported_formats(self) -> List[str]:
+        return ['.parquet', '.pq']
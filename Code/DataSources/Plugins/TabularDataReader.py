@@ -0,0 +1,85 @@
+"""
+TabularDataReader - Base class of the file format plugins holding one sheet per file
+A dataset is a directory of files named after their sheets (Nodes.csv, OHL.csv, ...), a {sheet name: path} dict
+or a single file with its sheet name. Each file is streamed in batches by the format plugin.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+import os
+from abc import abstractmethod
+from typing import Dict, Iterator, List, Tuple, Union
+import pandas as pd
+
+from Code.DataSources.BaseTemplates.StreamingDataReader import StreamingDataReader
+
+
+class TabularDataReader(StreamingDataReader):
+    """Streams datasets stored as one file per sheet"""
+
+    # Suffixes of compressed sheet files (Nodes.csv.gz), left to the format plugin to decompress
+    COMPRESSION_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zst')
+
+    def iter_batches(self, file_path: Union[str, Dict[str, str]] = None, sheet_name: str = None,
+                     **kwargs) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream every sheet of a dataset in SHEET_ORDER
+        Args:
+            file_path (str or Dict[str, str]): Directory of sheet files, {sheet name: path} or a single file
+            sheet_name (str): Sheet of a single file, by default the file name without its extension
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: (sheet name, batch) pairs
+        """
+        sheet_files = self.get_sheet_files(file_path, sheet_name)
+        for sheet in self.order_sheets(list(sheet_files)):
+            for batch in self.iter_file_batches(sheet_files[sheet], **kwargs):
+                if not batch.empty:
+                    yield sheet, batch
+
+    def get_sheet_files(self, file_path: Union[str, Dict[str, str]], sheet_name: str = None) -> Dict[str, str]:
+        """
+        Resolve the files of a dataset
+        Args:
+            file_path (str or Dict[str, str]): Directory of sheet files, {sheet name: path} or a single file
+            sheet_name (str): Sheet of a single file
+        Returns:
+            Dict[str, str]: Path of every sheet
+        Raises:
+            FileNotFoundError: If the path does not exist or a directory holds no file of this format
+        """
+        if file_path is None:
+            raise ValueError(f"{self.__class__.__name__} needs a file_path")
+        if isinstance(file_path, dict):
+            return {str(sheet): str(path) for sheet, path in file_path.items()}
+        if os.path.isdir(file_path):
+            sheet_files = {}
+            for file_name in sorted(os.listdir(file_path)):
+                stem, extension = self.split_file_name(file_name)
+                if extension.lower() in self.get_supported_formats():
+                    sheet_files[stem] = os.path.join(file_path, file_name)
+            if not sheet_files:
+                raise FileNotFoundError(f"No {'/'.join(self.get_supported_formats())} files in {file_path}")
+            return sheet_files
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"Data file not found: {file_path}")
+        return {sheet_name or self.split_file_name(os.path.basename(file_path))[0]: file_path}
+
+    def split_file_name(self, file_name: str) -> Tuple[str, str]:
+        """Sheet name and format extension of a sheet file, a compression suffix skipped"""
+        stem, extension = os.path.splitext(file_name)
+        if extension.lower() in self.COMPRESSION_EXTENSIONS:
+            stem, extension = os.path.splitext(stem)
+        return stem, extension
+
+    @abstractmethod
+    def iter_file_batches(self, path: str, **kwargs) -> Iterator[pd.DataFrame]:
+        """
+        Stream one file in batches of at most chunk_size rows
+        Args:
+            path (str): File of one sheet
+        Returns:
+            Iterator[pd.DataFrame]: Batches of the sheet
+        """
+        pass
+
+    @abstractmethod
+    def get_supported_formats(self) -> List[str]:
+        pass
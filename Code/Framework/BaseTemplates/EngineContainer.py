@@ -24,15 +24,15 @@ class EngineContainer:
         self.m_oNetworkFaultAnalysisRunInstance = None
 
         #__________________________ENGINE INITIALIZATION________________________
-    def isipsa():
+    def isipsa(self):
         """initialises IPSA to false such that when inherited, the engine can set it to true if it is an IPSA engine"""
         return False
 
-    def ispowerfactory():
+    def ispowerfactory(self):
         """initialises PowerFactory to false such that when inherited, the engine can set it to true if it is a PowerFactory engine"""
         return False
 
-    def isopendss():
+    def isopendss(self):
         """initialises OpenDSS to false such that when inherited, the engine can set it to true if it is an OpenDSS engine"""
         return False
 
@@ -163,6 +163,11 @@ class EngineContainer:
             return self.m_oNetworkToDataModelInterface.setnetworkbusbarvalues(dmBusbar)
         return bOK
 
+    def getnetworkstate(self, oDataModel):
+        """Returns an identifier of the engine network state when the engine network is known to have been built from the
+        given DataModel as it stands, otherwise None. Study results are only cached while a state is returned."""
+        return None
+
     #__________________________ANALYSIS RESULTS METHODS________________________
     def getloadflowresults(self):
         """Retrieves load flow results from the engine"""
@@ -46,10 +46,20 @@ class EngineDataModelInterfaceContainer:
     
     def copybranchratings(self, branch):
         for sNewRating, sOldRating in self.RatingstoCopy.items():
-            try:
-                branch.__dict__[sNewRating] = branch.__dict__[sOldRating]
-            except KeyError:
+            if not hasattr(branch, sOldRating):
                 self.m_oMsg.AddError(f"Rating {sOldRating} not found in branch {branch.BranchID}.")
+                continue
+            setattr(branch, sNewRating, getattr(branch, sOldRating))
+
+    def copyallbranchratings(self):
+        """Copies the ratings of RatingstoCopy for every branch at once through the rating sets of the DataModel"""
+        oRatings = gbl.DataModelManager.getratingengine(bRefresh=True)
+        for sNewRating, sOldRating in self.RatingstoCopy.items():
+            if sOldRating not in oRatings.getratingsets():
+                self.m_oMsg.AddError(f"Rating {sOldRating} not found in the branch rating sets.")
+                continue
+            oRatings.copyratingset(sNewRating, sOldRating, bWriteBack=True)
+        return True
     
     
     #__________________COMPONENT-SPECIFIC METHOD TEMPLATES____________________________________#
@@ -0,0 +1,47 @@
+from Code import GlobalEngineRegistry as gbl
+
+
+class EngineHarmonicsContainer:
+    # Harmonic orders analysed when none are given
+    DEFAULT_ORDERS = tuple(range(2, 51))
+
+    def __init__(self):
+        self.msg = gbl.Msg
+        self.m_dictLastRunSettings = {}
+
+    #__________________________ENGINE HARMONIC METHODS________________________
+    def runharmonicanalysis(self, listOrders=None):
+        """This method runs the harmonic load flow for the given harmonic orders."""
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def getandupdateharmonicresults(self):
+        """This method retrieves the harmonic results and updates the busbars (THD, VoltSum, HarmVolts, Distortions)."""
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def getharmonicresults(self, oBusbar):
+        """This method updates the harmonic results of one busbar, as its HarmonicEngineModelUpdater."""
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def getallharmonicresults(self):
+        """This method retrieves all results of the harmonic analysis."""
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    #__________________________CURRENT SOURCE SPECTRA________________________
+    @staticmethod
+    def setharmonicspectrum(oComponent, dictSpectrum):
+        """This method attaches a harmonic current source spectrum to a load or generator.
+
+        dictSpectrum maps the harmonic order to the current in percent of the fundamental current of the component,
+        or to (percent, angle in degrees). None removes the spectrum."""
+        if dictSpectrum is None:
+            oComponent.HarmonicSpectrum = None
+            return True
+        dictNormalised = {}
+        for xOrder, xValue in dictSpectrum.items():
+            nOrder = int(xOrder)
+            if nOrder < 2:
+                raise ValueError(f"Harmonic order {xOrder} is not above the fundamental")
+            fPercent, fAngle = xValue if isinstance(xValue, (tuple, list)) else (xValue, 0.0)
+            dictNormalised[nOrder] = (float(fPercent), float(fAngle))
+        oComponent.HarmonicSpectrum = dictNormalised
+        return True
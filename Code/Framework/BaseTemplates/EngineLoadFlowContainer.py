@@ -1,8 +1,13 @@
 from Code import GlobalEngineRegistry as gbl
 
 class EngineLoadFlowContainer:
+    # Containers that build their network from the DataModel set this, so their cached results are keyed on the
+    # DataModel alone; engine backed containers are only cached while the engine reports its network state
+    SOLVES_DATAMODEL = False
+
     def __init__(self):
-        pass
+        self.m_dictLastRunSettings = {}
+        self.m_bLastRunFromCache = False
 
     #__________________________ENGINE LOAD FLOW METHODS________________________
     def runloadflow(self):
@@ -23,4 +28,51 @@ class EngineLoadFlowContainer:
         raise NotImplementedError("This method should be implemented by subclasses.")
     def getallloadflowresults(self):
         """This method retrieves the results of the load flow analysis."""
-        raise NotImplementedError("This method should be implemented by subclasses.")
\ No newline at end of file
+        raise NotImplementedError("This method should be implemented by subclasses.")
+    def runloadflowtimestep(self, bWarmStart=False, **kwargs):
+        """This method runs the load flow for one step of a time series and retrieves the results. bWarmStart tells the
+        engine that only injections changed since the previous step; engines that can start from the previous solution
+        or reuse a factorisation override this, by default a normal load flow is run."""
+        bOK = self.runloadflow(**kwargs)
+        if bOK:
+            bOK = self.getallloadflowresults()
+        return bOK
+
+    #__________________________RESULT SNAPSHOT METHODS________________________
+    def snapshotloadflowresults(self, dictSettings=None, strRunId=None, strStudyType="loadflow", dictMetadata=None):
+        """This method snapshots the load flow results held on the DataModel into the result store and returns the run id."""
+        if gbl.ResultStore is None:
+            gbl.Msg.add_warning("Result store not initialised, load flow results were not snapshotted.")
+            return None
+        if dictSettings is None:
+            dictSettings = self.m_dictLastRunSettings
+        try:
+            return gbl.ResultStore.snapshotstudy(strStudyType, dictSettings, strRunId, dictMetadata)
+        except Exception as e:
+            gbl.Msg.add_error(f"Failed to snapshot load flow results: {e}")
+            return None
+
+    #__________________________CACHED LOAD FLOW METHODS________________________
+    def runloadflowcached(self, **kwargs):
+        """This method runs the load flow and retrieves all results, reusing cached results when the network and settings are unchanged."""
+        self.m_bLastRunFromCache = False
+        strNetworkState = None
+        if gbl.ResultCache is not None:
+            strNetworkState = gbl.ResultCache.getnetworkstate(self.SOLVES_DATAMODEL)
+        if strNetworkState is None:
+            bOK = self.runloadflow(**kwargs)
+            if bOK:
+                bOK = self.getallloadflowresults()
+            return bOK
+        strKey = gbl.ResultCache.getstudykey("loadflow", kwargs, network_state=strNetworkState)
+        if gbl.ResultCache.restore(strKey, "loadflow"):
+            self.m_dictLastRunSettings = dict(kwargs)
+            self.m_bLastRunFromCache = True
+            gbl.Msg.add_information("Load flow results restored from cache.")
+            return True
+        bOK = self.runloadflow(**kwargs)
+        if bOK:
+            bOK = self.getallloadflowresults()
+        if bOK:
+            gbl.ResultCache.storeresults(strKey, "loadflow", kwargs)
+        return bOK
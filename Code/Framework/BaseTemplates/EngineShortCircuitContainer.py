@@ -1,9 +1,27 @@
+import numpy as np
+
 from Code import GlobalEngineRegistry as gbl
 
 
 class EngineShortCircuitContainer:
+    # Columns of the generator contribution table, written to the generators as shortcircuit_<column>
+    GEN_CONTRIBUTION_COLUMNS = ("skss", "ikss", "ikss_angle", "ip")
+    # Fault types of a fault sweep: three phase, single phase to earth and phase to phase
+    FAULT_TYPES = ("3ph", "slg", "ll")
+    # Columns returned by runfaults. Contribution currents flow from BusID1 to BusID2 of the branch (end 0), or towards
+    # the fault from BusID1 (end 1) and BusID2 (end 2) on the two sections of a faulted branch
+    FAULT_COLUMNS = ("location", "fault_type", "ik_ka", "ik_angle", "sk_mva", "ip_ka", "r_ohm", "x_ohm")
+    CONTRIBUTION_COLUMNS = ("location", "fault_type", "branch", "end", "ik_ka", "ik_angle")
+    # Containers that build their network from the DataModel set this, so their cached results are keyed on the
+    # DataModel alone; engine backed containers are only cached while the engine reports its network state
+    SOLVES_DATAMODEL = False
+
     def __init__(self):
         self.msg = gbl.Msg
+        self.m_dictLastRunSettings = {}
+        self.m_bLastRunFromCache = False
+        # Generator contributions, one array per column aligned on "gen_index" (the Gen_TAB index)
+        self.m_dictGenContributions = {}
 
     #__________________________ENGINE SHORT CIRCUIT METHODS________________________
     def runshortcircuitanalysisforallbusbars(self):
@@ -19,4 +37,68 @@ class EngineShortCircuitContainer:
         raise NotImplementedError("This method should be implemented by subclasses.")
     def getgenshortcircuitcontributions(self):
         """This method retrieves the generator contributions to short circuit currents."""
-        raise NotImplementedError("This method should be implemented by subclasses.")
\ No newline at end of file
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def preparefaults(self):
+        """This method prepares the engine for a series of runfaults calls on the current network."""
+        return True
+
+    def runfaults(self, dictLocations, listFaultTypes=None):
+        """This method runs individual faults at the given locations and returns the fault levels and branch contributions.
+
+        dictLocations holds one entry per location: "bus" (Busbar_TAB index), "branch" (Branch_TAB index, -1 for a busbar
+        fault), "fraction" (position of a branch fault from BusID1), and the branches whose contributions are recorded as a
+        CSR list, "contribution_ptr" and "contribution_branch". Returns {"faults": columns, "contributions": columns}, one
+        fault row per location and fault type, or None if the faults could not be run."""
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def setgencontributiontable(self, arrGenIndex, dictColumns):
+        """This method stores the generator contributions as an array table and writes them onto the generators."""
+        arrGenIndex = np.asarray(arrGenIndex, dtype=np.int64)
+        self.m_dictGenContributions = {"gen_index": arrGenIndex}
+        for strColumn in self.GEN_CONTRIBUTION_COLUMNS:
+            self.m_dictGenContributions[strColumn] = np.asarray(dictColumns[strColumn], dtype=np.float64)
+        oGenTab = gbl.DataModelManager.Gen_TAB
+        listColumns = [(f"shortcircuit_{strColumn}", self.m_dictGenContributions[strColumn].tolist())
+                       for strColumn in self.GEN_CONTRIBUTION_COLUMNS]
+        for nRow, nGenIdx in enumerate(arrGenIndex.tolist()):
+            oGen = oGenTab[nGenIdx]
+            for strAttribute, listValues in listColumns:
+                setattr(oGen, strAttribute, listValues[nRow])
+        return self.m_dictGenContributions
+
+    #__________________________RESULT SNAPSHOT METHODS________________________
+    def snapshotshortcircuitresults(self, dictSettings=None, strRunId=None, dictMetadata=None):
+        """This method snapshots the short circuit results held on the DataModel into the result store and returns the run id."""
+        if gbl.ResultStore is None:
+            gbl.Msg.add_warning("Result store not initialised, short circuit results were not snapshotted.")
+            return None
+        if dictSettings is None:
+            dictSettings = self.m_dictLastRunSettings
+        try:
+            return gbl.ResultStore.snapshotstudy("shortcircuit", dictSettings, strRunId, dictMetadata)
+        except Exception as e:
+            gbl.Msg.add_error(f"Failed to snapshot short circuit results: {e}")
+            return None
+
+    #__________________________CACHED SHORT CIRCUIT METHODS________________________
+    def runshortcircuitcached(self, **kwargs):
+        """This method runs the short circuit analysis for all busbars and retrieves the results, reusing cached results when the network and settings are unchanged."""
+        self.m_bLastRunFromCache = False
+        self.m_dictLastRunSettings = dict(kwargs)
+        strKey = None
+        strNetworkState = None
+        if gbl.ResultCache is not None:
+            strNetworkState = gbl.ResultCache.getnetworkstate(self.SOLVES_DATAMODEL)
+        if strNetworkState is not None:
+            strKey = gbl.ResultCache.getstudykey("shortcircuit", kwargs, network_state=strNetworkState)
+            if gbl.ResultCache.restore(strKey, "shortcircuit"):
+                self.m_bLastRunFromCache = True
+                gbl.Msg.add_information("Short circuit results restored from cache.")
+                return True
+        bOK = self.runshortcircuitanalysisforallbusbars()
+        if bOK:
+            bOK = self.getandupdateshortcircuitresults()
+        if bOK and strKey is not None:
+            gbl.ResultCache.storeresults(strKey, "shortcircuit", kwargs)
+        return bOK
@@ -1,12 +1,17 @@
 # Engine wrapper for IPSA / PyIPSA
 import os
+import hashlib
 from typing import Optional
 
-import ipsa
+from Code.LazyImports import lazyimport
+ipsa = lazyimport('ipsa')
 
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineContainer import EngineContainer as EngineContainer
 from Code.Framework.IPSA.EngineIPSADataFactory import EngineIPSADataFactory
+from Code.Framework.IPSA.EngineIPSAComponents import (IPSA_IscBusbar, IPSA_IscBranch, IPSA_IscTransformer,
+                                                      IPSA_IscLoad, IPSA_IscSynMachine)
 
 class EngineIPSA(EngineContainer):
     """
@@ -18,6 +23,11 @@ class EngineIPSA(EngineContainer):
       - access diagrams and basic network ops
     """
 
+    # Network component type of each IPSA component class, in creation order. Deletion runs in the reverse order so
+    # no busbar is deleted while components are still connected to it.
+    COMPONENT_TYPES = {IPSA_IscBusbar: 'Busbar', IPSA_IscBranch: 'Branch', IPSA_IscTransformer: 'Transformer',
+                       IPSA_IscLoad: 'Load', IPSA_IscSynMachine: 'SynMachine'}
+
     def __init__(self, logger=None):
         EngineContainer.__init__(self)
         self.m_oMsg = gbl.Msg
@@ -26,6 +36,14 @@ class EngineIPSA(EngineContainer):
         self.m_iface = None
         self.m_network = None
         self.bus_uids = {}  # Track bus name -> UID mapping
+        # Track DataModel component key -> (UID, fingerprint, identity) of the components built from the DataModel,
+        # and the network they were built in, so a reload only touches what changed
+        self.component_uids = {}
+        self.m_oComponentNetwork = None
+        self.last_rebuild_counts = {}
+        # DataModel network hash the tracked components were built from, and the state of the network they make
+        self.m_strBuiltNetworkHash = None
+        self.m_strNetworkState = None
         self._initialise_ipsa_interface()
         self.data_factory = EngineIPSADataFactory()
 
@@ -38,6 +56,18 @@ class EngineIPSA(EngineContainer):
         """Return a displayable version string for this engine shell."""
         return self.m_strVersion
 
+    def getnetworkstate(self, oDataModel):
+        """
+        State of the engine network for result cache keys. Only known while the network is the one built from the
+        DataModel and the DataModel has not changed since; networks opened from file, streamed in directly or edited
+        in the DataModel without a reload return None.
+        """
+        if self.m_network is None or self.m_oComponentNetwork is not self.m_network:
+            return None
+        if oDataModel is None or oDataModel.getnetworkhash() != self.m_strBuiltNetworkHash:
+            return None
+        return self.m_strNetworkState
+
     # ---- Startup / interface ----
     def _initialise_ipsa_interface(self) -> None:
         """
@@ -99,28 +129,25 @@ class EngineIPSA(EngineContainer):
                 self.m_oMsg.AddError(f"Failed to create network: {e}")
             return False
 
-    def load_network_from_datamodel(self, save_file_path=None):
+    @timed("engine.load_network_from_datamodel")
+    def load_network_from_datamodel(self, save_file_path=None, incremental=True):
         """
-        Load network from framework DataModel into IPSA engine
+        Load network from framework DataModel into IPSA engine. When the engine network was itself built from the
+        DataModel, only the components that changed since are converted and created, deleted or reconfigured;
+        changes made to the engine network by other means are not seen, pass incremental=False to rebuild it.
         Args:
             save_file_path (str, optional): Path to save IPSA file. If None, uses default naming.
+            incremental (bool): Update the existing network rather than clearing it and building it again
         Returns:
             bool: Success status
         """
         try:
             self.m_oMsg.AddRawMessage("Loading network from framework DataModel to IPSA...")
-            # Build IPSA network model from framework DataModel
-            ipsa_model = self.data_factory.build_ipsa_network_model_from_datamodel()
-            # Validate the model
-            warnings = self.data_factory.validate_ipsa_model(ipsa_model)
-            if warnings:
-                self.m_oMsg.AddRawMessage("Validation warnings:")
-                for warning in warnings:
-                    self.m_oMsg.AddRawMessage(f"  - {warning}")
-            # Clear existing IPSA network
-            self.ClearNetwork()
-            # Load components into IPSA engine
-            success = self._load_ipsa_components_to_engine(ipsa_model)
+            if not incremental or self.m_network is None or self.m_oComponentNetwork is not self.m_network:
+                # Clear existing IPSA network
+                self.ClearNetwork()
+            # Load the components that differ from the engine network into IPSA engine
+            success = self._update_ipsa_components_in_engine()
             if success and save_file_path:
                 # Save the IPSA file
                 self.save_ipsa_file(save_file_path)
@@ -128,6 +155,45 @@ class EngineIPSA(EngineContainer):
         except Exception as e:
             self.m_oMsg.AddRawMessage(f"Error loading network from DataModel: {str(e)}")
             return False
+    @timed("engine.load_network_from_components")
+    def load_network_from_components(self, component_batches, save_file_path=None):
+        """
+        Build the IPSA network from batches of IPSA component objects as they arrive, e.g. converted straight from
+        streamed source data by the direct load strategy. Neither the DataModel nor a complete IPSA_Network_Model is
+        built; busbars must come before the components connected to them.
+        Args:
+            component_batches: Iterable of lists of IPSA_IscBusbar/IscBranch/IscTransformer/IscLoad/IscSynMachine
+            save_file_path (str, optional): Path to save IPSA file
+        Returns:
+            bool: Success status
+        """
+        try:
+            self.m_oMsg.AddRawMessage("Loading network components directly to IPSA...")
+            self.ClearNetwork()
+            adders = {IPSA_IscBusbar: self.AddBusbar, IPSA_IscBranch: self.AddBranch,
+                      IPSA_IscTransformer: self.AddTransformer, IPSA_IscLoad: self.AddLoad,
+                      IPSA_IscSynMachine: self.AddSynMachine}
+            connected_buses = set()
+            nLoaded = nSkipped = nGenerators = 0
+            for components in component_batches:
+                for component in components:
+                    if not adders[type(component)](component):
+                        nSkipped += 1
+                        continue
+                    nLoaded += 1
+                    if isinstance(component, (IPSA_IscBranch, IPSA_IscTransformer)):
+                        connected_buses.update((component.FromBusName, component.ToBusName))
+                    elif isinstance(component, IPSA_IscSynMachine):
+                        nGenerators += 1
+            # The checks of validate_ipsa_model, made on the names kept rather than on a whole network model
+            self._report_validation_warnings(list(self.bus_uids), connected_buses, nGenerators, nSkipped)
+            self.m_oMsg.AddRawMessage(f"Successfully loaded {nLoaded} components to IPSA engine")
+            if save_file_path:
+                self.save_ipsa_file(save_file_path)
+            return True
+        except Exception as e:
+            self.m_oMsg.AddRawMessage(f"Error loading components to IPSA engine: {str(e)}")
+            return False
     def closenetwork(self) -> bool:
         """
         Close the current network (fails if there is unsaved data).
@@ -147,36 +213,119 @@ class EngineIPSA(EngineContainer):
                 self.m_oMsg.AddError(f"Failed to close network: {e}")
             return False
 
-    def _load_ipsa_components_to_engine(self, ipsa_model):
+    @timed("engine.update_ipsa_components_in_engine")
+    def _update_ipsa_components_in_engine(self):
         """
-        Load IPSA_Network_Model components into the IPSA engine
-        Args:
-            ipsa_model (IPSA_Network_Model): Complete IPSA network model
+        Bring the engine network in line with the DataModel. Components are matched on their DataModel key and
+        compared by fingerprint: unchanged ones are neither converted nor touched, changed ones are reconfigured in
+        place, or created again when their type, name or busbars changed, and components no longer in the DataModel
+        are deleted. In a cleared network every component is created.
         Returns:
             bool: Success status
         """
         try:
-            # Add busbars
-            for busbar in ipsa_model.list_oBusbar:
-                self.AddBusbar(busbar)
-            # Add lines (branches)
-            for line in ipsa_model.list_oLine:
-                self.AddBranch(line)
-            # Add transformers
-            for transformer in ipsa_model.list_o2WindingTx:
-                self.AddTransformer(transformer)
-            # Add loads
-            for load in ipsa_model.list_oLoad:
-                self.AddLoad(load)
-            # Add generators
-            for generator in ipsa_model.list_oGenerator:
-                self.AddSynMachine(generator)
-            counts = ipsa_model.get_component_counts()
-            self.m_oMsg.AddRawMessage(f"Successfully loaded {sum(counts.values())} components to IPSA engine")
+            previous_uids = self.component_uids if self.m_oComponentNetwork is self.m_network else {}
+            fingerprints, changed = self.data_factory.convert_changed_datamodel_components(
+                {key: entry[1] for key, entry in previous_uids.items()})
+            changed_keys = {key for key, fingerprint, component in changed}
+            deletions = [entry for key, entry in previous_uids.items() if key not in fingerprints]
+            component_uids = {key: entry for key, entry in previous_uids.items()
+                              if key in fingerprints and key not in changed_keys}
+            creations, reconfigurations = [], []
+            for key, fingerprint, component in changed:
+                identity = self._get_component_identity(component)
+                entry = previous_uids.get(key)
+                if entry is not None and entry[2] == identity:
+                    reconfigurations.append((key, fingerprint, component, identity))
+                else:
+                    if entry is not None:
+                        deletions.append(entry)
+                    creations.append((key, fingerprint, component, identity))
+            # Components connected to a deleted busbar are deleted with it and created again, which connects them
+            # to a busbar of the same name if one is created in its place
+            deleted_busbars = {entry[2][1] for entry in deletions if entry[2][0] == 'Busbar'}
+            if deleted_busbars:
+                for change in [change for change in reconfigurations if deleted_busbars.intersection(change[3][2:])]:
+                    reconfigurations.remove(change)
+                    deletions.append(previous_uids[change[0]])
+                    creations.append(change)
+                reconnected = {key for key, entry in component_uids.items()
+                               if entry[2][0] != 'Busbar' and deleted_busbars.intersection(entry[2][2:])}
+                if reconnected:
+                    deletions.extend(component_uids.pop(key) for key in reconnected)
+                    _, converted = self.data_factory.convert_changed_datamodel_components(
+                        {key: fingerprint for key, fingerprint in fingerprints.items() if key not in reconnected})
+                    creations.extend((key, fingerprint, component, self._get_component_identity(component))
+                                     for key, fingerprint, component in converted)
+            nUnchanged = len(component_uids)
+            type_order = list(self.COMPONENT_TYPES.values())
+            # Delete, connected components before their busbars
+            for uid, fingerprint, identity in sorted(deletions, key=lambda entry: -type_order.index(entry[2][0])):
+                getattr(self.m_network, f"Delete{identity[0]}")(uid)
+                if identity[0] == 'Busbar' and self.bus_uids.get(identity[1]) == uid:
+                    del self.bus_uids[identity[1]]
+            # Reconfigure in place
+            for key, fingerprint, component, identity in reconfigurations:
+                uid = previous_uids[key][0]
+                component.configure_in_ipsa(getattr(self.m_network, f"Get{identity[0]}")(uid))
+                component_uids[key] = (uid, fingerprint, identity)
+            # Create, busbars before the components connected to them
+            nSkipped = 0
+            for key, fingerprint, component, identity in sorted(creations,
+                                                                key=lambda change: type_order.index(change[3][0])):
+                uid = getattr(self, f"Add{identity[0]}")(component)
+                if not uid:
+                    nSkipped += 1
+                    continue
+                component_uids[key] = (uid, fingerprint, identity)
+            self.component_uids = component_uids
+            self.m_oComponentNetwork = self.m_network
+            self.m_strBuiltNetworkHash = gbl.DataModelManager.getnetworkhash()
+            self.m_strNetworkState = hashlib.sha256(
+                repr([(key, entry[1]) for key, entry in component_uids.items()]).encode()).hexdigest()
+            self.last_rebuild_counts = {'created': len(creations) - nSkipped, 'deleted': len(deletions),
+                                        'reconfigured': len(reconfigurations), 'unchanged': nUnchanged,
+                                        'skipped': nSkipped}
+            # The checks of validate_ipsa_model, made on the tracked components
+            identities = [entry[2] for entry in component_uids.values()]
+            self._report_validation_warnings(
+                [identity[1] for identity in identities if identity[0] == 'Busbar'],
+                {bus_name for identity in identities if identity[0] in ('Branch', 'Transformer')
+                 for bus_name in identity[2:4]},
+                sum(1 for identity in identities if identity[0] == 'SynMachine'), nSkipped)
+            if previous_uids:
+                self.m_oMsg.AddRawMessage("Updated IPSA network: " + ", ".join(
+                    f"{count} {change}" for change, count in self.last_rebuild_counts.items()))
+            else:
+                self.m_oMsg.AddRawMessage(f"Successfully loaded {len(component_uids)} components to IPSA engine")
             return True
         except Exception as e:
+            # The engine network no longer matches the tracked components, the next load rebuilds it
+            self.m_oComponentNetwork = None
             self.m_oMsg.AddRawMessage(f"Error loading components to IPSA engine: {str(e)}")
             return False
+    def _get_component_identity(self, ipsa_component):
+        """Type, name and busbar names of a component, which can only be changed by creating it again"""
+        return (self.COMPONENT_TYPES[type(ipsa_component)], ipsa_component.Name,
+                getattr(ipsa_component, 'FromBusName', None), getattr(ipsa_component, 'ToBusName', None),
+                getattr(ipsa_component, 'BusName', None))
+    def _report_validation_warnings(self, bus_names, connected_buses, nGenerators, nSkipped=0):
+        """Report empty networks, isolated busbars, missing generators and components that could not be created"""
+        warnings = []
+        if not bus_names:
+            warnings.append("No busbars found in model")
+        isolated_buses = [bus_name for bus_name in bus_names if bus_name not in connected_buses]
+        if isolated_buses:
+            warnings.append(f"Isolated busbars found: {isolated_buses}")
+        if nGenerators == 0:
+            warnings.append("No generators found - network may not solve")
+        if nSkipped:
+            warnings.append(f"{nSkipped} components skipped, their busbars are not in the network")
+        if warnings:
+            self.m_oMsg.AddRawMessage("Validation warnings:")
+            for warning in warnings:
+                self.m_oMsg.AddRawMessage(f"  - {warning}")
+    @timed("engine.save_ipsa_file")
     def save_ipsa_file(self, file_path):
         """
         Save current IPSA network to file
@@ -278,7 +427,9 @@ class EngineIPSA(EngineContainer):
             return None
     def ClearNetwork(self):
         """Clear existing network by creating a new one"""
-        self.bus_uids.clear()  # Clear the tracking dictionary
+        self.bus_uids.clear()  # Clear the tracking dictionaries
+        self.component_uids = {}
+        self.m_oComponentNetwork = None
         return self.createnetwork()
 
     def WriteFile(self, filepath):
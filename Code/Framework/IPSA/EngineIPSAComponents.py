@@ -4,10 +4,12 @@ Provides component-specific data structures and configuration methods for IPSA e
 Part of the Jesse PowerFactory Modelling Framework.
 """
 
-import ipsa
 import math
 from typing import List, Optional
 
+from Code.LazyImports import lazyimport
+ipsa = lazyimport('ipsa')
+
 
 class IPSA_IscBusbar:
     """Model for IscBusbar"""
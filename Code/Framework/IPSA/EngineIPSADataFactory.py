@@ -4,16 +4,31 @@ Provides conversion methods to transform framework components into IPSA-ready ob
 Part of the Jesse PowerFactory Modelling Framework.
 """
 
-import pandas as pd
 import math
 from typing import Dict, List, Optional, Tuple
 from Code import GlobalEngineRegistry as gbl
+from Code.LazyImports import lazyimport
+pd = lazyimport('pandas')
 from Code.Framework.IPSA.EngineIPSAComponents import *
 
+# Attributes the converters read, by component key type. Only these are hashed into component fingerprints so
+# results written back to the DataModel (voltages, loadings, fault levels) do not count as changes
+_FINGERPRINT_ATTRIBUTES = {
+    'Busbar': ('BusID', 'kV', 'name', 'Disconnected'),
+    'Branch': ('BusID1', 'BusID2', 'BusID3', 'BranchID', 'ON', 'R', 'X', 'B', 'R0', 'X0', 'RatingA', 'RatingB',
+               'RatingC', 'WinterRating', 'SpringAutumnRating', 'SummerRating', 'Length', 'BranchType',
+               'IsZeroLength', 'name', 'IsTransformer', 'tapchangeronestatus'),
+    'Load': ('BusID', 'LoadID', 'MW', 'MVar', 'ON', 'name'),
+    'Generator': ('BusID', 'GenID', 'ON', 'MW', 'MVar', 'MWCapacity', 'Qmax', 'Qmin', 'IsExternalGrid', 'name'),
+}
+
 
 class EngineIPSADataFactory:
     """Converts Framework DataModel components to IPSA component objects"""
 
+    # Rating sets (or seasons) of the branch rating engine written to the three IPSA branch ratings
+    BRANCH_RATING_SETS = ("winter", "spring_autumn", "summer")
+
     def __init__(self):
         self.msg = gbl.Msg if hasattr(gbl, 'Msg') and gbl.Msg else None
     # =====================================================================
@@ -102,11 +117,9 @@ class EngineIPSADataFactory:
         # Zero sequence (if available)
         ipsa_branch.ZSResistancePU = self._safe_float(getattr(branch_datamodel, 'R0', 0))
         ipsa_branch.ZSReactancePU = self._safe_float(getattr(branch_datamodel, 'X0', 0))
-        # Ratings (with defaults)
-        default_rating = 9999.0
-        winter_rating = self._safe_float(getattr(branch_datamodel, 'WinterRating', default_rating), default_rating)
-        summer_rating = self._safe_float(getattr(branch_datamodel, 'SummerRating', default_rating), default_rating)
-        ipsa_branch.RatingMVAs = [winter_rating, summer_rating, winter_rating]
+        # Ratings (with defaults), a season without ratings takes its fallback set
+        ipsa_branch.RatingMVAs = gbl.DataModelManager.getratingengine().getbranchratings(
+            branch_datamodel, self.BRANCH_RATING_SETS, 9999.0)
         # Length
         ipsa_branch.LengthKm = max(self._safe_float(getattr(branch_datamodel, 'Length', 1.0)), 0.001)
         # Line type determination
@@ -170,8 +183,8 @@ class EngineIPSADataFactory:
         ipsa_transformer.CoreLossRPU = max(self._safe_float(getattr(transformer_datamodel, 'R', 0)), 0.0001)
         ipsa_transformer.MagnetXPU = max(self._safe_float(getattr(transformer_datamodel, 'X', 0)), 0.001)
         # Rating
-        ipsa_transformer.RatingMVA = self._safe_float(
-            getattr(transformer_datamodel, 'WinterRating', 100.0), 100.0)
+        ipsa_transformer.RatingMVA = gbl.DataModelManager.getratingengine().getbranchratings(
+            transformer_datamodel, ("winter",), 100.0)[0]
         # Tap changer settings (conservative defaults)
         ipsa_transformer.TapNominalPC = 0.0
         ipsa_transformer.TapStartPC = 0.0
@@ -315,30 +328,9 @@ class EngineIPSADataFactory:
         if self.msg:
             self.msg.AddRawMessage("Building IPSA Network Model from Framework DataModel...")
         ipsa_model = IPSA_Network_Model()
-        # Convert busbars
-        for busbar in gbl.DataModelManager.Busbar_TAB:
-            ipsa_busbar = self.convert_framework_busbar_to_ipsa(busbar)
-            ipsa_model.list_oBusbar.append(ipsa_busbar)
-        # Convert branches and transformers
-        for branch in gbl.DataModelManager.Branch_TAB:
-            if hasattr(branch, 'IsTransformer') and branch.IsTransformer:
-                # Convert as transformer
-                ipsa_transformer = self.convert_framework_transformer_to_ipsa(branch)
-                if ipsa_transformer:
-                    ipsa_model.list_o2WindingTx.append(ipsa_transformer)
-            else:
-                # Convert as line
-                ipsa_branch = self.convert_framework_branch_to_ipsa(branch)
-                if ipsa_branch:
-                    ipsa_model.list_oLine.append(ipsa_branch)
-        # Convert loads
-        for load in gbl.DataModelManager.Load_TAB:
-            ipsa_load = self.convert_framework_load_to_ipsa(load)
-            ipsa_model.list_oLoad.append(ipsa_load)
-        # Convert generators
-        for generator in gbl.DataModelManager.Gen_TAB:
-            ipsa_generator = self.convert_framework_generator_to_ipsa(generator)
-            ipsa_model.list_oGenerator.append(ipsa_generator)
+        # Ratings edited since the last build are read once here, the converters use the sets as they are
+        gbl.DataModelManager.getratingengine(bRefresh=True)
+        self._convert_datamodel_components(ipsa_model)
         # Log results
         if self.msg:
             counts = ipsa_model.get_component_counts()
@@ -347,6 +339,76 @@ class EngineIPSADataFactory:
                 if count > 0:
                     self.msg.AddRawMessage(f"  {component_type}: {count}")
         return ipsa_model
+    def _convert_datamodel_components(self, ipsa_model: IPSA_Network_Model):
+        """Convert every DataModel component into the IPSA network model"""
+        model_lists = {IPSA_IscBusbar: ipsa_model.list_oBusbar, IPSA_IscBranch: ipsa_model.list_oLine,
+                       IPSA_IscTransformer: ipsa_model.list_o2WindingTx, IPSA_IscLoad: ipsa_model.list_oLoad,
+                       IPSA_IscSynMachine: ipsa_model.list_oGenerator}
+        for key, component, converter in self._iter_datamodel_components():
+            ipsa_component = converter(component)
+            if ipsa_component:
+                model_lists[type(ipsa_component)].append(ipsa_component)
+    def _iter_datamodel_components(self):
+        """(key, DataModel component, converter) of busbars, then branches and transformers, loads and generators"""
+        datamodel = gbl.DataModelManager
+        for busbar in datamodel.Busbar_TAB:
+            yield self.get_component_key(busbar), busbar, self.convert_framework_busbar_to_ipsa
+        for branch in datamodel.Branch_TAB:
+            if hasattr(branch, 'IsTransformer') and branch.IsTransformer:
+                yield self.get_component_key(branch), branch, self.convert_framework_transformer_to_ipsa
+            else:
+                yield self.get_component_key(branch), branch, self.convert_framework_branch_to_ipsa
+        for load in datamodel.Load_TAB:
+            yield self.get_component_key(load), load, self.convert_framework_load_to_ipsa
+        for generator in datamodel.Gen_TAB:
+            yield self.get_component_key(generator), generator, self.convert_framework_generator_to_ipsa
+
+    # =====================================================================
+    # Incremental Conversion Methods
+    # =====================================================================
+    @staticmethod
+    def get_component_key(component_datamodel) -> tuple:
+        """Key identifying a DataModel component across reloads: its type and the IDs the DataModel finds it by"""
+        if hasattr(component_datamodel, 'BranchID'):
+            return ('Branch', component_datamodel.BusID1, component_datamodel.BusID2,
+                    getattr(component_datamodel, 'BusID3', None), component_datamodel.BranchID)
+        if hasattr(component_datamodel, 'LoadID'):
+            return ('Load', component_datamodel.BusID, component_datamodel.LoadID)
+        if hasattr(component_datamodel, 'GenID'):
+            return ('Generator', component_datamodel.BusID, component_datamodel.GenID)
+        return ('Busbar', component_datamodel.BusID)
+    @classmethod
+    def get_component_fingerprint(cls, component_datamodel) -> int:
+        """
+        Hash of the values a DataModel component is converted from: the input attributes its converter reads,
+        ratings included, and not the results written back to it. Hashes are only compared within one process.
+        """
+        attributes = _FINGERPRINT_ATTRIBUTES[cls.get_component_key(component_datamodel)[0]]
+        return hash(tuple([getattr(component_datamodel, name, None) for name in attributes]))
+    def convert_changed_datamodel_components(self, dict_oFingerprints: Dict[tuple, int]) -> Tuple[Dict, List]:
+        """
+        Convert only the DataModel components that are new or changed since the build the fingerprints were taken at
+        Args:
+            dict_oFingerprints (Dict[tuple, int]): Component key -> fingerprint at the last build
+        Returns:
+            Tuple[Dict, List]: Fingerprint of every DataModel component by key, and (key, fingerprint, IPSA
+            component) of each new or changed one, in the order of a full build
+        """
+        if not hasattr(gbl, 'DataModelManager') or gbl.DataModelManager is None:
+            raise RuntimeError("DataModelManager not initialized")
+        fingerprints, changed = {}, []
+        gbl.DataModelManager.getratingengine(bRefresh=True)
+        for key, component, converter in self._iter_datamodel_components():
+            # Components the DataModel holds twice are both built, as in a full build
+            while key in fingerprints:
+                key += ('duplicate',)
+            fingerprint = self.get_component_fingerprint(component)
+            fingerprints[key] = fingerprint
+            if dict_oFingerprints.get(key) != fingerprint:
+                ipsa_component = converter(component)
+                if ipsa_component:
+                    changed.append((key, fingerprint, ipsa_component))
+        return fingerprints, changed
     # =====================================================================
     # Validation Methods
     # =====================================================================
@@ -3,8 +3,10 @@
 # and populates your framework's DataModelManager tables, mirroring the PowerFactory DMI pattern.
 
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineDataModelInterfaceContainer import EngineDataModelInterfaceContainer
-import ipsa
+from Code.LazyImports import lazyimport
+ipsa = lazyimport('ipsa')
 
 class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
     """
@@ -23,6 +25,7 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
         self.load_dictionary = {}
 
     # ─────────Overall orchestration ────────────────── #
+    @timed("dmi.passelementsfromnetworktodatamodelmanager")
     def passelementsfromnetworktodatamodelmanager(self) -> bool:
         """
         Entry point (same role as PF): gather all supported elements and push into DataModelManager.
@@ -46,6 +49,7 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
         return bOK
 
     # ───────────────── Busbars ───────────────────────── #
+    @timed("dmi.get_busbarsfromnetwork")
     def get_busbarsfromnetwork(self) -> bool:
         """
         Discover busbars; copy basic attributes into Busbar_TAB.
@@ -64,14 +68,14 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 terminal_id = terminal_key               # Cache for cross-reference 
                 busbar = gbl.DataFactory.createbusbar(terminal_id)
                 if busbar is None:
-                    gbl.Msg.AddWarning(f"Failed to create DataModel row for busbar '{terminal_id}'.")
+                    gbl.Msg.AddWarning("Failed to create DataModel row for busbar '%s'.", terminal_id, strCategory="Failed to create DataModel row for busbar")
                     continue
                 # Attributes aligned to your model & IPSA enums you set during build
                 if not self.getbusbarvaluesfromnetwork(busbar):
-                    gbl.Msg.AddWarning(f"Failed to retrieve values for busbar '{terminal_id}'.")
+                    gbl.Msg.AddWarning("Failed to retrieve values for busbar '%s'.", terminal_id, strCategory="Failed to retrieve values for busbar")
                     continue
                 if not gbl.DataModelManager.addbusbartotab(busbar):
-                    gbl.Msg.AddWarning(f"Failed to add busbar '{terminal_id}' to DataModel.")
+                    gbl.Msg.AddWarning("Failed to add busbar '%s' to DataModel.", terminal_id, strCategory="Failed to add busbar to DataModel")
                     continue
             gbl.Msg.AddRawMessage(f"Total busbars added to DataModel: {len(gbl.DataModelManager.Busbar_TAB)}")
             return True
@@ -99,6 +103,7 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 busbar.kV = VMagkV
         return bOK
     # ──────────────────── Lines / Branches ────────────────────── #
+    @timed("dmi.get_linesfromnetwork")
     def get_linesfromnetwork(self) -> bool:
         """
         Discover AC lines/cables (IscBranch) and copy attributes to Branch_TAB.
@@ -118,14 +123,14 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 terminal2 = br_obj.GetSValue(ipsa.IscBranch.ToBusName)
                 if terminal1 and terminal2:
                     if terminal1 not in self.terminal_dictionary or terminal2 not in self.terminal_dictionary:
-                        gbl.Msg.AddWarning(f"Branch '{line_id}': missing end bus references.")
+                        gbl.Msg.AddWarning("Branch '%s': missing end bus references.", line_id, strCategory="Branch missing end bus references")
                         continue
                     line_datamodel = gbl.DataFactory.createbranch(terminal1, terminal2, 0, line_id)
                     if line_datamodel is None:
-                        gbl.Msg.AddWarning(f"Failed to create DataModel row for branch '{line_id}'.")
+                        gbl.Msg.AddWarning("Failed to create DataModel row for branch '%s'.", line_id, strCategory="Failed to create DataModel row for branch")
                         continue
                     if not self.getlinevaluesfromnetwork(line_datamodel):
-                        gbl.Msg.AddWarning(f"Failed to retrieve values for branch '{line_id}'.")
+                        gbl.Msg.AddWarning("Failed to retrieve values for branch '%s'.", line_id, strCategory="Failed to retrieve values for branch")
                         continue
                     gbl.DataModelManager.Branch_TAB.append(line_datamodel)
             gbl.Msg.AddRawMessage(f"Total lines added to DataModel: {len(gbl.DataModelManager.Branch_TAB)}")
@@ -150,9 +155,10 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                     line_datamodel.LengthKm = br.GetDValue(ipsa.IscBranch.LengthKm)
                     line_datamodel.Comment  = br.GetSValue(ipsa.IscBranch.Comment)
                 except Exception as e:
-                    gbl.Msg.AddWarning(f"Branch attribute copy failed for '{line_datamodel.BranchID}': {e}")
+                    gbl.Msg.AddWarning("Branch attribute copy failed for '%s': %s", line_datamodel.BranchID, e, strCategory="Branch attribute copy failed")
         return True
     # ────────────────── Transformers (2-winding) ───────────────────────────────────────────── #
+    @timed("dmi.get_transformersfromnetwork")
     def get_transformersfromnetwork(self) -> bool:
         """
         Discover 2-winding transformers (IscTransformer) and copy attributes to Tx_TAB.
@@ -174,14 +180,14 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 terminal2 = tr_obj.GetSValue(ipsa.IscTransformer.ToBusName)
                 if terminal1 and terminal2:
                     if terminal1 not in self.terminal_dictionary or terminal2 not in self.terminal_dictionary:
-                        gbl.Msg.AddWarning(f"Transformer '{transformer_id}': missing end bus references.")
+                        gbl.Msg.AddWarning("Transformer '%s': missing end bus references.", transformer_id, strCategory="Transformer missing end bus references")
                         continue
                     transformer_datamodel = gbl.DataFactory.createbranch(terminal1, terminal2, 0, transformer_id)
                     if transformer_datamodel is None:
-                        gbl.Msg.AddWarning(f"Failed to create DataModel row for transformer '{transformer_id}'.")
+                        gbl.Msg.AddWarning("Failed to create DataModel row for transformer '%s'.", transformer_id, strCategory="Failed to create DataModel row for transformer")
                         continue
                     if not self.gettransformervaluesfromnetwork(transformer_datamodel):
-                        gbl.Msg.AddWarning(f"Failed to retrieve values for transformer '{transformer_id}'.")
+                        gbl.Msg.AddWarning("Failed to retrieve values for transformer '%s'.", transformer_id, strCategory="Failed to retrieve values for transformer")
                         continue
                     transformer_datamodel.IsTransformer = True
                     gbl.DataModelManager.Branch_TAB.append(transformer_datamodel)
@@ -218,11 +224,12 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                     except Exception:
                         pass
                 except Exception as e:
-                    gbl.Msg.AddWarning(f"Transformer attribute copy failed for '{transformer_datamodel.BranchID}': {e}")
+                    gbl.Msg.AddWarning("Transformer attribute copy failed for '%s': %s", transformer_datamodel.BranchID, e, strCategory="Transformer attribute copy failed")
         return True
 
 
     # ────────────────── Loads ───────────────────────────────────────────── #
+    @timed("dmi.get_loadsfromnetwork")
     def get_loadsfromnetwork(self) -> bool:
         """
         Discover loads (IscLoad) and copy attributes to Load_TAB.
@@ -241,14 +248,14 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 terminal = ld_obj.GetSValue(ipsa.IscLoad.BusName)
                 if terminal:
                     if terminal not in self.terminal_dictionary:
-                        gbl.Msg.AddWarning(f"Load '{load_id}': missing bus reference.")
+                        gbl.Msg.AddWarning("Load '%s': missing bus reference.", load_id, strCategory="Load missing bus reference")
                         continue
                     load_datamodel = gbl.DataFactory.createload(terminal, load_id)
                     if load_datamodel is None:
-                        gbl.Msg.AddWarning(f"Failed to create DataModel row for load '{load_id}'.")
+                        gbl.Msg.AddWarning("Failed to create DataModel row for load '%s'.", load_id, strCategory="Failed to create DataModel row for load")
                         continue
                     if not self.getloadvaluesfromnetwork(load_datamodel):
-                        gbl.Msg.AddWarning(f"Failed to retrieve values for load '{load_id}'.")
+                        gbl.Msg.AddWarning("Failed to retrieve values for load '%s'.", load_id, strCategory="Failed to retrieve values for load")
                         continue
                     gbl.DataModelManager.addloadtotab(load_datamodel)
             gbl.Msg.AddRawMessage(f"Total loads added to DataModel: {len(gbl.DataModelManager.Load_TAB)}")
@@ -266,11 +273,12 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                     load_datamodel.LoadMW   = ld.GetDValue(ipsa.IscLoad.RealMW)
                     load_datamodel.LoadMVAR = ld.GetDValue(ipsa.IscLoad.ReactiveMVAr)
                 except Exception as e:
-                    gbl.Msg.AddWarning(f"Load attribute copy failed for '{load_datamodel.LoadID}': {e}")
+                    gbl.Msg.AddWarning("Load attribute copy failed for '%s': %s", load_datamodel.LoadID, e, strCategory="Load attribute copy failed")
         return True
 
 
     # ──────────────────── Generators ───────────────────────────────────────────── #
+    @timed("dmi.get_generatorsfromnetwork")
     def get_generatorsfromnetwork(self) -> bool:
         """
         Discover synchronous generators (IscSynMachine) and copy attributes to Gen_TAB.
@@ -289,14 +297,14 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                 terminal = gen_obj.GetSValue(ipsa.IscSynMachine.BusName)
                 if terminal:
                     if terminal not in self.terminal_dictionary:
-                        gbl.Msg.AddWarning(f"Generator '{gen_id}': missing bus reference.")
+                        gbl.Msg.AddWarning("Generator '%s': missing bus reference.", gen_id, strCategory="Generator missing bus reference")
                         continue
                     gen_datamodel = gbl.DataFactory.creategenerator(terminal, gen_id)
                     if gen_datamodel is None:
-                        gbl.Msg.AddWarning(f"Failed to create DataModel row for generator '{gen_id}'.")
+                        gbl.Msg.AddWarning("Failed to create DataModel row for generator '%s'.", gen_id, strCategory="Failed to create DataModel row for generator")
                         continue
                     if not self.getgeneratorvaluesfromnetwork(gen_datamodel):
-                        gbl.Msg.AddWarning(f"Failed to retrieve values for generator '{gen_id}'.")
+                        gbl.Msg.AddWarning("Failed to retrieve values for generator '%s'.", gen_id, strCategory="Failed to retrieve values for generator")
                         continue
                     gbl.DataModelManager.addgentotab(gen_datamodel)
             gbl.Msg.AddRawMessage(f"Total generators added to DataModel: {len(gbl.DataModelManager.Gen_TAB)}")
@@ -315,5 +323,5 @@ class EngineIPSADataModelInterface(EngineDataModelInterfaceContainer):
                     gen_datamodel.GenMVAR = gen.GetDValue(ipsa.IscSynMachine.GenMVAr)
                     return True
                 except Exception as e:
-                    gbl.Msg.AddWarning(f"Generator attribute copy failed for '{gen_datamodel.GenID}': {e}")
+                    gbl.Msg.AddWarning("Generator attribute copy failed for '%s': %s", gen_datamodel.GenID, e, strCategory="Generator attribute copy failed")
                     return False
\ No newline at end of file
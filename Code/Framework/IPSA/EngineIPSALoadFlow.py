@@ -1,7 +1,9 @@
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineLoadFlowContainer import EngineLoadFlowContainer as BaseEngineLoadFlowContainer
 
-import ipsa
+from Code.LazyImports import lazyimport
+ipsa = lazyimport('ipsa')
 
 
 class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
@@ -29,6 +31,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
             gbl.Msg.add_error(f"Failed to initialize IPSA load flow object: {e}")
 
     #__________________________IPSA LOAD FLOW METHODS________________________
+    @timed("loadflow.runloadflow")
     def runloadflow(self, **kwargs) -> bool:
         """
             Run IPSA load flow with optional settings.
@@ -51,6 +54,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
             True if converged; False otherwise.
             """
         self._initialize_loadflow_object()
+        self.m_dictLastRunSettings = dict(kwargs)
         # Map simple kwargs to IscAnalysisLF fields
         setI = self.ipsaloadflowobject.SetIValue
         setD = self.ipsaloadflowobject.SetDValue
@@ -112,6 +116,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
             gbl.Msg.add_error(f"Failed to configure IPSA load flow settings: {e}")
             return False
 
+    @timed("loadflow.getallloadflowresults")
     def getallloadflowresults(self):
         """This method retrieves all results of the IPSA load flow analysis."""
         bOK = False
@@ -127,6 +132,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         return bOK
 
     #__________________________BUSBAR LOAD FLOW RESULTS METHODS________________________
+    @timed("loadflow.getandupdatebusbarloadflowresults")
     def getandupdatebusbarloadflowresults(self):
         """This method retrieves the results of the IPSA load flow analysis for busbars."""
         bOK = True
@@ -189,7 +195,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         for bus in self.busbarloadflowresultsdata:
             busbar, _ = gbl.DataModelManager.findbusbar(bus["name"])
             if busbar is None:
-                gbl.Msg.add_warning(f"Busbar {bus['name']} not found in the tab.")
+                gbl.Msg.add_warning("Busbar %s not found in the tab.", bus['name'], strCategory="Busbar not found in the tab")
                 continue
             busbar.voltage = bus["voltage"]
             busbar.angle = bus["angle"]
@@ -197,6 +203,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         return True
 
     #__________________________LINE LOAD FLOW METHODS________________________
+    @timed("loadflow.getandupdatelineloadflowresults")
     def getandupdatelineloadflowresults(self):
         """This method retrieves the IPSA line load flow results and updates the data tab."""
         bOK = True
@@ -272,7 +279,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
             branch, _ = gbl.DataModelManager.findbranch(line["bus1"], line["bus2"], None,
                                                         line["name"])
             if branch is None:
-                gbl.Msg.add_warning(f"Branch {line['name']} not found in the tab.")
+                gbl.Msg.add_warning("Branch %s not found in the tab.", line['name'], strCategory="Branch not found in the tab")
                 continue
             branch.headroom = line["headroom"]
             branch.lossMW = line["lossMW"]
@@ -285,6 +292,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         return True
 
     #___________________GENERATOR LOAD FLOW RESULTS METHODS - NEEDS FIX________________________
+    @timed("loadflow.getandupdateloadflowgeneratorresults")
     def getandupdateloadflowgeneratorresults(self):
         """This method retrieves the IPSA generator load flow results and updates the data tab."""
         bOK = True
@@ -350,7 +358,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         for generator in self.generatorloadflowresultsdata:
             gen_obj, _ = gbl.DataModelManager.findgen(generator['bus'], generator["name"])
             if gen_obj is None:
-                gbl.Msg.add_warning(f"Generator {generator['name']} not found in the tab.")
+                gbl.Msg.add_warning("Generator %s not found in the tab.", generator['name'], strCategory="Generator not found in the tab")
                 continue
 
             gen_obj.MWLoadFlow = generator["MW"]
@@ -359,6 +367,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         return True
 
     #__________________________LOAD LOAD FLOW RESULTS METHODS________________________
+    @timed("loadflow.getandupdateloadsloadflowresults")
     def getandupdateloadsloadflowresults(self):
         """This method retrieves the IPSA load flow results and updates the data tab."""
         bOK = True
@@ -426,7 +435,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         for load in self.loadflowresultsdata:
             load_obj, _ = gbl.DataModelManager.findload(load['bus'], load["name"])
             if load_obj is None:
-                gbl.Msg.add_warning(f"Load {load['name']} not found in the tab.")
+                gbl.Msg.add_warning("Load %s not found in the tab.", load['name'], strCategory="Load not found in the tab")
                 continue
 
             load_obj.MWLoadFlow = load["MW"]
@@ -435,6 +444,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         return True
 
     #__________________________TRANSFORMER LOAD FLOW RESULTS METHODS________________________
+    @timed("loadflow.getandupdatetransformerflowresults")
     def getandupdatetransformerflowresults(self):
         """This method retrieves the IPSA transformer load flow results and updates the data tab."""
         if gbl.VERSION_TESTING:
@@ -507,7 +517,7 @@ class EngineIPSALoadFlow(BaseEngineLoadFlowContainer):
         for tx in self.transformerloadflowresultsdata:
             branch, _ = gbl.DataModelManager.findbranch(tx["bus1"], tx["bus2"], None, tx["name"])
             if branch is None:
-                gbl.Msg.add_warning(f"Branch {tx['name']} not found in the tab.")
+                gbl.Msg.add_warning("Branch %s not found in the tab.", tx['name'], strCategory="Branch not found in the tab")
                 continue
             branch.lossMW = tx["lossMW"]
             branch.lossMVAr = tx["lossMVAr"]
@@ -0,0 +1,210 @@
+# Native harmonic load flow working directly on the DataModel, no IPSA or PowerFactory needed.
+# The bus admittance matrices of all harmonic orders are assembled in one vectorised pass and stacked block diagonally,
+# so one sparse factorisation and one solve give the harmonic voltage of every busbar at every order. Loads and
+# generators with a current source spectrum inject harmonic currents (and are modelled as ideal current sources);
+# the grid infeed, machines, passive loads and line charging are the frequency dependent impedances they flow into.
+import math
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+from Code.Framework.BaseTemplates.EngineHarmonicsContainer import EngineHarmonicsContainer
+
+
+class EngineNativeHarmonics(EngineHarmonicsContainer):
+    """Harmonic voltages of all busbars at all orders from one stacked sparse solve"""
+
+    BASE_MVA = 100.0
+    # Defaults for data the DataModel does not carry
+    DEFAULT_REACTANCE_PU = 0.01
+    DEFAULT_SUBTRANSIENT_REACTANCE_PU = 0.2
+    DEFAULT_EXTERNAL_GRID_MVA = 10000.0
+    # Source impedance R/X: 0.1 for network feeders and 0.05 for machines, R independent of frequency
+    SOURCE_RX_RATIO = 0.1
+    MACHINE_RX_RATIO = 0.05
+    # Admittance to earth added at every busbar so unfed islands give zero voltages instead of a singular matrix
+    EARTH_LEAKAGE_PU = 1e-8
+    # Characteristic spectra of ideal line commutated converters, percent of the fundamental current
+    SPECTRA = {
+        "6pulse": {nOrder: 100.0 / nOrder for nOrder in range(5, 50) if nOrder % 6 in (1, 5)},
+        "12pulse": {nOrder: 100.0 / nOrder for nOrder in range(11, 50) if nOrder % 12 in (1, 11)},
+    }
+
+    def __init__(self):
+        EngineHarmonicsContainer.__init__(self)
+        self.m_listBusbars = []
+        self.m_arrBusOn = None
+        # Harmonic orders of the last run and the busbar voltages, orders x busbars in per unit of nominal
+        self.m_arrOrders = None
+        self.m_mtxVoltage = None
+
+    #__________________________ENGINE HARMONIC METHODS________________________
+    @timed("harmonics.native.runharmonicanalysis")
+    def runharmonicanalysis(self, listOrders=None):
+        """Builds the stacked admittance matrix of the harmonic orders, factorises it once and solves every order"""
+        oDataModel = gbl.DataModelManager
+        self.m_listBusbars = list(oDataModel.Busbar_TAB)
+        self.m_mtxVoltage = None
+        if not self.m_listBusbars:
+            self.msg.AddError("Native harmonics: the DataModel has no busbars.")
+            return False
+        arrOrders = np.array(sorted({int(nOrder) for nOrder in (listOrders or self.DEFAULT_ORDERS)}), dtype=np.int64)
+        if arrOrders[0] < 2:
+            self.msg.AddError(f"Native harmonics: harmonic order {arrOrders[0]} is not above the fundamental.")
+            return False
+        mtxY = self.buildstackedadmittance(oDataModel, arrOrders)
+        mtxCurrent = self.buildinjections(oDataModel, arrOrders)
+        try:
+            oFactor = splu(mtxY, permc_spec="MMD_AT_PLUS_A")
+        except RuntimeError as e:
+            self.msg.AddError(f"Native harmonics: admittance matrix factorisation failed: {e}")
+            return False
+        self.m_mtxVoltage = oFactor.solve(mtxCurrent.ravel()).reshape(mtxCurrent.shape)
+        self.m_mtxVoltage[:, ~self.m_arrBusOn] = 0.0
+        self.m_arrOrders = arrOrders
+        self.m_dictLastRunSettings = {"orders": arrOrders.tolist()}
+        return True
+
+    def buildstackedadmittance(self, oDataModel, arrOrders):
+        """Block diagonal matrix of the bus admittance matrices of every order (per unit, sparse)"""
+        nBusbars = len(oDataModel.Busbar_TAB)
+        dictIndex = oDataModel.BusbarIdToIndex
+        self.m_arrBusOn = np.array([bool(oBusbar.ON) and not oBusbar.Disconnected for oBusbar in oDataModel.Busbar_TAB])
+        listFrom, listTo, listR, listX, listB = [], [], [], [], []
+        for oBranch in oDataModel.Branch_TAB:
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = dictIndex.get(oBranch.BusID1), dictIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo or not (self.m_arrBusOn[nFrom] and self.m_arrBusOn[nTo]):
+                continue
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listR.append(abs(getattr(oBranch, 'R', 0.0) or 0.0))
+            listX.append(abs(getattr(oBranch, 'X', 0.0) or 0.0) or self.DEFAULT_REACTANCE_PU)
+            listB.append(getattr(oBranch, 'B', 0.0) or 0.0)
+        arrFrom = np.array(listFrom, dtype=np.int64)
+        arrTo = np.array(listTo, dtype=np.int64)
+        arrH = arrOrders.astype(np.float64)[:, None]
+        # Series reactance and charging susceptance scale with the order, resistance does not
+        mtxSeries = 1.0 / (np.array(listR)[None, :] + 1j * arrH * np.array(listX)[None, :])
+        mtxCharging = 0.5j * arrH * np.array(listB)[None, :]
+        mtxShunt = np.full((len(arrOrders), nBusbars), self.EARTH_LEAKAGE_PU, dtype=np.complex128)
+        np.add.at(mtxShunt.T, arrFrom, mtxCharging.T)
+        np.add.at(mtxShunt.T, arrTo, mtxCharging.T)
+        arrShuntBus, listShuntZ = [], []
+        for oGen in oDataModel.Gen_TAB:
+            nBus = dictIndex.get(oGen.BusID)
+            if nBus is None or not oGen.ON or not self.m_arrBusOn[nBus] or oGen.HarmonicSpectrum:
+                continue
+            tImpedance = self.getsourceimpedance(oGen)
+            if tImpedance is not None:
+                arrShuntBus.append(nBus)
+                listShuntZ.append(tImpedance)
+        if arrShuntBus:
+            arrZ = np.array(listShuntZ)
+            np.add.at(mtxShunt.T, np.array(arrShuntBus), (1.0 / (arrZ[:, 0][None, :] + 1j * arrH * arrZ[:, 1][None, :])).T)
+        # Passive loads: parallel resistance and inductance (or capacitance) taking their MW and MVAr at 1 pu
+        listLoadBus, listP, listQ = [], [], []
+        for oLoad in oDataModel.Load_TAB:
+            nBus = dictIndex.get(oLoad.BusID)
+            if nBus is None or not oLoad.ON or not self.m_arrBusOn[nBus] or oLoad.HarmonicSpectrum:
+                continue
+            listLoadBus.append(nBus)
+            listP.append((oLoad.MW or 0.0) / self.BASE_MVA)
+            listQ.append((oLoad.MVar or 0.0) / self.BASE_MVA)
+        if listLoadBus:
+            np.add.at(mtxShunt.T, np.array(listLoadBus), (np.array(listP)[None, :] - 1j * np.array(listQ)[None, :] / arrH).T)
+        arrOffset = (np.arange(len(arrOrders), dtype=np.int64) * nBusbars)[:, None]
+        arrDiagonal = np.arange(nBusbars, dtype=np.int64)[None, :]
+        arrRows = np.concatenate([arrFrom + arrOffset, arrTo + arrOffset, arrFrom + arrOffset, arrTo + arrOffset,
+                                  arrDiagonal + arrOffset], axis=1)
+        arrColumns = np.concatenate([arrFrom + arrOffset, arrTo + arrOffset, arrTo + arrOffset, arrFrom + arrOffset,
+                                     arrDiagonal + arrOffset], axis=1)
+        arrData = np.concatenate([mtxSeries, mtxSeries, -mtxSeries, -mtxSeries, mtxShunt], axis=1)
+        nSize = len(arrOrders) * nBusbars
+        return sp.coo_matrix((arrData.ravel(), (arrRows.ravel(), arrColumns.ravel())), shape=(nSize, nSize)).tocsc()
+
+    def getsourceimpedance(self, oGen):
+        """(R, X) at the fundamental of a grid infeed or machine on the system base, None for no impedance"""
+        if oGen.IsExternalGrid:
+            fFaultLevelMVA = getattr(oGen, 'FaultLevelMVA', 0.0) or self.DEFAULT_EXTERNAL_GRID_MVA
+            fZ = self.BASE_MVA / fFaultLevelMVA
+            fX = fZ / math.sqrt(1.0 + self.SOURCE_RX_RATIO ** 2)
+            return self.SOURCE_RX_RATIO * fX, fX
+        fRatedMVA = oGen.RatedMVA or (oGen.MWCapacity or oGen.MW or 0.0) / 0.95
+        if fRatedMVA <= 0:
+            return None
+        fX = (getattr(oGen, 'Xdpp', 0.0) or self.DEFAULT_SUBTRANSIENT_REACTANCE_PU) * self.BASE_MVA / fRatedMVA
+        return self.MACHINE_RX_RATIO * fX, fX
+
+    def buildinjections(self, oDataModel, arrOrders):
+        """Harmonic currents injected by the loads and generators with a spectrum, orders x busbars in per unit"""
+        nBusbars = len(oDataModel.Busbar_TAB)
+        dictOrderRow = {nOrder: nRow for nRow, nOrder in enumerate(arrOrders.tolist())}
+        mtxCurrent = np.zeros((len(arrOrders), nBusbars), dtype=np.complex128)
+        for oComponent in list(oDataModel.Gen_TAB) + list(oDataModel.Load_TAB):
+            if not oComponent.HarmonicSpectrum or not oComponent.ON:
+                continue
+            nBus = oDataModel.BusbarIdToIndex.get(oComponent.BusID)
+            if nBus is None or not self.m_arrBusOn[nBus]:
+                continue
+            fMW, fMVar = oComponent.MW or 0.0, oComponent.MVar or 0.0
+            fFundamental = math.hypot(fMW, fMVar) / self.BASE_MVA
+            # Spectrum angles are relative to the fundamental current: theta_h = angle_h + h theta_1
+            fTheta1 = math.radians(getattr(oDataModel.Busbar_TAB[nBus], 'angle', 0.0) or 0.0) - math.atan2(fMVar, fMW)
+            for nOrder, (fPercent, fAngle) in oComponent.HarmonicSpectrum.items():
+                nRow = dictOrderRow.get(nOrder)
+                if nRow is not None:
+                    mtxCurrent[nRow, nBus] += fFundamental * fPercent / 100.0 * np.exp(1j * (math.radians(fAngle) + nOrder * fTheta1))
+        return mtxCurrent
+
+    #__________________________BUSBAR HARMONIC RESULTS METHODS________________________
+    def getdistortions(self):
+        """Harmonic voltages in percent of the fundamental (orders x busbars), THD in percent and RMS voltage in pu"""
+        arrFundamental = np.array([getattr(oBusbar, 'voltage', 0.0) or 1.0 for oBusbar in self.m_listBusbars])
+        mtxMagnitude = np.abs(self.m_mtxVoltage)
+        mtxDistortion = mtxMagnitude / arrFundamental[None, :] * 100.0
+        arrTHD = np.sqrt((mtxDistortion ** 2).sum(axis=0))
+        arrVoltSum = np.sqrt(arrFundamental ** 2 + (mtxMagnitude ** 2).sum(axis=0))
+        return mtxDistortion, arrTHD, arrVoltSum
+
+    @timed("harmonics.native.getandupdateharmonicresults")
+    def getandupdateharmonicresults(self):
+        """Writes THD (%), VoltSum (RMS voltage, pu), HarmVolts (kV per order) and Distortions (% per order) to the busbars"""
+        if self.m_mtxVoltage is None:
+            self.msg.AddError("Native harmonics: no results, run the harmonic analysis first.")
+            return False
+        mtxDistortion, arrTHD, arrVoltSum = self.getdistortions()
+        listOrders = self.m_arrOrders.tolist()
+        mtxMagnitude = np.abs(self.m_mtxVoltage)
+        for nBus, oBusbar in enumerate(self.m_listBusbars):
+            self._writebusbar(oBusbar, listOrders, mtxMagnitude[:, nBus], mtxDistortion[:, nBus], arrTHD[nBus], arrVoltSum[nBus])
+        return True
+
+    def getharmonicresults(self, oBusbar):
+        """Writes the harmonic results of one busbar"""
+        if self.m_mtxVoltage is None:
+            return False
+        nBus = gbl.DataModelManager.BusbarIdToIndex.get(oBusbar.BusID)
+        if nBus is None or nBus >= len(self.m_listBusbars):
+            return False
+        fFundamental = getattr(oBusbar, 'voltage', 0.0) or 1.0
+        arrMagnitude = np.abs(self.m_mtxVoltage[:, nBus])
+        arrDistortion = arrMagnitude / fFundamental * 100.0
+        self._writebusbar(oBusbar, self.m_arrOrders.tolist(), arrMagnitude, arrDistortion, math.sqrt((arrDistortion ** 2).sum()),
+                          math.sqrt(fFundamental ** 2 + (arrMagnitude ** 2).sum()))
+        return True
+
+    def getallharmonicresults(self):
+        return self.getandupdateharmonicresults()
+
+    def _writebusbar(self, oBusbar, listOrders, arrMagnitude, arrDistortion, fTHD, fVoltSum):
+        fKV = oBusbar.kV or 0.0
+        oBusbar.THD = float(fTHD)
+        oBusbar.VoltSum = float(fVoltSum)
+        oBusbar.HarmVolts = dict(zip(listOrders, (arrMagnitude * fKV).tolist()))
+        oBusbar.Distortions = dict(zip(listOrders, arrDistortion.tolist()))
+        oBusbar.HarmonicEngineModelUpdater = self
@@ -0,0 +1,344 @@
+# Native AC load flow engine working directly on the DataModel, no IPSA or PowerFactory needed.
+# Newton-Raphson in polar coordinates on the sparse bus admittance matrix. The grid infeed (slack busbar or external
+# grid) of every island holds its voltage and angle, busbars with generation hold their voltage (PV) until a reactive
+# limit is reached and then become PQ busbars, all other busbars are PQ. Islands without a source or generation are
+# left de-energised. The network, busbar types and Jacobian assembly are public so the continuation power flow of the
+# voltage stability study runs on the same solver.
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+from Code.Framework.BaseTemplates.EngineLoadFlowContainer import EngineLoadFlowContainer
+
+
+class EngineNativeLoadFlow(EngineLoadFlowContainer):
+    """Newton-Raphson AC load flow on the DataModel with reactive limits of the voltage controlling generators"""
+
+    BASE_MVA = 100.0
+    SOLVES_DATAMODEL = True
+    DEFAULT_REACTANCE_PU = 0.01
+    DEFAULT_TOLERANCE_PU = 1e-8
+    DEFAULT_MAX_ITERATIONS = 20
+    # Busbar types
+    PQ, PV, SLACK, DEAD = 0, 1, 2, 3
+
+    def __init__(self):
+        EngineLoadFlowContainer.__init__(self)
+        self.msg = gbl.Msg
+        self.m_oDataModel = None
+        # In service branches of the admittance matrix: Branch_TAB index, end busbars, series and half shunt admittance
+        self.m_arrBranchTab = None
+        self.m_arrFrom = None
+        self.m_arrTo = None
+        self.m_arrYSeries = None
+        self.m_arrYShunt = None
+        self.m_mtxY = None
+        # Per busbar: type as built and as switched by reactive limits, voltage set point, generation and demand
+        # (per unit) and reactive limits of the PV busbars
+        self.m_arrBaseType = None
+        self.m_arrType = None
+        self.m_arrVSet = None
+        self.m_arrSGen = None
+        self.m_arrSLoad = None
+        self.m_arrQMax = None
+        self.m_arrQMin = None
+        # Solution: complex busbar voltages (per unit) and the iterations of the last solve
+        self.m_arrVoltage = None
+        self.m_nIterations = 0
+        self.m_bConverged = False
+        self.m_tNetworkKey = None
+        self.m_bWarmStart = False
+
+    #__________________________ENGINE LOAD FLOW METHODS________________________
+    @timed("loadflow.native.runloadflow")
+    def runloadflow(self, tolerance=None, max_iterations=None, enforce_q_limits=True, **kwargs):
+        """Builds the admittance matrix from the DataModel and solves the AC load flow"""
+        self.m_dictLastRunSettings = dict(kwargs, tolerance=tolerance, max_iterations=max_iterations,
+                                          enforce_q_limits=enforce_q_limits)
+        oDataModel = gbl.DataModelManager
+        if oDataModel is None or not oDataModel.Busbar_TAB:
+            self.msg.AddError("Native load flow: the DataModel has no busbars.")
+            return False
+        arrPrevious = self.m_arrVoltage if self.m_bWarmStart else None
+        tNetworkKey = self._getnetworkkey(oDataModel)
+        if not (self.m_bWarmStart and tNetworkKey == self.m_tNetworkKey and self.m_mtxY is not None):
+            self.buildnetwork(oDataModel)
+            self.m_tNetworkKey = tNetworkKey
+            arrPrevious = None
+        self.m_arrType = self.m_arrBaseType.copy()
+        self.getinjections()
+        arrVoltage = self.getinitialvoltage(arrPrevious)
+        fTolerance = tolerance or self.DEFAULT_TOLERANCE_PU
+        nMaxIterations = max_iterations or self.DEFAULT_MAX_ITERATIONS
+        self.m_nIterations = 0
+        while True:
+            arrVoltage, self.m_bConverged, nIterations = self.solve(self.getspecifiedinjection(), arrVoltage,
+                                                                    fTolerance, nMaxIterations)
+            self.m_nIterations += nIterations
+            if not self.m_bConverged or not enforce_q_limits or not self.applyreactivelimits(arrVoltage):
+                break
+        self.m_arrVoltage = arrVoltage
+        if not self.m_bConverged:
+            self.msg.AddError(f"Native load flow did not converge in {nMaxIterations} iterations.")
+        return self.m_bConverged
+
+    def runloadflowtimestep(self, bWarmStart=False, **kwargs):
+        """Time series step, starting from the previous solution while the topology is unchanged"""
+        self.m_bWarmStart = bWarmStart
+        try:
+            return EngineLoadFlowContainer.runloadflowtimestep(self, bWarmStart, **kwargs)
+        finally:
+            self.m_bWarmStart = False
+
+    #__________________________NETWORK________________________
+    def buildnetwork(self, oDataModel=None):
+        """Builds the bus admittance matrix and the busbar types of the DataModel"""
+        oDataModel = oDataModel or gbl.DataModelManager
+        self.m_oDataModel = oDataModel
+        nBusbars = len(oDataModel.Busbar_TAB)
+        listTab, listFrom, listTo, listY, listB = [], [], [], [], []
+        for nBranchIdx, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = oDataModel.BusbarIdToIndex.get(oBranch.BusID1), oDataModel.BusbarIdToIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo:
+                continue
+            listTab.append(nBranchIdx)
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listY.append(1.0 / complex(abs(getattr(oBranch, 'R', 0.0) or 0.0),
+                                       abs(getattr(oBranch, 'X', 0.0) or 0.0) or self.DEFAULT_REACTANCE_PU))
+            listB.append((getattr(oBranch, 'B', 0.0) or 0.0) / 2.0)
+        self.m_arrBranchTab = np.array(listTab, dtype=np.int64)
+        self.m_arrFrom = np.array(listFrom, dtype=np.int64)
+        self.m_arrTo = np.array(listTo, dtype=np.int64)
+        self.m_arrYSeries = np.array(listY, dtype=np.complex128)
+        self.m_arrYShunt = 1j * np.array(listB, dtype=np.float64)
+        arrY, arrFrom, arrTo = self.m_arrYSeries, self.m_arrFrom, self.m_arrTo
+        arrDiagonal = arrY + self.m_arrYShunt
+        self.m_mtxY = sp.coo_matrix((np.concatenate([arrDiagonal, arrDiagonal, -arrY, -arrY]),
+                                     (np.concatenate([arrFrom, arrTo, arrFrom, arrTo]),
+                                      np.concatenate([arrFrom, arrTo, arrTo, arrFrom]))),
+                                    shape=(nBusbars, nBusbars)).tocsr()
+        self._setbusbartypes(oDataModel, nBusbars)
+        return True
+
+    def _setbusbartypes(self, oDataModel, nBusbars):
+        """Slack, PV, PQ and de-energised busbars with the voltage set points and reactive limits of the PV busbars"""
+        arrSource = np.array([bool(oBusbar.Slack) for oBusbar in oDataModel.Busbar_TAB], dtype=bool)
+        arrGenerating = np.zeros(nBusbars, dtype=bool)
+        arrGenMW = np.zeros(nBusbars)
+        self.m_arrVSet = np.ones(nBusbars)
+        self.m_arrQMax = np.zeros(nBusbars)
+        self.m_arrQMin = np.zeros(nBusbars)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is None or not oGen.ON:
+                continue
+            if oGen.IsExternalGrid:
+                arrSource[nBus] = True
+            else:
+                arrGenerating[nBus] = True
+                arrGenMW[nBus] += oGen.MW or 0.0
+                self.m_arrQMax[nBus] += oGen.Qmax / self.BASE_MVA
+                self.m_arrQMin[nBus] += oGen.Qmin / self.BASE_MVA
+            self.m_arrVSet[nBus] = oGen.VMagPu or 1.0
+        arrDisconnected = np.array([not oBusbar.ON or bool(oBusbar.Disconnected) for oBusbar in oDataModel.Busbar_TAB])
+        # Islands are energised by a grid infeed, else by their largest generator
+        _, arrIsland = connected_components(abs(self.m_mtxY), directed=False)
+        arrIsland = np.where(arrDisconnected, -1 - np.arange(nBusbars), arrIsland)
+        arrSource &= ~arrDisconnected
+        arrGenerating &= ~arrDisconnected
+        arrType = np.full(nBusbars, self.DEAD, dtype=np.int8)
+        arrEnergised = np.isin(arrIsland, arrIsland[arrSource | arrGenerating])
+        arrType[arrEnergised] = self.PQ
+        arrType[arrGenerating] = self.PV
+        arrType[arrSource & np.isin(arrIsland, arrIsland[arrSource])] = self.SLACK
+        for nIsland in np.unique(arrIsland[arrGenerating & ~np.isin(arrIsland, arrIsland[arrSource])]).tolist():
+            arrCandidates = np.flatnonzero((arrIsland == nIsland) & arrGenerating)
+            arrType[arrCandidates[np.argmax(arrGenMW[arrCandidates])]] = self.SLACK
+        self.m_arrBaseType = arrType
+        self.m_arrType = arrType.copy()
+        return True
+
+    def getinjections(self):
+        """Generation and demand of every busbar in per unit, external grids take up the slack"""
+        oDataModel = self.m_oDataModel
+        nBusbars = len(oDataModel.Busbar_TAB)
+        self.m_arrSGen = np.zeros(nBusbars, dtype=np.complex128)
+        self.m_arrSLoad = np.zeros(nBusbars, dtype=np.complex128)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON and not oGen.IsExternalGrid:
+                self.m_arrSGen[nBus] += complex(oGen.MW or 0.0, oGen.MVar or 0.0) / self.BASE_MVA
+        for oLoad in oDataModel.Load_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oLoad.BusID)
+            if nBus is not None and oLoad.ON:
+                self.m_arrSLoad[nBus] += complex(oLoad.MW or 0.0, oLoad.MVar or 0.0) / self.BASE_MVA
+        return True
+
+    def getspecifiedinjection(self):
+        return self.m_arrSGen - self.m_arrSLoad
+
+    def getinitialvoltage(self, arrPrevious=None):
+        """Flat start at the voltage set points, or the previous solution of the same network"""
+        if arrPrevious is not None and len(arrPrevious) == len(self.m_arrType):
+            arrVoltage = np.abs(arrPrevious) * np.exp(1j * np.angle(arrPrevious))
+            arrHeld = self.m_arrType == self.PV
+            arrVoltage[arrHeld] = self.m_arrVSet[arrHeld] * np.exp(1j * np.angle(arrPrevious[arrHeld]))
+        else:
+            arrVoltage = np.ones(len(self.m_arrType), dtype=np.complex128)
+            arrHeld = (self.m_arrType == self.PV) | (self.m_arrType == self.SLACK)
+            arrVoltage[arrHeld] = self.m_arrVSet[arrHeld]
+        arrVoltage[self.m_arrType == self.DEAD] = 0.0
+        return arrVoltage
+
+    def getunknowns(self):
+        """Busbars with an unknown angle (PV and PQ) and with an unknown voltage magnitude (PQ)"""
+        arrPQ = np.flatnonzero(self.m_arrType == self.PQ)
+        arrPVPQ = np.flatnonzero((self.m_arrType == self.PV) | (self.m_arrType == self.PQ))
+        return arrPVPQ, arrPQ
+
+    #__________________________NEWTON-RAPHSON________________________
+    def getmismatch(self, arrVoltage, arrSpecified, arrPVPQ, arrPQ):
+        """Active power mismatch of the PV and PQ busbars followed by the reactive mismatch of the PQ busbars"""
+        arrMismatch = arrVoltage * np.conj(self.m_mtxY @ arrVoltage) - arrSpecified
+        return np.concatenate([arrMismatch[arrPVPQ].real, arrMismatch[arrPQ].imag])
+
+    def getjacobian(self, arrVoltage, arrPVPQ, arrPQ):
+        """Sparse Jacobian of the mismatch to the angles of the PV and PQ busbars and the magnitudes of the PQ busbars"""
+        mtxY = self.m_mtxY
+        arrCurrent = mtxY @ arrVoltage
+        arrMagnitude = np.abs(arrVoltage)
+        mtxV = sp.diags(arrVoltage)
+        mtxUnit = sp.diags(arrVoltage / np.where(arrMagnitude > 0, arrMagnitude, 1.0))
+        mtxdSdVm = mtxV @ (mtxY @ mtxUnit).conj() + sp.diags(np.conj(arrCurrent)) @ mtxUnit
+        mtxdSdVa = 1j * mtxV @ (sp.diags(arrCurrent) - mtxY @ mtxV).conj()
+        mtxdSdVa, mtxdSdVm = mtxdSdVa.tocsr(), mtxdSdVm.tocsr()
+        return sp.bmat([[mtxdSdVa[arrPVPQ][:, arrPVPQ].real, mtxdSdVm[arrPVPQ][:, arrPQ].real],
+                        [mtxdSdVa[arrPQ][:, arrPVPQ].imag, mtxdSdVm[arrPQ][:, arrPQ].imag]], format="csc")
+
+    @staticmethod
+    def updatevoltage(arrVoltage, arrStep, arrPVPQ, arrPQ):
+        """Voltages after a Newton step on the angles and magnitudes"""
+        arrAngle = np.angle(arrVoltage)
+        arrMagnitude = np.abs(arrVoltage)
+        arrAngle[arrPVPQ] += arrStep[:len(arrPVPQ)]
+        arrMagnitude[arrPQ] += arrStep[len(arrPVPQ):]
+        return arrMagnitude * np.exp(1j * arrAngle)
+
+    def solve(self, arrSpecified, arrVoltage, fTolerance=None, nMaxIterations=None):
+        """Newton-Raphson iterations from arrVoltage, returns the voltages, convergence and the iterations taken"""
+        fTolerance = fTolerance or self.DEFAULT_TOLERANCE_PU
+        nMaxIterations = nMaxIterations or self.DEFAULT_MAX_ITERATIONS
+        arrPVPQ, arrPQ = self.getunknowns()
+        arrVoltage = np.array(arrVoltage, dtype=np.complex128)
+        for nIteration in range(nMaxIterations + 1):
+            arrMismatch = self.getmismatch(arrVoltage, arrSpecified, arrPVPQ, arrPQ)
+            if not len(arrMismatch) or np.max(np.abs(arrMismatch)) < fTolerance:
+                return arrVoltage, True, nIteration
+            if nIteration == nMaxIterations or not np.all(np.isfinite(arrMismatch)):
+                break
+            try:
+                arrStep = splu(self.getjacobian(arrVoltage, arrPVPQ, arrPQ)).solve(-arrMismatch)
+            except RuntimeError:
+                break
+            arrVoltage = self.updatevoltage(arrVoltage, arrStep, arrPVPQ, arrPQ)
+        return arrVoltage, False, nIteration
+
+    def getgenerationreactive(self, arrVoltage):
+        """Reactive generation of every busbar at the solution (per unit)"""
+        return (arrVoltage * np.conj(self.m_mtxY @ arrVoltage)).imag + self.m_arrSLoad.imag
+
+    def applyreactivelimits(self, arrVoltage):
+        """Turns PV busbars past their reactive limits into PQ busbars held at the limit, True if any changed"""
+        arrQ = self.getgenerationreactive(arrVoltage)
+        arrPV = self.m_arrType == self.PV
+        arrAbove = arrPV & (arrQ > self.m_arrQMax + 1e-9)
+        arrBelow = arrPV & (arrQ < self.m_arrQMin - 1e-9)
+        if not (arrAbove.any() or arrBelow.any()):
+            return False
+        self.m_arrSGen[arrAbove] = self.m_arrSGen[arrAbove].real + 1j * self.m_arrQMax[arrAbove]
+        self.m_arrSGen[arrBelow] = self.m_arrSGen[arrBelow].real + 1j * self.m_arrQMin[arrBelow]
+        self.m_arrType[arrAbove | arrBelow] = self.PQ
+        return True
+
+    def _getnetworkkey(self, oDataModel):
+        """Topology and impedances of the DataModel, an unchanged key lets time steps skip the network build"""
+        return (len(oDataModel.Busbar_TAB), tuple((oBranch.BusID1, oBranch.BusID2, oBranch.ON, getattr(oBranch, 'R', 0.0),
+                                                   getattr(oBranch, 'X', 0.0), getattr(oBranch, 'B', 0.0))
+                                                  for oBranch in oDataModel.Branch_TAB),
+                tuple((oGen.BusID, oGen.ON, oGen.IsExternalGrid, oGen.VMagPu) for oGen in oDataModel.Gen_TAB))
+
+    #__________________________RESULT WRITE BACK________________________
+    def getandupdatebusbarloadflowresults(self):
+        arrMagnitude, arrAngle = np.abs(self.m_arrVoltage), np.degrees(np.angle(self.m_arrVoltage))
+        for oBusbar, fMagnitude, fAngle in zip(self.m_oDataModel.Busbar_TAB, arrMagnitude.tolist(), arrAngle.tolist()):
+            oBusbar.voltage = fMagnitude
+            oBusbar.angle = fAngle
+            oBusbar.LoadFlowResults = True
+        return True
+
+    def getandupdatelineloadflowresults(self):
+        oBranchTab = self.m_oDataModel.Branch_TAB
+        arrV = self.m_arrVoltage
+        arrVFrom, arrVTo = arrV[self.m_arrFrom], arrV[self.m_arrTo]
+        arrSeries = self.m_arrYSeries * (arrVFrom - arrVTo)
+        arrSFrom = arrVFrom * np.conj(arrSeries + self.m_arrYShunt * arrVFrom) * self.BASE_MVA
+        arrSTo = arrVTo * np.conj(-arrSeries + self.m_arrYShunt * arrVTo) * self.BASE_MVA
+        arrLoss = arrSFrom + arrSTo
+        # Loading against the active rating set, from the larger end flow
+        oRatings = self.m_oDataModel.getratingengine(bRefresh=True)
+        arrFlowMVA = np.full(len(oBranchTab), np.nan)
+        arrFlowMVA[self.m_arrBranchTab] = np.maximum(np.abs(arrSFrom), np.abs(arrSTo))
+        oRatings.setflows(arrFlowMVA)
+        oRatings.updateloading()
+        for nPos, nBranchIdx in enumerate(self.m_arrBranchTab.tolist()):
+            oBranch = oBranchTab[nBranchIdx]
+            oBranch.lossMW = float(arrLoss[nPos].real)
+            oBranch.lossMVAr = float(arrLoss[nPos].imag)
+        return True
+
+    def getandupdatetransformerflowresults(self):
+        # Transformers are held on Branch_TAB and updated with the lines
+        return True
+
+    def getandupdateloadflowgeneratorresults(self):
+        """Scheduled output of the generators, the slack and reactive output of a busbar shared between its machines"""
+        oDataModel = self.m_oDataModel
+        arrSolved = self.m_arrVoltage * np.conj(self.m_mtxY @ self.m_arrVoltage) + self.m_arrSLoad
+        dictShared = {}
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON and self.m_arrType[nBus] != self.DEAD:
+                dictShared.setdefault(nBus, []).append(oGen)
+        for oGen in oDataModel.Gen_TAB:
+            oGen.MWLoadFlow = oGen.MVarLoadFlow = 0.0
+        for nBus, listGens in dictShared.items():
+            listGrids = [oGen for oGen in listGens if oGen.IsExternalGrid]
+            fScheduled = sum((oGen.MW or 0.0) for oGen in listGens if not oGen.IsExternalGrid)
+            for oGen in listGens:
+                if oGen.IsExternalGrid:
+                    oGen.MWLoadFlow = float(arrSolved[nBus].real * self.BASE_MVA - fScheduled) / len(listGrids)
+                else:
+                    oGen.MWLoadFlow = float(oGen.MW or 0.0) if listGrids or self.m_arrType[nBus] != self.SLACK \
+                        else float(arrSolved[nBus].real * self.BASE_MVA) / len(listGens)
+                oGen.MVarLoadFlow = float(arrSolved[nBus].imag * self.BASE_MVA) / len(listGens)
+        return True
+
+    @timed("loadflow.native.getallloadflowresults")
+    def getallloadflowresults(self):
+        if self.m_arrVoltage is None:
+            self.msg.AddError("Native load flow: no results, run the load flow first.")
+            return False
+        bOK = self.getandupdatebusbarloadflowresults()
+        if bOK:
+            bOK = self.getandupdatelineloadflowresults()
+        if bOK:
+            bOK = self.getandupdatetransformerflowresults()
+        if bOK:
+            bOK = self.getandupdateloadflowgeneratorresults()
+        return bOK
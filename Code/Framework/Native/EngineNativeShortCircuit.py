@@ -0,0 +1,439 @@
+# Native IEC 60909 style short circuit engine working directly on the DataModel, no IPSA or PowerFactory needed.
+# Builds the positive and zero sequence bus admittance matrices, factorises each once and takes the fault impedance of
+# every busbar from the diagonal of Zbus = Y^-1. The diagonal comes from a selected inversion on the pattern of the
+# sparse LU factors, so Zbus is never formed as a dense matrix. Individual faults (fault sweeps) reuse the same
+# factors: one forward/back substitution gives the Zbus column of a fault point.
+# Limitation: every fault is treated as far from generator (IEC 60909 mu = lambda = 1), so the breaking and steady
+# state currents reported are the initial symmetrical current Ik''. Near generator faults decay in reality, so these
+# values are an upper bound there.
+import math
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+from Code.Framework.BaseTemplates.EngineShortCircuitContainer import EngineShortCircuitContainer
+
+
+class EngineNativeShortCircuit(EngineShortCircuitContainer):
+    """Three phase and single phase fault levels of all busbars from the sparse Zbus diagonal"""
+
+    BASE_MVA = 100.0
+    SOLVES_DATAMODEL = True
+    # IEC 60909 voltage factor c for maximum fault levels above 1 kV
+    VOLTAGE_FACTOR = 1.1
+    # Defaults for data the DataModel does not carry
+    DEFAULT_REACTANCE_PU = 0.01
+    DEFAULT_SUBTRANSIENT_REACTANCE_PU = 0.2
+    DEFAULT_EXTERNAL_GRID_MVA = 10000.0
+    DEFAULT_ZERO_SEQUENCE_RATIO = 3.0
+    # Source impedance angles: R/X of 0.1 for network feeders and 0.05 for machines
+    SOURCE_IMPEDANCE_ANGLE = complex(0.1, 1.0) / abs(complex(0.1, 1.0))
+    MACHINE_RX_RATIO = 0.05
+    # Admittance to earth added at every busbar so unfed islands give (near) zero fault current instead of a singular matrix
+    EARTH_LEAKAGE_PU = 1e-8
+    # Phase operator a = 1 at 120 degrees
+    PHASE_OPERATOR = complex(-0.5, math.sqrt(3.0) / 2.0)
+
+    def __init__(self, fVoltageFactor=None, nBlockSize=256):
+        EngineShortCircuitContainer.__init__(self)
+        self.m_fVoltageFactor = fVoltageFactor or self.VOLTAGE_FACTOR
+        self.m_nBlockSize = max(1, int(nBlockSize))
+        self.m_listBusbars = []
+        # Factorised positive and zero sequence admittance matrices, kept for fault sweeps on the same network
+        self.m_oFactor1 = None
+        self.m_oFactor0 = None
+        # Zbus diagonals, per unit on BASE_MVA
+        self.m_arrZ1 = None
+        self.m_arrZ0 = None
+        self.m_arrBusOn = None
+        self.m_listGenSources = []
+        # In service branches of the admittance matrices: Branch_TAB index, end busbars and series admittances
+        self.m_arrBranchTab = None
+        self.m_arrBranchFrom = None
+        self.m_arrBranchTo = None
+        self.m_arrBranchY1 = None
+        self.m_arrBranchY0 = None
+        # Branch_TAB index -> position in the arrays above, -1 for branches not in the matrices
+        self.m_arrBranchPosition = None
+
+    #__________________________ENGINE SHORT CIRCUIT METHODS________________________
+    @timed("shortcircuit.native.runshortcircuitanalysisforallbusbars")
+    def runshortcircuitanalysisforallbusbars(self):
+        """Builds and factorises the sequence admittance matrices and computes the Zbus diagonals"""
+        if self.factorisenetwork() is None:
+            return False
+        try:
+            self.m_arrZ1 = self.getzbusdiagonal(self.m_oFactor1)
+            self.m_arrZ0 = self.getzbusdiagonal(self.m_oFactor0)
+        except RuntimeError as e:
+            self.msg.AddError(f"Native short circuit: Zbus diagonal failed: {e}")
+            return False
+        return True
+
+    def factorisenetwork(self):
+        """Builds and factorises the sequence admittance matrices of the DataModel, returns them or None on failure"""
+        oDataModel = gbl.DataModelManager
+        self.m_listBusbars = list(oDataModel.Busbar_TAB)
+        self.m_arrZ1 = self.m_arrZ0 = None
+        if not self.m_listBusbars:
+            self.msg.AddError("Native short circuit: the DataModel has no busbars.")
+            return None
+        try:
+            mtxY1, mtxY0 = self.buildsequenceadmittances(oDataModel)
+            self.m_oFactor1 = self.factorise(mtxY1)
+            self.m_oFactor0 = self.factorise(mtxY0)
+        except RuntimeError as e:
+            self.m_oFactor1 = self.m_oFactor0 = None
+            self.msg.AddError(f"Native short circuit: admittance matrix factorisation failed: {e}")
+            return None
+        return mtxY1, mtxY0
+
+    def buildsequenceadmittances(self, oDataModel):
+        """Returns the positive and zero sequence bus admittance matrices (per unit, sparse)"""
+        nBusbars = len(oDataModel.Busbar_TAB)
+        dictIndex = oDataModel.BusbarIdToIndex
+        self.m_arrBusOn = np.array([bool(oBusbar.ON) and not oBusbar.Disconnected for oBusbar in oDataModel.Busbar_TAB])
+        listTab, listFrom, listTo, listY1, listY0 = [], [], [], [], []
+        for nBranchIdx, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = dictIndex.get(oBranch.BusID1), dictIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo or not (self.m_arrBusOn[nFrom] and self.m_arrBusOn[nTo]):
+                continue
+            fR = abs(getattr(oBranch, 'R', 0.0) or 0.0)
+            fX = abs(getattr(oBranch, 'X', 0.0) or 0.0) or self.DEFAULT_REACTANCE_PU
+            fR0, fX0 = getattr(oBranch, 'R0', None), getattr(oBranch, 'X0', None)
+            cZ0 = complex(fR0 or 0.0, fX0) if fX0 else self.DEFAULT_ZERO_SEQUENCE_RATIO * complex(fR, fX)
+            listTab.append(nBranchIdx)
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listY1.append(1.0 / complex(fR, fX))
+            listY0.append(1.0 / cZ0)
+        self.m_arrBranchTab = np.array(listTab, dtype=np.int64)
+        self.m_arrBranchFrom = np.array(listFrom, dtype=np.int64)
+        self.m_arrBranchTo = np.array(listTo, dtype=np.int64)
+        self.m_arrBranchY1 = np.array(listY1, dtype=np.complex128)
+        self.m_arrBranchY0 = np.array(listY0, dtype=np.complex128)
+        self.m_arrBranchPosition = np.full(len(oDataModel.Branch_TAB), -1, dtype=np.int64)
+        self.m_arrBranchPosition[self.m_arrBranchTab] = np.arange(len(listTab))
+        arrShunt1 = np.full(nBusbars, self.EARTH_LEAKAGE_PU, dtype=np.complex128)
+        arrShunt0 = arrShunt1.copy()
+        self.m_listGenSources = []
+        for nGenIdx, oGen in enumerate(oDataModel.Gen_TAB):
+            nBus = dictIndex.get(oGen.BusID)
+            if nBus is None or not oGen.ON or not self.m_arrBusOn[nBus]:
+                continue
+            cY1, cY0 = self.getsourceadmittances(oGen)
+            if cY1 == 0:
+                continue
+            arrShunt1[nBus] += cY1
+            arrShunt0[nBus] += cY0
+            self.m_listGenSources.append((nGenIdx, nBus, cY1))
+        return (self._assemble(nBusbars, listFrom, listTo, listY1, arrShunt1),
+                self._assemble(nBusbars, listFrom, listTo, listY0, arrShunt0))
+
+    def getsourceadmittances(self, oGen):
+        """Positive and zero sequence admittance of a source on the system base"""
+        if oGen.IsExternalGrid:
+            # Network feeder: Z = c * Sbase / Sk''
+            fFaultLevelMVA = getattr(oGen, 'FaultLevelMVA', 0.0) or self.DEFAULT_EXTERNAL_GRID_MVA
+            cZ = self.m_fVoltageFactor * self.BASE_MVA / fFaultLevelMVA * self.SOURCE_IMPEDANCE_ANGLE
+            return 1.0 / cZ, 1.0 / cZ
+        fRatedMVA = oGen.RatedMVA or (oGen.MWCapacity or oGen.MW or 0.0) / 0.95
+        if fRatedMVA <= 0:
+            return 0j, 0j
+        fXdpp = getattr(oGen, 'Xdpp', 0.0) or self.DEFAULT_SUBTRANSIENT_REACTANCE_PU
+        cY1 = 1.0 / complex(self.MACHINE_RX_RATIO * fXdpp, fXdpp) * fRatedMVA / self.BASE_MVA
+        # Machines are assumed to be connected through delta windings unless an earthed zero sequence reactance is given
+        fX0 = getattr(oGen, 'X0', 0.0)
+        cY0 = 1.0 / complex(0.0, fX0) * fRatedMVA / self.BASE_MVA if fX0 else 0j
+        return cY1, cY0
+
+    @staticmethod
+    def _assemble(nBusbars, listFrom, listTo, listY, arrShunt):
+        """Assembles Y = A^T diag(y) A + diag(shunt) from the branch list"""
+        arrFrom = np.array(listFrom, dtype=np.int64)
+        arrTo = np.array(listTo, dtype=np.int64)
+        arrY = np.array(listY, dtype=np.complex128)
+        arrDiagonal = np.arange(nBusbars)
+        return sp.coo_matrix((np.concatenate([arrY, arrY, -arrY, -arrY, arrShunt]),
+                              (np.concatenate([arrFrom, arrTo, arrFrom, arrTo, arrDiagonal]),
+                               np.concatenate([arrFrom, arrTo, arrTo, arrFrom, arrDiagonal]))),
+                             shape=(nBusbars, nBusbars)).tocsc()
+
+    def factorise(self, mtxY):
+        """LU factors of Y with a fill reducing symmetric ordering"""
+        return splu(mtxY, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+
+    def getzbusdiagonal(self, oFactor):
+        """
+        Diagonal of Zbus = Y^-1 by selected inversion (Takahashi recurrences) on the stored factors: Y is complex
+        symmetric, so when the rows were pivoted in the fill reducing column order Y = L D L^T in that order, and Z is
+        evaluated only on the pattern of L, column by column from the last. Falls back to solving blocks of unit
+        vectors if the factors do not have that form.
+        """
+        nBusbars = oFactor.shape[0]
+        if not np.array_equal(oFactor.perm_r, oFactor.perm_c):
+            return self._solvezbusdiagonal(oFactor)
+        arrOrder = np.argsort(oFactor.perm_c)
+        arrNatural = np.arange(nBusbars)
+        mtxL = oFactor.L.tocsc()
+        mtxL.sort_indices()
+        arrD = oFactor.U.diagonal()
+        arrIndptr, arrRows, arrL = mtxL.indptr, mtxL.indices, mtxL.data
+        arrDiagonalPos = arrIndptr[:-1]
+        if not np.array_equal(arrRows[arrDiagonalPos], arrNatural):
+            return self._solvezbusdiagonal(oFactor)
+        # Entries of L (and of Z on the same pattern) located by column * n + row, which is sorted in CSC order
+        arrKeys = np.repeat(arrNatural.astype(np.int64), np.diff(arrIndptr)) * nBusbars + arrRows
+        arrZ = np.zeros(len(arrL), dtype=np.complex128)
+        for nColumn in range(nBusbars - 1, -1, -1):
+            nStart, nEnd = arrIndptr[nColumn] + 1, arrIndptr[nColumn + 1]
+            if nStart == nEnd:
+                arrZ[arrDiagonalPos[nColumn]] = 1.0 / arrD[nColumn]
+                continue
+            arrJ = arrRows[nStart:nEnd]
+            arrLColumn = arrL[nStart:nEnd]
+            # Z[J, J] is already known: the pattern of L is closed under elimination
+            arrQuery = np.minimum.outer(arrJ, arrJ).astype(np.int64) * nBusbars + np.maximum.outer(arrJ, arrJ)
+            arrPos = np.searchsorted(arrKeys, arrQuery)
+            if not np.array_equal(arrKeys[np.minimum(arrPos, len(arrKeys) - 1)], arrQuery):
+                return self._solvezbusdiagonal(oFactor)
+            arrZColumn = -(arrZ[arrPos] @ arrLColumn)
+            arrZ[nStart:nEnd] = arrZColumn
+            arrZ[arrDiagonalPos[nColumn]] = 1.0 / arrD[nColumn] - arrLColumn @ arrZColumn
+        arrDiagonal = np.empty(nBusbars, dtype=np.complex128)
+        arrDiagonal[arrOrder] = arrZ[arrDiagonalPos]
+        return arrDiagonal
+
+    def _solvezbusdiagonal(self, oFactor):
+        """Diagonal of Y^-1 by solving blocks of unit vectors, memory stays O(n * block)"""
+        nBusbars = oFactor.shape[0]
+        arrDiagonal = np.empty(nBusbars, dtype=np.complex128)
+        for nStart in range(0, nBusbars, self.m_nBlockSize):
+            nEnd = min(nStart + self.m_nBlockSize, nBusbars)
+            arrColumns = np.arange(nStart, nEnd)
+            mtxUnit = np.zeros((nBusbars, nEnd - nStart), dtype=np.complex128)
+            mtxUnit[arrColumns, arrColumns - nStart] = 1.0
+            arrDiagonal[nStart:nEnd] = oFactor.solve(mtxUnit)[arrColumns, arrColumns - nStart]
+        return arrDiagonal
+
+    #__________________________BUSBAR SHORT CIRCUIT RESULTS METHODS________________________
+    @timed("shortcircuit.native.getandupdateshortcircuitresults")
+    def getandupdateshortcircuitresults(self):
+        """Writes the three phase and single phase fault levels onto every busbar. Faults are taken as far from generator,
+        so the breaking and steady state currents are written equal to the initial current (see the module notes)."""
+        if self.m_arrZ1 is None:
+            self.msg.AddError("Native short circuit: no results, run the short circuit analysis first.")
+            return False
+        fC = self.m_fVoltageFactor
+        arrKV = np.array([oBusbar.kV or 0.0 for oBusbar in self.m_listBusbars], dtype=np.float64)
+        arrValid = self.m_arrBusOn & (arrKV > 0)
+        if not arrValid.all():
+            self.msg.AddWarning(f"Native short circuit: {int((~arrValid).sum())} busbars are out of service or have "
+                                "no voltage and get zero fault levels.")
+        arrKV = np.where(arrValid, arrKV, 1.0)
+        arrBaseKA = self.BASE_MVA / (math.sqrt(3.0) * arrKV)
+        arrZ1 = self.m_arrZ1
+        # Three phase: Ik'' = c / |Z1|, Sk'' = c * Sbase / |Z1|
+        arrIk = np.where(arrValid, fC / np.abs(arrZ1) * arrBaseKA, 0.0)
+        arrSk = np.where(arrValid, fC * self.BASE_MVA / np.abs(arrZ1), 0.0)
+        # Peak current, method B: ip = 1.15 * kappa * sqrt(2) * Ik'' with 1.15 * kappa capped at 2.0
+        arrRX = np.abs(arrZ1.real) / np.maximum(np.abs(arrZ1.imag), 1e-12)
+        arrKappa = np.minimum(1.15 * (1.02 + 0.98 * np.exp(-3.0 * arrRX)), 2.0)
+        arrIp = arrKappa * math.sqrt(2.0) * arrIk
+        # Single phase to earth: Ik1 = 3c / |2 Z1 + Z0|
+        arrIk1 = np.where(arrValid, 3.0 * fC / np.abs(2.0 * arrZ1 + self.m_arrZ0) * arrBaseKA, 0.0)
+        arrZOhm = arrZ1 * np.where(arrValid, arrKV ** 2 / self.BASE_MVA, 0.0)
+        for nIndex, oBusbar in enumerate(self.m_listBusbars):
+            # Far from generator (mu = lambda = 1): the breaking and steady state currents equal the initial current
+            oBusbar.initialshortcircuitcurrent = float(arrIk[nIndex])
+            oBusbar.initialshortcircuitmva = float(arrSk[nIndex])
+            oBusbar.peakshortcircuitcurrent = float(arrIp[nIndex])
+            oBusbar.breakingshortcircuitcurrent = float(arrIk[nIndex])
+            oBusbar.breakingshortcircuitmva = float(arrSk[nIndex])
+            oBusbar.steadystateshortcircuitcurrent = float(arrIk[nIndex])
+            oBusbar.steadystateshortcircuitmva = float(arrSk[nIndex])
+            oBusbar.singlephaseshortcircuitcurrent = float(arrIk1[nIndex])
+            oBusbar.realshortcircuitimpedance = float(arrZOhm[nIndex].real)
+            oBusbar.imaginaryshortcircuitimpedance = float(arrZOhm[nIndex].imag)
+            oBusbar.shortcircuitresults = bool(arrValid[nIndex])
+        return True
+
+    def getallshortcircuitresults(self):
+        """Writes the busbar fault levels and the generator contributions"""
+        bOK = self.getandupdateshortcircuitresults()
+        if bOK:
+            bOK = self.getgenshortcircuitcontributions()
+        return bOK
+
+    def getgenshortcircuitcontributions(self):
+        """Contribution of every source to a three phase fault at its own busbar"""
+        if self.m_arrZ1 is None:
+            self.msg.AddError("Native short circuit: no results, run the short circuit analysis first.")
+            return False
+        if not self.m_listGenSources:
+            self.setgencontributiontable([], {strColumn: [] for strColumn in self.GEN_CONTRIBUTION_COLUMNS})
+            return True
+        arrGenIndex, arrBus, arrY1 = (np.array(listColumn) for listColumn in zip(*self.m_listGenSources))
+        arrKV = np.array([self.m_listBusbars[nBus].kV or 0.0 for nBus in arrBus.tolist()], dtype=np.float64)
+        # The faulted busbar is at zero volts, so every source drives c / Z_source into the fault
+        arrIkPu = self.m_fVoltageFactor * arrY1.astype(np.complex128)
+        arrIk = np.where(arrKV > 0, np.abs(arrIkPu) * self.BASE_MVA / (math.sqrt(3.0) * np.where(arrKV > 0, arrKV, 1.0)), 0.0)
+        arrKappa = 1.02 + 0.98 * np.exp(-3.0 * np.abs(arrIkPu.real) / np.maximum(np.abs(arrIkPu.imag), 1e-12))
+        self.setgencontributiontable(arrGenIndex, {"skss": np.abs(arrIkPu) * self.BASE_MVA, "ikss": arrIk,
+                                                   "ikss_angle": np.degrees(np.angle(arrIkPu)),
+                                                   "ip": arrKappa * math.sqrt(2.0) * arrIk})
+        return True
+
+    #__________________________INDIVIDUAL FAULTS________________________
+    def preparefaults(self):
+        """Factorises the current network once for the faults that follow"""
+        return self.factorisenetwork() is not None
+
+    @timed("shortcircuit.native.runfaults")
+    def runfaults(self, dictLocations, listFaultTypes=None):
+        """
+        Runs individual faults with the factors of the last analysis, factorising the network only if there are none.
+        A busbar fault is at the busbar. A branch fault at fraction a of branch i-j is a new node splitting the branch:
+        its Zbus column is (1 - a) Z[:, i] + a Z[:, j] and its self impedance adds a (1 - a) z. The Zbus columns of a
+        block of fault points are one solve against the stored factors. Currents follow the IEC 60909 equivalent
+        source c at the fault, negative sequence impedances are taken equal to the positive sequence ones.
+        """
+        listFaultTypes = list(listFaultTypes or self.FAULT_TYPES)
+        for strType in listFaultTypes:
+            if strType not in self.FAULT_TYPES:
+                self.msg.AddError(f"Native short circuit: unknown fault type {strType}.")
+                return None
+        if self.m_oFactor1 is None and self.factorisenetwork() is None:
+            return None
+        arrBus = np.asarray(dictLocations["bus"], dtype=np.int64)
+        nLocations = len(arrBus)
+        arrBranch = np.asarray(dictLocations.get("branch", np.full(nLocations, -1)), dtype=np.int64)
+        arrFraction = np.clip(np.asarray(dictLocations.get("fraction", np.zeros(nLocations)), dtype=np.float64), 0.0, 1.0)
+        arrPtr = np.asarray(dictLocations.get("contribution_ptr", np.zeros(nLocations + 1)), dtype=np.int64)
+        arrContribution = np.asarray(dictLocations.get("contribution_branch", []), dtype=np.int64)
+        # Fault point of every location: the busbar, or the point at fraction a from BusID1 along the branch
+        bBranchFault = arrBranch >= 0
+        arrPos = np.full(nLocations, -1, dtype=np.int64)
+        if len(self.m_arrBranchTab):
+            arrPos[bBranchFault] = self.m_arrBranchPosition[arrBranch[bBranchFault]]
+        arrSafePos = np.maximum(arrPos, 0)
+        bInMatrix = arrPos >= 0
+        arrNodeI = np.where(bInMatrix, self.m_arrBranchFrom[arrSafePos] if len(self.m_arrBranchTab) else 0, arrBus)
+        arrNodeJ = np.where(bInMatrix, self.m_arrBranchTo[arrSafePos] if len(self.m_arrBranchTab) else 0, arrBus)
+        arrA = np.where(bInMatrix, arrFraction, 0.0)
+        arrKV = np.array([oBusbar.kV or 0.0 for oBusbar in self.m_listBusbars], dtype=np.float64)
+        arrBaseKA = self.BASE_MVA / (math.sqrt(3.0) * np.where(arrKV > 0, arrKV, 1.0))
+        arrNear = np.where(arrA <= 0.5, arrNodeI, arrNodeJ)
+        arrValid = (~bBranchFault | bInMatrix) & self.m_arrBusOn[arrNodeI] & (arrKV[arrNear] > 0)
+        if not arrValid.all():
+            self.msg.AddWarning(f"Native short circuit: {int((~arrValid).sum())} fault locations are out of service "
+                                "or have no voltage and get no results.")
+        dictFaults, dictContributions = {}, {}
+        for nStart in range(0, nLocations, self.m_nBlockSize):
+            nEnd = min(nStart + self.m_nBlockSize, nLocations)
+            self._runfaultblock(slice(nStart, nEnd), arrNodeI, arrNodeJ, arrA, arrPos, arrNear, arrValid, arrBaseKA,
+                                arrKV, arrPtr, arrContribution, listFaultTypes, dictFaults, dictContributions)
+        return {"faults": self._concatenatecolumns(dictFaults, self.FAULT_COLUMNS),
+                "contributions": self._concatenatecolumns(dictContributions, self.CONTRIBUTION_COLUMNS)}
+
+    def _runfaultblock(self, oSlice, arrNodeI, arrNodeJ, arrA, arrPos, arrNear, arrValid, arrBaseKA, arrKV, arrPtr,
+                       arrContribution, listFaultTypes, dictFaults, dictContributions):
+        """Runs every fault type at one block of fault locations, appending the result columns"""
+        nBusbars = len(self.m_listBusbars)
+        arrNodeI, arrNodeJ, arrA, arrPos = arrNodeI[oSlice], arrNodeJ[oSlice], arrA[oSlice], arrPos[oSlice]
+        arrNear, arrValid = arrNear[oSlice], arrValid[oSlice]
+        arrColumns = np.arange(len(arrNodeI))
+        arrLocation = arrColumns + oSlice.start
+        mtxRHS = np.zeros((nBusbars, len(arrColumns)), dtype=np.complex128)
+        np.add.at(mtxRHS, (arrNodeI, arrColumns), 1.0 - arrA)
+        np.add.at(mtxRHS, (arrNodeJ, arrColumns), arrA)
+        mtxZ1 = self.m_oFactor1.solve(mtxRHS)
+        mtxZ0 = self.m_oFactor0.solve(mtxRHS)
+        bBranch = arrPos >= 0
+        arrSafePos = np.maximum(arrPos, 0)
+        arrZBranch1 = np.where(bBranch, 1.0 / self.m_arrBranchY1[arrSafePos], 0.0) if bBranch.any() else np.zeros(len(arrPos))
+        arrZBranch0 = np.where(bBranch, 1.0 / self.m_arrBranchY0[arrSafePos], 0.0) if bBranch.any() else np.zeros(len(arrPos))
+        arrSplit = arrA * (1.0 - arrA)
+        arrZI1, arrZJ1 = mtxZ1[arrNodeI, arrColumns], mtxZ1[arrNodeJ, arrColumns]
+        arrZI0, arrZJ0 = mtxZ0[arrNodeI, arrColumns], mtxZ0[arrNodeJ, arrColumns]
+        arrZff1 = (1.0 - arrA) * arrZI1 + arrA * arrZJ1 + arrSplit * arrZBranch1
+        arrZff0 = (1.0 - arrA) * arrZI0 + arrA * arrZJ0 + arrSplit * arrZBranch0
+        arrZff1 = np.where(arrValid, arrZff1, 1.0)
+        arrZff0 = np.where(arrValid, arrZff0, 1.0)
+        arrNearKV = np.where(arrValid, arrKV[arrNear], np.nan)
+        arrNearBaseKA = arrBaseKA[arrNear]
+        arrRX = np.abs(arrZff1.real) / np.maximum(np.abs(arrZff1.imag), 1e-12)
+        arrKappa = np.minimum(1.15 * (1.02 + 0.98 * np.exp(-3.0 * arrRX)), 2.0)
+        arrZOhm = arrZff1 * arrNearKV ** 2 / self.BASE_MVA
+        # Share of the sequence fault current arriving from BusID1 on the faulted branch, computed from the longer section
+        arrLong = arrA <= 0.5
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arrShare1 = np.where(arrLong, 1.0 - (arrZff1 - arrZJ1) / (arrZBranch1 * (1.0 - arrA)),
+                                 (arrZff1 - arrZI1) / (arrZBranch1 * arrA))
+            arrShare0 = np.where(arrLong, 1.0 - (arrZff0 - arrZJ0) / (arrZBranch0 * (1.0 - arrA)),
+                                 (arrZff0 - arrZI0) / (arrZBranch0 * arrA))
+        arrSections = np.flatnonzero(bBranch & arrValid)
+        # Contributions of the listed branches, except the faulted branch which is reported as its two sections
+        arrCounts = np.diff(arrPtr[oSlice.start:oSlice.stop + 1])
+        arrRowColumn = np.repeat(arrColumns, arrCounts)
+        arrRowBranch = arrContribution[arrPtr[oSlice.start]:arrPtr[oSlice.stop]]
+        arrRowPos = self.m_arrBranchPosition[arrRowBranch] if len(arrRowBranch) else np.zeros(0, dtype=np.int64)
+        arrKeep = (arrRowPos >= 0) & (arrRowPos != arrPos[arrRowColumn]) & arrValid[arrRowColumn]
+        arrRowColumn, arrRowBranch, arrRowPos = arrRowColumn[arrKeep], arrRowBranch[arrKeep], arrRowPos[arrKeep]
+        arrRowFrom, arrRowTo = self.m_arrBranchFrom[arrRowPos], self.m_arrBranchTo[arrRowPos]
+        arrDeltaY1 = self.m_arrBranchY1[arrRowPos] * (mtxZ1[arrRowFrom, arrRowColumn] - mtxZ1[arrRowTo, arrRowColumn])
+        arrDeltaY0 = self.m_arrBranchY0[arrRowPos] * (mtxZ0[arrRowFrom, arrRowColumn] - mtxZ0[arrRowTo, arrRowColumn])
+        fC = self.m_fVoltageFactor
+        cA = self.PHASE_OPERATOR
+        for strType in listFaultTypes:
+            # Sequence currents leaving the network at the fault and the phase reported (a, or b for phase to phase)
+            if strType == "3ph":
+                arrI1 = fC / arrZff1
+                arrI2 = arrI0 = np.zeros_like(arrI1)
+                cH1, cH2 = 1.0, 1.0
+            elif strType == "slg":
+                arrI1 = arrI2 = arrI0 = fC / (2.0 * arrZff1 + arrZff0)
+                cH1, cH2 = 1.0, 1.0
+            else:
+                arrI1 = fC / (2.0 * arrZff1)
+                arrI2 = -arrI1
+                arrI0 = np.zeros_like(arrI1)
+                cH1, cH2 = cA * cA, cA
+            arrPositive = cH1 * arrI1 + cH2 * arrI2
+            arrIf = arrI0 + arrPositive
+            arrIk = np.where(arrValid, np.abs(arrIf) * arrNearBaseKA, np.nan)
+            self._appendcolumns(dictFaults, location=arrLocation, fault_type=np.full(len(arrLocation), strType, dtype=object),
+                                ik_ka=arrIk, ik_angle=np.where(arrValid, np.degrees(np.angle(arrIf)), np.nan),
+                                sk_mva=math.sqrt(3.0) * arrNearKV * arrIk, ip_ka=arrKappa * math.sqrt(2.0) * arrIk,
+                                r_ohm=arrZOhm.real, x_ohm=arrZOhm.imag)
+            # Branch currents from BusID1 to BusID2: I = -y (Z[from, f] - Z[to, f]) per sequence
+            arrIBranch = -(arrDeltaY0 * arrI0[arrRowColumn] + arrDeltaY1 * arrPositive[arrRowColumn])
+            arrEnd1 = arrShare0[arrSections] * arrI0[arrSections] + arrShare1[arrSections] * arrPositive[arrSections]
+            arrEnd2 = arrIf[arrSections] - arrEnd1
+            arrCurrent = np.concatenate([arrIBranch, arrEnd1, arrEnd2])
+            arrBusKA = np.concatenate([arrBaseKA[arrRowFrom], arrBaseKA[arrNodeI[arrSections]], arrBaseKA[arrNodeJ[arrSections]]])
+            arrSectionBranch = self.m_arrBranchTab[arrPos[arrSections]] if len(arrSections) else np.zeros(0, dtype=np.int64)
+            nRows = len(arrCurrent)
+            self._appendcolumns(dictContributions,
+                                location=np.concatenate([arrLocation[arrRowColumn], arrLocation[arrSections], arrLocation[arrSections]]),
+                                fault_type=np.full(nRows, strType, dtype=object),
+                                branch=np.concatenate([arrRowBranch, arrSectionBranch, arrSectionBranch]),
+                                end=np.concatenate([np.zeros(len(arrIBranch), dtype=np.int64), np.ones(len(arrSections), dtype=np.int64),
+                                                    np.full(len(arrSections), 2, dtype=np.int64)]),
+                                ik_ka=np.abs(arrCurrent) * arrBusKA, ik_angle=np.degrees(np.angle(arrCurrent)))
+
+    @staticmethod
+    def _appendcolumns(dictColumns, **kwargs):
+        for strColumn, arrValues in kwargs.items():
+            dictColumns.setdefault(strColumn, []).append(arrValues)
+
+    @staticmethod
+    def _concatenatecolumns(dictColumns, tColumns):
+        """Joins the appended blocks of every column, empty columns for no rows"""
+        return {strColumn: np.concatenate(dictColumns[strColumn]) if dictColumns.get(strColumn) else np.zeros(0)
+                for strColumn in tColumns}
@@ -2,9 +2,10 @@ import os, sys
 import datetime
 import string
 from typing import Callable
-import psutil
-import wmi
-import pythoncom
+from Code.LazyImports import lazyimport
+psutil = lazyimport('psutil')
+wmi = lazyimport('wmi')
+pythoncom = lazyimport('pythoncom')
 
 from Code import GlobalEngineRegistry as gbl
 from Code.Framework.BaseTemplates.EngineContainer import EngineContainer as EngineContainer
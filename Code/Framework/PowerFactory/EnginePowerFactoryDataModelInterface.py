@@ -1,6 +1,7 @@
 # This module retrives data from PowerFactory engine, creates a data model, and manages the transfer of data between the network and the data model.
 
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineDataModelInterfaceContainer import EngineDataModelInterfaceContainer
 class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
     def __init__(self):
@@ -13,6 +14,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
         self.transformer_dictionary = {}
         self.external_grid_dictionary = {}
     #____________________OVERALL DATAMODELMANAGER LOADING METHODS________________________# 
+    @timed("dmi.passelementsfromnetworktodatamodelmanager")
     def passelementsfromnetworktodatamodelmanager(self):
         """Retrieves elements from the network and passes them to the DataModelManager."""
         bOK = True
@@ -31,6 +33,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
     #____________________BUSBAR METHODS________________________#
 
 
+    @timed("dmi.getbusbarsfromnetwork")
     def getbusbarsfromnetwork(self):
         """Retrieves busbars from the PowerFactory network."""
         bOK = True
@@ -90,6 +93,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
             bOK = self.get_transformersfromnetwork()
         return bOK
 
+    @timed("dmi.get_linesfromnetwork")
     def get_linesfromnetwork(self):
         """Retrieves lines from the PowerFactory network."""
         bOK = True
@@ -133,6 +137,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
                     line_datamodel.ON = ON
 
         return bOK
+    @timed("dmi.get_transformersfromnetwork")
     def get_transformersfromnetwork(self):
         """Retrieves transformers from the PowerFactory network."""
         bOK = True
@@ -252,6 +257,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
 
 #____________________LOAD METHODS________________________#
 
+    @timed("dmi.getloadsfromnetwork")
     def getloadsfromnetwork(self):
         """Retrieves loads from the PowerFactory network."""
         bOK = True
@@ -297,6 +303,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
                     load_item.ON = ON
         return bOK
 #____________________GENERATOR METHODS________________________#
+    @timed("dmi.getgeneratorsfromnetwork")
     def getgeneratorsfromnetwork(self):
         """Retrieves generators from the PowerFactory network."""
         bOK = True
@@ -349,6 +356,7 @@ class EnginePowerFactoryDataModelInterface(EngineDataModelInterfaceContainer):
                     gen_item.Qmax = Qmax
                     gen_item.Qmin = Qmin
         return bOK
+    @timed("dmi.getexternalgridsfromnetwork")
     def getexternalgridsfromnetwork(self):
         """Retrieves external grids from the PowerFactory network."""
         bOK = True
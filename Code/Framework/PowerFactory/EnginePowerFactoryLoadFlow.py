@@ -1,4 +1,5 @@
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineLoadFlowContainer import EngineLoadFlowContainer as BaseEngineLoadFlowContainer
 
 
@@ -14,6 +15,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         self.loadflowresultsdata = []  # List to hold load flow results data
 
     #__________________________ENGINE POWER FACTORY LOAD FLOW METHODS________________________
+    @timed("loadflow.runloadflow")
     def runloadflow(self, **kwargs):
         """This method runs the load flow analysis."""
         loadflowsettings = {
@@ -21,6 +23,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
             'AutomaticPhaseShifterTapAdjustment': 'iPST_at', #0 inactive, 1 active
             'AutomaticTapAdjustmentTransformer':'iopt_at' #0 inactive, 1 active
         }
+        self.m_dictLastRunSettings = dict(kwargs)
         if gbl.VERSION_TESTING:
             gbl.Msg.add_information("Running PowerFactory Load Flow Analysis...")
         if self.powerfactoryloadflowobject:
@@ -34,6 +37,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         if gbl.VERSION_TESTING:
             gbl.Msg.add_information("PowerFactory Load Flow Analysis completed successfully.")
         return True
+    @timed("loadflow.getallloadflowresults")
     def getallloadflowresults(self):
         """This method retrieves the results of the load flow analysis."""
         bOK = False
@@ -48,6 +52,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
             bOK = self.getandupdateloadsloadflowresults()
         return bOK
     #__________________________BUSBAR LOAD FLOW RESULTS METHODS________________________
+    @timed("loadflow.getandupdatebusbarloadflowresults")
     def getandupdatebusbarloadflowresults(self):
         """This method retrieves the results of the load flow analysis. It functions as an aggregator for the busbar load flow results."""
         bOK = True
@@ -90,13 +95,14 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         for bus in self.busbarloadflowresultsdata:
             busbar, _ = gbl.DataModelManager.findbusbar(bus["name"])
             if busbar is None:
-                gbl.Msg.add_warning(f"Busbar {bus['name']} not found in the tab.")
+                gbl.Msg.add_warning("Busbar %s not found in the tab.", bus['name'], strCategory="Busbar not found in the tab")
                 continue
             busbar.voltage = bus["voltage"]
             busbar.angle = bus["angle"]
             busbar.LoadFlowResults = True
         return True
     #__________________________LINE LOAD FLOW METHODS________________________
+    @timed("loadflow.getandupdatelineloadflowresults")
     def getandupdatelineloadflowresults(self):
         """This method retrieves the line load flow results and updates the data tab."""
         bOK = True
@@ -164,7 +170,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
 
             branch, _ = gbl.DataModelManager.findbranch( line["bus1"], line["bus2"], None, line["name"])
             if branch is None:
-                gbl.Msg.add_warning(f"Branch {line['name']} not found in the tab.")
+                gbl.Msg.add_warning("Branch %s not found in the tab.", line['name'], strCategory="Branch not found in the tab")
                 continue
             branch.loading = line["loading"]
             branch.oBus1.voltage = line["bus1_pu_voltage"]
@@ -215,7 +221,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         for transformer in self.txloadflowresultsdata:
             branch, _ = gbl.DataModelManager.findbranch(transformer["bushv"], transformer["buslv"], None, transformer["name"])
             if branch is None:
-                gbl.Msg.add_warning(f"Transformer {transformer['name']} not found in the tab.")
+                gbl.Msg.add_warning("Transformer %s not found in the tab.", transformer['name'], strCategory="Transformer not found in the tab")
                 continue
             branch.loading = transformer["loading"]
             branch.tap_position = transformer["tap_position"]
@@ -227,6 +233,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
                 branch.oBus2.voltage = transformer["bus2_pu_voltage"]
                 branch.oBus2.LoadFlowResults = branch.Results = True
         return True
+    @timed("loadflow.getandupdatetransformerflowresults")
     def getandupdatetransformerflowresults(self):
         """This method retrieves the transformer load flow results and updates the data tab."""
         bOK = True
@@ -285,7 +292,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         for generator in self.generatorloadflowresultsdata:
             gen, _ = gbl.DataModelManager.findgen(generator["bus"], generator["name"])
             if gen is None:
-                gbl.Msg.add_warning(f"Generator {generator['name']} not found in the tab.")
+                gbl.Msg.add_warning("Generator %s not found in the tab.", generator['name'], strCategory="Generator not found in the tab")
                 continue
             gen.MWLoadFlow = generator["MW"]
             gen.MVarLoadFlow = generator["MVAR"]
@@ -296,6 +303,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
             gen.parallelmachines = generator["parallel_machines"]
             gen.LoadFlowResults = True
         return True
+    @timed("loadflow.getandupdateloadflowgeneratorresults")
     def getandupdateloadflowgeneratorresults(self):
         """This method retrieves the generator load flow results and updates the data tab."""
         bOK = True
@@ -351,7 +359,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
         for load in self.loadflowresultsdata:
             load_obj, _ = gbl.DataModelManager.findload(load["bus"], load["name"])
             if load_obj is None:
-                gbl.Msg.add_warning(f"Load {load['name']} not found in the tab.")
+                gbl.Msg.add_warning("Load %s not found in the tab.", load['name'], strCategory="Load not found in the tab")
                 continue
             load_obj.MWLoadFlow = load["MW"]
             load_obj.MVarLoadFlow = load["MVAR"]
@@ -360,6 +368,7 @@ class EnginePowerFactoryLoadFlow(BaseEngineLoadFlowContainer):
             load_obj.powerFactor = load["powerfactor"]
             load_obj.LoadFlowResults = True
         return True
+    @timed("loadflow.getandupdateloadsloadflowresults")
     def getandupdateloadsloadflowresults(self):
         """This method retrieves the load flow results and updates the data tab."""
         bOK = True
@@ -1,13 +1,24 @@
+import numpy as np
+
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 from Code.Framework.BaseTemplates.EngineShortCircuitContainer import EngineShortCircuitContainer
 
 class EnginePowerFactoryShortCircuit(EngineShortCircuitContainer):
+    # Contribution table column -> PowerFactory result attribute of the generator terminal
+    GEN_CONTRIBUTION_ATTRIBUTES = (("skss", "m:Skss:bus1"), ("ikss", "m:Ikss:bus1"),
+                                   ("ikss_angle", "m:phii:bus1"), ("ip", "m:Ip:bus1"))
+    # Fault type -> ComShc fault type option
+    FAULT_TYPE_OPTIONS = {"3ph": "3psc", "slg": "spgf", "ll": "2psc"}
+
     def __init__(self):
         super().__init__()
         self.powerfactoryshortcircuitobject = gbl.EngineContainer.m_pFApp.GetFromStudyCase("ComShc")
         self.busbarshortcircuitresultsdata = []
-        self.gen_short_circuit_data = []
+        # ((DataModel id, number of generators), generator objects, Gen_TAB indices)
+        self.m_tGenObjectIndex = None
 
+    @timed("shortcircuit.runshortcircuitanalysisforallbusbars")
     def runshortcircuitanalysisforallbusbars(self):
         """This method runs the short circuit analysis."""
         if gbl.VERSION_TESTING:
@@ -23,24 +34,31 @@ class EnginePowerFactoryShortCircuit(EngineShortCircuitContainer):
             self.msg.add_error(f"Error running short circuit analysis: {e}")
             return False
         
-    # def runshortcircuitanalysisforspecificbusbar(self, busbar):
-    #     """This method runs the short circuit analysis for a specific busbar."""
-    #     if gbl.VERSION_TESTING:
-    #         self.msg.add_information(f"Running short circuit analysis for busbar: {busbar}")
-    #     if self.powerfactoryshortcircuitobject is None:
-    #         self.msg.adderror("Short circuit object not found in PowerFactory study case.")
-    #         return False
-    #     try:
-    #         # Assuming 'busbar' is a valid busbar object in PowerFactory
-    #         self.powerfactoryshortcircuitobject.Execute(busbar)
-    #         self.msg.add_information(f"Short circuit analysis for busbar {busbar} executed successfully.")
-    #         return True
-    #     except Exception as e:
-    #         self.msg.add_error(f"Error running short circuit analysis for busbar {busbar}: {e}")
-    #         return False
-    
+    def runshortcircuitanalysisforspecificbusbar(self, busbar, faulttype="3ph"):
+        """This method runs the short circuit analysis for a specific busbar (a PowerFactory terminal)."""
+        if gbl.VERSION_TESTING:
+            self.msg.add_information(f"Running short circuit analysis for busbar: {busbar}")
+        return self.runshortcircuitanalysisforfault(busbar, faulttype)
+
+    def runshortcircuitanalysisforfault(self, faultlocation, faulttype="3ph", fraction=None):
+        """This method runs a single fault at a terminal, or along a line at a fraction of its length from bus1."""
+        if self.powerfactoryshortcircuitobject is None:
+            self.msg.add_error("Short circuit object not found in PowerFactory study case.")
+            return False
+        try:
+            self.powerfactoryshortcircuitobject.iopt_allbus = 0
+            self.powerfactoryshortcircuitobject.shcobj = faultlocation
+            self.powerfactoryshortcircuitobject.iopt_shc = self.FAULT_TYPE_OPTIONS[faulttype]
+            if fraction is not None:
+                self.powerfactoryshortcircuitobject.ppro = 100.0 * fraction
+            return self.powerfactoryshortcircuitobject.Execute() == 0
+        except Exception as e:
+            self.msg.add_error(f"Error running short circuit analysis for fault at {faultlocation}: {e}")
+            return False
+
     #___________________________BUSBAR SHORT CIRCUIT RESULTS METHODS________________________
 
+    @timed("shortcircuit.getandupdateshortcircuitresults")
     def getandupdateshortcircuitresults(self):
         """This method retrieves the short circuit results and updates the data tab."""
         bOK = True
@@ -104,7 +122,7 @@ class EnginePowerFactoryShortCircuit(EngineShortCircuitContainer):
         for bus in self.busbarshortcircuitresultsdata:
             busbar, _ = gbl.DataModelManager.findbusbar(bus["name"])
             if busbar is None:
-                gbl.Msg.add_warning(f"Busbar {bus['name']} not found in the tab.")
+                gbl.Msg.add_warning("Busbar %s not found in the tab.", bus['name'], strCategory="Busbar not found in the tab")
                 continue
             busbar.initialshortcircuitcurrent = bus["initialshortcircuitcurrent"]
             busbar.initialshortcircuitmva = bus["initialshortcircuitmva"]
@@ -117,33 +135,127 @@ class EnginePowerFactoryShortCircuit(EngineShortCircuitContainer):
             busbar.shortcircuitresults = True
         return True
     
-    def getgenshortcircuitcontribution(self):
-        """This method retrieves the generator short circuit contribution."""
+    #___________________________GENERATOR SHORT CIRCUIT CONTRIBUTION METHODS________________________
+
+    def getgenobjectindex(self):
+        """Pairs every PowerFactory generator with its Gen_TAB index. Built once per DataModel and reused between runs."""
+        oDataModel = gbl.DataModelManager
+        tKey = (id(oDataModel), len(oDataModel.Gen_TAB))
+        if self.m_tGenObjectIndex is not None and self.m_tGenObjectIndex[0] == tKey:
+            return self.m_tGenObjectIndex[1], self.m_tGenObjectIndex[2]
         gens = gbl.EngineContainer.m_pFApp.GetCalcRelevantObjects("*.ElmGen, *.ElmGenstat, *.ElmSym")
-        gbl.Msg.add_information(f"Found {len(gens)} generators for short circuit contribution analysis.")
-        gen_short_circuit_data = []
+        listObjects, listGenIndex = [], []
         for gen in gens:
-            gen_id = gen.GetAttribute("loc_name")
             terminal = gen.GetAttribute("bus1")
-            if terminal:
-                bus_id = gbl.DataModelInterfaceContainer.standardize_terminal_id(terminal)
-            for gen_obj in gbl.DataModelManager.Gen_TAB:
-                if gen_obj.GenID == gen_id and gen_obj.BusID == bus_id:
-                    skss_value = gen.GetAttribute("m:Skss:bus1")
-                    ikss_value = gen.GetAttribute("m:Ikss:bus1")
-                    ikss_angle = gen.GetAttribute("m:phii:bus1")
-                    ip_value = gen.GetAttribute("m:Ip:bus1")
-                    gen_obj.shortcircuit_skss = skss_value
-                    gen_obj.shortcircuit_ikss = ikss_value
-                    gen_obj.shortcircuit_ikss_angle = ikss_angle
-                    gen_obj.shortcircuit_ip = ip_value
-                    self.gen_short_circuit_data.append({
-                        "GenID": gen_id,
-                        "BusID": bus_id,
-                        "Skss": skss_value,
-                        "Ikss": ikss_value,
-                        "Ikss_Angle": ikss_angle,
-                        "Ip": ip_value
-                    })
-                    break
-        return self.gen_short_circuit_data
+            if not terminal:
+                continue
+            bus_id = gbl.DataModelInterfaceContainer.standardize_terminal_id(terminal)
+            nGenIdx = oDataModel.getgenindex(bus_id, gen.GetAttribute("loc_name"))
+            if nGenIdx >= 0:
+                listObjects.append(gen)
+                listGenIndex.append(nGenIdx)
+        arrGenIndex = np.array(listGenIndex, dtype=np.int64)
+        self.m_tGenObjectIndex = (tKey, listObjects, arrGenIndex)
+        return listObjects, arrGenIndex
+
+    def resetgenobjectindex(self):
+        """Forgets the generator pairing, e.g. after another PowerFactory project was activated"""
+        self.m_tGenObjectIndex = None
+
+    @timed("shortcircuit.getgenshortcircuitcontributions")
+    def getgenshortcircuitcontributions(self):
+        """This method retrieves the generator short circuit contributions into the contribution array table."""
+        listObjects, arrGenIndex = self.getgenobjectindex()
+        gbl.Msg.add_information(f"Found {len(listObjects)} generators for short circuit contribution analysis.")
+        listAttributes = [strAttribute for _, strAttribute in self.GEN_CONTRIBUTION_ATTRIBUTES]
+        mtxValues = np.full((len(listObjects), len(listAttributes)), np.nan)
+        for nRow, gen in enumerate(listObjects):
+            fnGetAttribute = gen.GetAttribute
+            for nColumn, strAttribute in enumerate(listAttributes):
+                value = fnGetAttribute(strAttribute)
+                if value is not None:
+                    mtxValues[nRow, nColumn] = value
+        self.setgencontributiontable(arrGenIndex, {strColumn: mtxValues[:, nColumn] for nColumn, (strColumn, _)
+                                                   in enumerate(self.GEN_CONTRIBUTION_ATTRIBUTES)})
+        return True
+
+    def getgenshortcircuitcontribution(self):
+        """This method retrieves the generator short circuit contributions and returns the contribution array table."""
+        self.getgenshortcircuitcontributions()
+        return self.m_dictGenContributions
+
+    #___________________________INDIVIDUAL FAULT METHODS________________________
+
+    @timed("shortcircuit.runfaults")
+    def runfaults(self, dictLocations, listFaultTypes=None):
+        """This method runs one ComShc fault per location and fault type and reads the fault levels and branch currents.
+        Terminal faults read the terminal results; branch faults add up the currents flowing into the line at both ends."""
+        listFaultTypes = list(listFaultTypes or self.FAULT_TYPES)
+        if self.powerfactoryshortcircuitobject is None:
+            self.msg.add_error("Short circuit object not found in PowerFactory study case.")
+            return None
+        oDataModel = gbl.DataModelManager
+        oInterface = gbl.DataModelInterfaceContainer
+        arrPtr = np.asarray(dictLocations["contribution_ptr"], dtype=np.int64)
+        listContribution = np.asarray(dictLocations["contribution_branch"], dtype=np.int64).tolist()
+        listFaultRows, listContributionRows = [], []
+        oShc = self.powerfactoryshortcircuitobject
+        tSaved = (oShc.iopt_allbus, oShc.shcobj, oShc.iopt_shc)
+        try:
+            for nLocation, (nBus, nBranch, fFraction) in enumerate(zip(np.asarray(dictLocations["bus"]).tolist(),
+                                                                       np.asarray(dictLocations["branch"]).tolist(),
+                                                                       np.asarray(dictLocations["fraction"]).tolist())):
+                if nBranch >= 0:
+                    location = oInterface.branch_dictionary.get(oDataModel.Branch_TAB[nBranch].BranchID)
+                else:
+                    location = oInterface.terminal_dictionary.get(oDataModel.Busbar_TAB[nBus].BusID)
+                fKV = oDataModel.Busbar_TAB[nBus].kV or 0.0
+                listBranches = [(nBranchIdx, oInterface.branch_dictionary.get(oDataModel.Branch_TAB[nBranchIdx].BranchID))
+                                for nBranchIdx in listContribution[arrPtr[nLocation]:arrPtr[nLocation + 1]] if nBranchIdx != nBranch]
+                for strType in listFaultTypes:
+                    bOK = location is not None and self.runshortcircuitanalysisforfault(
+                        location, strType, fFraction if nBranch >= 0 else None)
+                    if not bOK:
+                        listFaultRows.append((nLocation, strType) + (np.nan,) * 6)
+                        continue
+                    if nBranch >= 0:
+                        cEnd1 = self._getbranchcurrent(location, "bus1")
+                        cEnd2 = self._getbranchcurrent(location, "bus2")
+                        fIk = abs(cEnd1 + cEnd2)
+                        listFaultRows.append((nLocation, strType, fIk, float(np.degrees(np.angle(cEnd1 + cEnd2))),
+                                              np.sqrt(3.0) * fKV * fIk, np.nan, np.nan, np.nan))
+                        listContributionRows.append((nLocation, strType, nBranch, 1, abs(cEnd1), float(np.degrees(np.angle(cEnd1)))))
+                        listContributionRows.append((nLocation, strType, nBranch, 2, abs(cEnd2), float(np.degrees(np.angle(cEnd2)))))
+                    else:
+                        # The terminal results carry no angle of the fault current
+                        listFaultRows.append((nLocation, strType) + tuple(self._getattributefloat(location, strAttribute)
+                                              for strAttribute in ("m:Ikss", None, "m:Skss", "m:Ip", "m:R", "m:X")))
+                    for nBranchIdx, branch in listBranches:
+                        if branch is None:
+                            continue
+                        cCurrent = self._getbranchcurrent(branch, "bus1")
+                        listContributionRows.append((nLocation, strType, nBranchIdx, 0, abs(cCurrent),
+                                                     float(np.degrees(np.angle(cCurrent)))))
+        finally:
+            oShc.iopt_allbus, oShc.shcobj, oShc.iopt_shc = tSaved
+        return {"faults": self._torowcolumns(listFaultRows, self.FAULT_COLUMNS),
+                "contributions": self._torowcolumns(listContributionRows, self.CONTRIBUTION_COLUMNS)}
+
+    def _getattributefloat(self, pfobject, attribute):
+        """Result attribute as a float, NaN when it is missing"""
+        value = pfobject.GetAttribute(attribute) if attribute else None
+        return np.nan if value is None else float(value)
+
+    def _getbranchcurrent(self, branch, side):
+        """Initial short circuit current flowing into a branch at one side as a complex number in kA"""
+        magnitude = self._getattributefloat(branch, f"m:Ikss:{side}")
+        angle = self._getattributefloat(branch, f"m:phii:{side}")
+        return magnitude * np.exp(1j * np.radians(angle))
+
+    @staticmethod
+    def _torowcolumns(listRows, tColumns):
+        """Turns result rows into one array per column"""
+        if not listRows:
+            return {strColumn: np.zeros(0) for strColumn in tColumns}
+        return {strColumn: np.array(tValues, dtype=object if strColumn == "fault_type" else None)
+                for strColumn, tValues in zip(tColumns, zip(*listRows))}
@@ -4,6 +4,7 @@ import string
 import threading
 
 from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
 
 
 class FrameworkInitialiser:
@@ -18,11 +19,13 @@ class FrameworkInitialiser:
         self.engine = None
         self._configureapplicationsettings()
 
-    def initializeproduct(self, engine=None, webinterfaceonly=False):
-        """Initialize all framework components"""
+    def initializeproduct(self, engine=None, webinterfaceonly=False, clionly=None):
+        """Initialize all framework components. In CLI-only mode Flask is never imported or started."""
         if self.isinitialized:
             print("Framework already initialized!")
             return
+        if clionly is None:
+            clionly = getattr(gbl.AppSettingsContainer, 'CliOnlyMode', False)
         try:
             # Priority order: provided params > engine info > defaults
 
@@ -30,7 +33,12 @@ class FrameworkInitialiser:
             self.bOK = self.initialise_messaging()
             if self.bOK:
                 self.bOK = self.initialisestudysettings()
-            if webinterfaceonly:
+            if clionly:
+                if self.bOK and not webinterfaceonly:
+                    self.bOK = self.initialize_backend(engine)
+                if self.bOK:
+                    self.isinitialized = True
+            elif webinterfaceonly:
                 #web interface only
                 if self.bOK:
                     self.bOK = self.initialisewebinterface()
@@ -62,6 +70,7 @@ class FrameworkInitialiser:
             self.bOK = self.startwebinterface()
         return self.bOK
 
+    @timed("framework.initialize_backend")
     def initialize_backend(self, engine_type=None):
         """Initialize only components needed for backend"""
         try:
@@ -83,6 +92,8 @@ class FrameworkInitialiser:
                 self.bOK = self.initialise_network_data_manager()
             if self.bOK:
                 self.bOK = self.initialise_data_source_interface()
+            if self.bOK:
+                self.bOK = self.initialise_result_store()
             if self.bOK:
                 self.backendinitialized = True
                 self.selected_engine = engine_type
@@ -114,6 +125,22 @@ class FrameworkInitialiser:
             gbl.AppSettingsContainer.DebugMode = False
         except Exception as e:
             self._set_safe_defaults()
+        self._configureinstrumentation()
+
+    def _configureinstrumentation(self):
+        """Expose the span recorder and enable it when requested in the application settings"""
+        from Code.Instrumentation import Recorder
+        gbl.Instrumentation = Recorder
+        if getattr(gbl.AppSettingsContainer, 'EnableInstrumentation', False):
+            Recorder.enable()
+        strReportPath = getattr(gbl.AppSettingsContainer, 'InstrumentationReportPath', '')
+        strTracePath = getattr(gbl.AppSettingsContainer, 'InstrumentationTracePath', '')
+        if Recorder.bEnabled and (strReportPath or strTracePath):
+            import atexit
+            if strReportPath:
+                atexit.register(Recorder.exportjsonreport, strReportPath)
+            if strTracePath:
+                atexit.register(Recorder.exportchrometrace, strTracePath)
 
     def _set_safe_defaults(self):
         """Set safe defaults if AppSettings initialization fails"""
@@ -123,12 +150,14 @@ class FrameworkInitialiser:
             EnableAPI = True
             EnableWebInterface = False
             WebOnlyMode = False
+            CliOnlyMode = False
             DebugMode = False
             WebInterfaceHost = 'localhost'
             WebInterfacePort = 5000
 
         gbl.AppSettingsContainer = SafeDefaults()
 
+    @timed("framework.initialisewebinterface")
     def initialisewebinterface(self):
         """Initialize web interface"""
         try:
@@ -139,33 +168,42 @@ class FrameworkInitialiser:
             gbl.Msg.AddError(f"Web interface not available: {e}")
             return False
 
+    @timed("framework.startwebinterface")
     def startwebinterface(self):
-        """Start web interface"""
+        """Start web interface on a daemon thread and wait until it accepts connections"""
         try:
             if gbl.StudySettingsContainer.EnableWebInterface and gbl.WebContainer:
-                print(f"DEBUG: About to start web thread")
-                print(f"DEBUG: self.gbl.WebContainer = {gbl.WebContainer}")
-                print(f"DEBUG: type(self.gbl.WebContainer) = {type(gbl.WebContainer)}")
                 host = getattr(gbl.AppSettingsContainer, 'WebInterfaceHost', 'localhost')
                 port = getattr(gbl.AppSettingsContainer, 'WebInterfacePort', 5000)
-                print(f"DEBUG: host={host}, port={port}")
                 web_thread = threading.Thread(target=gbl.WebContainer,
                                               args=(host, port),
                                               daemon=True)
-                # print(f"DEBUG: Thread created: {web_thread}")
                 web_thread.start()
-                print(f"DEBUG: Thread started, is_alive: {web_thread.is_alive()}")
-                # Wait a moment and check if thread is still alive
-                import time
-                time.sleep(1)
-                print(f"DEBUG: After 1 second, thread is_alive: {web_thread.is_alive()}")
+                if not self._waitforwebinterface(web_thread, host, port):
+                    gbl.Msg.AddError(f"Web interface failed to start at http://{host}:{port}")
+                    return False
                 gbl.Msg.AddInfo(f"Web interface started at http://{host}:{port}")
             return True
         except Exception as e:
-            print(f"DEBUG: Exception in startwebinterface: {e}")
             gbl.Msg.AddError(f"Failed to start web interface: {e}")
             return False
 
+    def _waitforwebinterface(self, web_thread, host, port, timeout=5.0):
+        """Poll the web server socket until it accepts connections; False if the server thread dies first"""
+        import socket
+        import time
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if not web_thread.is_alive():
+                return False
+            try:
+                with socket.create_connection((host, port), timeout=0.1):
+                    return True
+            except OSError:
+                time.sleep(0.01)
+        return web_thread.is_alive()
+
+    @timed("framework.initialisestudyengine")
     def initialisestudyengine(self, engine=None, engine_type="ipsa", **kwargs):
         """Initialize study engine. Defaults to PowerFactory if not defined"""
         try:
@@ -194,6 +232,7 @@ class FrameworkInitialiser:
             gbl.Msg.AddError(f"Failed to initialize study engine: {e}")
             return False
 
+    @timed("framework.initialisedatamodelinterface")
     def initialisedatamodelinterface(self, engine=None, engine_type="powerfactory"):
         """Initialize data model interface"""
         try:
@@ -209,6 +248,7 @@ class FrameworkInitialiser:
             gbl.Msg.AddError(f"Failed to initialize data model interface: {e}")
             return False
 
+    @timed("framework.configurecomponenttemplates")
     def configurecomponenttemplates(self):
         try:
             from Code.DataModel.ComponentManager import ComponentBaseTemplate
@@ -218,6 +258,7 @@ class FrameworkInitialiser:
             gbl.Msg.AddError(f"Failed to initialize component templates: {e}")
             return False
 
+    @timed("framework.initialisedatafactory")
     def initialisedatafactory(self):
         """Initialize data factory"""
         try:
@@ -227,6 +268,7 @@ class FrameworkInitialiser:
         except Exception as e:
             gbl.Msg.AddError(f"Failed to initialize data factory: {e}")
             return False
+    @timed("framework.initialise_data_source_interface")
     def initialise_data_source_interface(self):
         """Initialize data source interface"""
         try:
@@ -236,6 +278,7 @@ class FrameworkInitialiser:
         except Exception as e:
             gbl.Msg.AddError(f"Failed to initialize data source interface: {e}")
             return False
+    @timed("framework.initialise_network_data_manager")
     def initialise_network_data_manager(self):
         """Initialize network data management"""
         try:
@@ -247,6 +290,22 @@ class FrameworkInitialiser:
             gbl.Msg.AddError(f"Failed to initialize network data manager: {e}")
             return False
 
+    @timed("framework.initialise_result_store")
+    def initialise_result_store(self):
+        """Initialize the columnar result store for study snapshots"""
+        try:
+            from Code.Results.ResultStore import ResultStore
+            gbl.ResultStore = ResultStore(gbl.StudySettingsContainer.resultstorepath)
+            if gbl.StudySettingsContainer.UseResultCache:
+                from Code.Results.StudyResultCache import StudyResultCache
+                gbl.ResultCache = StudyResultCache(gbl.StudySettingsContainer.get_result_cache_path(),
+                                                   gbl.StudySettingsContainer.resultcachemaxentries,
+                                                   gbl.StudySettingsContainer.resultcachemaxsizemb)
+            return True
+        except Exception as e:
+            gbl.Msg.AddError(f"Failed to initialize result store: {e}")
+            return False
+
     def _initialise_engine_modules(self, engine_type):
         if engine_type == "powerfactory":
             return self._powerfactorymodules()
@@ -265,6 +324,9 @@ class FrameworkInitialiser:
             # Initialize Short Circuit Container
             from Code.Framework.PowerFactory.EnginePowerFactoryShortCircuit import EnginePowerFactoryShortCircuit
             gbl.EngineShortCircuitContainer = EnginePowerFactoryShortCircuit()
+            # Harmonic load flows run on the native engine
+            from Code.Framework.Native.EngineNativeHarmonics import EngineNativeHarmonics
+            gbl.EngineHarmonicsContainer = EngineNativeHarmonics()
             return True
         except Exception as e:
             gbl.Msg.AddError(f"Failed to initialize PowerFactory modules: {e}")
@@ -276,11 +338,17 @@ class FrameworkInitialiser:
             # Initialize Load Flow Container
             from Code.Framework.IPSA.EngineIPSALoadFlow import EngineIPSALoadFlow
             gbl.EngineLoadFlowContainer = EngineIPSALoadFlow()
+            # IPSA has no short circuit container of its own, fault levels come from the native engine
+            from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+            gbl.EngineShortCircuitContainer = EngineNativeShortCircuit()
+            from Code.Framework.Native.EngineNativeHarmonics import EngineNativeHarmonics
+            gbl.EngineHarmonicsContainer = EngineNativeHarmonics()
             return True
         except Exception as e:
             gbl.Msg.AddError(f"Failed to initialize PowerFactory modules: {e}")
             return False
 
+    @timed("framework.initialisedatamodelmanager")
     def initialisedatamodelmanager(self):
         try:
             from Code.DataModel.DataModelManager import DataModelManager
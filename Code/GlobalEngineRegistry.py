@@ -19,9 +19,13 @@ DataSourceInterfaceContainer = None  # New container for data sources
 EngineContainer       = None   # Generic analysis engine interface
 EngineLoadFlowContainer = None   # Load flow analysis engine interface
 EngineShortCircuitContainer = None   # Short circuit analysis engine interface
+EngineHarmonicsContainer = None   # Harmonic analysis engine interface
 DataModelInterfaceContainer    = None   # Stores data collected from the power systems network model via the engine
 DataModelManager = None
 StudySettingsContainer = None   # Stores study settings for the network model
 AppSettingsContainer = None   # Stores application settings
 DataFactory  = None   # Entry point for data model creation and management
+ResultStore  = None   # Columnar store for study result snapshots
+ResultCache  = None   # Memoised study results keyed on network state and settings
+Instrumentation = None   # Timing span recorder for the hot paths
 Msg          = None   # messaging class
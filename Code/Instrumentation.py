@@ -0,0 +1,176 @@
+# Instrumentation.py
+# Lightweight timing spans for the framework hot paths (data loading, DataModel ingestion, engine build, load flow).
+# Spans aggregate call counts, totals and percentiles per name and can be exported as a JSON report or as a
+# Chrome trace (chrome://tracing or https://ui.perfetto.dev). When disabled, span() hands back a shared no-op
+# context manager and timed() calls straight through, so the instrumentation can stay in production code.
+
+import os
+import json
+import random
+import threading
+import functools
+from time import perf_counter_ns
+
+
+class _NullSpan:
+    """Context manager returned when instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one execution of a named block"""
+    __slots__ = ("m_oRecorder", "m_strName", "m_dictArgs", "m_nStart")
+
+    def __init__(self, oRecorder, strName, dictArgs):
+        self.m_oRecorder = oRecorder
+        self.m_strName = strName
+        self.m_dictArgs = dictArgs
+        self.m_nStart = 0
+
+    def __enter__(self):
+        self.m_nStart = perf_counter_ns()
+        return self
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.m_oRecorder.record(self.m_strName, self.m_nStart, perf_counter_ns() - self.m_nStart, self.m_dictArgs)
+        return False
+
+
+class SpanRecorder:
+    """Collects span timings. Counts and totals are exact, percentiles come from a bounded reservoir sample."""
+
+    def __init__(self, bEnabled=False, nMaxSamples=10000, nMaxTraceEvents=1000000):
+        self.bEnabled = bEnabled
+        self.nMaxSamples = nMaxSamples
+        self.nMaxTraceEvents = nMaxTraceEvents
+        self.m_oLock = threading.Lock()
+        self.m_nOriginNs = perf_counter_ns()
+        self.reset()
+
+    #__________________________CONTROL________________________
+    def enable(self):
+        """Start recording spans"""
+        self.bEnabled = True
+
+    def disable(self):
+        """Stop recording spans; already recorded data is kept"""
+        self.bEnabled = False
+
+    def reset(self):
+        """Discard all recorded spans"""
+        with self.m_oLock:
+            self.m_dictStats = {}
+            self.m_listTraceEvents = []
+            self.m_nDroppedTraceEvents = 0
+
+    #__________________________RECORDING________________________
+    def span(self, strName, **dictArgs):
+        """Returns a context manager timing the enclosed block under strName"""
+        if not self.bEnabled:
+            return _NULL_SPAN
+        return _Span(self, strName, dictArgs)
+
+    def timed(self, strName=None):
+        """Decorator timing every call of the wrapped function. The name defaults to Class.method."""
+        def decorator(fn):
+            strSpanName = strName or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.bEnabled:
+                    return fn(*args, **kwargs)
+                nStart = perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(strSpanName, nStart, perf_counter_ns() - nStart, None)
+            return wrapper
+        return decorator
+
+    def record(self, strName, nStartNs, nDurationNs, dictArgs=None):
+        """Adds one completed span"""
+        with self.m_oLock:
+            listStats = self.m_dictStats.get(strName)
+            if listStats is None:
+                # [count, total ns, max ns, reservoir of durations]
+                listStats = self.m_dictStats[strName] = [0, 0, 0, []]
+            listStats[0] += 1
+            listStats[1] += nDurationNs
+            if nDurationNs > listStats[2]:
+                listStats[2] = nDurationNs
+            listSamples = listStats[3]
+            if len(listSamples) < self.nMaxSamples:
+                listSamples.append(nDurationNs)
+            else:
+                nSlot = random.randrange(listStats[0])
+                if nSlot < self.nMaxSamples:
+                    listSamples[nSlot] = nDurationNs
+            if len(self.m_listTraceEvents) < self.nMaxTraceEvents:
+                self.m_listTraceEvents.append((strName, nStartNs, nDurationNs, threading.get_ident(), dictArgs))
+            else:
+                self.m_nDroppedTraceEvents += 1
+
+    #__________________________REPORTING________________________
+    def getreport(self):
+        """Returns per span statistics in milliseconds, slowest total first"""
+        with self.m_oLock:
+            dictStats = {strName: (listStats[0], listStats[1], listStats[2], sorted(listStats[3]))
+                         for strName, listStats in self.m_dictStats.items()}
+        dictReport = {}
+        for strName, (nCount, nTotal, nMax, listSamples) in sorted(dictStats.items(), key=lambda item: -item[1][1]):
+            dictReport[strName] = {
+                "count": nCount,
+                "total_ms": nTotal / 1e6,
+                "mean_ms": nTotal / nCount / 1e6,
+                "p50_ms": self._percentile(listSamples, 50) / 1e6,
+                "p90_ms": self._percentile(listSamples, 90) / 1e6,
+                "p99_ms": self._percentile(listSamples, 99) / 1e6,
+                "max_ms": nMax / 1e6,
+            }
+        return dictReport
+
+    def exportjsonreport(self, strFilePath):
+        """Writes the per span statistics to a JSON file"""
+        with open(strFilePath, "w", encoding="utf-8") as oFile:
+            json.dump({"spans": self.getreport(), "dropped_trace_events": self.m_nDroppedTraceEvents}, oFile, indent=2)
+        return strFilePath
+
+    def exportchrometrace(self, strFilePath):
+        """Writes the recorded spans in Chrome trace event format"""
+        nPid = os.getpid()
+        with self.m_oLock:
+            listEvents = list(self.m_listTraceEvents)
+        listTrace = []
+        for strName, nStartNs, nDurationNs, nThreadId, dictArgs in listEvents:
+            dictEvent = {"name": strName, "cat": strName.split(".", 1)[0], "ph": "X",
+                         "ts": (nStartNs - self.m_nOriginNs) / 1000.0, "dur": nDurationNs / 1000.0,
+                         "pid": nPid, "tid": nThreadId}
+            if dictArgs:
+                dictEvent["args"] = {strKey: str(value) for strKey, value in dictArgs.items()}
+            listTrace.append(dictEvent)
+        with open(strFilePath, "w", encoding="utf-8") as oFile:
+            json.dump({"traceEvents": listTrace, "displayTimeUnit": "ms"}, oFile)
+        return strFilePath
+
+    @staticmethod
+    def _percentile(listSortedSamples, nPercent):
+        """Nearest-rank percentile of an already sorted sample"""
+        if not listSortedSamples:
+            return 0
+        nIndex = max(0, -(-nPercent * len(listSortedSamples) // 100) - 1)
+        return listSortedSamples[min(nIndex, len(listSortedSamples) - 1)]
+
+
+# Process wide recorder so modules can decorate functions at import time, before the framework is initialised
+Recorder = SpanRecorder(os.getenv('ENABLE_INSTRUMENTATION', '0') == '1')
+span = Recorder.span
+timed = Recorder.timed
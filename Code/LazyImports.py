@@ -0,0 +1,101 @@
+# LazyImports.py
+# Registry of modules imported on first use. Engine bindings (ipsa, powerfactory, wmi, psutil, pythoncom)
+# and heavy libraries (pandas) are handed out as LazyModule proxies, so importing a framework module
+# costs nothing until the binding is actually used and a missing engine only fails the code path that
+# needs it. The proxy resolves the real module on first attribute access and caches it.
+
+import sys
+import importlib
+import importlib.util
+import threading
+
+
+# Modules that need an engine installation, with the hint shown when they are missing
+ENGINE_BINDINGS = {
+    'ipsa': "PyIPSA is required for the IPSA engine",
+    'powerfactory': "the PowerFactory Python API is required for the PowerFactory engine",
+    'psutil': "psutil is required to locate a running PowerFactory instance",
+    'wmi': "wmi (Windows only) is required to locate a running PowerFactory instance",
+    'pythoncom': "pywin32 (Windows only) is required to locate a running PowerFactory instance",
+}
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is used"""
+    __slots__ = ("m_strName", "m_oModule", "m_oLock")
+
+    def __init__(self, strName):
+        self.m_strName = strName
+        self.m_oModule = None
+        self.m_oLock = threading.Lock()
+
+    def load(self):
+        """Import the real module (once) and return it"""
+        oModule = self.m_oModule
+        if oModule is None:
+            with self.m_oLock:
+                if self.m_oModule is None:
+                    try:
+                        self.m_oModule = importlib.import_module(self.m_strName)
+                    except ImportError as e:
+                        strHint = ENGINE_BINDINGS.get(self.m_strName)
+                        if strHint is None:
+                            raise
+                        raise ImportError(f"Cannot import '{self.m_strName}': {strHint} ({e})") from e
+                oModule = self.m_oModule
+        return oModule
+
+    def isloaded(self):
+        """True once the real module has been imported"""
+        return self.m_oModule is not None
+
+    def isavailable(self):
+        """True if the module is imported or can be found, without importing it"""
+        if self.m_oModule is not None or self.m_strName in sys.modules:
+            return True
+        return importlib.util.find_spec(self.m_strName) is not None
+
+    def reset(self):
+        """Forget the resolved module so the next use imports it again"""
+        with self.m_oLock:
+            self.m_oModule = None
+
+    def __getattr__(self, strAttribute):
+        return getattr(self.load(), strAttribute)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self):
+        strState = "loaded" if self.m_oModule is not None else "not loaded"
+        return f"<LazyModule '{self.m_strName}' ({strState})>"
+
+
+_dictLazyModules = {}
+_oRegistryLock = threading.Lock()
+
+
+def lazyimport(strName):
+    """Returns the shared LazyModule proxy for a module name"""
+    oLazyModule = _dictLazyModules.get(strName)
+    if oLazyModule is None:
+        with _oRegistryLock:
+            oLazyModule = _dictLazyModules.setdefault(strName, LazyModule(strName))
+    return oLazyModule
+
+
+def importobject(strPath):
+    """Imports 'package.module.Object' and returns Object"""
+    strModuleName, _, strObjectName = strPath.rpartition('.')
+    return getattr(importlib.import_module(strModuleName), strObjectName)
+
+
+def resetlazymodule(strName):
+    """Forget a resolved module, e.g. after swapping an engine binding in tests"""
+    if strName in _dictLazyModules:
+        _dictLazyModules[strName].reset()
+
+
+def getlazymodulestatus():
+    """Returns {module name: loaded} for every module handed out through the registry"""
+    return {strName: oLazyModule.isloaded() for strName, oLazyModule in _dictLazyModules.items()}
@@ -3,6 +3,45 @@
 
 from Code import GlobalEngineRegistry as gbl
 import datetime
+import os
+import time
+import atexit
+import threading
+import collections
+import weakref
+
+# Message levels, ordered so that filtering is a single integer comparison
+LEVEL_DEBUG = 10
+LEVEL_INFO = 20
+LEVEL_WARNING = 30
+LEVEL_ERROR = 40
+LEVEL_CRITICAL = 50
+LEVEL_RAW = 100
+
+LOG_LEVELS = {'DEBUG': LEVEL_DEBUG, 'INFO': LEVEL_INFO, 'WARNING': LEVEL_WARNING,
+              'ERROR': LEVEL_ERROR, 'CRITICAL': LEVEL_CRITICAL}
+LEVEL_NAMES = {LEVEL_INFO: "INFO", LEVEL_WARNING: "WARNING", LEVEL_ERROR: "ERROR"}
+
+# Live Messaging instances, closed at exit and reset in forked children by handlers registered once for the module,
+# so registering them does not keep the instances alive
+_setInstances = weakref.WeakSet()
+
+
+def _closeallinstances():
+    """Flush and close the log files of every live instance at interpreter exit"""
+    for oMsg in list(_setInstances):
+        oMsg.close_log_files()
+
+
+def _resetallwriters():
+    """The writer threads do not survive a fork, each instance in the child starts its own on first use"""
+    for oMsg in list(_setInstances):
+        oMsg._resetwriter()
+
+
+atexit.register(_closeallinstances)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_resetallwriters)
 
 
 class Messaging:
@@ -20,8 +59,21 @@ class Messaging:
 
     bMode = gbl.VERSION_TESTING
 
+    # Messages are handed to a background writer thread which formats and writes them in batches.
+    # Repeats of the same message (or the same category) within a batch window are collapsed.
+    bAsync = os.getenv('LOG_ASYNC', '1') == '1'
+    fBatchWindow = 0.05
+
     def __init__(self):
+        self.nMinLevel = LEVEL_INFO
+        self.oPending = collections.deque()
+        self.oWriterThread = None
+        self.oWriteLock = threading.Lock()
+        strLogLevel = getattr(gbl.AppSettingsContainer, 'LogLevel', None)
+        if strLogLevel:
+            self.set_log_level(strLogLevel)
         self.set_mode(self.bMode)
+        _setInstances.add(self)
 
     def set_mode(self, bMode):
         # Close any existing files first
@@ -44,9 +96,15 @@ class Messaging:
             self.oFileWarnings = open(self.strFileWarningName, 'a', encoding='utf-8')
             self.oFileErrors = open(self.strFileErrorName, 'a', encoding='utf-8')
 
+    def set_log_level(self, strLevel):
+        """Set the minimum level of messages that are formatted and written"""
+        self.nMinLevel = LOG_LEVELS[str(strLevel).upper()]
+
     # __________________________CLOSE LOG FILES________________________
     def close_log_files(self):
-        """Close all open log files"""
+        """Flush pending messages and close all open log files"""
+        self.Flush()
+        self._stopwriter()
         if self.oFileMsgs:
             self.oFileMsgs.close()
             self.oFileMsgs = None
@@ -58,77 +116,164 @@ class Messaging:
             self.oFileErrors = None
 
     #_________________________INFORMATION MESSAGES________________________
-    def AddInfo(self, sMsg):
-        """Add an informational message to the log"""
+    def AddInfo(self, sMsg, *args, strCategory=None):
+        """Add an informational message to the log. Any args are %-formatted into sMsg by the writer, so a filtered
+        message is never formatted."""
         self.nInfoCount += 1
-        try:
-            sMsg = str(sMsg)
-            sMsg = f"{datetime.datetime.now()} - INFO: {sMsg}"
-        except (ValueError, TypeError) as e:
-            sMsg = f"{datetime.datetime.now()} - Error formatting info message: {e}"
-            return
-
-        if self.bPrintMsgsToConsole:
-            print(sMsg)
-
-        if self.oFileMsgs:
-            self.oFileMsgs.write("\n" + sMsg)
+        if LEVEL_INFO >= self.nMinLevel:
+            self._enqueue(LEVEL_INFO, sMsg, args, strCategory)
 
     #_________________________RAW MESSAGES (NO TIMESTAMP)________________________
     def AddRawMessage(self, sMsg):
         """Add a raw message without timestamp/prefix - for splash screens"""
-        if self.bPrintMsgsToConsole:
-            print(sMsg)
-
-        if self.oFileMsgs:
-            self.oFileMsgs.write("\n" + sMsg)
+        self._enqueue(LEVEL_RAW, sMsg, (), None)
 
     #_________________________WARNING MESSAGES________________________
-    def AddWarning(self, sMsg):
-        """Add a warning message to the log"""
+    def AddWarning(self, sMsg, *args, strCategory=None):
+        """Add a warning message to the log. Warnings sharing a category are aggregated when repeated."""
         self.nWarningCount += 1
-        try:
-            sMsg = str(sMsg)
-            sMsg = f"{datetime.datetime.now()} - WARNING: {sMsg}"
-        except (ValueError, TypeError) as e:
-            sMsg = f"{datetime.datetime.now()} - Error formatting warning message: {e}"
-            return
-
-        if self.bPrintWarningsToConsole:
-            print(sMsg)
-
-        if self.oFileWarnings:
-            self.oFileWarnings.write("\n" + sMsg)
+        if LEVEL_WARNING >= self.nMinLevel:
+            self._enqueue(LEVEL_WARNING, sMsg, args, strCategory)
 
     #_________________________ERROR MESSAGES________________________
-    def AddError(self, sMsg):
+    def AddError(self, sMsg, *args, strCategory=None):
         """Add an error message to the log"""
         self.nErrorCount += 1
-        try:
-            sMsg = str(sMsg)
-            sMsg = f"{datetime.datetime.now()} - ERROR: {sMsg}"
-        except (ValueError, TypeError) as e:
-            sMsg = f"{datetime.datetime.now()} - Error formatting error message: {e}"
-            return
-
-        if self.bPrintErrorsToConsole:
-            print(sMsg)
-
-        if self.oFileErrors:
-            self.oFileErrors.write("\n" + sMsg)
+        if LEVEL_ERROR >= self.nMinLevel:
+            self._enqueue(LEVEL_ERROR, sMsg, args, strCategory)
 
     #________________________CONVENIENT OVERRIDES________________________
-    def add_information(self, sMsg):
+    def add_information(self, sMsg, *args, strCategory=None):
         """Convenience method to add an informational message"""
-        self.AddInfo(sMsg)
+        self.AddInfo(sMsg, *args, strCategory=strCategory)
 
-    def add_warning(self, sMsg):
+    def add_warning(self, sMsg, *args, strCategory=None):
         """Convenience method to add a warning message"""
-        self.AddWarning(sMsg)
+        self.AddWarning(sMsg, *args, strCategory=strCategory)
 
-    def add_error(self, sMsg):
+    def add_error(self, sMsg, *args, strCategory=None):
         """Convenience method to add an error message"""
-        self.AddError(sMsg)
+        self.AddError(sMsg, *args, strCategory=strCategory)
+
+    #_________________________BACKGROUND WRITER________________________
+    def Flush(self):
+        """Block until every message added so far has been written"""
+        if self.oWriterThread is None or not self.oWriterThread.is_alive():
+            return
+        with self.oWriterCondition:
+            self.bFlushRequested = True
+            self.oWakeEvent.set()
+            while self.oPending or self.bWriterBusy:
+                self.oWriterCondition.wait(0.1)
+            self.bFlushRequested = False
+
+    def _enqueue(self, nLevel, sMsg, tArgs, strCategory):
+        """Hand a message and its unformatted args to the writer thread, capturing only the time it was raised"""
+        if not self.bAsync:
+            self._writebatch([(nLevel, time.time(), sMsg, tArgs, strCategory)])
+            return
+        if self.oWriterThread is None:
+            self._startwriter()
+        # deque.append is atomic, so producers never take a lock
+        self.oPending.append((nLevel, time.time(), sMsg, tArgs, strCategory))
+        if not self.oWakeEvent.is_set():
+            self.oWakeEvent.set()
+
+    def _startwriter(self):
+        """Start the background writer thread for this process"""
+        self.oPending = collections.deque()
+        self.oWakeEvent = threading.Event()
+        self.oWriterCondition = threading.Condition()
+        self.bWriterBusy = False
+        self.bFlushRequested = False
+        self.bStopWriter = False
+        self.oWriterThread = threading.Thread(target=self._writerloop, name="MessagingWriter", daemon=True)
+        self.oWriterThread.start()
+
+    def _stopwriter(self):
+        """Stop the background writer thread once it has written everything queued"""
+        if self.oWriterThread is not None and self.oWriterThread.is_alive():
+            self.bStopWriter = True
+            self.oWakeEvent.set()
+            self.oWriterThread.join(timeout=5)
+        self.oWriterThread = None
+
+    def _resetwriter(self):
+        """Forget the parent's writer thread in a forked child; messages inherited unwritten are dropped"""
+        self.oWriterThread = None
+        self.oPending = collections.deque()
+
+    def _writerloop(self):
+        """Collect messages for a short window, then format and write them as one batch"""
+        while True:
+            self.oWakeEvent.wait()
+            if not self.bStopWriter and not self.bFlushRequested:
+                # Let a burst of messages from a hot loop accumulate so repeats are aggregated
+                time.sleep(self.fBatchWindow)
+            self.oWakeEvent.clear()
+            with self.oWriterCondition:
+                self.bWriterBusy = True
+            lBatch = []
+            try:
+                while True:
+                    lBatch.append(self.oPending.popleft())
+            except IndexError:
+                pass
+            try:
+                if lBatch:
+                    self._writebatch(lBatch)
+            except Exception as e:
+                print(f"Messaging writer failed: {e}")
+            with self.oWriterCondition:
+                self.bWriterBusy = False
+                self.oWriterCondition.notify_all()
+            if self.bStopWriter and not self.oPending:
+                return
+
+    def _writebatch(self, lMessages):
+        """Format a batch of messages, collapsing repeats, and write each destination once"""
+        dictGroups = {}
+        for nLevel, fTime, sMsg, tArgs, strCategory in lMessages:
+            if nLevel == LEVEL_RAW:
+                tKey = (nLevel, len(dictGroups))
+            elif strCategory is not None:
+                tKey = (nLevel, strCategory)
+            else:
+                tKey = (nLevel, str(sMsg), repr(tArgs))
+            if tKey in dictGroups:
+                dictGroups[tKey][4] += 1
+            else:
+                dictGroups[tKey] = [nLevel, fTime, sMsg, tArgs, 1, strCategory]
+
+        dictPrint = {LEVEL_INFO: self.bPrintMsgsToConsole, LEVEL_WARNING: self.bPrintWarningsToConsole,
+                     LEVEL_ERROR: self.bPrintErrorsToConsole}
+        dictFileLines = {LEVEL_INFO: [], LEVEL_WARNING: [], LEVEL_ERROR: []}
+        lConsoleLines = []
+        for nLevel, fTime, sMsg, tArgs, nCount, strCategory in dictGroups.values():
+            try:
+                sMsg = str(sMsg) % tArgs if tArgs else str(sMsg)
+            except (ValueError, TypeError) as e:
+                sMsg = f"Error formatting message: {e}"
+            if nLevel == LEVEL_RAW:
+                nLevel = LEVEL_INFO
+            else:
+                if nCount > 1 and strCategory is not None:
+                    sMsg = f"{nCount:,} \u00d7 {strCategory} (e.g. {sMsg})"
+                elif nCount > 1:
+                    sMsg = f"{nCount:,} \u00d7 {sMsg}"
+                sMsg = f"{datetime.datetime.fromtimestamp(fTime)} - {LEVEL_NAMES[nLevel]}: {sMsg}"
+            if dictPrint[nLevel]:
+                lConsoleLines.append(sMsg)
+            dictFileLines[nLevel].append(sMsg)
+
+        with self.oWriteLock:
+            if lConsoleLines:
+                print("\n".join(lConsoleLines))
+            for nLevel, oFile in ((LEVEL_INFO, self.oFileMsgs), (LEVEL_WARNING, self.oFileWarnings),
+                                  (LEVEL_ERROR, self.oFileErrors)):
+                if oFile and dictFileLines[nLevel]:
+                    oFile.write("\n" + "\n".join(dictFileLines[nLevel]))
+                    oFile.flush()
 
     #_________________________DESTRUCTOR________________________
     def __del__(self):
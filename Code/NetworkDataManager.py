@@ -4,20 +4,71 @@ Manages multiple data sources and provides standardized data access for the fram
 Part of the Jesse PowerFactory Modelling Framework.
 """
 
-from typing import Dict, Any, Optional
-import pandas as pd
+from __future__ import annotations
+
+from typing import Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 
-from Code.DataSources.ETYS.ETYSDataReader import ETYSDataReader
-from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
-from Code.DataSources.ValidationResult import ValidationResult
+from Code.Instrumentation import span
+from Code.LazyImports import lazyimport, importobject
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from Code.DataSources.ValidationResult import ValidationResult
+else:
+    # pandas and the source readers/validators are only imported when data is first loaded
+    pd = lazyimport('pandas')
+
+# Reader and validator classes of the built-in data sources, imported on first use. The format plugins stream
+# their data in the ETYS sheet vocabulary, so they share the ETYS validator, standardisation and DataModel loader.
+DATA_SOURCE_FACTORIES = {
+    'etys': ('Code.DataSources.ETYS.ETYSDataReader.ETYSDataReader',
+             'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+    'csv': ('Code.DataSources.Plugins.CSVDataReader.CSVDataReader',
+            'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+    'parquet': ('Code.DataSources.Plugins.ParquetDataReader.ParquetDataReader',
+                'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+    'arrow': ('Code.DataSources.Plugins.ArrowDataReader.ArrowDataReader',
+              'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+    'psse': ('Code.DataSources.Plugins.PSSERawDataReader.PSSERawDataReader',
+             'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+    'matpower': ('Code.DataSources.Plugins.MatpowerDataReader.MatpowerDataReader',
+                 'Code.DataSources.ETYS.ETYSDataValidator.ETYSDataValidator'),
+}
 
 
 class NetworkDataManager:
     """Orchestrates multiple data sources for network modeling"""
 
     def __init__(self):
-        self.data_sources = {'etys': (ETYSDataReader(), ETYSDataValidator())}
+        self.data_sources = {}
+        self.data_source_factories = dict(DATA_SOURCE_FACTORIES)
+        # Validation of the last streamed dataset, complete once its stream is exhausted
+        self.stream_validation_result = None
+        # DataExporter, created on the first export so importing the manager does not load pandas or pyarrow
+        self.exporter = None
+
+    def get_data_source(self, source_type: str) -> Tuple[Any, Any]:
+        """
+        Get the (reader, validator) pair of a data source, creating it on first use
+        Args:
+            source_type (str): Type of data source ('etys', etc.)
+        Returns:
+            Tuple[Any, Any]: Reader and validator instances
+        Raises:
+            ValueError: If source type is not supported
+        """
+        if source_type not in self.data_sources:
+            if source_type not in self.data_source_factories:
+                raise ValueError(f"Unsupported data source type: {source_type}")
+            reader_path, validator_path = self.data_source_factories[source_type]
+            self.data_sources[source_type] = (importobject(reader_path)(), importobject(validator_path)())
+        return self.data_sources[source_type]
+
+    def get_source_schema(self, source_type: str) -> str:
+        """Sheet vocabulary of a data source, the source type itself unless its reader declares one"""
+        reader, _ = self.get_data_source(source_type)
+        return getattr(reader, 'SCHEMA', source_type)
 
     def load_and_validate_data(self, source_type: str, **kwargs) -> ValidationResult:
         """
@@ -30,11 +81,11 @@ class NetworkDataManager:
         Raises:
             ValueError: If source type is not supported
         """
-        if source_type not in self.data_sources:
-            raise ValueError(f"Unsupported data source type: {source_type}")
-        reader, validator = self.data_sources[source_type]
-        raw_data = reader.load_data(**kwargs)
-        return validator.validate(raw_data)
+        reader, validator = self.get_data_source(source_type)
+        with span("datasource.read", source=source_type):
+            raw_data = reader.load_data(**kwargs)
+        with span("datasource.validate", source=source_type):
+            return validator.validate(raw_data)
 
     def get_standardized_data(self, source_type: str, strict_validation: bool = False, export_to_excel: bool = False, output_file_path: Optional[str] = None, **kwargs) -> Dict[str, pd.DataFrame]:
         validation_result = self.load_and_validate_data(source_type, **kwargs)
@@ -54,12 +105,14 @@ class NetworkDataManager:
             # Try to get raw data instead as fallback
             if hasattr(validation_result, 'raw_data') and validation_result.raw_data is not None:
                 print("Falling back to raw_data")
-                standardized_data = self._standardize_to_common_format(validation_result.raw_data, source_type)
+                standardized_data = self._standardize_to_common_format(validation_result.raw_data,
+                                                                       self.get_source_schema(source_type))
             else:
                 raise ValueError("No data available to process - both cleaned_data and raw_data are None")
         else:
             # Create standardized data from cleaned data
-            standardized_data = self._standardize_to_common_format(validation_result.cleaned_data, source_type)
+            standardized_data = self._standardize_to_common_format(validation_result.cleaned_data,
+                                                                   self.get_source_schema(source_type))
         # Handle Excel export if requested
         if export_to_excel:
             if output_file_path is None:
@@ -77,13 +130,8 @@ class NetworkDataManager:
             standardized_data (Dict[str, pd.DataFrame]): Already standardized data
             output_file_path (str): Path where Excel file should be saved
         """
-        with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-            for sheet_name, df in standardized_data.items():
-                # Clean sheet name for Excel (max 31 chars, no special chars)
-                clean_sheet_name = sheet_name.replace('/', '_').replace('\\', '_')[:31]
-                df.to_excel(writer, sheet_name=clean_sheet_name, index=False)
-        print(f"Standardized data exported to: {output_file_path}")
-        print(f"Created {len(standardized_data)} tabs: {list(standardized_data.keys())}")
+        self.export_data(standardized_data, output_file_path, 'xlsx')
+
     def export_standardized_data_to_excel(self, source_type: str, output_file_path: str, **kwargs):
         """
         Export standardized data to Excel file with separate tabs for each element type
@@ -92,16 +140,43 @@ class NetworkDataManager:
             output_file_path (str): Path where Excel file should be saved
             **kwargs: Arguments passed to the data reader
         """
-        # Get the standardized data
+        return self.export_standardized_data(source_type, output_file_path, 'xlsx', **kwargs)
+
+    def export_standardized_data(self, source_type: str, output_path: str, export_format: str = 'parquet',
+                                 compression: Optional[str] = None, **kwargs) -> Dict[str, str]:
+        """
+        Export standardized data, one file per element type or one workbook tab per element type for xlsx
+        Args:
+            source_type (str): Type of data source ('etys', etc.)
+            output_path (str): Directory of the sheet files, or the workbook for xlsx
+            export_format (str): 'parquet', 'arrow', 'csv' or 'xlsx'
+            compression (Optional[str]): Codec of the sheet files, see DataExporter.export
+            **kwargs: Arguments passed to the data reader
+        Returns:
+            Dict[str, str]: Path written for every element type
+        """
         standardized_data = self.get_standardized_data(source_type, **kwargs)
-        # Create Excel writer
-        with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
-            for sheet_name, df in standardized_data.items():
-                # Clean sheet name for Excel (max 31 chars, no special chars)
-                clean_sheet_name = sheet_name.replace('/', '_').replace('\\', '_')[:31]
-                df.to_excel(writer, sheet_name=clean_sheet_name, index=False)
-        print(f"Standardized data exported to: {output_file_path}")
-        print(f"Created {len(standardized_data)} tabs: {list(standardized_data.keys())}")
+        return self.export_data(standardized_data, output_path, export_format, compression)
+
+    def export_data(self, data: Dict[str, pd.DataFrame], output_path: str, export_format: str = 'parquet',
+                    compression: Optional[str] = None) -> Dict[str, str]:
+        """
+        Write a {sheet name: DataFrame} dataset through the exporter
+        Args:
+            data (Dict[str, pd.DataFrame]): Sheets to write
+            output_path (str): Directory of the sheet files, or the workbook for xlsx
+            export_format (str): 'parquet', 'arrow', 'csv' or 'xlsx'
+            compression (Optional[str]): Codec of the sheet files, see DataExporter.export
+        Returns:
+            Dict[str, str]: Path written for every sheet
+        """
+        if self.exporter is None:
+            from Code.DataSources.DataExporter import DataExporter
+            self.exporter = DataExporter()
+        sheet_paths = self.exporter.export(data, output_path, export_format, compression)
+        print(f"Data exported to: {output_path}")
+        print(f"Created {len(data)} tabs: {list(data.keys())}")
+        return sheet_paths
 
     def _standardize_to_common_format(self, data: Optional[Dict[str, pd.DataFrame]],
                                       source_type: str) -> Dict[str, pd.DataFrame]:
@@ -116,7 +191,8 @@ class NetworkDataManager:
         if data is None:
             return {}
         if source_type == 'etys':
-            return self._standardize_etys_data(data)
+            with span("datasource.standardise", source=source_type):
+                return self._standardize_etys_data(data)
         else:
             # Future: Add handling for other source types (neso, geographic, etc.)
             return data
@@ -239,10 +315,11 @@ class NetworkDataManager:
             if not hasattr(gbl, 'DataSourceInterfaceContainer') or gbl.DataSourceInterfaceContainer is None:
                 raise RuntimeError("ETYSDataModelInterface not initialized in framework")
             # Step 3: Use orchestration to load data
-            success = gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(
-                standardized_data,
-                load_strategy=load_strategy
-            )
+            with span("datasource.orchestrate", strategy=load_strategy):
+                success = gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(
+                    standardized_data,
+                    load_strategy=load_strategy
+                )
             if success:
                 return True
             else:
@@ -252,6 +329,71 @@ class NetworkDataManager:
             print(f"ETYS data loading failed: {e}")
             return False
 
+    def iter_standardized_batches(self, source_type: str, strict_validation: bool = False, chunk_size: int = None,
+                                  **kwargs) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Stream a data source as validated, standardised (sheet name, batch) pairs. Readers without a streaming
+        protocol are read whole and passed on one sheet at a time.
+        Args:
+            source_type (str): Type of data source ('csv', 'parquet', 'psse', etc.)
+            strict_validation (bool): Raise before a batch failing validation is passed on
+            chunk_size (int): Rows per batch, by default the reader's own
+            **kwargs: Arguments passed to the data reader (e.g. file_path)
+        Returns:
+            Iterator[Tuple[str, pd.DataFrame]]: Standardised batches; self.stream_validation_result holds the
+            validation messages so far
+        Raises:
+            ValueError: If strict validation fails
+        """
+        from Code.DataSources.ValidationResult import ValidationResult
+        reader, validator = self.get_data_source(source_type)
+        schema = self.get_source_schema(source_type)
+        if hasattr(reader, 'iter_batches'):
+            if chunk_size:
+                reader.chunk_size = int(chunk_size)
+            raw_batches = reader.iter_batches(**kwargs)
+        else:
+            raw_batches = iter(reader.load_data(**kwargs).items())
+        self.stream_validation_result = result = ValidationResult(is_valid=True, messages=[])
+        reported = 0
+        for sheet_name, batch in validator.validate_batches(raw_batches, result):
+            if not result.is_valid and len(result.errors) > reported:
+                error_msg = f"Data validation failed: {'; '.join(msg.message for msg in result.errors[reported:])}"
+                if strict_validation:
+                    raise ValueError(error_msg)
+                print(error_msg)
+                reported = len(result.errors)
+            with span("datasource.standardise", source=source_type):
+                standardized = self._standardize_to_common_format({sheet_name: batch}, schema)
+            yield from standardized.items()
+
+    def stream_data_to_framework(self, source_type: str, strict_validation: bool = False, chunk_size: int = None,
+                                 load_strategy: str = "datamodel", **kwargs) -> bool:
+        """
+        Streaming data loading pipeline: reader batches → validation → standardisation → DataModel (or, with the
+        'direct' strategy, the network of the study engine), one batch in memory at a time
+        Args:
+            source_type (str): Type of data source ('csv', 'parquet', 'arrow', 'psse', 'matpower', ...)
+            strict_validation (bool): Stop before a batch failing validation is loaded
+            chunk_size (int): Rows per batch, by default the reader's own
+            load_strategy (str): 'datamodel' or 'direct' loading strategy
+            **kwargs: Arguments passed to the data reader (e.g. file_path)
+        Returns:
+            bool: True if loading successful, False otherwise
+        """
+        from Code import GlobalEngineRegistry as gbl
+        if not hasattr(gbl, 'DataSourceInterfaceContainer') or gbl.DataSourceInterfaceContainer is None:
+            raise RuntimeError("ETYSDataModelInterface not initialized in framework")
+        batches = self.iter_standardized_batches(source_type, strict_validation, chunk_size, **kwargs)
+        with span("datasource.stream", source=source_type, strategy=load_strategy):
+            if load_strategy == "datamodel":
+                success = gbl.DataSourceInterfaceContainer.load_batches_to_datamodel(batches)
+            else:
+                success = gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(batches, load_strategy)
+        if not success:
+            print(f"Failed to stream {source_type} data with the {load_strategy} strategy")
+        return success
+
     def get_available_data_sources(self) -> Dict[str, Dict[str, Any]]:
         """
         Get information about available data sources
@@ -259,7 +401,9 @@ class NetworkDataManager:
             Dict[str, Dict[str, Any]]: Source information including capabilities
         """
         sources_info = {}
-        for source_name, (reader, validator) in self.data_sources.items():
+        for source_name in list(self.data_source_factories) + [name for name in self.data_sources
+                                                              if name not in self.data_source_factories]:
+            reader, validator = self.get_data_source(source_name)
             sources_info[source_name] = {
                 'reader_info': reader.get_data_source_info(),
                 'validator_info': validator.get_validation_rules(),
@@ -283,8 +427,8 @@ class NetworkDataManager:
         Args:
             source_name (str): Data source identifier to remove
         """
-        if source_name in self.data_sources:
-            del self.data_sources[source_name]
+        self.data_sources.pop(source_name, None)
+        self.data_source_factories.pop(source_name, None)
 
     def get_validation_report(self, source_type: str, **kwargs) -> str:
         """
@@ -0,0 +1,388 @@
+"""
+ResultStore - Columnar on-disk store for study results
+Snapshots each study run (load flow, short circuit, contingency) into Arrow IPC files keyed by
+run id, network hash and settings hash. Re-opening a previous run reads only the requested columns
+and closes the file again, so a run in use can still be deleted or replaced (Windows locks mapped files).
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, Any, List, Optional
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Results.ResultTables import extractresulttables, RESULT_TABLE_KEYS
+
+
+class ResultStore:
+    """Persists study results as one Arrow IPC file per table and run"""
+
+    MANIFEST_FILE = 'manifest.json'
+    TABLE_EXTENSION = '.arrow'
+
+    def __init__(self, root_path: str):
+        self.root_path = os.path.abspath(root_path)
+        os.makedirs(self.root_path, exist_ok=True)
+        self._manifests = {}
+
+    # ==========================================================================
+    # WRITING
+    # ==========================================================================
+
+    def snapshotstudy(self, study_type: str, settings: Optional[Dict[str, Any]] = None,
+                      run_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                      datamodel=None) -> str:
+        """
+        Snapshot the results currently held on the DataModel into the store
+        Args:
+            study_type (str): Study type ('loadflow', 'shortcircuit', 'contingency')
+            settings (Optional[Dict[str, Any]]): Solver settings the study was run with
+            run_id (Optional[str]): Run identifier (generated when not given)
+            metadata (Optional[Dict[str, Any]]): Extra information kept in the manifest,
+                e.g. the outage applied for a contingency run
+            datamodel: DataModelManager to snapshot (defaults to gbl.DataModelManager)
+        Returns:
+            str: Run id of the stored snapshot
+        """
+        datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+        tables = extractresulttables(study_type, datamodel)
+        return self.writerun(study_type, tables, settings=settings, run_id=run_id,
+                             metadata=metadata, network_hash=datamodel.getnetworkhash())
+
+    def writerun(self, study_type: str, tables: Dict[str, pd.DataFrame],
+                 settings: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None, network_hash: str = '') -> str:
+        """
+        Write already extracted result tables as a new run
+        Args:
+            study_type (str): Study type the tables belong to
+            tables (Dict[str, pd.DataFrame]): Result tables keyed by table name
+            settings (Optional[Dict[str, Any]]): Solver settings the study was run with
+            run_id (Optional[str]): Run identifier (generated when not given)
+            metadata (Optional[Dict[str, Any]]): Extra information kept in the manifest
+            network_hash (str): Hash of the network the results were produced on
+        Returns:
+            str: Run id of the stored snapshot
+        """
+        settings = settings or {}
+        if run_id is None:
+            run_id = f"{study_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        run_path = self._getrunpath(run_id)
+        if os.path.exists(run_path):
+            raise ValueError(f"Result run already exists: {run_id}")
+        temp_path = run_path + '.tmp'
+        os.makedirs(temp_path)
+        table_rows = {}
+        for table_name, df in tables.items():
+            arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(os.path.join(temp_path, table_name + self.TABLE_EXTENSION), 'wb') as sink:
+                with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                    writer.write_table(arrow_table)
+            table_rows[table_name] = arrow_table.num_rows
+        manifest = {
+            'run_id': run_id,
+            'study_type': study_type,
+            'network_hash': network_hash,
+            'settings_hash': self.getsettingshash(settings),
+            'settings': settings,
+            'metadata': metadata or {},
+            'created': datetime.now().isoformat(),
+            'tables': table_rows,
+        }
+        with open(os.path.join(temp_path, self.MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        # Rename last so that readers never see a half written run
+        os.replace(temp_path, run_path)
+        self._manifests[run_id] = manifest
+        return run_id
+
+    def opentimeseriesrun(self, study_type: str, settings: Optional[Dict[str, Any]] = None,
+                          run_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+                          network_hash: str = '') -> 'TimeSeriesRunWriter':
+        """
+        Start a run whose tables are written incrementally, one record batch per chunk of time steps
+        Args:
+            study_type (str): Study type, e.g. 'timeseries'
+            settings (Optional[Dict[str, Any]]): Solver settings the study was run with
+            run_id (Optional[str]): Run identifier (generated when not given)
+            metadata (Optional[Dict[str, Any]]): Extra information kept in the manifest
+            network_hash (str): Hash of the base network the time series ran on
+        Returns:
+            TimeSeriesRunWriter: Writer to append batches to; the run becomes visible when it is closed
+        """
+        if run_id is None:
+            run_id = f"{study_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        run_path = self._getrunpath(run_id)
+        if os.path.exists(run_path):
+            raise ValueError(f"Result run already exists: {run_id}")
+        return TimeSeriesRunWriter(self, run_id, study_type, settings or {}, metadata or {}, network_hash)
+
+    def deleterun(self, run_id: str) -> bool:
+        """
+        Delete a stored run
+        Args:
+            run_id (str): Run identifier
+        Returns:
+            bool: True if the run existed and was removed
+        """
+        run_path = self._getrunpath(run_id)
+        self._manifests.pop(run_id, None)
+        if not os.path.isdir(run_path):
+            return False
+        shutil.rmtree(run_path)
+        return True
+
+    # ==========================================================================
+    # QUERYING
+    # ==========================================================================
+
+    def listruns(self, study_type: Optional[str] = None, network_hash: Optional[str] = None,
+                 settings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        List stored runs matching the given filters, oldest first
+        Args:
+            study_type (Optional[str]): Only return runs of this study type
+            network_hash (Optional[str]): Only return runs produced on this network
+            settings (Optional[Dict[str, Any]]): Only return runs made with these settings
+        Returns:
+            List[Dict[str, Any]]: Run manifests
+        """
+        settings_hash = self.getsettingshash(settings) if settings is not None else None
+        runs = []
+        for run_id in os.listdir(self.root_path):
+            if run_id.endswith('.tmp'):
+                continue
+            manifest = self.getrunmanifest(run_id)
+            if manifest is None:
+                continue
+            if study_type is not None and manifest['study_type'] != study_type:
+                continue
+            if network_hash is not None and manifest['network_hash'] != network_hash:
+                continue
+            if settings_hash is not None and manifest['settings_hash'] != settings_hash:
+                continue
+            runs.append(manifest)
+        runs.sort(key=lambda manifest: manifest['created'])
+        return runs
+
+    def getlatestrun(self, study_type: str, network_hash: Optional[str] = None,
+                     settings: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the manifest of the most recent run matching the filters
+        Returns:
+            Optional[Dict[str, Any]]: Run manifest, or None if nothing matches
+        """
+        runs = self.listruns(study_type, network_hash, settings)
+        return runs[-1] if runs else None
+
+    def getrunmanifest(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the manifest of a stored run
+        Args:
+            run_id (str): Run identifier
+        Returns:
+            Optional[Dict[str, Any]]: Run manifest, or None if the run does not exist
+        """
+        if run_id in self._manifests:
+            return self._manifests[run_id]
+        manifest_path = os.path.join(self._getrunpath(run_id), self.MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self._manifests[run_id] = manifest
+        return manifest
+
+    def loadtable(self, run_id: str, table_name: str,
+                  columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Read a result table of a run, or some of its columns, into memory
+        Args:
+            run_id (str): Run identifier
+            table_name (str): Table name ('busbars', 'branches', 'generators', 'loads')
+            columns (Optional[List[str]]): Columns to select (default all)
+        Returns:
+            pa.Table: Arrow table holding no reference to the file
+        Raises:
+            KeyError: If the run or table does not exist
+        """
+        table_path = os.path.join(self._getrunpath(run_id), table_name + self.TABLE_EXTENSION)
+        if not os.path.isfile(table_path):
+            raise KeyError(f"Result table '{table_name}' not found for run {run_id}")
+        # Read from the file rather than a memory map, which would stay open as long as the table is referenced
+        with pa.OSFile(table_path, 'rb') as source:
+            options = None
+            if columns is not None:
+                schema = pa.ipc.open_file(source).schema
+                options = pa.ipc.IpcReadOptions(included_fields=[schema.get_field_index(column) for column in columns])
+            arrow_table = pa.ipc.open_file(source, options=options).read_all()
+        if columns is not None:
+            arrow_table = arrow_table.select(columns)
+        return arrow_table
+
+    def loadrun(self, run_id: str, tables: Optional[List[str]] = None,
+                as_pandas: bool = True) -> Dict[str, Any]:
+        """
+        Load the result tables of a run
+        Args:
+            run_id (str): Run identifier
+            tables (Optional[List[str]]): Subset of tables to load (default all)
+            as_pandas (bool): Convert to DataFrames, otherwise return Arrow tables
+        Returns:
+            Dict[str, Any]: Tables keyed by table name
+        Raises:
+            KeyError: If the run does not exist
+        """
+        manifest = self.getrunmanifest(run_id)
+        if manifest is None:
+            raise KeyError(f"Result run not found: {run_id}")
+        loaded_tables = {}
+        for table_name in manifest['tables']:
+            if tables is not None and table_name not in tables:
+                continue
+            arrow_table = self.loadtable(run_id, table_name)
+            loaded_tables[table_name] = arrow_table.to_pandas() if as_pandas else arrow_table
+        return loaded_tables
+
+    def compareruns(self, run_id_a: str, run_id_b: str, table_name: str = 'busbars',
+                    columns: Optional[List[str]] = None, tolerance: float = 0.0,
+                    changed_only: bool = True) -> pd.DataFrame:
+        """
+        Compare a result table between two runs component by component
+        Args:
+            run_id_a (str): Reference run
+            run_id_b (str): Run compared against the reference
+            table_name (str): Table to compare
+            columns (Optional[List[str]]): Value columns to compare (default all numeric columns)
+            tolerance (float): Absolute difference below which numeric values are treated as equal
+            changed_only (bool): Only return components that differ or exist in one run only
+        Returns:
+            pd.DataFrame: Key columns, then '<column>_a', '<column>_b' and '<column>_delta' per
+                compared column and a '_merge' column showing where each component was found
+        """
+        key_columns = RESULT_TABLE_KEYS[table_name]
+        df_a = self.loadtable(run_id_a, table_name).to_pandas()
+        df_b = self.loadtable(run_id_b, table_name).to_pandas()
+        if columns is None:
+            columns = [c for c in df_a.columns
+                       if c not in key_columns and c in df_b.columns
+                       and pd.api.types.is_numeric_dtype(df_a[c])
+                       and not pd.api.types.is_bool_dtype(df_a[c])]
+        df_a = df_a[key_columns + columns]
+        df_b = df_b[key_columns + columns]
+        merged = df_a.merge(df_b, on=key_columns, how='outer', suffixes=('_a', '_b'), indicator=True)
+        changed = merged['_merge'] != 'both'
+        for column in columns:
+            column_a, column_b = merged[column + '_a'], merged[column + '_b']
+            if pd.api.types.is_numeric_dtype(column_a) and pd.api.types.is_numeric_dtype(column_b):
+                delta = column_b - column_a
+                merged[column + '_delta'] = delta
+                changed |= delta.abs() > tolerance
+                changed |= column_a.isna() != column_b.isna()
+            else:
+                changed |= column_a.astype(str) != column_b.astype(str)
+        if changed_only:
+            merged = merged[changed]
+        return merged.reset_index(drop=True)
+
+    # ==========================================================================
+    # HELPERS
+    # ==========================================================================
+
+    @staticmethod
+    def getsettingshash(settings: Optional[Dict[str, Any]]) -> str:
+        """
+        Get a deterministic hash of a settings dictionary
+        Args:
+            settings (Optional[Dict[str, Any]]): Settings (key order does not matter)
+        Returns:
+            str: SHA-256 hex digest
+        """
+        settings_json = json.dumps(settings or {}, sort_keys=True, default=str)
+        return hashlib.sha256(settings_json.encode()).hexdigest()
+
+    def _getrunpath(self, run_id: str) -> str:
+        """Get the directory holding a run, rejecting ids that would escape the store"""
+        if not run_id or os.path.basename(run_id) != run_id or run_id in ('.', '..'):
+            raise ValueError(f"Invalid result run id: {run_id}")
+        return os.path.join(self.root_path, run_id)
+
+
+class TimeSeriesRunWriter:
+    """Appends time step results to the Arrow IPC files of one run as they are produced"""
+
+    def __init__(self, store: ResultStore, run_id: str, study_type: str, settings: Dict[str, Any],
+                 metadata: Dict[str, Any], network_hash: str):
+        self.store = store
+        self.run_id = run_id
+        self.study_type = study_type
+        self.settings = settings
+        self.metadata = metadata
+        self.network_hash = network_hash
+        self.run_path = store._getrunpath(run_id)
+        self.temp_path = self.run_path + '.tmp'
+        os.makedirs(self.temp_path)
+        # table name -> (sink, writer, rows written)
+        self._writers = {}
+
+    def writebatch(self, table_name: str, steps, columns: Dict[str, Any], index_name: str = 'step'):
+        """
+        Append one batch of time steps to a table
+        Args:
+            table_name (str): Table name, e.g. 'busbars_voltage'
+            steps: Time step index of every row
+            columns (Dict[str, Any]): Column name (usually a component key) -> values per row
+            index_name (str): Name of the index column, e.g. 'fault' for a fault sweep
+        """
+        arrays = [pa.array(steps, type=pa.int64())] + [pa.array(values) for values in columns.values()]
+        batch = pa.RecordBatch.from_arrays(arrays, names=[index_name] + list(columns))
+        entry = self._writers.get(table_name)
+        if entry is None:
+            sink = pa.OSFile(os.path.join(self.temp_path, table_name + ResultStore.TABLE_EXTENSION), 'wb')
+            entry = [sink, pa.ipc.new_file(sink, batch.schema), 0]
+            self._writers[table_name] = entry
+        entry[1].write_batch(batch)
+        entry[2] += batch.num_rows
+
+    def close(self) -> str:
+        """
+        Finish the tables, write the manifest and publish the run
+        Returns:
+            str: Run id of the stored run
+        """
+        table_rows = {}
+        for table_name, (sink, writer, rows) in self._writers.items():
+            writer.close()
+            sink.close()
+            table_rows[table_name] = rows
+        self._writers = {}
+        manifest = {
+            'run_id': self.run_id,
+            'study_type': self.study_type,
+            'network_hash': self.network_hash,
+            'settings_hash': ResultStore.getsettingshash(self.settings),
+            'settings': self.settings,
+            'metadata': self.metadata,
+            'created': datetime.now().isoformat(),
+            'tables': table_rows,
+        }
+        with open(os.path.join(self.temp_path, ResultStore.MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(self.temp_path, self.run_path)
+        self.store._manifests[self.run_id] = manifest
+        return self.run_id
+
+    def abort(self):
+        """Discard a run that did not complete"""
+        for sink, writer, _ in self._writers.values():
+            writer.close()
+            sink.close()
+        self._writers = {}
+        shutil.rmtree(self.temp_path, ignore_errors=True)
@@ -0,0 +1,177 @@
+"""
+ResultTables - Column definitions and extraction of study results from the DataModel
+Turns the result attributes written back onto DataModel components after a study into
+columnar pandas tables that can be persisted, compared and cached.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, List, Optional
+import pandas as pd
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+
+
+# ==============================================================================
+# TABLE DEFINITIONS
+# ==============================================================================
+
+# Maps each result table onto the DataModel tab it is extracted from
+RESULT_TABLE_TABS = {
+    'busbars': 'Busbar_TAB',
+    'branches': 'Branch_TAB',
+    'generators': 'Gen_TAB',
+    'loads': 'Load_TAB',
+}
+
+# Identifying columns for each table, always stored as strings so runs can be joined
+RESULT_TABLE_KEYS = {
+    'busbars': ['BusID'],
+    'branches': ['BranchID', 'BusID1', 'BusID2', 'BusID3'],
+    'generators': ['BusID', 'GenID'],
+    'loads': ['BusID', 'LoadID'],
+}
+
+_LOADFLOW_COLUMNS = {
+    'busbars': ['name', 'kV', 'ON', 'voltage', 'angle', 'MW', 'MVAr', 'LoadFlowResults'],
+    'branches': ['ON', 'loading', 'headroom', 'lossMW', 'lossMVAr'],
+    'generators': ['ON', 'MW', 'MVar', 'MWLoadFlow', 'MVarLoadFlow', 'MVALoadFlow', 'VMagPu',
+                   'powerFactor', 'LoadFlowResults'],
+    'loads': ['ON', 'MW', 'MVar', 'MWLoadFlow', 'MVarLoadFlow', 'MVALoadFlow', 'VMagPu',
+              'LoadFlowResults'],
+}
+
+# Value columns captured for each study type
+RESULT_TABLE_COLUMNS = {
+    'loadflow': _LOADFLOW_COLUMNS,
+    'contingency': _LOADFLOW_COLUMNS,
+    'shortcircuit': {
+        'busbars': ['name', 'kV', 'initialshortcircuitcurrent', 'initialshortcircuitmva',
+                    'peakshortcircuitcurrent', 'breakingshortcircuitcurrent',
+                    'breakingshortcircuitmva', 'steadystateshortcircuitcurrent',
+                    'steadystateshortcircuitmva', 'singlephaseshortcircuitcurrent', 'realshortcircuitimpedance',
+                    'imaginaryshortcircuitimpedance'],
+        'generators': ['ON', 'shortcircuit_skss', 'shortcircuit_ikss', 'shortcircuit_ikss_angle',
+                       'shortcircuit_ip'],
+    },
+}
+
+
+# ==============================================================================
+# EXTRACTION
+# ==============================================================================
+
+def getresulttablecolumns(study_type: str) -> Dict[str, List[str]]:
+    """
+    Get the value columns captured for a study type
+    Args:
+        study_type (str): Study type ('loadflow', 'shortcircuit', 'contingency')
+    Returns:
+        Dict[str, List[str]]: Value columns keyed by table name
+    Raises:
+        ValueError: If the study type has no table definition
+    """
+    if study_type not in RESULT_TABLE_COLUMNS:
+        raise ValueError(f"Unsupported study type for result tables: {study_type}")
+    return RESULT_TABLE_COLUMNS[study_type]
+
+
+@timed("results.extract")
+def extractresulttables(study_type: str, datamodel=None,
+                        tables: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Extract the results of a study from the DataModel into columnar tables
+    Args:
+        study_type (str): Study type ('loadflow', 'shortcircuit', 'contingency')
+        datamodel: DataModelManager to read from (defaults to gbl.DataModelManager)
+        tables (Optional[List[str]]): Subset of tables to extract (default all for the study)
+    Returns:
+        Dict[str, pd.DataFrame]: One DataFrame per table, one row per component in tab order
+    """
+    datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+    table_columns = getresulttablecolumns(study_type)
+    result_tables = {}
+    for table_name, value_columns in table_columns.items():
+        if tables is not None and table_name not in tables:
+            continue
+        components = getattr(datamodel, RESULT_TABLE_TABS[table_name])
+        columns = {}
+        for key_column in RESULT_TABLE_KEYS[table_name]:
+            columns[key_column] = [_tokey(getattr(c, key_column, None)) for c in components]
+        for value_column in value_columns:
+            columns[value_column] = _tocolumn([getattr(c, value_column, None) for c in components])
+        result_tables[table_name] = pd.DataFrame(columns)
+    return result_tables
+
+
+def _tokey(value) -> str:
+    """Normalise an identifier so int and str IDs compare equal across runs"""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _tocolumn(values: list) -> list:
+    """
+    Coerce a column of attribute values into a single Arrow-compatible type.
+    Numeric and boolean columns are kept as they are; anything mixed is stored as strings.
+    """
+    bNumeric = True
+    bBoolean = True
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            bNumeric = False
+        elif isinstance(value, (int, float)):
+            bBoolean = False
+        else:
+            bNumeric = False
+            bBoolean = False
+            break
+    if bBoolean:
+        return values
+    if bNumeric:
+        return [float('nan') if value is None else float(value) for value in values]
+    return [None if value is None else str(value) for value in values]
+
+
+# ==============================================================================
+# WRITE BACK
+# ==============================================================================
+
+@timed("results.apply")
+def applyresulttables(study_type: str, tables: Dict[str, pd.DataFrame], datamodel=None) -> bool:
+    """
+    Write stored result tables back onto the DataModel components they were extracted from.
+    Rows are matched to components by tab position, which is only valid for a DataModel with the
+    same network hash as the one the tables came from; the identifiers are checked to make sure.
+    Args:
+        study_type (str): Study type the tables belong to
+        tables (Dict[str, pd.DataFrame]): Result tables keyed by table name
+        datamodel: DataModelManager to update (defaults to gbl.DataModelManager)
+    Returns:
+        bool: True if all tables were applied
+    Raises:
+        ValueError: If a table does not line up with the DataModel tab
+    """
+    datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+    table_columns = getresulttablecolumns(study_type)
+    for table_name, df in tables.items():
+        components = getattr(datamodel, RESULT_TABLE_TABS[table_name])
+        if len(df) != len(components):
+            raise ValueError(f"Result table '{table_name}' has {len(df)} rows but the DataModel has "
+                             f"{len(components)} components")
+        for key_column in RESULT_TABLE_KEYS[table_name]:
+            stored_keys = df[key_column].tolist()
+            if stored_keys != [_tokey(getattr(c, key_column, None)) for c in components]:
+                raise ValueError(f"Result table '{table_name}' does not match the DataModel on {key_column}")
+        for value_column in table_columns.get(table_name, []):
+            if value_column not in df.columns:
+                continue
+            for component, value in zip(components, df[value_column].tolist()):
+                # Attributes that were never set on the component were stored as nulls
+                if value is None or value != value:
+                    continue
+                setattr(component, value_column, value)
+    return True
@@ -0,0 +1,211 @@
+"""
+StudyResultCache - Memoised study results keyed on network state and solver settings
+Sits in front of the load flow and short circuit containers. A study is identified by the
+DataModel network hash, the engine in use and the state of the network it solves, the study
+type and the solver settings, together with the cache format version and the engine version so results
+stored before a solver or result format change are not restored after it. When an
+identical study has been run before, its stored results are written straight back onto the
+DataModel instead of calling the engine. Entries are kept in a ResultStore and evicted least
+recently used first once the entry count or disk size bound is exceeded.
+Part of the Jesse PowerFactory Modelling Framework.
+"""
+
+from typing import Dict, Any, Optional
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Results.ResultStore import ResultStore
+from Code.Results.ResultTables import extractresulttables, applyresulttables
+
+
+class StudyResultCache:
+    """Disk backed LRU cache of study results"""
+
+    # Raise when the solvers or the stored result tables change, so older entries are no longer matched
+    CACHE_VERSION = 1
+
+    def __init__(self, root_path: str, max_entries: int = 256,
+                 max_size_mb: float = 1024.0):
+        self.store = ResultStore(root_path)
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        # key -> size in bytes, ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._size_bytes = 0
+        self._loadentries()
+
+    # ==========================================================================
+    # KEYS
+    # ==========================================================================
+
+    def getnetworkstate(self, solves_datamodel: bool, datamodel=None) -> Optional[str]:
+        """
+        Get the state of the network a study container solves
+        Containers that solve the DataModel itself are fully described by its network hash. Engine
+        backed containers solve the engine network, which is only known to match when the engine
+        reports its state for the DataModel; otherwise None is returned and the study is not cached.
+        Args:
+            solves_datamodel (bool): The container builds its network from the DataModel
+            datamodel: DataModelManager the study runs on (defaults to gbl.DataModelManager)
+        Returns:
+            Optional[str]: Network state, or None when results must not be cached
+        """
+        if solves_datamodel:
+            return 'datamodel'
+        if gbl.EngineContainer is None:
+            return None
+        datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+        return gbl.EngineContainer.getnetworkstate(datamodel)
+
+    def getstudykey(self, study_type: str, settings: Optional[Dict[str, Any]] = None,
+                    datamodel=None, engine_name: Optional[str] = None,
+                    network_state: Optional[str] = 'datamodel', engine_version: Optional[str] = None) -> str:
+        """
+        Get the deterministic fingerprint of a study
+        Args:
+            study_type (str): Study type ('loadflow', 'shortcircuit')
+            settings (Optional[Dict[str, Any]]): Solver settings (key order does not matter)
+            datamodel: DataModelManager the study runs on (defaults to gbl.DataModelManager)
+            engine_name (Optional[str]): Engine identifier (defaults to the active engine)
+            network_state (Optional[str]): State of the solved network from getnetworkstate
+            engine_version (Optional[str]): Engine build (defaults to the version of the active engine)
+        Returns:
+            str: SHA-256 hex digest usable as a cache key
+        """
+        datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+        if engine_name is None:
+            engine_name = type(gbl.EngineContainer).__name__ if gbl.EngineContainer is not None else ''
+        if engine_version is None:
+            engine_version = gbl.EngineContainer.getversion() if gbl.EngineContainer is not None else ''
+        fingerprint = json.dumps({
+            'cache_version': self.CACHE_VERSION,
+            'study_type': study_type,
+            'engine': engine_name,
+            'engine_version': engine_version,
+            'network_hash': datamodel.getnetworkhash(),
+            'network_state': network_state,
+            'settings_hash': ResultStore.getsettingshash(settings),
+        }, sort_keys=True)
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    # ==========================================================================
+    # LOOKUP AND STORAGE
+    # ==========================================================================
+
+    def restore(self, key: str, study_type: str, datamodel=None) -> bool:
+        """
+        Write cached results back onto the DataModel
+        Args:
+            key (str): Study key from getstudykey
+            study_type (str): Study type the key was computed for
+            datamodel: DataModelManager to update (defaults to gbl.DataModelManager)
+        Returns:
+            bool: True on a cache hit, False on a miss
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return False
+        datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+        try:
+            tables = self.store.loadrun(key)
+            applyresulttables(study_type, tables, datamodel)
+        except Exception as e:
+            gbl.Msg.AddWarning(f"Discarding unreadable cached {study_type} results: {e}")
+            self.invalidate(key)
+            self.misses += 1
+            return False
+        self._touch(key)
+        self.hits += 1
+        return True
+
+    def storeresults(self, key: str, study_type: str, settings: Optional[Dict[str, Any]] = None,
+                     datamodel=None) -> bool:
+        """
+        Store the results currently held on the DataModel under a study key
+        Args:
+            key (str): Study key from getstudykey, computed before the study ran
+            study_type (str): Study type
+            settings (Optional[Dict[str, Any]]): Solver settings, kept for reference
+            datamodel: DataModelManager to read from (defaults to gbl.DataModelManager)
+        Returns:
+            bool: True if the results were stored
+        """
+        datamodel = datamodel if datamodel is not None else gbl.DataModelManager
+        if key in self._entries:
+            self._touch(key)
+            return True
+        try:
+            tables = extractresulttables(study_type, datamodel)
+            self.store.writerun(study_type, tables, settings=settings, run_id=key,
+                                network_hash=datamodel.getnetworkhash())
+        except Exception as e:
+            gbl.Msg.AddWarning(f"Failed to cache {study_type} results: {e}")
+            return False
+        size_bytes = self._getentrysize(key)
+        self._entries[key] = size_bytes
+        self._size_bytes += size_bytes
+        self._evict()
+        return True
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Remove one entry, or every entry when no key is given
+        Args:
+            key (Optional[str]): Study key to remove
+        """
+        keys = [key] if key is not None else list(self._entries)
+        for entry_key in keys:
+            self._size_bytes -= self._entries.pop(entry_key, 0)
+            self.store.deleterun(entry_key)
+
+    def getstatistics(self) -> Dict[str, Any]:
+        """Get hit/miss counts and the current cache occupancy"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'size_mb': self._size_bytes / (1024 * 1024),
+            'max_entries': self.max_entries,
+            'max_size_mb': self.max_size_bytes / (1024 * 1024),
+        }
+
+    # ==========================================================================
+    # EVICTION
+    # ==========================================================================
+
+    def _loadentries(self):
+        """Rebuild the LRU order from the entries already on disk, oldest access first"""
+        entries = []
+        for manifest in self.store.listruns():
+            key = manifest['run_id']
+            run_path = os.path.join(self.store.root_path, key)
+            entries.append((os.path.getmtime(run_path), key, self._getentrysize(key)))
+        for _, key, size_bytes in sorted(entries):
+            self._entries[key] = size_bytes
+            self._size_bytes += size_bytes
+        self._evict()
+
+    def _touch(self, key: str):
+        """Mark an entry as most recently used, in memory and on disk for later sessions"""
+        self._entries.move_to_end(key)
+        now = time.time()
+        os.utime(os.path.join(self.store.root_path, key), (now, now))
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds are respected"""
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._size_bytes > self.max_size_bytes):
+            key, size_bytes = self._entries.popitem(last=False)
+            self._size_bytes -= size_bytes
+            self.store.deleterun(key)
+
+    def _getentrysize(self, key: str) -> int:
+        """Get the size on disk of an entry"""
+        run_path = os.path.join(self.store.root_path, key)
+        return sum(entry.stat().st_size for entry in os.scandir(run_path) if entry.is_file())
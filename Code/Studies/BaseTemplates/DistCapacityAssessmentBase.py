@@ -0,0 +1,35 @@
+from Code import GlobalEngineRegistry as gbl
+class DistCapacityAssessmentBase:
+    # Settings of a distribution capacity assessment, overridden per study through the constructor
+    DEFAULT_SETTINGS = {
+        # Busbars (BusIDs) assessed, None for every in service busbar at or below max_busbar_kv
+        "headroom_busbars": None,
+        "max_busbar_kv": 132.0,
+        "thermal_limit_percent": 100.0,
+        "voltage_min_pu": 0.94,
+        "voltage_max_pu": 1.06,
+        "max_injection_mw": 100.0,
+        # Busbars whose linear generation or demand headroom is below this are refined with full load flows
+        "refine_below_mw": 20.0,
+        "max_full_solves": None,
+        "headroom_tolerance_mw": 0.5,
+        "workers": 1,
+        # Engine of the worker processes ('ipsa', 'powerfactory' or 'simulated'), by default the engine in use
+        "engine": None,
+        "push_to_engine": True,
+        "loadflow_settings": {},
+        # Serve the stored results of an identical network and settings instead of rerunning
+        "use_cache": True,
+    }
+    def __init__(self, dictSettings=None):
+        self.msg = gbl.Msg
+        unknown = set(dictSettings or {}) - set(self.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown capacity assessment settings: {', '.join(sorted(unknown))}")
+        self.settings = dict(self.DEFAULT_SETTINGS, **(dictSettings or {}))
+    def runcapacityassessment(self):
+        pass
+    def getcapacityassessmentresults(self):
+        pass
+    def getallcapacityassessmentresults(self):
+        pass
@@ -0,0 +1,35 @@
+from Code import GlobalEngineRegistry as gbl
+class OptimalPowerFlowBase:
+    # Settings of an optimal power flow, overridden per study through the constructor
+    DEFAULT_SETTINGS = {
+        # Rating sets limiting the intact flow (None: the active set) and the flow after a contingency (the intact
+        # rating where the latter is zero)
+        "rating": None,
+        "contingency_rating": "RatingB",
+        "loading_limit_percent": 100.0,
+        # Outages secured against: None, 'all' or a list of BranchIDs
+        "contingencies": None,
+        # Redispatch prices per MW moved up and down, by GenID or PlantType: a price or (offer, bid)
+        "costs": {},
+        "default_cost": 1.0,
+        # External grids keep their output unless they may be redispatched at this price
+        "external_grid_redispatch": False,
+        "external_grid_cost": 1000.0,
+        # Price of flow left above a limit, keeps the problem solvable when redispatch cannot clear an overload
+        "overload_penalty": 1e5,
+        "max_constraint_rounds": 20,
+        "write_back": True,
+        "push_to_engine": True,
+    }
+    def __init__(self, dictSettings=None):
+        self.msg = gbl.Msg
+        unknown = set(dictSettings or {}) - set(self.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown optimal power flow settings: {', '.join(sorted(unknown))}")
+        self.settings = dict(self.DEFAULT_SETTINGS, **(dictSettings or {}))
+    def runopf(self):
+        pass
+    def getopfresults(self):
+        pass
+    def getallopfresults(self):
+        pass
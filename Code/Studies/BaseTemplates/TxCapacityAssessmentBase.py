@@ -1,10 +1,32 @@
 from Code import GlobalEngineRegistry as gbl
 class TxCapacityAssessmentBase:
-    def __init__(self):
+    # Settings of a capacity assessment, overridden per study through the constructor
+    DEFAULT_SETTINGS = {
+        "thermal_limit_percent": 100.0,
+        "voltage_min_pu": 0.95,
+        "voltage_max_pu": 1.05,
+        # Outages whose screened post-outage loading reaches this go through a full load flow
+        "screening_threshold_percent": 90.0,
+        "max_full_solves": None,
+        # Busbars (BusIDs) whose injection headroom is assessed, None for every in service busbar
+        "headroom_busbars": None,
+        "max_injection_mw": 2000.0,
+        "headroom_tolerance_mw": 5.0,
+        "workers": 1,
+        # Engine of the worker processes ('ipsa', 'powerfactory' or 'simulated'), by default the engine in use
+        "engine": None,
+        "push_to_engine": True,
+        "loadflow_settings": {},
+    }
+    def __init__(self, dictSettings=None):
         self.msg = gbl.Msg
+        unknown = set(dictSettings or {}) - set(self.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown capacity assessment settings: {', '.join(sorted(unknown))}")
+        self.settings = dict(self.DEFAULT_SETTINGS, **(dictSettings or {}))
     def runcapacityassessment(self):
         pass
     def getcapacityassessmentresults(self):
         pass
     def getallcapacityassessmentresults(self):
-        pass
\ No newline at end of file
+        pass
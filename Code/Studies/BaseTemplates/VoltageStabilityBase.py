@@ -0,0 +1,37 @@
+from Code import GlobalEngineRegistry as gbl
+class VoltageStabilityBase:
+    # Settings of a voltage stability study, overridden per study through the constructor
+    DEFAULT_SETTINGS = {
+        # Transfer directions: dicts of name, source and sink, each a zone, a list of BusIDs or None for the slack.
+        # None traces both directions across every boundary between the zones of zone_attribute
+        "directions": None,
+        "zone_attribute": "Zone",
+        # Busbars (BusIDs) whose PV curves are stored, None for the critical busbar of each direction
+        "monitored_busbars": None,
+        # Continuation step along the curve, as MW of transfer, and the largest voltage change of one predictor step
+        "initial_step_mw": 100.0,
+        "min_step_mw": 1.0,
+        "max_step_mw": 1000.0,
+        "max_voltage_step_pu": 0.05,
+        "max_transfer_mw": 20000.0,
+        # Share of the margin followed down the lower side of the nose, and the voltage at which tracing stops
+        "lower_branch_fraction": 0.1,
+        "collapse_voltage_pu": 0.3,
+        "max_points": 1000,
+        "tolerance_pu": 1e-6,
+        "max_corrector_iterations": 10,
+        "enforce_q_limits": True,
+        "workers": 1,
+    }
+    def __init__(self, dictSettings=None):
+        self.msg = gbl.Msg
+        unknown = set(dictSettings or {}) - set(self.DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown voltage stability settings: {', '.join(sorted(unknown))}")
+        self.settings = dict(self.DEFAULT_SETTINGS, **(dictSettings or {}))
+    def runvoltagestability(self):
+        pass
+    def getvoltagestabilityresults(self):
+        pass
+    def getallvoltagestabilityresults(self):
+        pass
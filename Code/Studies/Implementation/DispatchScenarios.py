@@ -0,0 +1,194 @@
+# Engine independent generator dispatch and demand scaling on the DataModel.
+# Gen_TAB and Load_TAB are read once into arrays; a batch of scenarios (demand scale, plant type availability,
+# interconnector flow) is then dispatched in merit order for all scenarios at once with array operations, so
+# thousands of scenarios can be scoped per second. A chosen scenario is written back onto the DataModel, from where
+# the usual component updaters push it to whichever engine is running.
+import numpy as np
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import timed
+
+
+class DispatchScenarioResult:
+    """Dispatch of a batch of scenarios, one row per scenario"""
+
+    def __init__(self, oEngine, mtxGenMW, mtxLoadScale, arrDemandMW, arrShortfallMW, arrSurplusMW):
+        self.m_oEngine = oEngine
+        # scenarios x generators, MW of every generator including interconnectors (negative for export)
+        self.mtxGenMW = mtxGenMW
+        # scenarios x 1 or scenarios x loads, multiplier on the base MW of every load
+        self.mtxLoadScale = mtxLoadScale
+        self.arrDemandMW = arrDemandMW
+        # Demand left after the full merit order (negative of what the external grid has to supply)
+        self.arrShortfallMW = arrShortfallMW
+        # Interconnector import in excess of demand
+        self.arrSurplusMW = arrSurplusMW
+
+    def getnumberofscenarios(self):
+        return self.mtxGenMW.shape[0]
+
+    def getloadmw(self, nScenario):
+        """Returns the MW of every load in one scenario"""
+        arrScale = self.mtxLoadScale[nScenario if self.mtxLoadScale.shape[0] > 1 else 0]
+        return self.m_oEngine.m_arrLoadMW * arrScale
+
+    def getdispatchbycategory(self):
+        """Returns {category: MW per scenario}, the generation mix of every scenario"""
+        oEngine = self.m_oEngine
+        dictMix = {}
+        for nCategory, strCategory in enumerate(oEngine.m_listCategories):
+            arrMask = oEngine.m_arrCategory == nCategory
+            if arrMask.any():
+                dictMix[strCategory] = self.mtxGenMW[:, arrMask].sum(axis=1)
+        return dictMix
+
+
+class DispatchScenarioEngine:
+    """Merit order dispatch and demand scaling of Gen_TAB and Load_TAB as array operations"""
+
+    INTERCONNECTOR = "Interconnector"
+    ENERGY_STORAGE = "Energy Storage System"
+    # Plant type components that may share a site with storage without limiting its export
+    STORAGE_ALLOWED_COMPONENTS = {"Energy Storage System", "Reactive Compensation", "Demand"}
+    # Storage sharing a site with generation may export 60% of its registered capacity
+    STORAGE_HYBRID_EXPORT_FACTOR = 0.6
+    # Default merit order, cheapest first. A generator is placed at the first category its plant type contains.
+    DEFAULT_MERIT_ORDER = ("Nuclear", "Wind Offshore", "Wind Onshore", "PV Array", "Tidal", "Hydro", "Biomass",
+                           "CCGT", "Pump Storage", "Energy Storage System", "Gas Reciprocating", "OCGT")
+    OTHER = "Other"
+
+    def __init__(self, listMeritOrder=None):
+        self.msg = gbl.Msg
+        self.m_listMeritOrder = list(listMeritOrder or self.DEFAULT_MERIT_ORDER)
+        # Categories are the merit order plus interconnectors, reactive compensation and anything unmatched
+        self.m_listCategories = self.m_listMeritOrder + [self.INTERCONNECTOR, "Reactive Compensation", self.OTHER]
+        self.m_listGens = []
+        self.m_listLoads = []
+        self.m_arrCapacityMW = None
+        self.m_arrExportFactor = None
+        self.m_arrCategory = None
+        self.m_arrMeritOrder = None
+        self.m_arrInterconnectors = None
+        self.m_arrLoadMW = None
+
+    #__________________________READING THE DATAMODEL________________________
+    @timed("dispatch.loaddatamodel")
+    def loaddatamodel(self, oDataModel=None):
+        """Reads the in service generators and loads of the DataModel into arrays; the base demand is the load MW"""
+        oDataModel = oDataModel or gbl.DataModelManager
+        # External grids balance the network and are left to the engine slack
+        self.m_listGens = [oGen for oGen in oDataModel.Gen_TAB if oGen.ON and not oGen.IsExternalGrid]
+        self.m_listLoads = [oLoad for oLoad in oDataModel.Load_TAB if oLoad.ON]
+        self.m_arrCapacityMW = np.array([oGen.MWCapacity or oGen.MW or 0.0 for oGen in self.m_listGens], dtype=np.float64)
+        self.m_arrLoadMW = np.array([oLoad.MW or 0.0 for oLoad in self.m_listLoads], dtype=np.float64)
+        # The plant type rules are evaluated once per distinct plant type
+        listPlantTypes, arrInverse = np.unique([str(getattr(oGen, 'PlantType', '') or '') for oGen in self.m_listGens],
+                                               return_inverse=True)
+        arrTypeCategory = np.array([self.getcategory(strType) for strType in listPlantTypes] + [0], dtype=np.int64)
+        arrTypeFactor = np.array([self.getdispatchexportfactor(strType) for strType in listPlantTypes] + [1.0])
+        self.m_arrCategory = arrTypeCategory[arrInverse] if self.m_listGens else np.zeros(0, dtype=np.int64)
+        self.m_arrExportFactor = arrTypeFactor[arrInverse] if self.m_listGens else np.zeros(0)
+        self.m_arrInterconnectors = np.flatnonzero(self.m_arrCategory == self.m_listCategories.index(self.INTERCONNECTOR))
+        # Merit order position of every dispatchable generator, largest units first within a category
+        arrDispatchable = np.flatnonzero(self.m_arrCategory < len(self.m_listMeritOrder))
+        arrKey = np.lexsort((-self.m_arrCapacityMW[arrDispatchable], self.m_arrCategory[arrDispatchable]))
+        self.m_arrMeritOrder = arrDispatchable[arrKey]
+        return True
+
+    def getcategory(self, strPlantType):
+        """Category index of a plant type string"""
+        if strPlantType.strip() == self.INTERCONNECTOR:
+            return self.m_listCategories.index(self.INTERCONNECTOR)
+        for nCategory, strCategory in enumerate(self.m_listMeritOrder):
+            if strCategory in strPlantType:
+                return nCategory
+        if "Reactive Compensation" in strPlantType:
+            return self.m_listCategories.index("Reactive Compensation")
+        return self.m_listCategories.index(self.OTHER)
+
+    def getdispatchexportfactor(self, strPlantType):
+        """
+        Fraction of the registered capacity a plant type may be dispatched to: storage hybrids 60%, everything
+        else in full. Unlike the TEC register export capacity of ETYSDataReader, which only credits storage and
+        interconnectors, the dispatch covers every plant type.
+        """
+        setComponents = set(map(str.strip, strPlantType.split(";")))
+        if self.ENERGY_STORAGE in setComponents and not setComponents.issubset(self.STORAGE_ALLOWED_COMPONENTS):
+            return self.STORAGE_HYBRID_EXPORT_FACTOR
+        return 1.0
+
+    #__________________________DISPATCH________________________
+    def _toscenarioarray(self, value, nScenarios, nColumns=None):
+        """Broadcasts a scalar, per scenario or per scenario and column input to a 2-D array"""
+        arrValue = np.asarray(value, dtype=np.float64)
+        if arrValue.ndim == 0:
+            arrValue = arrValue.reshape(1, 1)
+        elif arrValue.ndim == 1:
+            arrValue = arrValue.reshape(-1, 1)
+        if arrValue.shape[0] not in (1, nScenarios):
+            raise ValueError(f"Expected 1 or {nScenarios} scenario rows, got {arrValue.shape[0]}")
+        if nColumns is not None and arrValue.shape[1] not in (1, nColumns):
+            raise ValueError(f"Expected 1 or {nColumns} columns, got {arrValue.shape[1]}")
+        return arrValue
+
+    @timed("dispatch.dispatchscenarios")
+    def dispatchscenarios(self, arrDemandScale=1.0, dictAvailability=None, arrInterconnectorFlow=0.0, nScenarios=None):
+        """
+        Dispatches a batch of scenarios in merit order.
+        arrDemandScale: demand multiplier, scalar, per scenario or scenarios x loads.
+        dictAvailability: {category: availability factor}, each a scalar or one value per scenario (e.g. wind output).
+        arrInterconnectorFlow: interconnector flow as a fraction of capacity, positive importing and negative exporting,
+        scalar, per scenario or scenarios x interconnectors. Interconnectors are fixed, the merit order covers the rest.
+        Returns a DispatchScenarioResult.
+        """
+        if self.m_arrCapacityMW is None:
+            self.loaddatamodel()
+        dictAvailability = dictAvailability or {}
+        if nScenarios is None:
+            listInputs = [arrDemandScale, arrInterconnectorFlow] + list(dictAvailability.values())
+            nScenarios = max(np.asarray(value).shape[0] if np.ndim(value) else 1 for value in listInputs)
+        mtxLoadScale = self._toscenarioarray(arrDemandScale, nScenarios, len(self.m_arrLoadMW))
+        arrDemandMW = np.broadcast_to((mtxLoadScale * self.m_arrLoadMW).sum(axis=1), (nScenarios,))
+        # Availability of every category in every scenario
+        mtxAvailability = np.ones((nScenarios, len(self.m_listCategories)))
+        for strCategory, value in dictAvailability.items():
+            if strCategory not in self.m_listCategories:
+                raise ValueError(f"Unknown dispatch category {strCategory}")
+            mtxAvailability[:, self.m_listCategories.index(strCategory)] = self._toscenarioarray(value, nScenarios)[:, 0]
+        mtxGenMW = np.zeros((nScenarios, len(self.m_listGens)))
+        # Interconnectors are fixed by the scenario, their net import reduces the demand left for the merit order
+        arrInterconnectors = self.m_arrInterconnectors
+        mtxFlow = np.clip(self._toscenarioarray(arrInterconnectorFlow, nScenarios, len(arrInterconnectors)), -1.0, 1.0)
+        mtxGenMW[:, arrInterconnectors] = mtxFlow * self.m_arrCapacityMW[arrInterconnectors]
+        arrResidualMW = arrDemandMW - mtxGenMW[:, arrInterconnectors].sum(axis=1)
+        # Merit order stack: every unit runs up to its available capacity until the residual demand is met
+        arrOrder = self.m_arrMeritOrder
+        mtxAvailableMW = (self.m_arrCapacityMW[arrOrder] * self.m_arrExportFactor[arrOrder]
+                          * mtxAvailability[:, self.m_arrCategory[arrOrder]])
+        mtxStackMW = np.cumsum(mtxAvailableMW, axis=1)
+        arrTargetMW = np.maximum(arrResidualMW, 0.0)[:, None]
+        mtxGenMW[:, arrOrder] = np.clip(arrTargetMW - (mtxStackMW - mtxAvailableMW), 0.0, mtxAvailableMW)
+        arrStackMW = mtxStackMW[:, -1] if len(arrOrder) else np.zeros(nScenarios)
+        arrShortfallMW = np.maximum(arrResidualMW - arrStackMW, 0.0)
+        arrSurplusMW = np.maximum(-arrResidualMW, 0.0)
+        return DispatchScenarioResult(self, mtxGenMW, mtxLoadScale, np.array(arrDemandMW), arrShortfallMW, arrSurplusMW)
+
+    #__________________________APPLYING A SCENARIO________________________
+    def applyscenario(self, oResult, nScenario, bPushToEngine=False):
+        """Writes one scenario onto the DataModel generators and loads, optionally updating the engine model too"""
+        listChanged = []
+        for oGen, fMW in zip(self.m_listGens, oResult.mtxGenMW[nScenario].tolist()):
+            if oGen.MW != fMW:
+                oGen.MW = fMW
+                listChanged.append(oGen)
+        for oLoad, fMW in zip(self.m_listLoads, oResult.getloadmw(nScenario).tolist()):
+            if oLoad.MW != fMW:
+                oLoad.MW = fMW
+                listChanged.append(oLoad)
+        bOK = True
+        if bPushToEngine:
+            for oComponent in listChanged:
+                bOK = oComponent.setdatamodelcomponenttoengine() and bOK
+            if not bOK:
+                self.msg.AddWarning(f"Dispatch scenario {nScenario}: not every component was updated in the engine.")
+        return bOK
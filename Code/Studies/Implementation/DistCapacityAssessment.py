@@ -0,0 +1,177 @@
+# Engine independent distribution capacity assessment.
+# Generation and demand headroom of every primary and secondary busbar comes from voltage and thermal sensitivities
+# of the linearised AC network, all busbars from one factorisation of the admittance matrix. Only the busbars whose
+# linear headroom is close to a limit are refined by bisection on full load flows (the transmission assessment's
+# solver, optionally over worker processes). Results are stored per network hash and settings, so an unchanged network
+# is served from the result store, e.g. for the EDCM dashboard heat-maps.
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span, timed
+from Code.Studies.BaseTemplates.DistCapacityAssessmentBase import DistCapacityAssessmentBase
+from Code.Studies.Implementation.SensitivityFactors import ACSensitivityFactors
+from Code.Studies.Implementation.TimeSeriesLoadFlow import _getenginename
+from Code.Studies.Implementation.TxCapacityAssessment import TxCapacityAssessment
+
+
+class DistCapacityAssessment(DistCapacityAssessmentBase):
+    """Generation and demand headroom of distribution busbars from linear sensitivities and targeted full solves"""
+
+    STUDY_TYPE = "distcapacity"
+    DIRECTIONS = ("generation", "demand")
+    # Settings shared with the transmission assessment that carries out the full solves
+    FULL_SOLVE_SETTINGS = ("thermal_limit_percent", "voltage_min_pu", "voltage_max_pu", "max_injection_mw",
+                           "headroom_tolerance_mw", "workers", "engine", "push_to_engine", "loadflow_settings")
+
+    def __init__(self, dictSettings=None):
+        DistCapacityAssessmentBase.__init__(self, dictSettings)
+        self.initialized = False
+        self.run_id = None
+        self.m_bFromCache = False
+        self.m_dfHeadroom = None
+
+    def initializestudy(self):
+        if gbl.DataModelManager is None or not gbl.DataModelManager.Busbar_TAB:
+            raise RuntimeError("The DataModel has no network to assess.")
+        self.initialized = True
+        return True
+
+    #__________________________CAPACITY ASSESSMENT________________________
+    @timed("capacity.distribution.runcapacityassessment")
+    def runcapacityassessment(self, dictMetadata=None):
+        """Headroom of every distribution busbar, from the result store when this network and settings were run before"""
+        bOK = self.initializestudy()
+        if not bOK:
+            return False
+        oDataModel = gbl.DataModelManager
+        strNetworkHash = oDataModel.getnetworkhash()
+        dictCacheSettings = self._getcachesettings()
+        self.m_bFromCache = False
+        if self.settings["use_cache"] and self.loadstoredresults():
+            return True
+        with span("capacity.distribution.linear"):
+            self.m_dfHeadroom = self.getlinearheadroom()
+        nFullSolves = self.refineheadroom(self.m_dfHeadroom)
+        if gbl.ResultStore is None:
+            self.msg.AddWarning("Result store not initialised, distribution capacity results were not stored.")
+            return True
+        dictMetadata = dict(dictMetadata or {}, busbars=len(self.m_dfHeadroom), full_solves=nFullSolves)
+        self.run_id = gbl.ResultStore.writerun(self.STUDY_TYPE, {"headroom": self.m_dfHeadroom}, settings=dictCacheSettings,
+                                               metadata=dictMetadata, network_hash=strNetworkHash)
+        return True
+
+    def loadstoredresults(self):
+        """Loads the stored headroom of this network and these settings, False when they have not been run"""
+        if gbl.ResultStore is None or gbl.DataModelManager is None:
+            return False
+        dictManifest = gbl.ResultStore.getlatestrun(self.STUDY_TYPE, gbl.DataModelManager.getnetworkhash(),
+                                                    self._getcachesettings())
+        if dictManifest is None:
+            return False
+        self.run_id = dictManifest["run_id"]
+        self.m_dfHeadroom = gbl.ResultStore.loadtable(self.run_id, "headroom").to_pandas()
+        self.m_bFromCache = True
+        return True
+
+    def getcapacityassessmentresults(self):
+        """Returns the headroom table of the last assessment"""
+        return self.m_dfHeadroom
+
+    def getallcapacityassessmentresults(self):
+        """Returns the tables of the last assessment"""
+        return {"headroom": self.m_dfHeadroom}
+
+    #__________________________LINEAR HEADROOM________________________
+    def getbusbars(self):
+        """Busbar_TAB indices of the busbars to assess"""
+        oDataModel = gbl.DataModelManager
+        if self.settings["headroom_busbars"] is not None:
+            return np.array([oDataModel.BusbarIdToIndex[strBusId] for strBusId in self.settings["headroom_busbars"]
+                             if strBusId in oDataModel.BusbarIdToIndex], dtype=np.int64)
+        fMaxKV = self.settings["max_busbar_kv"]
+        return np.array([nIndex for nIndex, oBusbar in enumerate(oDataModel.Busbar_TAB)
+                         if oBusbar.ON and not oBusbar.Disconnected and (fMaxKV is None or (oBusbar.kV or 0.0) <= fMaxKV)],
+                        dtype=np.int64)
+
+    def getlinearheadroom(self):
+        """Generation and demand headroom of every busbar from the linearised AC sensitivities"""
+        oDataModel = gbl.DataModelManager
+        oFactors = ACSensitivityFactors(oDataModel)
+        arrBusbars = self.getbusbars()
+        arrRatingMVA = oDataModel.getratingengine().getratings()[oFactors.m_arrBranchTab]
+        arrRatingMVA = arrRatingMVA * self.settings["thermal_limit_percent"] / 100.0
+        dictColumns = {
+            "busbar": [str(oDataModel.Busbar_TAB[nBus].BusID) for nBus in arrBusbars.tolist()],
+            "kV": [oDataModel.Busbar_TAB[nBus].kV for nBus in arrBusbars.tolist()],
+            "voltage_pu": np.abs(oFactors.m_arrVoltage[arrBusbars]),
+        }
+        listLimits = oFactors.getinjectionlimits(arrBusbars, arrRatingMVA, self.settings["voltage_min_pu"],
+                                                 self.settings["voltage_max_pu"], self.settings["max_injection_mw"], (1.0, -1.0))
+        for strDirection, (arrLimit, arrKind, arrAt) in zip(self.DIRECTIONS, listLimits):
+            dictColumns[f"{strDirection}_headroom_mw"] = arrLimit
+            dictColumns[f"{strDirection}_linear_mw"] = arrLimit.copy()
+            dictColumns[f"{strDirection}_limit"] = arrKind.astype(str)
+            dictColumns[f"{strDirection}_limit_component"] = [
+                "" if nAt < 0 else oDataModel.Branch_TAB[oFactors.m_arrBranchTab[nAt]].BranchID if strKind == "thermal"
+                else str(oDataModel.Busbar_TAB[nAt].BusID) for strKind, nAt in zip(arrKind.tolist(), arrAt.tolist())]
+            dictColumns[f"{strDirection}_method"] = np.full(len(arrBusbars), "linear", dtype=object)
+        return pd.DataFrame(dictColumns)
+
+    #__________________________FULL SOLVES________________________
+    def refineheadroom(self, dfHeadroom):
+        """Replaces the linear headroom closest to the limits with full load flow bisection; returns the busbars solved"""
+        if gbl.EngineLoadFlowContainer is None:
+            self.msg.AddWarning("No load flow engine initialised, distribution headroom is the linear estimate only.")
+            return 0
+        # The probe injections are DataModel edits, an engine they are not pushed to would solve the base case each time
+        if not self.settings["push_to_engine"] and not gbl.EngineLoadFlowContainer.SOLVES_DATAMODEL:
+            self.msg.AddWarning("DataModel edits are not pushed to the engine, distribution headroom is the linear "
+                                "estimate only.")
+            return 0
+        oDataModel = gbl.DataModelManager
+        oFullSolver = TxCapacityAssessment({strKey: self.settings[strKey] for strKey in self.FULL_SOLVE_SETTINGS})
+        oFullSolver.initializestudy()
+        nFullSolves = 0
+        for strDirection in self.DIRECTIONS:
+            arrLinear = dfHeadroom[f"{strDirection}_linear_mw"].to_numpy()
+            arrRefine = np.flatnonzero(arrLinear < self.settings["refine_below_mw"])
+            arrRefine = arrRefine[np.argsort(arrLinear[arrRefine], kind="stable")]
+            if self.settings["max_full_solves"] is not None:
+                arrRefine = arrRefine[:int(self.settings["max_full_solves"])]
+            if not len(arrRefine):
+                continue
+            listTasks = [(oDataModel.BusbarIdToIndex[self._tobusid(dfHeadroom.at[nRow, "busbar"])], float(arrLinear[nRow]),
+                          strDirection == "demand") for nRow in arrRefine.tolist()]
+            dictRows = {dictRow["busbar"]: dictRow for dictRow in oFullSolver.runtasks("headroom", listTasks)["headroom"]}
+            for nRow in arrRefine.tolist():
+                dictRow = dictRows[dfHeadroom.at[nRow, "busbar"]]
+                if np.isnan(dictRow["headroom_mw"]):
+                    continue
+                dfHeadroom.at[nRow, f"{strDirection}_headroom_mw"] = dictRow["headroom_mw"]
+                dfHeadroom.at[nRow, f"{strDirection}_limit"] = dictRow["limiting_type"]
+                dfHeadroom.at[nRow, f"{strDirection}_limit_component"] = dictRow["limiting_component"]
+                dfHeadroom.at[nRow, f"{strDirection}_method"] = "load flow"
+            nFullSolves += len(arrRefine)
+        return nFullSolves
+
+    #__________________________HELPERS________________________
+    def _getcachesettings(self):
+        """Settings identifying the results of a network: the assessment settings, the engine and the active rating set
+        with a hash of its ratings (the network hash does not cover seasonal ratings), not the worker count"""
+        dictSettings = {strKey: xValue for strKey, xValue in self.settings.items() if strKey not in ("workers", "use_cache")}
+        dictSettings["engine"] = self.settings["engine"] or _getenginename()
+        oRatingEngine = gbl.DataModelManager.getratingengine(bRefresh=True)
+        dictSettings["rating_set"] = oRatingEngine.getactiveratingset()
+        dictSettings["ratings_hash"] = hashlib.sha256(np.ascontiguousarray(oRatingEngine.getratings()).tobytes()).hexdigest()
+        return dictSettings
+
+    @staticmethod
+    def _tobusid(strBusId):
+        """BusID as held on the DataModel (busbar IDs that are numbers are held as int)"""
+        try:
+            return int(strBusId)
+        except ValueError:
+            return strBusId
@@ -0,0 +1,232 @@
+# Fault sweep: individual three phase, single phase to earth and phase to phase faults at every busbar and at both ends
+# of every branch, recording the fault levels and the branch currents feeding each fault. Fault locations and the
+# branches around them are built once from the DataModel topology; the faults are run in chunks by the short circuit
+# engine (the native engine solves each chunk against one factorisation of the network) and appended to the columnar
+# result store. Chunks can be spread over worker processes that attach to one shared copy of the DataModel.
+import numpy as np
+import scipy.sparse as sp
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span
+from Code.Studies.Implementation.TimeSeriesLoadFlow import _getenginename
+
+
+class FaultSweep:
+    """Runs individual faults at busbars and branch ends and stores the fault levels and branch contributions"""
+
+    LOCATION_BUSBAR = "busbar"
+    LOCATION_BRANCH = "branch"
+
+    def __init__(self, listFaultTypes=None, bBusbarFaults=True, bBranchEndFaults=True, fBranchEndFraction=0.0,
+                 nContributionDepth=1, nChunkFaults=1024):
+        """
+        listFaultTypes: fault types to run at every location, by default "3ph", "slg" and "ll".
+        fBranchEndFraction: position of the branch end faults from each end (0 is a close-in fault on the line side of
+        the breaker, whose branch contributions show the current through the breaker at each end).
+        nContributionDepth: branches within this many busbars of the fault have their currents recorded, 0 for none.
+        """
+        self.msg = gbl.Msg
+        self.m_listFaultTypes = list(listFaultTypes or ("3ph", "slg", "ll"))
+        self.m_bBusbarFaults = bBusbarFaults
+        self.m_bBranchEndFaults = bBranchEndFaults
+        self.m_fBranchEndFraction = min(max(float(fBranchEndFraction), 0.0), 0.5)
+        self.m_nContributionDepth = max(0, int(nContributionDepth))
+        self.m_nChunkFaults = max(1, int(nChunkFaults))
+        self.m_dictSettings = {"fault_types": self.m_listFaultTypes, "busbar_faults": bBusbarFaults,
+                               "branch_end_faults": bBranchEndFaults, "branch_end_fraction": self.m_fBranchEndFraction,
+                               "contribution_depth": self.m_nContributionDepth}
+        self.m_dictLocations = None
+
+    #__________________________FAULT LOCATIONS________________________
+    def buildlocations(self, oDataModel=None):
+        """
+        Builds the fault locations of the DataModel in the layout of EngineShortCircuitContainer.runfaults: every in
+        service busbar with a voltage, then both ends of every in service branch, each with the branches around it
+        """
+        oDataModel = oDataModel or gbl.DataModelManager
+        nBusbars = len(oDataModel.Busbar_TAB)
+        arrBusOn = np.array([bool(oBusbar.ON) and not oBusbar.Disconnected and (oBusbar.kV or 0.0) > 0
+                             for oBusbar in oDataModel.Busbar_TAB], dtype=bool)
+        dictIndex = oDataModel.BusbarIdToIndex
+        listTab, listFrom, listTo = [], [], []
+        for nBranchIdx, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = dictIndex.get(oBranch.BusID1), dictIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo or not (arrBusOn[nFrom] and arrBusOn[nTo]):
+                continue
+            listTab.append(nBranchIdx)
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+        arrTab = np.array(listTab, dtype=np.int64)
+        arrFrom = np.array(listFrom, dtype=np.int64)
+        arrTo = np.array(listTo, dtype=np.int64)
+        arrBusFaults = np.flatnonzero(arrBusOn) if self.m_bBusbarFaults else np.zeros(0, dtype=np.int64)
+        nBranchFaults = len(arrTab) if self.m_bBranchEndFaults else 0
+        fFraction = self.m_fBranchEndFraction
+        # Branch end faults: near BusID1 for every branch, then near BusID2
+        arrBranchPos = np.tile(np.arange(nBranchFaults), 2)
+        arrFraction = np.concatenate([np.full(nBranchFaults, fFraction), np.full(nBranchFaults, 1.0 - fFraction)])
+        arrBus = np.concatenate([arrBusFaults, arrFrom[:nBranchFaults], arrTo[:nBranchFaults]])
+        nLocations = len(arrBus)
+        # Busbars the contributions are taken around: the faulted busbar, or both ends of the faulted branch
+        arrRows = np.concatenate([np.arange(len(arrBusFaults)), np.arange(len(arrBusFaults), nLocations),
+                                  np.arange(len(arrBusFaults), nLocations)])
+        arrColumns = np.concatenate([arrBusFaults, arrFrom[arrBranchPos], arrTo[arrBranchPos]])
+        mtxReach = sp.csr_matrix((np.ones(len(arrRows)), (arrRows, arrColumns)), shape=(nLocations, nBusbars))
+        mtxIncidence = sp.csr_matrix((np.ones(2 * len(arrTab)), (np.tile(np.arange(len(arrTab)), 2),
+                                                                 np.concatenate([arrFrom, arrTo]))),
+                                     shape=(len(arrTab), nBusbars))
+        mtxAdjacency = (mtxIncidence.T @ mtxIncidence).tocsr()
+        for _ in range(self.m_nContributionDepth - 1):
+            mtxReach = (mtxReach @ mtxAdjacency).tocsr()
+            mtxReach.data[:] = 1.0
+        if self.m_nContributionDepth > 0:
+            mtxContribution = (mtxReach @ mtxIncidence.T).tocsr()
+        else:
+            mtxContribution = sp.csr_matrix((nLocations, len(arrTab)))
+        mtxContribution.sort_indices()
+        self.m_dictLocations = {
+            "bus": arrBus,
+            "branch": np.concatenate([np.full(len(arrBusFaults), -1, dtype=np.int64), arrTab[arrBranchPos]]),
+            "fraction": np.concatenate([np.zeros(len(arrBusFaults)), arrFraction]),
+            "contribution_ptr": mtxContribution.indptr.astype(np.int64),
+            "contribution_branch": arrTab[mtxContribution.indices] if len(arrTab) else np.zeros(0, dtype=np.int64),
+        }
+        return self.m_dictLocations
+
+    def getlocationchunk(self, nStart, nEnd):
+        """Locations [nStart, nEnd) with their contribution lists"""
+        dictLocations = self.m_dictLocations
+        arrPtr = dictLocations["contribution_ptr"]
+        return {"bus": dictLocations["bus"][nStart:nEnd], "branch": dictLocations["branch"][nStart:nEnd],
+                "fraction": dictLocations["fraction"][nStart:nEnd],
+                "contribution_ptr": arrPtr[nStart:nEnd + 1] - arrPtr[nStart],
+                "contribution_branch": dictLocations["contribution_branch"][arrPtr[nStart]:arrPtr[nEnd]]}
+
+    #__________________________RUNNING THE SWEEP________________________
+    def runsweep(self, nWorkers=1, strEngine=None, dictMetadata=None):
+        """
+        Runs every fault type at every location and stores the sweep as one result store run, returned by id. The run
+        holds a "faults" table (one row per fault) and a "contributions" table (one row per branch current per fault),
+        both indexed by fault = location * number of fault types + fault type position. With nWorkers > 1 the chunks
+        are spread over worker processes running strEngine ('ipsa', 'powerfactory' or 'simulated', by default the
+        engine in use).
+        """
+        oDataModel = gbl.DataModelManager
+        dictLocations = self.buildlocations(oDataModel)
+        nLocations = len(dictLocations["bus"])
+        listChunks = [(nStart, min(nStart + self.m_nChunkFaults, nLocations))
+                      for nStart in range(0, nLocations, self.m_nChunkFaults)]
+        dictMetadata = dict(dictMetadata or {}, locations=nLocations, chunk_faults=self.m_nChunkFaults, workers=nWorkers)
+        oWriter = gbl.ResultStore.opentimeseriesrun("faultsweep", self.m_dictSettings, metadata=dictMetadata,
+                                                    network_hash=oDataModel.getnetworkhash())
+        try:
+            if nWorkers > 1 and len(listChunks) > 1:
+                for dictChunk in self._runchunksinworkers(listChunks, nWorkers, strEngine):
+                    self._writechunk(oWriter, dictChunk)
+            else:
+                oEngine = gbl.EngineShortCircuitContainer
+                if not oEngine.preparefaults():
+                    raise RuntimeError("Fault sweep: the short circuit engine could not be prepared")
+                for nStart, nEnd in listChunks:
+                    self._writechunk(oWriter, self.runchunk(oEngine, nStart, nEnd))
+        except Exception:
+            oWriter.abort()
+            raise
+        return oWriter.close()
+
+    def runchunk(self, oEngine, nStart, nEnd):
+        """Runs the faults of locations [nStart, nEnd) on the engine, returns the engine result columns"""
+        with span("faultsweep.chunk", start=nStart, end=nEnd):
+            dictResults = oEngine.runfaults(self.getlocationchunk(nStart, nEnd), self.m_listFaultTypes)
+        if dictResults is None:
+            raise RuntimeError(f"Fault sweep: faults at locations {nStart} to {nEnd} failed")
+        for dictColumns in dictResults.values():
+            dictColumns["location"] = np.asarray(dictColumns["location"], dtype=np.int64) + nStart
+        return dictResults
+
+    def _writechunk(self, oWriter, dictResults):
+        """Appends the faults and contributions of one chunk to the run, named after the DataModel components"""
+        oDataModel = gbl.DataModelManager
+        dictLocations = self.m_dictLocations
+        dictTypes = {strType: nType for nType, strType in enumerate(self.m_listFaultTypes)}
+        listBusIds = [oBusbar.BusID for oBusbar in oDataModel.Busbar_TAB]
+        listBranchIds = [oBranch.BranchID for oBranch in oDataModel.Branch_TAB]
+        for strTable, dictColumns in (("faults", dictResults["faults"]), ("contributions", dictResults["contributions"])):
+            arrLocation = dictColumns["location"]
+            arrFault = arrLocation * len(dictTypes) + np.array([dictTypes[strType] for strType in dictColumns["fault_type"]],
+                                                               dtype=np.int64)
+            arrOrder = np.argsort(arrFault, kind="stable")
+            dictOut = {}
+            if strTable == "faults":
+                arrBranch = dictLocations["branch"][arrLocation]
+                dictOut["location_type"] = np.where(arrBranch >= 0, self.LOCATION_BRANCH, self.LOCATION_BUSBAR).astype(object)
+                dictOut["location"] = np.array([listBranchIds[nBranch] if nBranch >= 0 else listBusIds[nBus] for nBranch, nBus
+                                                in zip(arrBranch.tolist(), dictLocations["bus"][arrLocation].tolist())], dtype=object)
+                dictOut["busbar"] = np.array([listBusIds[nBus] for nBus in dictLocations["bus"][arrLocation].tolist()], dtype=object)
+                dictOut["fraction"] = dictLocations["fraction"][arrLocation]
+                listColumns = [strColumn for strColumn in dictColumns if strColumn not in ("location",)]
+            else:
+                dictOut["branch"] = np.array([listBranchIds[nBranch] for nBranch in dictColumns["branch"].tolist()], dtype=object)
+                listColumns = [strColumn for strColumn in dictColumns if strColumn not in ("location", "branch")]
+            for strColumn in listColumns:
+                dictOut[strColumn] = dictColumns[strColumn]
+            oWriter.writebatch(strTable, arrFault[arrOrder], {strColumn: np.asarray(arrValues)[arrOrder]
+                                                              for strColumn, arrValues in dictOut.items()},
+                               index_name="fault")
+
+    #__________________________PARALLEL RUN________________________
+    def _runchunksinworkers(self, listChunks, nWorkers, strEngine):
+        """Spreads the chunks over worker processes attached to one shared copy of the DataModel, yielding the chunk
+        results in location order. Every worker prepares (for the native engine, factorises) the network once."""
+        from concurrent.futures import ProcessPoolExecutor
+        if strEngine is None:
+            strEngine = _getenginename()
+        oArrays = gbl.DataModelManager.toarrays()
+        strDataModelName = oArrays.tosharedmemory()
+        tInitArgs = (strDataModelName, strEngine, self.m_dictSettings, self.m_dictLocations)
+        try:
+            with ProcessPoolExecutor(max_workers=min(nWorkers, len(listChunks)), initializer=_initialiseworker,
+                                     initargs=tInitArgs) as oExecutor:
+                listFutures = [oExecutor.submit(_runchunkinworker, nStart, nEnd) for nStart, nEnd in listChunks]
+                for oFuture in listFutures:
+                    yield oFuture.result()
+        finally:
+            oArrays.unlink()
+
+
+# Sweep and short circuit engine of the worker process, set up once per worker by _initialiseworker
+_WorkerSweep = None
+_WorkerEngine = None
+
+
+def _initialiseworker(strDataModelName, strEngine, dictSettings, dictLocations):
+    """Worker process set-up: framework, DataModel from shared memory, engine session and prepared network"""
+    global _WorkerSweep, _WorkerEngine
+    from Code.BatchRunner import BatchRunner
+    from Code.DataModel.DataModelArrays import DataModelArrays
+    oRunner = BatchRunner(log_level="ERROR", use_result_store=False)
+    if not oRunner.initialise():
+        raise RuntimeError("Failed to initialise the framework in the fault sweep worker")
+    oArrays = DataModelArrays.attachsharedmemory(strDataModelName)
+    try:
+        oDataModel = oArrays.todatamodel()
+    finally:
+        oArrays.close()
+    gbl.DataModelManager = oDataModel
+    dictSession = oRunner.activateengine(strEngine)
+    oDataModel.BasicEngineModelupdater = dictSession["datamodel_interface"]
+    if dictSession["engine"] is not None and not dictSession["engine"].load_network_from_datamodel():
+        raise RuntimeError(f"Failed to build the {strEngine} network in the fault sweep worker")
+    _WorkerEngine = dictSession["shortcircuit"]
+    if _WorkerEngine is None or not _WorkerEngine.preparefaults():
+        raise RuntimeError(f"The {strEngine} short circuit engine could not be prepared in the fault sweep worker")
+    _WorkerSweep = FaultSweep(dictSettings["fault_types"], dictSettings["busbar_faults"], dictSettings["branch_end_faults"],
+                              dictSettings["branch_end_fraction"], dictSettings["contribution_depth"])
+    _WorkerSweep.m_dictLocations = dictLocations
+
+
+def _runchunkinworker(nStart, nEnd):
+    """Worker process task: run the faults of one chunk of locations"""
+    return _WorkerSweep.runchunk(_WorkerEngine, nStart, nEnd)
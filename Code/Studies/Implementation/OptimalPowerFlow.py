@@ -0,0 +1,405 @@
+# DC optimal power flow: the cheapest redispatch that relieves branch overloads of the intact network and after
+# contingencies. Generator output moves up and down within MSG..MWCapacity at per generator offer and bid prices,
+# each island stays balanced and every flow is linear in the redispatch through the PTDF (and LODF after an outage)
+# of one factorisation of the network. The LP is solved by HiGHS through SciPy with only the constraints that are
+# violated added round by round. Between calls on the same topology (time steps, contingency sets) the factorisation,
+# the sensitivities and the binding constraints are kept, so a warm started solve usually needs a single round.
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span, timed
+from Code.Studies.BaseTemplates.OptimalPowerFlowBase import OptimalPowerFlowBase
+from Code.Studies.Implementation.SensitivityFactors import DCSensitivityFactors
+
+
+class OptimalPowerFlow(OptimalPowerFlowBase):
+    """Security constrained DC redispatch of the DataModel generators"""
+
+    STUDY_TYPE = "opf"
+    STUDY_TYPE_TIMESERIES = "opftimeseries"
+    # Outage name of the intact network, and the outage index of its constraints
+    INTACT = ""
+    INTACT_OUTAGE = -1
+    # Flow above a limit that counts as a violation, and redispatch below which a generator is left untouched (MW)
+    VIOLATION_TOLERANCE_MW = 1e-3
+    REDISPATCH_TOLERANCE_MW = 1e-6
+    DISPATCH_COLUMNS = ["generator", "busbar", "plant_type", "initial_mw", "final_mw", "redispatch_mw", "cost"]
+    CONSTRAINT_COLUMNS = ["branch", "outage", "limit_mw", "initial_flow_mw", "final_flow_mw", "loading_percent",
+                          "shadow_price", "overload_mw"]
+
+    def __init__(self, dictSettings=None):
+        OptimalPowerFlowBase.__init__(self, dictSettings)
+        self.initialized = False
+        self.run_id = None
+        self.m_dictResults = {}
+        # Kept between solves on the same topology
+        self.m_oFactors = None
+        self.m_tTopology = None
+        self.m_dictPTDF = {}
+        self.m_dictLODF = {}
+        # Constraints (branch position, outage position or INTACT_OUTAGE) binding at the last solve
+        self.m_setActive = set()
+        self.m_nRounds = 0
+
+    def initializestudy(self):
+        """Checks the DataModel and refactorises the network when its topology has changed since the last solve"""
+        oDataModel = gbl.DataModelManager
+        if oDataModel is None or not oDataModel.Busbar_TAB:
+            raise RuntimeError("The DataModel has no network to dispatch.")
+        tTopology = self.gettopology(oDataModel)
+        if self.m_oFactors is None or self.m_oFactors.m_oDataModel is not oDataModel or tTopology != self.m_tTopology:
+            self.m_oFactors = DCSensitivityFactors(oDataModel)
+            self.m_tTopology = tTopology
+            self.m_dictPTDF = {}
+            self.m_dictLODF = {}
+            self.m_setActive = set()
+        self.initialized = True
+        return True
+
+    #__________________________OPTIMAL POWER FLOW________________________
+    @timed("opf.runopf")
+    def runopf(self, dictMetadata=None):
+        """Solves the redispatch of the DataModel as it is, writes it back and stores the dispatch and constraints"""
+        self.initializestudy()
+        dictSolution = self.solveopf()
+        if dictSolution is None:
+            return False
+        self.m_dictResults = {"dispatch": dictSolution["dispatch"], "constraints": dictSolution["constraints"]}
+        if self.settings["write_back"]:
+            self.writeback(dictSolution)
+        self.msg.AddRawMessage(f"Optimal power flow: {dictSolution['redispatch_mw']:.1f} MW redispatched at a cost of "
+                               f"{dictSolution['cost']:.1f}, {len(dictSolution['constraints'])} constraints, "
+                               f"{dictSolution['overload_mw']:.1f} MW of overload left ({dictSolution['rounds']} rounds).")
+        if gbl.ResultStore is None:
+            self.msg.AddWarning("Result store not initialised, optimal power flow results were not stored.")
+            return True
+        dictMetadata = dict(dictMetadata or {}, cost=dictSolution["cost"], redispatch_mw=dictSolution["redispatch_mw"],
+                            overload_mw=dictSolution["overload_mw"], rounds=dictSolution["rounds"])
+        self.run_id = gbl.ResultStore.writerun(self.STUDY_TYPE, self.m_dictResults, settings=self.settings,
+                                               metadata=dictMetadata, network_hash=gbl.DataModelManager.getnetworkhash())
+        return True
+
+    @timed("opf.runopftimeseries")
+    def runopftimeseries(self, oProfiles, nStartStep=0, nEndStep=None, dictMetadata=None):
+        """
+        Solves the redispatch of every step of TimeSeriesProfiles, warm started from the step before. The DataModel
+        is returned to its state before the run; the redispatch of each step is stored, not written back.
+        """
+        self.initializestudy()
+        oDataModel = gbl.DataModelManager
+        nEndStep = oProfiles.getnumberofsteps() if nEndStep is None else min(nEndStep, oProfiles.getnumberofsteps())
+        listBound = oProfiles.bind(oDataModel)
+        listSteps, listRedispatch = [], []
+        oSnapshot = oDataModel.snapshot()
+        try:
+            for nStep in range(nStartStep, nEndStep):
+                for strAttribute, listComponents, mtxValues in listBound:
+                    for oComponent, fValue in zip(listComponents, mtxValues[nStep].tolist()):
+                        setattr(oComponent, strAttribute, fValue)
+                fStart = time.perf_counter()
+                with span("opf.step", step=nStep):
+                    self.initializestudy()
+                    dictSolution = self.solveopf()
+                if dictSolution is None:
+                    listSteps.append({"step": nStep, "solved": False, "cost": np.nan, "redispatch_mw": np.nan,
+                                      "overload_mw": np.nan, "constraints": 0, "rounds": self.m_nRounds,
+                                      "seconds": time.perf_counter() - fStart})
+                    continue
+                listSteps.append({"step": nStep, "solved": True, "cost": dictSolution["cost"],
+                                  "redispatch_mw": dictSolution["redispatch_mw"], "overload_mw": dictSolution["overload_mw"],
+                                  "constraints": len(dictSolution["constraints"]), "rounds": dictSolution["rounds"],
+                                  "seconds": time.perf_counter() - fStart})
+                oDispatch = dictSolution["dispatch"]
+                for dictRow in oDispatch[oDispatch["redispatch_mw"].abs() > self.REDISPATCH_TOLERANCE_MW].to_dict("records"):
+                    listRedispatch.append({"step": nStep, "generator": dictRow["generator"],
+                                           "redispatch_mw": dictRow["redispatch_mw"], "cost": dictRow["cost"]})
+        finally:
+            oSnapshot.restore()
+            oSnapshot.release()
+        self.m_dictResults = {"steps": pd.DataFrame(listSteps, columns=["step", "solved", "cost", "redispatch_mw",
+                                                                        "overload_mw", "constraints", "rounds", "seconds"]),
+                              "redispatch": pd.DataFrame(listRedispatch, columns=["step", "generator", "redispatch_mw", "cost"])}
+        oSteps = self.m_dictResults["steps"]
+        nUnsolved = int((~oSteps["solved"].astype(bool)).sum())
+        self.msg.AddRawMessage(f"Optimal power flow time series: {len(oSteps)} steps, {nUnsolved} unsolved, "
+                               f"total cost {oSteps['cost'].sum():.1f}.")
+        if gbl.ResultStore is None:
+            self.msg.AddWarning("Result store not initialised, optimal power flow results were not stored.")
+            return True
+        dictMetadata = dict(dictMetadata or {}, start_step=nStartStep, end_step=nEndStep,
+                            total_cost=float(oSteps["cost"].sum()))
+        self.run_id = gbl.ResultStore.writerun(self.STUDY_TYPE_TIMESERIES, self.m_dictResults, settings=self.settings,
+                                               metadata=dictMetadata, network_hash=oDataModel.getnetworkhash())
+        return True
+
+    def getopfresults(self):
+        """Returns the dispatch table of the last solve"""
+        return self.m_dictResults.get("dispatch")
+
+    def getallopfresults(self):
+        """Returns every table of the last solve or time series"""
+        return self.m_dictResults
+
+    #__________________________LINEAR PROGRAM________________________
+    def solveopf(self):
+        """
+        Redispatch of the DataModel as it is now, by rounds: solve the LP on the active constraints, add the limits
+        the solution still violates and solve again until none are left. Returns the dispatch and constraint tables
+        and the totals of the solution, None when HiGHS finds no solution.
+        """
+        oFactors = self.m_oFactors
+        arrFlowMW = oFactors.getbaseflowsmw(self.getbalancedinjectionsmw())
+        listGens, arrInitialMW, arrBounds, arrOffer, arrBid = self.getdispatchables()
+        arrGenBus = np.array([gbl.DataModelManager.BusbarIdToIndex[oGen.BusID] for oGen in listGens], dtype=np.int64)
+        mtxPTDF = self.getptdf(arrGenBus)
+        arrOutages, mtxLODF = self.getlodf()
+        arrLimit, arrContingencyLimit = self.getlimits()
+        arrRedispatch = np.zeros(len(listGens))
+        # Constraints carried from the last solve, less those of outages no longer secured against
+        setOutages = set(arrOutages.tolist())
+        setActive = {tConstraint for tConstraint in self.m_setActive
+                     if tConstraint[1] == self.INTACT_OUTAGE or tConstraint[1] in setOutages}
+        oResult = None
+        self.m_nRounds = 0
+        while True:
+            setViolated = self.getviolations(arrFlowMW + mtxPTDF @ arrRedispatch, arrOutages, mtxLODF, arrLimit,
+                                             arrContingencyLimit) - setActive
+            if oResult is not None and not setViolated:
+                break
+            if self.m_nRounds >= int(self.settings["max_constraint_rounds"]):
+                self.msg.AddWarning(f"Optimal power flow: constraints still violated after {self.m_nRounds} rounds.")
+                break
+            setActive |= setViolated
+            if not setActive:
+                break
+            listActive = sorted(setActive)
+            self.m_nRounds += 1
+            with span("opf.round", constraints=len(listActive)):
+                oResult = self._solvelp(listActive, arrFlowMW, mtxPTDF, arrOutages, mtxLODF, arrLimit,
+                                        arrContingencyLimit, arrGenBus, arrBounds, arrOffer, arrBid)
+            if oResult.status != 0:
+                self.msg.AddWarning(f"Optimal power flow: HiGHS found no solution ({oResult.message}).")
+                return None
+            nGens = len(listGens)
+            arrRedispatch = oResult.x[:nGens] - oResult.x[nGens:2 * nGens]
+        listActive = sorted(setActive)
+        arrSensitivity, arrBase, arrLimitActive = self.getconstraintrows(listActive, arrFlowMW, mtxPTDF, arrOutages,
+                                                                         mtxLODF, arrLimit, arrContingencyLimit)
+        arrFinal = arrBase + arrSensitivity @ arrRedispatch
+        nGens, nActive = len(listGens), len(listActive)
+        arrOverload = oResult.x[2 * nGens:] if oResult is not None else np.zeros(nActive)
+        arrShadow = np.zeros(nActive)
+        if oResult is not None and nActive:
+            arrMarginals = oResult.ineqlin.marginals
+            arrShadow = -(arrMarginals[:nActive] + arrMarginals[nActive:])
+        # Constraints that bind or price are carried to the next solve
+        arrBinding = (np.abs(arrFinal) >= arrLimitActive - self.VIOLATION_TOLERANCE_MW) | (np.abs(arrShadow) > 1e-9)
+        self.m_setActive = {tConstraint for tConstraint, bBinding in zip(listActive, arrBinding) if bBinding}
+        arrUp, arrDown = np.maximum(arrRedispatch, 0.0), np.maximum(-arrRedispatch, 0.0)
+        arrCost = arrUp * arrOffer + arrDown * arrBid
+        oDispatch = pd.DataFrame({"generator": [oGen.GenID for oGen in listGens],
+                                  "busbar": [str(oGen.BusID) for oGen in listGens],
+                                  "plant_type": [oGen.PlantType for oGen in listGens],
+                                  "initial_mw": arrInitialMW, "final_mw": arrInitialMW + arrRedispatch,
+                                  "redispatch_mw": arrRedispatch, "cost": arrCost}, columns=self.DISPATCH_COLUMNS)
+        listBranches = gbl.DataModelManager.Branch_TAB
+        arrBranchTab = oFactors.m_arrBranchTab
+        oConstraints = pd.DataFrame({
+            "branch": [listBranches[arrBranchTab[nPosition]].BranchID for nPosition, _ in listActive],
+            "outage": [self.INTACT if nOutage == self.INTACT_OUTAGE else listBranches[arrBranchTab[nOutage]].BranchID
+                       for _, nOutage in listActive],
+            "limit_mw": arrLimitActive, "initial_flow_mw": arrBase, "final_flow_mw": arrFinal,
+            "loading_percent": np.abs(arrFinal) / np.where(arrLimitActive > 0, arrLimitActive, np.nan) * 100.0,
+            "shadow_price": arrShadow, "overload_mw": arrOverload}, columns=self.CONSTRAINT_COLUMNS)
+        oConstraints = oConstraints.sort_values("shadow_price", ascending=False, kind="stable").reset_index(drop=True)
+        return {"dispatch": oDispatch, "constraints": oConstraints, "generators": listGens, "redispatch": arrRedispatch,
+                "cost": float(arrCost.sum()), "redispatch_mw": float(arrUp.sum()),
+                "overload_mw": float(arrOverload.sum()), "rounds": self.m_nRounds}
+
+    def _solvelp(self, listActive, arrFlowMW, mtxPTDF, arrOutages, mtxLODF, arrLimit, arrContingencyLimit, arrGenBus,
+                 arrBounds, arrOffer, arrBid):
+        """
+        HiGHS solution of min offer.up + bid.down + penalty.overload over [up, down, overload] subject to
+        -limit - overload <= base + s.(up - down) <= limit + overload for every active constraint and
+        sum(up - down) = 0 over the generators of every island.
+        """
+        nGens, nActive = len(arrGenBus), len(listActive)
+        arrSensitivity, arrBase, arrLimitActive = self.getconstraintrows(listActive, arrFlowMW, mtxPTDF, arrOutages,
+                                                                         mtxLODF, arrLimit, arrContingencyLimit)
+        mtxS = sp.csr_matrix(arrSensitivity)
+        mtxSlack = sp.identity(nActive, format="csr")
+        mtxUB = sp.vstack([sp.hstack([mtxS, -mtxS, -mtxSlack]), sp.hstack([-mtxS, mtxS, -mtxSlack])], format="csr")
+        arrUB = np.concatenate([arrLimitActive - arrBase, arrLimitActive + arrBase])
+        arrGenIsland = self.m_oFactors.m_arrIsland[arrGenBus]
+        arrIslands = np.unique(arrGenIsland)
+        arrRows = np.searchsorted(arrIslands, arrGenIsland)
+        mtxBalance = sp.csr_matrix((np.ones(nGens), (arrRows, np.arange(nGens))), shape=(len(arrIslands), nGens))
+        mtxEQ = sp.hstack([mtxBalance, -mtxBalance, sp.csr_matrix((len(arrIslands), nActive))], format="csr")
+        arrCost = np.concatenate([arrOffer, arrBid, np.full(nActive, float(self.settings["overload_penalty"]))])
+        listBounds = [tuple(tBound) for tBound in arrBounds[:, 0]] + [tuple(tBound) for tBound in arrBounds[:, 1]] \
+            + [(0.0, None)] * nActive
+        return linprog(arrCost, A_ub=mtxUB, b_ub=arrUB, A_eq=mtxEQ, b_eq=np.zeros(len(arrIslands)), bounds=listBounds,
+                       method="highs")
+
+    def getconstraintrows(self, listActive, arrFlowMW, mtxPTDF, arrOutages, mtxLODF, arrLimit, arrContingencyLimit):
+        """
+        Sensitivity to the generator redispatch, flow before redispatch and limit of every constraint: the branch
+        flow of the intact network, or after an outage f_m + LODF_mk f_k with sensitivity PTDF_m + LODF_mk PTDF_k.
+        """
+        arrSensitivity = np.zeros((len(listActive), mtxPTDF.shape[1]))
+        arrBase = np.zeros(len(listActive))
+        arrLimitActive = np.zeros(len(listActive))
+        dictOutageColumn = {nOutage: nColumn for nColumn, nOutage in enumerate(arrOutages.tolist())}
+        for nRow, (nPosition, nOutage) in enumerate(listActive):
+            if nOutage == self.INTACT_OUTAGE:
+                arrSensitivity[nRow] = mtxPTDF[nPosition]
+                arrBase[nRow] = arrFlowMW[nPosition]
+                arrLimitActive[nRow] = arrLimit[nPosition]
+            else:
+                fLODF = mtxLODF[nPosition, dictOutageColumn[nOutage]]
+                arrSensitivity[nRow] = mtxPTDF[nPosition] + fLODF * mtxPTDF[nOutage]
+                arrBase[nRow] = arrFlowMW[nPosition] + fLODF * arrFlowMW[nOutage]
+                arrLimitActive[nRow] = arrContingencyLimit[nPosition]
+        return arrSensitivity, arrBase, arrLimitActive
+
+    def getviolations(self, arrFlowMW, arrOutages, mtxLODF, arrLimit, arrContingencyLimit):
+        """(branch position, outage position or INTACT_OUTAGE) of every monitored flow above its limit"""
+        fTolerance = self.VIOLATION_TOLERANCE_MW
+        setViolated = {(nPosition, self.INTACT_OUTAGE) for nPosition in
+                       np.flatnonzero((arrLimit > 0) & (np.abs(arrFlowMW) > arrLimit + fTolerance)).tolist()}
+        if len(arrOutages):
+            mtxPost = np.abs(arrFlowMW[:, None] + mtxLODF * arrFlowMW[arrOutages][None, :])
+            mtxPost[arrOutages, np.arange(len(arrOutages))] = 0.0
+            arrMonitored = arrContingencyLimit > 0
+            arrRows, arrColumns = np.nonzero(arrMonitored[:, None] & (mtxPost > arrContingencyLimit[:, None] + fTolerance))
+            setViolated.update(zip(arrRows.tolist(), arrOutages[arrColumns].tolist()))
+        return setViolated
+
+    #__________________________NETWORK DATA________________________
+    @staticmethod
+    def gettopology(oDataModel):
+        """Everything the factorisation depends on, compared between solves to decide whether it can be kept"""
+        return (len(oDataModel.Busbar_TAB),) + tuple(
+            (oBranch.ON, oBranch.BusID1, oBranch.BusID2, getattr(oBranch, 'X', 0.0), getattr(oBranch, 'IsHVDC', False))
+            for oBranch in oDataModel.Branch_TAB)
+
+    def getbalancedinjectionsmw(self):
+        """Busbar injections with the imbalance of every island taken by its external grids rather than its DC slack"""
+        oDataModel = gbl.DataModelManager
+        oFactors = self.m_oFactors
+        arrInjection = oFactors.getinjectionsmw(oDataModel)
+        arrGridBus = np.array([oDataModel.BusbarIdToIndex[oGen.BusID] for oGen in self._getexternalgrids()], dtype=np.int64)
+        if len(arrGridBus):
+            arrImbalance = np.bincount(oFactors.m_arrIsland, weights=arrInjection)
+            arrGridIsland = oFactors.m_arrIsland[arrGridBus]
+            arrGrids = np.bincount(arrGridIsland, minlength=len(arrImbalance))
+            np.add.at(arrInjection, arrGridBus, -arrImbalance[arrGridIsland] / arrGrids[arrGridIsland])
+        return arrInjection
+
+    def getdispatchables(self):
+        """
+        Generators the LP may move with their output before redispatch, (up, down) bounds and offer and bid prices.
+        Output moves within MSG..MWCapacity, a generator already outside its range may only move back towards it.
+        """
+        oDataModel = gbl.DataModelManager
+        listGens, listInitial, listBounds, listOffer, listBid = [], [], [], [], []
+        for oGen in oDataModel.Gen_TAB:
+            if not oGen.ON or oGen.IsExternalGrid or oGen.BusID not in oDataModel.BusbarIdToIndex:
+                continue
+            fMW = oGen.MW or 0.0
+            fMax = max(oGen.MWCapacity or 0.0, 0.0)
+            fMin = min(max(oGen.MSG or 0.0, 0.0), fMax)
+            fOffer, fBid = self.getprices(oGen)
+            listGens.append(oGen)
+            listInitial.append(fMW)
+            listBounds.append(((0.0, max(fMax - fMW, 0.0)), (0.0, max(fMW - fMin, 0.0))))
+            listOffer.append(fOffer)
+            listBid.append(fBid)
+        if self.settings["external_grid_redispatch"]:
+            # An external grid starts from the share of the island imbalance it takes and is not bounded
+            arrInjection = self.m_oFactors.getinjectionsmw(oDataModel)
+            arrBalanced = self.getbalancedinjectionsmw()
+            for oGen in self._getexternalgrids():
+                nBus = oDataModel.BusbarIdToIndex[oGen.BusID]
+                nShare = sum(1 for oGrid in self._getexternalgrids() if oGrid.BusID == oGen.BusID)
+                listGens.append(oGen)
+                listInitial.append((oGen.MW or 0.0) + (arrBalanced[nBus] - arrInjection[nBus]) / nShare)
+                listBounds.append(((0.0, None), (0.0, None)))
+                listOffer.append(float(self.settings["external_grid_cost"]))
+                listBid.append(float(self.settings["external_grid_cost"]))
+        arrBounds = np.empty((len(listGens), 2), dtype=object)
+        for nGen, tBounds in enumerate(listBounds):
+            arrBounds[nGen, 0], arrBounds[nGen, 1] = tBounds
+        return listGens, np.array(listInitial, dtype=np.float64), arrBounds, np.array(listOffer), np.array(listBid)
+
+    def getprices(self, oGen):
+        """(offer, bid) per MW of a generator, looked up by GenID, then PlantType, then the default cost"""
+        dictCosts = self.settings["costs"] or {}
+        price = dictCosts.get(oGen.GenID, dictCosts.get(oGen.PlantType, self.settings["default_cost"]))
+        if isinstance(price, (tuple, list)):
+            return float(price[0]), float(price[1])
+        return float(price), float(price)
+
+    def getlimits(self):
+        """Intact and post contingency limits (MW) of every in service branch, zero for branches not monitored"""
+        oRatings = gbl.DataModelManager.getratingengine(bRefresh=True)
+        fScale = float(self.settings["loading_limit_percent"]) / 100.0
+        arrBranchTab = self.m_oFactors.m_arrBranchTab
+        arrLimit = oRatings.getratings(self.settings["rating"])[arrBranchTab] * fScale
+        strContingency = self.settings["contingency_rating"]
+        if strContingency not in oRatings.getratingsets():
+            return arrLimit, arrLimit
+        arrContingency = oRatings.getratings(strContingency)[arrBranchTab] * fScale
+        return arrLimit, np.where(arrContingency > 0, arrContingency, arrLimit)
+
+    def getptdf(self, arrGenBus):
+        """Branches x generators PTDF, kept while the topology and the generator busbars stay the same"""
+        tKey = tuple(arrGenBus.tolist())
+        if tKey not in self.m_dictPTDF:
+            self.m_dictPTDF = {tKey: self.m_oFactors.getptdf(arrGenBus)}
+        return self.m_dictPTDF[tKey]
+
+    def getlodf(self):
+        """Positions of the outages secured against and their LODF columns, kept while the topology stays the same"""
+        oFactors = self.m_oFactors
+        contingencies = self.settings["contingencies"]
+        if contingencies is None:
+            return np.zeros(0, dtype=np.int64), np.zeros((oFactors.getnumberofbranches(), 0))
+        if contingencies == "all":
+            arrOutages = np.arange(oFactors.getnumberofbranches())
+        else:
+            setIds = {str(strId) for strId in contingencies}
+            arrOutages = np.array([oFactors.m_arrBranchPosition[nIdx] for nIdx, oBranch in
+                                   enumerate(gbl.DataModelManager.Branch_TAB) if str(oBranch.BranchID) in setIds
+                                   and oFactors.m_arrBranchPosition[nIdx] >= 0], dtype=np.int64)
+        tKey = tuple(arrOutages.tolist())
+        if tKey not in self.m_dictLODF:
+            mtxLODF, arrIslanding = oFactors.getlodf(arrOutages)
+            if arrIslanding.any():
+                self.msg.AddWarning(f"Optimal power flow: {int(arrIslanding.sum())} contingencies split an island "
+                                    f"and are not secured against.")
+            self.m_dictLODF = {tKey: (arrOutages[~arrIslanding], mtxLODF[:, ~arrIslanding])}
+        return self.m_dictLODF[tKey]
+
+    #__________________________WRITE BACK________________________
+    def writeback(self, dictSolution):
+        """Writes the redispatched output onto the DataModel generators (and the engine)"""
+        bPush = bool(self.settings["push_to_engine"]) and gbl.EngineContainer is not None
+        for oGen, fInitialMW, fRedispatchMW in zip(dictSolution["generators"], dictSolution["dispatch"]["initial_mw"],
+                                                   dictSolution["redispatch"]):
+            if abs(fRedispatchMW) <= self.REDISPATCH_TOLERANCE_MW:
+                continue
+            oGen.MW = float(fInitialMW + fRedispatchMW)
+            if bPush:
+                oGen.setdatamodelcomponenttoengine()
+        return True
+
+    def _getexternalgrids(self):
+        oDataModel = gbl.DataModelManager
+        return [oGen for oGen in oDataModel.Gen_TAB
+                if oGen.ON and oGen.IsExternalGrid and oGen.BusID in oDataModel.BusbarIdToIndex]
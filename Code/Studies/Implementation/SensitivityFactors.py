@@ -0,0 +1,339 @@
+# DC power transfer and line outage distribution factors of the DataModel.
+# The reduced susceptance matrix of the in service branches is factorised once (one slack busbar per island); PTDF
+# columns of any set of busbars and LODF columns of any set of outages are then blocks of forward/back substitutions,
+# so sensitivities of networks with thousands of branches are screened block by block without forming dense inverses.
+# The linearised AC factors do the same on the complex admittance matrix for voltage as well as thermal limits.
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+
+
+class DCSensitivityFactors:
+    """PTDF and LODF of the in service branches from one factorisation of the DC susceptance matrix"""
+
+    BASE_MVA = 100.0
+    DEFAULT_REACTANCE_PU = 0.01
+    # 1 - PTDF of an outage below this means the outage splits an island
+    ISLANDING_TOLERANCE = 1e-6
+    # An outage moving at least this share of its flow onto a branch without reactance is not screened reliably
+    MATERIAL_LODF = 0.05
+
+    def __init__(self, oDataModel=None, nBlockSize=256):
+        self.m_oDataModel = oDataModel or gbl.DataModelManager
+        self.m_nBlockSize = max(1, int(nBlockSize))
+        # In service branches: Branch_TAB index, end busbars and susceptance (per unit)
+        self.m_arrBranchTab = None
+        self.m_arrFrom = None
+        self.m_arrTo = None
+        self.m_arrB = None
+        # In service branches without a reactance, given DEFAULT_REACTANCE_PU
+        self.m_arrZeroReactance = None
+        # Branch_TAB index -> position in the arrays above, -1 for branches out of service
+        self.m_arrBranchPosition = None
+        self.m_arrFree = None
+        self.m_arrIsland = None
+        self.m_oFactor = None
+        self.build()
+
+    #__________________________FACTORISATION________________________
+    def build(self):
+        """Reads the in service branches of the DataModel and factorises the reduced susceptance matrix"""
+        oDataModel = self.m_oDataModel
+        nBusbars = len(oDataModel.Busbar_TAB)
+        listTab, listFrom, listTo, listX = [], [], [], []
+        for nBranchIdx, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = oDataModel.BusbarIdToIndex.get(oBranch.BusID1), oDataModel.BusbarIdToIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo:
+                continue
+            listTab.append(nBranchIdx)
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listX.append(abs(getattr(oBranch, 'X', 0.0) or 0.0))
+        self.m_arrBranchTab = np.array(listTab, dtype=np.int64)
+        self.m_arrFrom = np.array(listFrom, dtype=np.int64)
+        self.m_arrTo = np.array(listTo, dtype=np.int64)
+        arrX = np.array(listX, dtype=np.float64)
+        self.m_arrZeroReactance = arrX == 0
+        self.m_arrB = 1.0 / np.where(self.m_arrZeroReactance, self.DEFAULT_REACTANCE_PU, arrX)
+        self.m_arrBranchPosition = np.full(len(oDataModel.Branch_TAB), -1, dtype=np.int64)
+        self.m_arrBranchPosition[self.m_arrBranchTab] = np.arange(len(listTab))
+        arrB = self.m_arrB
+        mtxB = sp.coo_matrix((np.concatenate([arrB, arrB, -arrB, -arrB]),
+                              (np.concatenate([self.m_arrFrom, self.m_arrTo, self.m_arrFrom, self.m_arrTo]),
+                               np.concatenate([self.m_arrFrom, self.m_arrTo, self.m_arrTo, self.m_arrFrom]))),
+                             shape=(nBusbars, nBusbars)).tocsr()
+        # The first busbar of every island is its slack and absorbs the injections of the island
+        _, self.m_arrIsland = connected_components(mtxB, directed=False)
+        _, arrSlacks = np.unique(self.m_arrIsland, return_index=True)
+        self.m_arrFree = np.ones(nBusbars, dtype=bool)
+        self.m_arrFree[arrSlacks] = False
+        self.m_oFactor = splu(mtxB[self.m_arrFree][:, self.m_arrFree].tocsc()) if self.m_arrFree.any() else None
+        return True
+
+    def getnumberofbranches(self):
+        return len(self.m_arrBranchTab)
+
+    def solveangles(self, mtxInjection):
+        """Busbar angles (radians) of busbars x cases injections in per unit, slack busbars at zero"""
+        mtxInjection = np.asarray(mtxInjection, dtype=np.float64)
+        mtxAngles = np.zeros_like(mtxInjection)
+        if self.m_oFactor is not None:
+            mtxAngles[self.m_arrFree] = self.m_oFactor.solve(np.ascontiguousarray(mtxInjection[self.m_arrFree]))
+        return mtxAngles
+
+    def getbranchflows(self, mtxAngles):
+        """Branch flows from BusID1 to BusID2 (per unit) of busbars x cases angles"""
+        return self.m_arrB[:, None] * (mtxAngles[self.m_arrFrom] - mtxAngles[self.m_arrTo])
+
+    #__________________________SENSITIVITIES________________________
+    def getinjectionsmw(self, oDataModel=None):
+        """Net injection of every busbar (generation less demand) in MW"""
+        oDataModel = oDataModel or self.m_oDataModel
+        arrInjection = np.zeros(len(oDataModel.Busbar_TAB))
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON:
+                arrInjection[nBus] += oGen.MW or 0.0
+        for oLoad in oDataModel.Load_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oLoad.BusID)
+            if nBus is not None and oLoad.ON:
+                arrInjection[nBus] -= oLoad.MW or 0.0
+        return arrInjection
+
+    def getbaseflowsmw(self, arrInjectionMW=None):
+        """DC flow of every in service branch in MW for the given (by default the DataModel) busbar injections"""
+        if arrInjectionMW is None:
+            arrInjectionMW = self.getinjectionsmw()
+        mtxAngles = self.solveangles(np.asarray(arrInjectionMW, dtype=np.float64)[:, None] / self.BASE_MVA)
+        return self.getbranchflows(mtxAngles)[:, 0] * self.BASE_MVA
+
+    def gettransferptdf(self, arrSource, arrSink):
+        """Branches x transfers: flow per unit of power moved from each source busbar to its sink busbar.
+        A sink of -1 is the slack of the source island."""
+        arrSource = np.asarray(arrSource, dtype=np.int64)
+        arrSink = np.asarray(arrSink, dtype=np.int64)
+        nBusbars = len(self.m_arrFree)
+        arrColumns = np.arange(len(arrSource))
+        mtxInjection = np.zeros((nBusbars, len(arrSource)))
+        mtxInjection[arrSource, arrColumns] += 1.0
+        arrHasSink = arrSink >= 0
+        mtxInjection[arrSink[arrHasSink], arrColumns[arrHasSink]] -= 1.0
+        return self.getbranchflows(self.solveangles(mtxInjection))
+
+    def getptdf(self, arrBusbars):
+        """Branches x busbars: flow per unit injected at each busbar and taken at the slack of its island"""
+        return self.gettransferptdf(arrBusbars, np.full(len(arrBusbars), -1))
+
+    def getlodf(self, arrOutages):
+        """
+        Branches x outages: change of flow per unit of pre-outage flow of each outaged branch (positions in the in
+        service branch arrays). LODF = PTDF(from, to) / (1 - PTDF_kk); the outaged branch itself gets -1. Outages that
+        split an island get NaN columns and are reported by the returned mask.
+        """
+        arrOutages = np.asarray(arrOutages, dtype=np.int64)
+        mtxPTDF = self.gettransferptdf(self.m_arrFrom[arrOutages], self.m_arrTo[arrOutages])
+        arrColumns = np.arange(len(arrOutages))
+        arrDenominator = 1.0 - mtxPTDF[arrOutages, arrColumns]
+        arrIslanding = arrDenominator < self.ISLANDING_TOLERANCE
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mtxLODF = mtxPTDF / np.where(arrIslanding, np.nan, arrDenominator)
+        mtxLODF[arrOutages, arrColumns] = -1.0
+        mtxLODF[:, arrIslanding] = np.nan
+        return mtxLODF, arrIslanding
+
+    #__________________________OUTAGE SCREENING________________________
+    def screenoutages(self, arrRatingMW, arrFlowMW=None, arrOutages=None):
+        """
+        Estimates the post-outage loading of every monitored branch (rating above zero) for every outage, in blocks.
+        Returns per outage position the highest loading in percent, the branch position carrying it (-1 for outages
+        that split an island), whether the outage splits an island and whether its estimate is unreliable: the outage
+        of a branch without reactance, or one moving a material share of its flow onto such a branch.
+        """
+        if arrFlowMW is None:
+            arrFlowMW = self.getbaseflowsmw()
+        if arrOutages is None:
+            arrOutages = np.arange(self.getnumberofbranches())
+        arrOutages = np.asarray(arrOutages, dtype=np.int64)
+        arrRatingMW = np.asarray(arrRatingMW, dtype=np.float64)
+        arrMonitored = arrRatingMW > 0
+        arrInverseRating = np.where(arrMonitored, 100.0 / np.where(arrMonitored, arrRatingMW, 1.0), 0.0)
+        arrMaxLoading = np.zeros(len(arrOutages))
+        arrLimiting = np.full(len(arrOutages), -1, dtype=np.int64)
+        arrIslanding = np.zeros(len(arrOutages), dtype=bool)
+        arrUnscreenable = self.m_arrZeroReactance[arrOutages].copy()
+        bZeroReactance = self.m_arrZeroReactance.any()
+        for nStart in range(0, len(arrOutages), self.m_nBlockSize):
+            oSlice = slice(nStart, min(nStart + self.m_nBlockSize, len(arrOutages)))
+            arrBlock = arrOutages[oSlice]
+            mtxLODF, arrBlockIslanding = self.getlodf(arrBlock)
+            mtxLoading = np.abs(arrFlowMW[:, None] + mtxLODF * arrFlowMW[arrBlock]) * arrInverseRating[:, None]
+            mtxLoading[arrBlock, np.arange(len(arrBlock))] = 0.0
+            mtxLoading = np.nan_to_num(mtxLoading, nan=0.0)
+            arrLimiting[oSlice] = np.argmax(mtxLoading, axis=0) if len(arrFlowMW) else -1
+            arrMaxLoading[oSlice] = mtxLoading.max(axis=0) if len(arrFlowMW) else 0.0
+            arrIslanding[oSlice] = arrBlockIslanding
+            if bZeroReactance:
+                mtxZeroLODF = np.nan_to_num(np.abs(mtxLODF[self.m_arrZeroReactance]), nan=0.0)
+                arrUnscreenable[oSlice] |= mtxZeroLODF.max(axis=0) >= self.MATERIAL_LODF
+        arrLimiting[arrIslanding] = -1
+        return {"outage": arrOutages, "max_loading": arrMaxLoading, "limiting_branch": arrLimiting,
+                "islanding": arrIslanding, "unscreenable": arrUnscreenable}
+
+
+class ACSensitivityFactors:
+    """
+    Voltage and branch flow sensitivities of the linearised AC network from one factorisation of the complex
+    admittance matrix. Busbar voltages follow V = V_slack + Z I with the injected currents taken at the operating
+    point, so R/X of distribution networks shows in the voltage rise that DC factors miss.
+    """
+
+    BASE_MVA = 100.0
+    DEFAULT_REACTANCE_PU = 0.01
+
+    def __init__(self, oDataModel=None, nBlockSize=256):
+        self.m_oDataModel = oDataModel or gbl.DataModelManager
+        self.m_nBlockSize = max(1, int(nBlockSize))
+        # In service branches: Branch_TAB index, end busbars and series admittance (per unit)
+        self.m_arrBranchTab = None
+        self.m_arrFrom = None
+        self.m_arrTo = None
+        self.m_arrY = None
+        self.m_arrFree = None
+        self.m_oFactor = None
+        # Operating point of the linearised network: busbar voltages and branch flows (per unit, BusID1 to BusID2)
+        self.m_arrVoltage = None
+        self.m_arrFlow = None
+        self.build()
+
+    #__________________________FACTORISATION________________________
+    def build(self):
+        """Factorises the admittance matrix reduced by one slack busbar per island and solves the operating point"""
+        oDataModel = self.m_oDataModel
+        nBusbars = len(oDataModel.Busbar_TAB)
+        listTab, listFrom, listTo, listY = [], [], [], []
+        for nBranchIdx, oBranch in enumerate(oDataModel.Branch_TAB):
+            if not oBranch.ON or getattr(oBranch, 'IsHVDC', False):
+                continue
+            nFrom, nTo = oDataModel.BusbarIdToIndex.get(oBranch.BusID1), oDataModel.BusbarIdToIndex.get(oBranch.BusID2)
+            if nFrom is None or nTo is None or nFrom == nTo:
+                continue
+            listTab.append(nBranchIdx)
+            listFrom.append(nFrom)
+            listTo.append(nTo)
+            listY.append(1.0 / complex(abs(getattr(oBranch, 'R', 0.0) or 0.0),
+                                       abs(getattr(oBranch, 'X', 0.0) or 0.0) or self.DEFAULT_REACTANCE_PU))
+        self.m_arrBranchTab = np.array(listTab, dtype=np.int64)
+        self.m_arrFrom = np.array(listFrom, dtype=np.int64)
+        self.m_arrTo = np.array(listTo, dtype=np.int64)
+        self.m_arrY = np.array(listY, dtype=np.complex128)
+        arrY = self.m_arrY
+        mtxY = sp.coo_matrix((np.concatenate([arrY, arrY, -arrY, -arrY]),
+                              (np.concatenate([self.m_arrFrom, self.m_arrTo, self.m_arrFrom, self.m_arrTo]),
+                               np.concatenate([self.m_arrFrom, self.m_arrTo, self.m_arrTo, self.m_arrFrom]))),
+                             shape=(nBusbars, nBusbars)).tocsr()
+        # The grid infeed (slack busbar or external grid) of every island holds its voltage, else its first busbar
+        _, arrIsland = connected_components(abs(mtxY), directed=False)
+        arrSource = np.array([oBusbar.Slack for oBusbar in oDataModel.Busbar_TAB], dtype=bool)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON and oGen.IsExternalGrid:
+                arrSource[nBus] = True
+        arrSource[np.isin(arrIsland, arrIsland[arrSource], invert=True)] = False
+        _, arrFirst = np.unique(arrIsland, return_index=True)
+        arrIslandHasSource = np.isin(arrIsland[arrFirst], arrIsland[arrSource])
+        arrSource[arrFirst[~arrIslandHasSource]] = True
+        self.m_arrFree = ~arrSource
+        self.m_oFactor = splu(mtxY[self.m_arrFree][:, self.m_arrFree].tocsc()) if self.m_arrFree.any() else None
+        # Operating point from the DataModel injections, currents taken at flat voltage
+        self.m_arrVoltage = np.ones(nBusbars, dtype=np.complex128)
+        arrCurrent = np.conj(self.getinjectionsmva()) / self.BASE_MVA
+        if self.m_oFactor is not None:
+            self.m_arrVoltage[self.m_arrFree] += self.m_oFactor.solve(arrCurrent[self.m_arrFree])
+        self.m_arrFlow = self.getbranchflows(self.m_arrVoltage[:, None])[:, 0]
+        return True
+
+    def getnumberofbranches(self):
+        return len(self.m_arrBranchTab)
+
+    def getinjectionsmva(self):
+        """Net complex injection of every busbar (generation less demand) in MVA"""
+        oDataModel = self.m_oDataModel
+        arrInjection = np.zeros(len(oDataModel.Busbar_TAB), dtype=np.complex128)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and oGen.ON and not oGen.IsExternalGrid:
+                arrInjection[nBus] += complex(oGen.MW or 0.0, oGen.MVar or 0.0)
+        for oLoad in oDataModel.Load_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oLoad.BusID)
+            if nBus is not None and oLoad.ON:
+                arrInjection[nBus] -= complex(oLoad.MW or 0.0, oLoad.MVar or 0.0)
+        return arrInjection
+
+    def getbranchflows(self, mtxVoltage):
+        """Branch currents from BusID1 to BusID2 (per unit) of busbars x cases voltages"""
+        return self.m_arrY[:, None] * (mtxVoltage[self.m_arrFrom] - mtxVoltage[self.m_arrTo])
+
+    #__________________________SENSITIVITIES________________________
+    def getvoltagesensitivity(self, arrBusbars):
+        """Busbars x busbars: change of complex voltage per MW injected at unity power factor at each busbar"""
+        arrBusbars = np.asarray(arrBusbars, dtype=np.int64)
+        nBusbars = len(self.m_arrFree)
+        mtxCurrent = np.zeros((nBusbars, len(arrBusbars)), dtype=np.complex128)
+        # 1 MW at the operating voltage of the busbar draws I = 1 / conj(V) per unit
+        mtxCurrent[arrBusbars, np.arange(len(arrBusbars))] = 1.0 / (np.conj(self.m_arrVoltage[arrBusbars]) * self.BASE_MVA)
+        mtxCurrent[~self.m_arrFree] = 0.0
+        mtxSensitivity = np.zeros_like(mtxCurrent)
+        if self.m_oFactor is not None:
+            mtxSensitivity[self.m_arrFree] = self.m_oFactor.solve(np.ascontiguousarray(mtxCurrent[self.m_arrFree]))
+        return mtxSensitivity
+
+    def getinjectionlimits(self, arrBusbars, arrRatingMVA, fVMin, fVMax, fMaxMW, listDirections=(1.0,)):
+        """
+        Largest injection (direction 1) or withdrawal (direction -1) in MW at each busbar before a branch reaches its
+        rating (above zero) or a busbar voltage magnitude leaves [fVMin, fVMax], by blocks of busbars. Every direction
+        is read from the same solves. Returns per direction the limit of every busbar, the limiting kind ('thermal',
+        'voltage_low', 'voltage_high', 'max injection') and the branch position or busbar index at the limit (-1 for
+        'max injection').
+        """
+        arrBusbars = np.asarray(arrBusbars, dtype=np.int64)
+        arrRating = np.asarray(arrRatingMVA, dtype=np.float64) / self.BASE_MVA
+        arrMonitored = arrRating > 0
+        arrMonitoredPositions = np.flatnonzero(arrMonitored)
+        arrVoltage = np.abs(self.m_arrVoltage)
+        arrUnit = self.m_arrVoltage / np.where(arrVoltage > 0, arrVoltage, 1.0)
+        arrF0 = self.m_arrFlow[arrMonitored][:, None]
+        arrC = np.abs(arrF0) ** 2 - arrRating[arrMonitored][:, None] ** 2
+        listLimits = [(np.full(len(arrBusbars), float(fMaxMW)), np.full(len(arrBusbars), "max injection", dtype=object),
+                       np.full(len(arrBusbars), -1, dtype=np.int64)) for _ in listDirections]
+        for nStart in range(0, len(arrBusbars), self.m_nBlockSize):
+            oSlice = slice(nStart, nStart + self.m_nBlockSize)
+            mtxDV = self.getvoltagesensitivity(arrBusbars[oSlice])
+            # Magnitude change per MW, projected on the operating voltage
+            mtxDVMag = (mtxDV * np.conj(arrUnit)[:, None]).real
+            mtxDF = self.getbranchflows(mtxDV)[arrMonitored]
+            mtxA = np.abs(mtxDF) ** 2
+            mtxB = (arrF0 * np.conj(mtxDF)).real
+            for fDirection, (arrLimit, arrKind, arrAt) in zip(listDirections, listLimits):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    mtxHigh = np.where(fDirection * mtxDVMag > 1e-12, (fVMax - arrVoltage)[:, None] / (fDirection * mtxDVMag), np.inf)
+                    mtxLow = np.where(fDirection * mtxDVMag < -1e-12, (arrVoltage - fVMin)[:, None] / (-fDirection * mtxDVMag), np.inf)
+                    # |F0 + x dF| = rating: positive root of |dF|^2 x^2 + 2 Re(F0 conj dF) x + |F0|^2 - rating^2
+                    mtxThermal = np.where(mtxA > 1e-18, (-fDirection * mtxB + np.sqrt(np.maximum(mtxB ** 2 - mtxA * arrC, 0.0)))
+                                          / mtxA, np.inf)
+                mtxThermal = np.where(arrC >= 0, 0.0, mtxThermal)
+                for strKind, mtxCandidate, arrPositions in (("thermal", mtxThermal, arrMonitoredPositions),
+                                                            ("voltage_high", mtxHigh, None), ("voltage_low", mtxLow, None)):
+                    if not len(mtxCandidate):
+                        continue
+                    arrArg = np.argmin(mtxCandidate, axis=0)
+                    arrCandidate = np.maximum(mtxCandidate[arrArg, np.arange(mtxCandidate.shape[1])], 0.0)
+                    arrBetter = arrCandidate < arrLimit[oSlice]
+                    arrLimit[oSlice] = np.where(arrBetter, arrCandidate, arrLimit[oSlice])
+                    arrKind[oSlice] = np.where(arrBetter, strKind, arrKind[oSlice])
+                    arrAt[oSlice] = np.where(arrBetter, arrArg if arrPositions is None else arrPositions[arrArg], arrAt[oSlice])
+        return listLimits
@@ -0,0 +1,319 @@
+# Quasi-static time-series load flow (e.g. 8760 hourly steps of an annual ETYS/TEC study).
+# Per-load and per-generator profiles are held as step x component NumPy matrices, built in memory or read from
+# Parquet. Every step writes the profile values onto the DataModel (and the engine), runs a warm started load flow
+# and keeps the selected result columns; results are appended to the columnar result store one chunk of steps at a
+# time. Chunks can be spread over worker processes that attach to one shared copy of the DataModel and profiles.
+import numpy as np
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span
+from Code.Results.ResultTables import RESULT_TABLE_TABS
+
+
+class TimeSeriesProfiles:
+    """Per component profiles, one step x component matrix per (tab, attribute)"""
+
+    # Attribute identifying the components of a profiled tab
+    TAB_KEYS = {"Load_TAB": "LoadID", "Gen_TAB": "GenID"}
+    # Parquet column prefixes, columns are named "<prefix>:<component id>:<attribute>", e.g. "load:Load_ABC1_0:MW"
+    PARQUET_PREFIXES = {"load": "Load_TAB", "gen": "Gen_TAB"}
+
+    def __init__(self):
+        # (tab, attribute) -> (list of component ids, step x component matrix)
+        self.m_dictProfiles = {}
+        self.m_listSharedMemory = []
+
+    #__________________________BUILDING PROFILES________________________
+    def addprofiles(self, strTab, strAttribute, listComponentIds, mtxValues):
+        """Adds the profiles of one attribute, mtxValues has one row per step and one column per component id"""
+        if strTab not in self.TAB_KEYS:
+            raise ValueError(f"Profiles are only supported for {', '.join(self.TAB_KEYS)}, not {strTab}")
+        mtxValues = np.asarray(mtxValues, dtype=np.float64)
+        if mtxValues.ndim != 2 or mtxValues.shape[1] != len(listComponentIds):
+            raise ValueError(f"Profile matrix for {strTab}.{strAttribute} must be steps x {len(listComponentIds)}")
+        if self.m_dictProfiles and mtxValues.shape[0] != self.getnumberofsteps():
+            raise ValueError("All profiles must have the same number of steps")
+        self.m_dictProfiles[(strTab, strAttribute)] = ([str(strId) for strId in listComponentIds], mtxValues)
+
+    @classmethod
+    def fromparquet(cls, strFilePath):
+        """Reads profiles from a Parquet file with one row per step and one "<prefix>:<id>:<attribute>" column per profile"""
+        import pyarrow.parquet as pq
+        oTable = pq.read_table(strFilePath, memory_map=True)
+        dictGroups = {}
+        for strColumn in oTable.column_names:
+            listParts = strColumn.split(":")
+            if len(listParts) < 3 or listParts[0] not in cls.PARQUET_PREFIXES:
+                continue
+            strTab = cls.PARQUET_PREFIXES[listParts[0]]
+            strId, strAttribute = ":".join(listParts[1:-1]), listParts[-1]
+            dictGroups.setdefault((strTab, strAttribute), []).append((strId, strColumn))
+        oProfiles = cls()
+        for (strTab, strAttribute), listColumns in dictGroups.items():
+            mtxValues = np.column_stack([oTable.column(strColumn).to_numpy(zero_copy_only=False)
+                                         for _, strColumn in listColumns])
+            oProfiles.addprofiles(strTab, strAttribute, [strId for strId, _ in listColumns], mtxValues)
+        return oProfiles
+
+    def toparquet(self, strFilePath):
+        """Writes the profiles in the layout read by fromparquet"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        dictPrefixes = {strTab: strPrefix for strPrefix, strTab in self.PARQUET_PREFIXES.items()}
+        dictColumns = {}
+        for (strTab, strAttribute), (listIds, mtxValues) in self.m_dictProfiles.items():
+            for nColumn, strId in enumerate(listIds):
+                dictColumns[f"{dictPrefixes[strTab]}:{strId}:{strAttribute}"] = mtxValues[:, nColumn]
+        pq.write_table(pa.table(dictColumns), strFilePath)
+        return strFilePath
+
+    def getnumberofsteps(self):
+        """Returns the number of steps covered by the profiles"""
+        for _, mtxValues in self.m_dictProfiles.values():
+            return mtxValues.shape[0]
+        return 0
+
+    #__________________________BINDING TO THE DATAMODEL________________________
+    def bind(self, oDataModel):
+        """Resolves the component ids against a DataModel, returns (attribute, components, matrix) per profile set"""
+        listBound = []
+        for (strTab, strAttribute), (listIds, mtxValues) in self.m_dictProfiles.items():
+            strKey = self.TAB_KEYS[strTab]
+            dictIndex = {str(getattr(oComponent, strKey)).strip(): oComponent for oComponent in getattr(oDataModel, strTab)}
+            listComponents, listColumns = [], []
+            for nColumn, strId in enumerate(listIds):
+                oComponent = dictIndex.get(strId.strip())
+                if oComponent is None:
+                    gbl.Msg.AddWarning(f"Time series: no component {strId} in {strTab}, its profile is ignored.")
+                    continue
+                listComponents.append(oComponent)
+                listColumns.append(nColumn)
+            if listComponents:
+                listBound.append((strAttribute, listComponents, mtxValues[:, listColumns]))
+        return listBound
+
+    #__________________________SHARING WITH WORKERS________________________
+    def tosharedmemory(self):
+        """Copies every profile matrix into shared memory once, returns a descriptor workers attach with"""
+        from multiprocessing import shared_memory
+        dictDescriptor = {}
+        for tKey, (listIds, mtxValues) in self.m_dictProfiles.items():
+            oSharedMemory = shared_memory.SharedMemory(create=True, size=max(mtxValues.nbytes, 1))
+            np.ndarray(mtxValues.shape, dtype=np.float64, buffer=oSharedMemory.buf)[:] = mtxValues
+            self.m_listSharedMemory.append(oSharedMemory)
+            dictDescriptor[tKey] = (oSharedMemory.name, mtxValues.shape, listIds)
+        return dictDescriptor
+
+    @classmethod
+    def attachsharedmemory(cls, dictDescriptor):
+        """Attaches to profiles shared by tosharedmemory without copying them"""
+        from multiprocessing import shared_memory
+        oProfiles = cls()
+        for (strTab, strAttribute), (strName, tShape, listIds) in dictDescriptor.items():
+            oSharedMemory = shared_memory.SharedMemory(name=strName)
+            oProfiles.m_listSharedMemory.append(oSharedMemory)
+            oProfiles.m_dictProfiles[(strTab, strAttribute)] = (
+                listIds, np.ndarray(tuple(tShape), dtype=np.float64, buffer=oSharedMemory.buf))
+        return oProfiles
+
+    def releasesharedmemory(self, bUnlink=False):
+        """Detaches from the shared profile blocks, bUnlink frees them (done once by the creating process)"""
+        if bUnlink:
+            self.m_dictProfiles = {tKey: (listIds, np.array(mtxValues))
+                                   for tKey, (listIds, mtxValues) in self.m_dictProfiles.items()}
+        for oSharedMemory in self.m_listSharedMemory:
+            oSharedMemory.close()
+            if bUnlink:
+                oSharedMemory.unlink()
+        self.m_listSharedMemory = []
+
+
+class TimeSeriesLoadFlow:
+    """Runs a load flow per step of a set of profiles and stores the selected results per step"""
+
+    # Result table -> attributes recorded every step
+    DEFAULT_RESULT_COLUMNS = {
+        "busbars": ["voltage", "angle"],
+        "branches": ["loading"],
+        "generators": ["MWLoadFlow", "MVarLoadFlow"],
+    }
+    # Attribute naming the result columns of each table
+    RESULT_COLUMN_KEYS = {"busbars": "BusID", "branches": "BranchID", "generators": "GenID", "loads": "LoadID"}
+
+    def __init__(self, oProfiles, dictSettings=None, dictResultColumns=None, nChunkSteps=168, bPushToEngine=True):
+        self.msg = gbl.Msg
+        self.m_oProfiles = oProfiles
+        self.m_dictSettings = dict(dictSettings or {})
+        self.m_dictResultColumns = dictResultColumns or self.DEFAULT_RESULT_COLUMNS
+        self.m_nChunkSteps = max(1, int(nChunkSteps))
+        self.m_bPushToEngine = bPushToEngine
+        self.m_listBound = None
+        self.m_listFailedSteps = []
+
+    #__________________________SEQUENTIAL RUN________________________
+    def runtimeseries(self, nStartStep=0, nEndStep=None, nWorkers=1, strEngine=None, dictMetadata=None):
+        """
+        Runs steps [nStartStep, nEndStep) and stores them as one result store run, returned by id.
+        With nWorkers > 1 the chunks are spread over worker processes running strEngine ('ipsa', 'powerfactory' or
+        'simulated', by default the engine in use). The DataModel is left as it was before the run.
+        """
+        if nEndStep is None:
+            nEndStep = self.m_oProfiles.getnumberofsteps()
+        listChunks = [(nStep, min(nStep + self.m_nChunkSteps, nEndStep))
+                      for nStep in range(nStartStep, nEndStep, self.m_nChunkSteps)]
+        self.m_listFailedSteps = []
+        dictMetadata = dict(dictMetadata or {}, steps=[nStartStep, nEndStep], chunk_steps=self.m_nChunkSteps,
+                            workers=nWorkers, result_columns=self.m_dictResultColumns)
+        oWriter = gbl.ResultStore.opentimeseriesrun("timeseries", self.m_dictSettings, metadata=dictMetadata,
+                                                    network_hash=gbl.DataModelManager.getnetworkhash())
+        try:
+            if nWorkers > 1 and len(listChunks) > 1:
+                for dictChunk in self._runchunksinworkers(listChunks, nWorkers, strEngine):
+                    self._writechunk(oWriter, dictChunk)
+            else:
+                bPushToEngine = self.m_bPushToEngine and gbl.EngineContainer is not None
+                oSnapshot = gbl.DataModelManager.snapshot()
+                try:
+                    for nStart, nEnd in listChunks:
+                        self._writechunk(oWriter, self.runchunk(nStart, nEnd))
+                finally:
+                    # The engine holds the last step's values until the restored profile values are pushed back
+                    oSnapshot.restore(fnOnRestore=self._pushrestored if bPushToEngine else None)
+                    oSnapshot.release()
+        except Exception:
+            oWriter.abort()
+            raise
+        dictMetadata["failed_steps"] = sorted(self.m_listFailedSteps)
+        if self.m_listFailedSteps:
+            self.msg.AddWarning(f"Time series: {len(self.m_listFailedSteps)} steps did not solve and hold NaN results.")
+        return oWriter.close()
+
+    def runchunk(self, nStart, nEnd):
+        """Runs steps [nStart, nEnd) on the current DataModel and engine, returns the result matrices of the chunk"""
+        oDataModel = gbl.DataModelManager
+        oLoadFlow = gbl.EngineLoadFlowContainer
+        if self.m_listBound is None:
+            self.m_listBound = self.m_oProfiles.bind(oDataModel)
+        bPushToEngine = self.m_bPushToEngine and gbl.EngineContainer is not None
+        dictTables = {}
+        for strTable, listColumns in self.m_dictResultColumns.items():
+            listComponents = getattr(oDataModel, RESULT_TABLE_TABS[strTable])
+            for strColumn in listColumns:
+                dictTables[(strTable, strColumn)] = (listComponents, np.full((nEnd - nStart, len(listComponents)), np.nan))
+        listFailed = []
+        with span("timeseries.chunk", start=nStart, end=nEnd):
+            for nRow, nStep in enumerate(range(nStart, nEnd)):
+                for strAttribute, listComponents, mtxValues in self.m_listBound:
+                    for oComponent, fValue in zip(listComponents, mtxValues[nStep].tolist()):
+                        setattr(oComponent, strAttribute, fValue)
+                        if bPushToEngine:
+                            oComponent.setdatamodelcomponenttoengine()
+                try:
+                    bOK = oLoadFlow.runloadflowtimestep(bWarmStart=nRow > 0, **self.m_dictSettings)
+                except Exception as e:
+                    self.msg.AddWarning(f"Time series step {nStep} failed: {e}")
+                    bOK = False
+                if not bOK:
+                    listFailed.append(nStep)
+                    continue
+                for (_, strColumn), (listComponents, mtxResults) in dictTables.items():
+                    mtxResults[nRow] = [_tofloat(getattr(oComponent, strColumn, None)) for oComponent in listComponents]
+        return {"start": nStart, "end": nEnd, "failed": listFailed,
+                "tables": {tKey: mtxResults for tKey, (_, mtxResults) in dictTables.items()}}
+
+    def _pushrestored(self, oComponent, listAttributes):
+        """Pushes a component back to the engine when one of its profiled attributes was restored"""
+        setProfiled = {strAttribute for strAttribute, _, _ in self.m_listBound or []}
+        if setProfiled.intersection(listAttributes):
+            oComponent.setdatamodelcomponenttoengine()
+
+    def _writechunk(self, oWriter, dictChunk):
+        """Appends the results of one chunk to the run, one table per result column"""
+        oDataModel = gbl.DataModelManager
+        self.m_listFailedSteps.extend(dictChunk["failed"])
+        arrSteps = np.arange(dictChunk["start"], dictChunk["end"], dtype=np.int64)
+        for (strTable, strColumn), mtxResults in dictChunk["tables"].items():
+            listNames = self._getcolumnnames(strTable, getattr(oDataModel, RESULT_TABLE_TABS[strTable]))
+            oWriter.writebatch(f"{strTable}_{strColumn}", arrSteps,
+                               {strName: mtxResults[:, nColumn] for nColumn, strName in enumerate(listNames)})
+
+    def _getcolumnnames(self, strTable, listComponents):
+        """Unique column name per component, repeated identifiers get their tab position appended"""
+        strKey = self.RESULT_COLUMN_KEYS[strTable]
+        listNames = [str(getattr(oComponent, strKey, "")).strip() for oComponent in listComponents]
+        setSeen, listUnique = set(), []
+        for nIndex, strName in enumerate(listNames):
+            if strName in setSeen:
+                strName = f"{strName}#{nIndex}"
+            setSeen.add(strName)
+            listUnique.append(strName)
+        return listUnique
+
+    #__________________________PARALLEL RUN________________________
+    def _runchunksinworkers(self, listChunks, nWorkers, strEngine):
+        """Spreads the chunks over worker processes attached to one shared copy of the DataModel and profiles,
+        yielding the chunk results in step order"""
+        from concurrent.futures import ProcessPoolExecutor
+        if strEngine is None:
+            strEngine = _getenginename()
+        oArrays = gbl.DataModelManager.toarrays()
+        strDataModelName = oArrays.tosharedmemory()
+        dictProfileDescriptor = self.m_oProfiles.tosharedmemory()
+        tInitArgs = (strDataModelName, dictProfileDescriptor, strEngine, self.m_dictSettings,
+                     self.m_dictResultColumns, self.m_bPushToEngine)
+        try:
+            with ProcessPoolExecutor(max_workers=min(nWorkers, len(listChunks)), initializer=_initialiseworker,
+                                     initargs=tInitArgs) as oExecutor:
+                listFutures = [oExecutor.submit(_runchunkinworker, nStart, nEnd) for nStart, nEnd in listChunks]
+                for oFuture in listFutures:
+                    yield oFuture.result()
+        finally:
+            oArrays.unlink()
+            self.m_oProfiles.releasesharedmemory(bUnlink=True)
+
+
+def _tofloat(value):
+    """Result value as a float, NaN for missing or non-numeric values"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _getenginename():
+    """Engine name of the active engine, as understood by the batch runner"""
+    if gbl.EngineContainer is None:
+        return "simulated"
+    strType = type(gbl.EngineContainer).__name__.lower()
+    return "powerfactory" if "powerfactory" in strType else "ipsa"
+
+
+# Study of the worker process, set up once per worker by _initialiseworker
+_WorkerStudy = None
+
+
+def _initialiseworker(strDataModelName, dictProfileDescriptor, strEngine, dictSettings, dictResultColumns, bPushToEngine):
+    """Worker process set-up: framework, DataModel from shared memory, engine session and network"""
+    global _WorkerStudy
+    from Code.BatchRunner import BatchRunner
+    from Code.DataModel.DataModelArrays import DataModelArrays
+    oRunner = BatchRunner(log_level="ERROR", use_result_store=False)
+    if not oRunner.initialise():
+        raise RuntimeError("Failed to initialise the framework in the time series worker")
+    oArrays = DataModelArrays.attachsharedmemory(strDataModelName)
+    try:
+        oDataModel = oArrays.todatamodel()
+    finally:
+        oArrays.close()
+    gbl.DataModelManager = oDataModel
+    dictSession = oRunner.activateengine(strEngine)
+    oDataModel.BasicEngineModelupdater = dictSession["datamodel_interface"]
+    if dictSession["engine"] is not None and not dictSession["engine"].load_network_from_datamodel():
+        raise RuntimeError(f"Failed to build the {strEngine} network in the time series worker")
+    oProfiles = TimeSeriesProfiles.attachsharedmemory(dictProfileDescriptor)
+    _WorkerStudy = TimeSeriesLoadFlow(oProfiles, dictSettings, dictResultColumns, bPushToEngine=bPushToEngine)
+
+
+def _runchunkinworker(nStart, nEnd):
+    """Worker process task: run one chunk of steps"""
+    return _WorkerStudy.runchunk(nStart, nEnd)
@@ -0,0 +1,348 @@
+# Engine independent transmission capacity assessment.
+# Every branch outage is first screened with DC line outage distribution factors from one factorisation of the network.
+# Only the outages whose estimated post-outage loading comes near the thermal limit, and those that split an island,
+# are run as full load flows, spread over worker processes. The headroom of a busbar, the largest injection it takes
+# before a thermal or voltage limit is reached, starts from its PTDF estimate and is refined by bisection on warm
+# started load flows. The constraints found are ranked by severity and stored with the screening and headroom tables.
+import numpy as np
+import pandas as pd
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span, timed
+from Code.DataModel.ComponentManager import Generator, Load
+from Code.Studies.BaseTemplates.TxCapacityAssessmentBase import TxCapacityAssessmentBase
+from Code.Studies.Implementation.SensitivityFactors import DCSensitivityFactors
+from Code.Studies.Implementation.TimeSeriesLoadFlow import _getenginename, _tofloat
+
+
+class TxCapacityAssessment(TxCapacityAssessmentBase):
+    """Outage screening, full solves of the critical outages and busbar headroom on the engine in use"""
+
+    # Outage name of the intact network
+    INTACT = ""
+    # ID of the generator (or load) added to carry the headroom injection at busbars without generation or demand
+    PROBE_GEN_ID = "CAPACITY_PROBE"
+    CONSTRAINT_COLUMNS = ["rank", "outage", "constraint_type", "component", "value", "limit", "severity"]
+
+    def __init__(self, dictSettings=None):
+        TxCapacityAssessmentBase.__init__(self, dictSettings)
+        self.loadflow = None
+        self.initialized = False
+        self.run_id = None
+        self.m_dictResults = {}
+
+    def initializestudy(self):
+        if gbl.DataModelManager is None or not gbl.DataModelManager.Busbar_TAB:
+            raise RuntimeError("The DataModel has no network to assess.")
+        if gbl.EngineLoadFlowContainer is None:
+            raise RuntimeError("No load flow engine has been initialised.")
+        self.loadflow = gbl.EngineLoadFlowContainer
+        self.initialized = True
+        return True
+
+    #__________________________CAPACITY ASSESSMENT________________________
+    @timed("capacity.runcapacityassessment")
+    def runcapacityassessment(self, dictMetadata=None):
+        """Screens every outage, solves the critical ones and the busbar headroom and stores the results in the result store"""
+        bOK = self.initializestudy()
+        if not bOK:
+            return False
+        oDataModel = gbl.DataModelManager
+        with span("capacity.screening"):
+            oFactors = DCSensitivityFactors(oDataModel)
+            arrFlowMW = oFactors.getbaseflowsmw()
+            arrRatingMW = oDataModel.getratingengine(bRefresh=True).getratings()[oFactors.m_arrBranchTab]
+            dictScreening = oFactors.screenoutages(arrRatingMW, arrFlowMW)
+            listHeadroomTasks = self.getlinearheadroom(oFactors, arrFlowMW, arrRatingMW)
+        nUnscreenable = int(dictScreening["unscreenable"].sum())
+        if nUnscreenable:
+            self.msg.AddWarning(f"Capacity assessment: {nUnscreenable} outages involve branches without reactance, "
+                                "which the screening cannot estimate, so they are solved in full.")
+        listCritical = self.getcriticaloutages(oFactors, dictScreening)
+        dictOutageRows = self.runtasks("outages", [-1] + listCritical)
+        dictHeadroomRows = self.runtasks("headroom", listHeadroomTasks)
+        self.m_dictResults = self._buildtables(oFactors, dictScreening, listCritical, dictOutageRows, dictHeadroomRows)
+        if gbl.ResultStore is None:
+            self.msg.AddWarning("Result store not initialised, capacity assessment results were not stored.")
+            return True
+        dictMetadata = dict(dictMetadata or {}, outages=len(dictScreening["outage"]), full_solves=len(listCritical) + 1,
+                            headroom_busbars=len(listHeadroomTasks))
+        self.run_id = gbl.ResultStore.writerun("txcapacity", self.m_dictResults, settings=self.settings,
+                                               metadata=dictMetadata, network_hash=oDataModel.getnetworkhash())
+        self.msg.AddRawMessage(f"Capacity assessment: {len(dictScreening['outage'])} outages screened, "
+                               f"{len(listCritical)} solved in full, {len(self.m_dictResults['constraints'])} constraints.")
+        return True
+
+    def getcapacityassessmentresults(self):
+        """Returns the ranked constraint table of the last assessment"""
+        return self.m_dictResults.get("constraints")
+
+    def getallcapacityassessmentresults(self):
+        """Returns the constraint, outage, screening and headroom tables of the last assessment"""
+        return self.m_dictResults
+
+    #__________________________SCREENING________________________
+    def getcriticaloutages(self, oFactors, dictScreening):
+        """Branch_TAB indices of the outages to solve in full, the islanding and unscreenable outages first and then by
+        screened loading. Unrated branches are not monitored and do not force full solves."""
+        arrForced = dictScreening["islanding"] | dictScreening["unscreenable"]
+        arrCritical = np.flatnonzero((dictScreening["max_loading"] >= self.settings["screening_threshold_percent"])
+                                     | arrForced)
+        arrOrder = np.lexsort((-dictScreening["max_loading"][arrCritical], ~arrForced[arrCritical]))
+        arrCritical = arrCritical[arrOrder]
+        if self.settings["max_full_solves"] is not None:
+            arrCritical = arrCritical[:int(self.settings["max_full_solves"])]
+        return oFactors.m_arrBranchTab[dictScreening["outage"][arrCritical]].tolist()
+
+    def getlinearheadroom(self, oFactors, arrFlowMW, arrRatingMW):
+        """(Busbar_TAB index, PTDF estimate of the thermal headroom in MW) of every busbar to assess"""
+        oDataModel = gbl.DataModelManager
+        listBusIds = self.settings["headroom_busbars"]
+        if listBusIds is None:
+            arrBusbars = np.array([nIndex for nIndex, oBusbar in enumerate(oDataModel.Busbar_TAB)
+                                   if oBusbar.ON and not oBusbar.Disconnected], dtype=np.int64)
+        else:
+            arrBusbars = np.array([oDataModel.BusbarIdToIndex[strBusId] for strBusId in listBusIds
+                                   if strBusId in oDataModel.BusbarIdToIndex], dtype=np.int64)
+        fMaxMW = float(self.settings["max_injection_mw"])
+        arrLimitMW = arrRatingMW * self.settings["thermal_limit_percent"] / 100.0
+        arrMonitored = arrLimitMW > 0
+        arrEstimate = np.full(len(arrBusbars), fMaxMW)
+        for nStart in range(0, len(arrBusbars), oFactors.m_nBlockSize):
+            oSlice = slice(nStart, nStart + oFactors.m_nBlockSize)
+            mtxPTDF = oFactors.getptdf(arrBusbars[oSlice])[arrMonitored]
+            # Injection at which each branch reaches its limit: (limit - sign(p) f) / |p|
+            arrFlow = arrFlowMW[arrMonitored][:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mtxLimit = np.where(np.abs(mtxPTDF) > 1e-6, (arrLimitMW[arrMonitored][:, None] - np.sign(mtxPTDF) * arrFlow)
+                                    / np.abs(mtxPTDF), np.inf)
+            if len(mtxLimit):
+                arrEstimate[oSlice] = np.minimum(mtxLimit.min(axis=0), fMaxMW)
+        return list(zip(arrBusbars.tolist(), np.maximum(arrEstimate, 0.0).tolist()))
+
+    #__________________________FULL SOLVES________________________
+    def runoutages(self, listOutages):
+        """Runs a load flow with each branch (Branch_TAB index, -1 for the intact network) out of service in turn"""
+        oDataModel = gbl.DataModelManager
+        bPush = self._getpushtoengine()
+        listConstraints, listSummary = [], []
+        oSnapshot = oDataModel.snapshot()
+        try:
+            for nBranchIdx in listOutages:
+                strOutage = self.INTACT if nBranchIdx < 0 else oDataModel.Branch_TAB[nBranchIdx].BranchID
+                if nBranchIdx >= 0:
+                    oDataModel.Branch_TAB[nBranchIdx].setdatamodelcomponentstatus(False, bUpdateEngine=bPush)
+                bOK = self._solve(False)
+                listViolations = self.getviolations() if bOK else []
+                listSummary.append({"outage": strOutage, "converged": bOK,
+                                    "max_loading": max((_tofloat(oBranch.loading) for oBranch in oDataModel.Branch_TAB
+                                                        if oBranch.ON), default=np.nan) if bOK else np.nan})
+                listConstraints.extend(dict(tViolation, outage=strOutage) for tViolation in listViolations)
+                oSnapshot.restore(bUpdateEngine=bPush)
+        finally:
+            oSnapshot.release()
+        return {"constraints": listConstraints, "outages": listSummary}
+
+    def getviolations(self):
+        """Thermal and voltage limit violations of the load flow results held on the DataModel"""
+        oDataModel = gbl.DataModelManager
+        fThermal = self.settings["thermal_limit_percent"]
+        fVMin, fVMax = self.settings["voltage_min_pu"], self.settings["voltage_max_pu"]
+        listViolations = []
+        for oBranch in oDataModel.Branch_TAB:
+            fLoading = _tofloat(getattr(oBranch, "loading", None))
+            if oBranch.ON and fLoading > fThermal:
+                listViolations.append({"constraint_type": "thermal", "component": oBranch.BranchID, "value": fLoading,
+                                       "limit": fThermal, "severity": fLoading / fThermal - 1.0})
+        for oBusbar in oDataModel.Busbar_TAB:
+            fVoltage = _tofloat(getattr(oBusbar, "voltage", None))
+            # Dead busbars (no voltage) are left to the islanding outages
+            if not oBusbar.ON or oBusbar.Disconnected or not fVoltage > 0:
+                continue
+            if fVoltage < fVMin:
+                listViolations.append({"constraint_type": "voltage_low", "component": str(oBusbar.BusID), "value": fVoltage,
+                                       "limit": fVMin, "severity": (fVMin - fVoltage) / fVMin})
+            elif fVoltage > fVMax:
+                listViolations.append({"constraint_type": "voltage_high", "component": str(oBusbar.BusID), "value": fVoltage,
+                                       "limit": fVMax, "severity": (fVoltage - fVMax) / fVMax})
+        return listViolations
+
+    #__________________________BUSBAR HEADROOM________________________
+    def runheadroom(self, listTasks):
+        """Headroom of every (Busbar_TAB index, linear estimate[, withdrawal]) task"""
+        return {"headroom": [self.getbusbarheadroom(*tTask) for tTask in listTasks]}
+
+    def getbusbarheadroom(self, nBus, fEstimateMW, bDemand=False):
+        """
+        Largest injection (bDemand: withdrawal) at a busbar, balanced by the slack, with no thermal or voltage violation
+        on the intact network. An injection is carried by a generator at the busbar, else by reducing a load, else
+        (engines built from the DataModel only) by a temporary generator; a withdrawal the other way round. The
+        linear estimate brackets the bisection of warm started load flows.
+        """
+        oDataModel = gbl.DataModelManager
+        oBusbar = oDataModel.Busbar_TAB[nBus]
+        dictRow = {"busbar": str(oBusbar.BusID), "linear_headroom_mw": fEstimateMW, "headroom_mw": np.nan,
+                   "limiting_type": "", "limiting_component": "", "solves": 0}
+        bPush = self._getpushtoengine()
+        oSnapshot = oDataModel.snapshot()
+        try:
+            tProbe = self._getprobe(oBusbar, bDemand)
+            if tProbe is None:
+                dictRow["limiting_type"] = "no injection point"
+                return dictRow
+            oComponent, fSign = tProbe
+            fBaseMW = oComponent.MW or 0.0
+
+            def check(fInjectionMW):
+                oComponent.MW = fBaseMW + fSign * fInjectionMW
+                if bPush:
+                    oComponent.setdatamodelcomponenttoengine()
+                bSolved = self._solve(dictRow["solves"] > 0)
+                dictRow["solves"] += 1
+                if not bSolved:
+                    return False, {"constraint_type": "non-convergence", "component": ""}
+                listViolations = self.getviolations()
+                return not listViolations, max(listViolations, key=lambda dictV: dictV["severity"], default=None)
+
+            fMaxMW = float(self.settings["max_injection_mw"])
+            fTolerance = float(self.settings["headroom_tolerance_mw"])
+            bFeasible, dictLimiting = check(0.0)
+            fLow = 0.0
+            if bFeasible:
+                fHigh = min(fMaxMW, max(1.2 * fEstimateMW, fTolerance))
+                bFeasible, dictLimiting = check(fHigh)
+                while bFeasible and fHigh < fMaxMW:
+                    fLow, fHigh = fHigh, min(2.0 * fHigh, fMaxMW)
+                    bFeasible, dictLimiting = check(fHigh)
+                if bFeasible:
+                    fLow, dictLimiting = fHigh, {"constraint_type": "max injection", "component": ""}
+                while not bFeasible and fHigh - fLow > fTolerance:
+                    fMid = 0.5 * (fLow + fHigh)
+                    bMidFeasible, dictMidLimiting = check(fMid)
+                    if bMidFeasible:
+                        fLow = fMid
+                    else:
+                        fHigh, dictLimiting = fMid, dictMidLimiting
+            dictRow["headroom_mw"] = fLow
+            dictRow["limiting_type"] = dictLimiting["constraint_type"]
+            dictRow["limiting_component"] = dictLimiting["component"]
+            return dictRow
+        finally:
+            oSnapshot.restore(bUpdateEngine=bPush, fnOnRestore=self._pushrestored if bPush else None)
+            oSnapshot.release()
+
+    def _getprobe(self, oBusbar, bDemand=False):
+        """(component, sign) whose MW carries the headroom injection (bDemand: withdrawal) at a busbar, None if there is none"""
+        oDataModel = gbl.DataModelManager
+        listGens = [oGen for oGen in oDataModel.Gen_TAB if oGen.BusID == oBusbar.BusID and oGen.ON and not oGen.IsExternalGrid]
+        listLoads = [oLoad for oLoad in oDataModel.Load_TAB if oLoad.BusID == oBusbar.BusID and oLoad.ON]
+        listProbes = [(oLoad, 1.0) for oLoad in listLoads] + [(oGen, -1.0) for oGen in listGens] if bDemand \
+            else [(oGen, 1.0) for oGen in listGens] + [(oLoad, -1.0) for oLoad in listLoads]
+        if listProbes:
+            return listProbes[0]
+        if gbl.EngineContainer is not None:
+            return None
+        if bDemand:
+            oLoad = Load(oBusbar.BusID, self.PROBE_GEN_ID)
+            oDataModel.addloadtotab(oLoad)
+            return oLoad, 1.0
+        oGen = Generator(oBusbar.BusID, self.PROBE_GEN_ID)
+        oDataModel.addgentotab(oGen)
+        return oGen, 1.0
+
+    @staticmethod
+    def _pushrestored(oComponent, listAttributes):
+        if "MW" in listAttributes:
+            oComponent.setdatamodelcomponenttoengine()
+
+    #__________________________HELPERS________________________
+    def _getpushtoengine(self):
+        return bool(self.settings["push_to_engine"]) and gbl.EngineContainer is not None
+
+    def _solve(self, bWarmStart):
+        """Load flow and result retrieval, False when the load flow does not solve"""
+        try:
+            return bool(self.loadflow.runloadflowtimestep(bWarmStart=bWarmStart, **self.settings["loadflow_settings"]))
+        except Exception as e:
+            self.msg.AddWarning(f"Capacity assessment load flow failed: {e}")
+            return False
+
+    def _buildtables(self, oFactors, dictScreening, listCritical, dictOutageRows, dictHeadroomRows):
+        """Ranked constraint table and the outage, screening and headroom tables"""
+        oBranchTab = gbl.DataModelManager.Branch_TAB
+        dfConstraints = pd.DataFrame(dictOutageRows["constraints"],
+                                     columns=[strColumn for strColumn in self.CONSTRAINT_COLUMNS if strColumn != "rank"])
+        dfConstraints = dfConstraints.sort_values("severity", ascending=False, kind="stable").reset_index(drop=True)
+        dfConstraints.insert(0, "rank", np.arange(1, len(dfConstraints) + 1))
+        arrOutageTab = oFactors.m_arrBranchTab[dictScreening["outage"]]
+        arrLimiting = dictScreening["limiting_branch"]
+        setCritical = set(listCritical)
+        dfScreening = pd.DataFrame({
+            "outage": [oBranchTab[nBranchIdx].BranchID for nBranchIdx in arrOutageTab.tolist()],
+            "screened_loading": dictScreening["max_loading"],
+            "limiting_branch": [oBranchTab[oFactors.m_arrBranchTab[nPos]].BranchID if nPos >= 0 else ""
+                                for nPos in arrLimiting.tolist()],
+            "islanding": dictScreening["islanding"],
+            "unscreenable": dictScreening["unscreenable"],
+            "full_solve": [nBranchIdx in setCritical for nBranchIdx in arrOutageTab.tolist()],
+        }).sort_values("screened_loading", ascending=False, kind="stable").reset_index(drop=True)
+        return {"constraints": dfConstraints, "outages": pd.DataFrame(dictOutageRows["outages"]),
+                "screening": dfScreening, "headroom": pd.DataFrame(dictHeadroomRows["headroom"])}
+
+    #__________________________PARALLEL RUN________________________
+    def runtasks(self, strTask, listTasks):
+        """Runs outage or headroom tasks here or spread over worker processes, returns the joined result rows"""
+        nWorkers = int(self.settings["workers"] or 1)
+        fnRun = self.runoutages if strTask == "outages" else self.runheadroom
+        if nWorkers <= 1 or len(listTasks) <= 1:
+            return fnRun(listTasks)
+        from concurrent.futures import ProcessPoolExecutor
+        nChunks = min(len(listTasks), 4 * nWorkers)
+        listChunks = [listTasks[nChunk::nChunks] for nChunk in range(nChunks)]
+        strEngine = self.settings["engine"] or _getenginename()
+        oArrays = gbl.DataModelManager.toarrays()
+        strDataModelName = oArrays.tosharedmemory()
+        dictWorkerSettings = dict(self.settings, workers=1)
+        dictRows = {}
+        try:
+            with ProcessPoolExecutor(max_workers=min(nWorkers, nChunks), initializer=_initialiseworker,
+                                     initargs=(strDataModelName, strEngine, dictWorkerSettings)) as oExecutor:
+                for oFuture in [oExecutor.submit(_runtaskinworker, strTask, listChunk) for listChunk in listChunks]:
+                    for strTable, listRows in oFuture.result().items():
+                        dictRows.setdefault(strTable, []).extend(listRows)
+        finally:
+            oArrays.unlink()
+        return dictRows
+
+
+# Assessment of the worker process, set up once per worker by _initialiseworker
+_WorkerAssessment = None
+
+
+def _initialiseworker(strDataModelName, strEngine, dictSettings):
+    """Worker process set-up: framework, DataModel from shared memory, engine session and network"""
+    global _WorkerAssessment
+    from Code.BatchRunner import BatchRunner
+    from Code.DataModel.DataModelArrays import DataModelArrays
+    oRunner = BatchRunner(log_level="ERROR", use_result_store=False)
+    if not oRunner.initialise():
+        raise RuntimeError("Failed to initialise the framework in the capacity assessment worker")
+    oArrays = DataModelArrays.attachsharedmemory(strDataModelName)
+    try:
+        oDataModel = oArrays.todatamodel()
+    finally:
+        oArrays.close()
+    gbl.DataModelManager = oDataModel
+    dictSession = oRunner.activateengine(strEngine)
+    oDataModel.BasicEngineModelupdater = dictSession["datamodel_interface"]
+    if dictSession["engine"] is not None and not dictSession["engine"].load_network_from_datamodel():
+        raise RuntimeError(f"Failed to build the {strEngine} network in the capacity assessment worker")
+    _WorkerAssessment = TxCapacityAssessment(dictSettings)
+    _WorkerAssessment.initializestudy()
+
+
+def _runtaskinworker(strTask, listTasks):
+    """Worker process task: run a chunk of outages or headroom busbars"""
+    if strTask == "outages":
+        return _WorkerAssessment.runoutages(listTasks)
+    return _WorkerAssessment.runheadroom(listTasks)
@@ -1,11 +1,14 @@
 from Code import GlobalEngineRegistry as gbl
-from Code.Studies.BaseTemplates.TxCapacityAssessmentBase import TxCapacityAssessmentBase
+from Code.Studies.Implementation.TxCapacityAssessment import TxCapacityAssessment
 
 
-class TxCapacityAssessmentPowerFactory(TxCapacityAssessmentBase):
-    def __init__(self):
-        TxCapacityAssessmentBase.__init__(self)
-.        self.msg = gbl.Msg
+class TxCapacityAssessmentPowerFactory(TxCapacityAssessment):
+    # PowerFactory project and study case activated before the assessment, None to keep the active ones
+    DEFAULT_SETTINGS = dict(TxCapacityAssessment.DEFAULT_SETTINGS, project=None, study_case=None)
+
+    def __init__(self, dictSettings=None):
+        TxCapacityAssessment.__init__(self, dictSettings)
+        self.msg = gbl.Msg
     def initializestudy(self):
         if not gbl.EngineContainer:
             raise RuntimeError("The PowerFactory engine has not been initialized yet.")
@@ -14,28 +17,15 @@ class TxCapacityAssessmentPowerFactory(TxCapacityAssessmentBase):
         self.loadflow = gbl.EngineLoadFlowContainer
         self.initialized = True
         return True
-    def runcapacityassessment(self):
-        """Activates the PowerFactory network and runs the capacity assessment."""
-        bOK = False
+    def runcapacityassessment(self, dictMetadata=None):
+        """Activates the PowerFactory project and study case, loads the network and runs the capacity assessment."""
         bOK = self.initializestudy()
+        if bOK and self.settings["project"]:
+            bOK = self.engine.activatepowerfactorynetwork(self.settings["project"])
+        if bOK and self.settings["study_case"]:
+            bOK = self.engine.activatepowerfactorystudycase(self.settings["study_case"])
         if bOK:
-            strNetworkName = input("Enter the name of the PowerFactory project to activate: ")
-            bOK = self.engine.activatepowerfactorynetwork(strNetworkName)
-        if bOK:
-            strStudyName = input("Enter the name of the study to run: ")
-            bOK = self.engine.activatepowerfactorystudycase(strStudyName)
-        if bOK:
-            bOK = gbl.DataModelInterfaceContainer.passelementsfromnetworktodatamodelmanager()
+            bOK = self.datamodelinterface.passelementsfromnetworktodatamodelmanager()
         if bOK:
-            offline = True
-            online = not offline
-            for branch in gbl.DataModelManager.Branch_TAB:
-                if branch.ON:
-                    bOK = gbl.DataModelInterfaceContainer.switchbranchstatus(branch, offline)
-                    if bOK:
-                        bOK = self.loadflow.runloadflow()
-                    if bOK:
-                        bOK = self.loadflow.getallloadflowresults()
-                    if bOK:
-                        bOK = gbl.DataModelInterfaceContainer.switchbranchstatus(branch, online)
+            bOK = TxCapacityAssessment.runcapacityassessment(self, dictMetadata)
         return bOK
@@ -0,0 +1,472 @@
+# Voltage stability by continuation power flow on the native AC load flow.
+# Each transfer direction raises the generation of a source (a zone, a set of busbars or the slack) and the demand of a
+# sink by the same MW and traces the PV curve through the nose: a tangent predictor followed by a corrector on the load
+# flow equations augmented with one continuation parameter, the transfer while the curve rises and the most sensitive
+# busbar voltage near the nose. The augmented Jacobian is factorised once per point and reused for the tangent and the
+# corrector iterations. The loadability margin of a direction is the transfer at the nose, refined from the points
+# around it. Directions are independent and are spread over worker processes.
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from Code import GlobalEngineRegistry as gbl
+from Code.Instrumentation import span, timed
+from Code.Framework.Native.EngineNativeLoadFlow import EngineNativeLoadFlow
+from Code.Studies.BaseTemplates.VoltageStabilityBase import VoltageStabilityBase
+
+
+class VoltageStability(VoltageStabilityBase):
+    """PV curves and loadability margins of transfer directions by continuation power flow"""
+
+    STUDY_TYPE = "voltagestability"
+    MARGIN_COLUMNS = ["direction", "source", "sink", "margin_mw", "status", "critical_busbar", "critical_voltage_pu",
+                      "points", "corrector_iterations", "factorisations", "seconds"]
+    # The corrector keeps the factorisation of the point while each iteration cuts the mismatch by this factor
+    CHORD_CONTRACTION = 0.5
+    # Reactive output past a generator limit (per unit) at which the continuation step is shortened
+    REACTIVE_LIMIT_TOLERANCE_PU = 0.01
+
+    def __init__(self, dictSettings=None):
+        VoltageStabilityBase.__init__(self, dictSettings)
+        self.solver = None
+        self.initialized = False
+        self.run_id = None
+        self.m_dictResults = {}
+        # Base case: voltages, busbar types and generation after the reactive limits of the base load flow
+        self.m_arrBaseVoltage = None
+        self.m_arrBaseType = None
+        self.m_arrBaseSGen = None
+
+    def initializestudy(self):
+        """Builds the native network of the DataModel and solves the base case"""
+        if gbl.DataModelManager is None or not gbl.DataModelManager.Busbar_TAB:
+            raise RuntimeError("The DataModel has no network to assess.")
+        self.solver = EngineNativeLoadFlow()
+        bOK = self.solver.runloadflow(tolerance=self.settings["tolerance_pu"],
+                                      enforce_q_limits=self.settings["enforce_q_limits"])
+        if not bOK:
+            raise RuntimeError("The base case load flow of the voltage stability study did not converge.")
+        self.m_arrBaseVoltage = self.solver.m_arrVoltage.copy()
+        self.m_arrBaseType = self.solver.m_arrType.copy()
+        self.m_arrBaseSGen = self.solver.m_arrSGen.copy()
+        self.initialized = True
+        return True
+
+    #__________________________VOLTAGE STABILITY________________________
+    @timed("voltagestability.runvoltagestability")
+    def runvoltagestability(self, dictMetadata=None):
+        """Traces the PV curve of every transfer direction and stores the margins and curves in the result store"""
+        bOK = self.initializestudy()
+        if not bOK:
+            return False
+        oDataModel = gbl.DataModelManager
+        listDirections = self.getdirections()
+        if not listDirections:
+            self.msg.AddWarning("Voltage stability: no transfer directions to assess.")
+            return False
+        dictRows = self.runtasks(listDirections)
+        dfMargins = pd.DataFrame(dictRows.get("margins", []), columns=self.MARGIN_COLUMNS)
+        dfMargins = dfMargins.sort_values("margin_mw", kind="stable").reset_index(drop=True)
+        dfCurves = pd.DataFrame(dictRows.get("pvcurves", []),
+                                columns=["direction", "point", "transfer_mw", "busbar", "voltage_pu"])
+        self.m_dictResults = {"margins": dfMargins, "pvcurves": dfCurves}
+        if gbl.ResultStore is None:
+            self.msg.AddWarning("Result store not initialised, voltage stability results were not stored.")
+            return True
+        dictMetadata = dict(dictMetadata or {}, directions=len(listDirections))
+        self.run_id = gbl.ResultStore.writerun(self.STUDY_TYPE, self.m_dictResults, settings=self.settings,
+                                               metadata=dictMetadata, network_hash=oDataModel.getnetworkhash())
+        self.msg.AddRawMessage(f"Voltage stability: {len(listDirections)} transfer directions traced, smallest margin "
+                               f"{dfMargins['margin_mw'].min():.0f} MW.")
+        return True
+
+    def getvoltagestabilityresults(self):
+        """Returns the loadability margin table of the last study, smallest margin first"""
+        return self.m_dictResults.get("margins")
+
+    def getallvoltagestabilityresults(self):
+        """Returns the margin and PV curve tables of the last study"""
+        return self.m_dictResults
+
+    #__________________________TRANSFER DIRECTIONS________________________
+    def getdirections(self):
+        """Directions of the settings, else both directions across every boundary between two zones"""
+        if self.settings["directions"] is not None:
+            return [dict(dictDirection, name=dictDirection.get("name") or self._getdirectionname(dictDirection))
+                    for dictDirection in self.settings["directions"]]
+        oDataModel = gbl.DataModelManager
+        strAttribute = self.settings["zone_attribute"]
+        setBoundaries = set()
+        for oBranch in oDataModel.Branch_TAB:
+            nBus1, nBus2 = oDataModel.BusbarIdToIndex.get(oBranch.BusID1), oDataModel.BusbarIdToIndex.get(oBranch.BusID2)
+            if not oBranch.ON or nBus1 is None or nBus2 is None:
+                continue
+            strZone1 = getattr(oDataModel.Busbar_TAB[nBus1], strAttribute, '')
+            strZone2 = getattr(oDataModel.Busbar_TAB[nBus2], strAttribute, '')
+            if strZone1 and strZone2 and strZone1 != strZone2:
+                setBoundaries.update({(strZone1, strZone2), (strZone2, strZone1)})
+        return [{"name": f"{strSource}->{strSink}", "source": strSource, "sink": strSink}
+                for strSource, strSink in sorted(setBoundaries)]
+
+    def getdirectionvector(self, dictDirection):
+        """Change of the busbar injections (per unit) per per unit of transfer: source generation up, sink demand up"""
+        oDataModel = gbl.DataModelManager
+        nBusbars = len(oDataModel.Busbar_TAB)
+        arrSource = self._getbusbars(dictDirection.get("source"))
+        arrSink = self._getbusbars(dictDirection.get("sink"))
+        # Source generators share the transfer by output, sink loads by demand at their own power factor
+        arrGen = np.zeros(nBusbars)
+        for oGen in oDataModel.Gen_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oGen.BusID)
+            if nBus is not None and arrSource[nBus] and oGen.ON and not oGen.IsExternalGrid:
+                arrGen[nBus] += max(oGen.MW or 0.0, 0.0)
+        if arrSource.any() and arrGen.sum() <= 0:
+            arrGen[arrSource] = 1.0
+        arrLoad = np.zeros(nBusbars, dtype=np.complex128)
+        for oLoad in oDataModel.Load_TAB:
+            nBus = oDataModel.BusbarIdToIndex.get(oLoad.BusID)
+            if nBus is not None and arrSink[nBus] and oLoad.ON and (oLoad.MW or 0.0) > 0:
+                arrLoad[nBus] += complex(oLoad.MW, oLoad.MVar or 0.0)
+        if arrSink.any() and arrLoad.real.sum() <= 0:
+            arrLoad[arrSink] = 1.0
+        arrDirection = np.zeros(nBusbars, dtype=np.complex128)
+        if arrGen.sum() > 0:
+            arrDirection += arrGen / arrGen.sum()
+        if arrLoad.real.sum() > 0:
+            arrDirection -= arrLoad / arrLoad.real.sum()
+        arrDirection[self.m_arrBaseType == EngineNativeLoadFlow.DEAD] = 0.0
+        return arrDirection
+
+    def _getbusbars(self, xSide):
+        """Busbar mask of a direction side: a zone, a list of BusIDs or None"""
+        oDataModel = gbl.DataModelManager
+        arrMask = np.zeros(len(oDataModel.Busbar_TAB), dtype=bool)
+        if xSide is None:
+            return arrMask
+        if isinstance(xSide, (list, tuple, set)):
+            for xBusId in xSide:
+                nBus = oDataModel.BusbarIdToIndex.get(self._tobusid(xBusId))
+                if nBus is None:
+                    raise ValueError(f"Transfer direction busbar {xBusId} is not in the DataModel")
+                arrMask[nBus] = True
+            return arrMask
+        strAttribute = self.settings["zone_attribute"]
+        arrMask[:] = [getattr(oBusbar, strAttribute, '') == xSide for oBusbar in oDataModel.Busbar_TAB]
+        if not arrMask.any():
+            raise ValueError(f"Transfer direction zone {xSide} has no busbars")
+        return arrMask
+
+    def _getdirectionname(self, dictDirection):
+        return f"{self._getsidename(dictDirection.get('source'))}->{self._getsidename(dictDirection.get('sink'))}"
+
+    @staticmethod
+    def _getsidename(xSide):
+        if xSide is None:
+            return "slack"
+        if isinstance(xSide, (list, tuple, set)):
+            return "+".join(str(xBusId) for xBusId in xSide)
+        return str(xSide)
+
+    @staticmethod
+    def _tobusid(xBusId):
+        try:
+            return int(xBusId)
+        except (TypeError, ValueError):
+            return str(xBusId)
+
+    #__________________________CONTINUATION POWER FLOW________________________
+    def tracepvcurves(self, listDirections):
+        """Traces the directions one after the other, returns the margin and PV curve rows"""
+        dictRows = {"margins": [], "pvcurves": []}
+        for dictDirection in listDirections:
+            with span("voltagestability.direction", direction=dictDirection["name"]):
+                dictResult = self.tracepvcurve(dictDirection)
+            for strTable, listRows in dictResult.items():
+                dictRows[strTable].extend(listRows)
+        return dictRows
+
+    def tracepvcurve(self, dictDirection):
+        """Continuation power flow of one transfer direction from the base case through the nose"""
+        fStart = time.perf_counter()
+        oSolver = self.solver
+        dictSettings = self.settings
+        fBase = oSolver.BASE_MVA
+        oSolver.m_arrType = self.m_arrBaseType.copy()
+        oSolver.m_arrSGen = self.m_arrBaseSGen.copy()
+        arrDirection = self.getdirectionvector(dictDirection)
+        arrVoltage, fLambda = self.m_arrBaseVoltage.copy(), 0.0
+        fStep = dictSettings["initial_step_mw"] / fBase
+        fMinStep, fMaxStep = dictSettings["min_step_mw"] / fBase, dictSettings["max_step_mw"] / fBase
+        fMaxTransfer = dictSettings["max_transfer_mw"] / fBase
+        # Continuation parameter, ("lambda",) or ("vm", busbar index), and the tangent of the previous point
+        tParameter = ("lambda",)
+        arrPreviousTangent = np.zeros(2 * len(arrVoltage) + 1)
+        listLambda, listVoltage, listCritical = [0.0], [np.abs(arrVoltage)], [-1]
+        dictCounters = {"iterations": 0, "factorisations": 0}
+        strStatus, bPassedNose = "max points", False
+        while len(listLambda) < dictSettings["max_points"]:
+            arrPVPQ, arrPQ = oSolver.getunknowns()
+            oFactor = self._factorise(arrVoltage, arrDirection, arrPVPQ, arrPQ, tParameter, dictCounters)
+            if oFactor is None:
+                strStatus = "singular"
+                break
+            arrTangent, arrPreviousTangent = self._gettangent(oFactor, arrPVPQ, arrPQ, arrPreviousTangent)
+            arrTangentVm = arrTangent[len(arrPVPQ):-1]
+            listCritical[-1] = int(arrPQ[np.argmin(arrTangentVm)]) if len(arrPQ) else -1
+            if arrTangent[-1] < 0 and len(listLambda) > 1:
+                bPassedNose = True
+            tNext = self._getparameter(arrTangent, arrPQ)
+            if tNext != tParameter:
+                # The continuation parameter moves to another quantity, the bordering row of the factorisation changes
+                oFactor = self._factorise(arrVoltage, arrDirection, arrPVPQ, arrPQ, tNext, dictCounters)
+                if oFactor is None:
+                    strStatus = "singular"
+                    break
+            tParameter = tNext
+            fVmRate = max(np.max(np.abs(arrTangentVm), initial=0.0), 1e-12)
+            tResult = None
+            while tResult is None:
+                fLimited = min(fStep, dictSettings["max_voltage_step_pu"] / fVmRate)
+                arrPredicted, fPredicted = self._predict(arrVoltage, fLambda, arrTangent, fLimited, arrPVPQ, arrPQ)
+                tResult = self._correct(arrPredicted, fPredicted, arrDirection, arrPVPQ, arrPQ, tParameter,
+                                        self._getparametervalue(arrPredicted, fPredicted, tParameter, arrPQ),
+                                        oFactor, dictCounters)
+                if tResult is None:
+                    fStep = fLimited / 2.0
+                    if fStep < fMinStep:
+                        break
+                    continue
+                # A step past a reactive limit is shortened to where the first generator reaches its limit
+                fFraction = self._getreactivelimitfraction(arrVoltage, tResult[0]) \
+                    if dictSettings["enforce_q_limits"] else 1.0
+                if fFraction < 1.0 and fLimited > fMinStep:
+                    tResult = None
+                    fStep = max(fLimited * fFraction, fMinStep)
+            if tResult is None:
+                strStatus = "nose" if bPassedNose else "step limit"
+                break
+            arrVoltage, fLambda, nIterations = tResult
+            if nIterations <= 3:
+                fStep = min(fLimited * 1.5, fMaxStep)
+            if dictSettings["enforce_q_limits"] and oSolver.applyreactivelimits(arrVoltage):
+                # Generators at their reactive limit: re-solve at the same transfer with their busbars released
+                arrVoltage, bConverged, _ = oSolver.solve(oSolver.getspecifiedinjection() + fLambda * arrDirection,
+                                                          arrVoltage, dictSettings["tolerance_pu"],
+                                                          dictSettings["max_corrector_iterations"])
+                if not bConverged:
+                    strStatus = "limit induced"
+                    break
+            listLambda.append(fLambda)
+            listVoltage.append(np.abs(arrVoltage))
+            listCritical.append(listCritical[-1])
+            fMax = max(listLambda)
+            if fLambda >= fMaxTransfer:
+                strStatus = "max transfer"
+                break
+            if fLambda < fMax:
+                bPassedNose = True
+            arrEnergised = self.m_arrBaseType != oSolver.DEAD
+            if bPassedNose and (fLambda <= (1.0 - dictSettings["lower_branch_fraction"]) * fMax or
+                                np.min(listVoltage[-1][arrEnergised]) < dictSettings["collapse_voltage_pu"]):
+                strStatus = "nose"
+                break
+        return self._getrows(dictDirection, strStatus, listLambda, listVoltage, listCritical, dictCounters,
+                             time.perf_counter() - fStart)
+
+    def _getaugmentedjacobian(self, arrVoltage, arrDirection, arrPVPQ, arrPQ, tParameter):
+        """Load flow Jacobian bordered by the transfer direction column and the continuation parameter row"""
+        mtxJacobian = self.solver.getjacobian(arrVoltage, arrPVPQ, arrPQ)
+        nUnknowns = mtxJacobian.shape[0]
+        arrColumn = -np.concatenate([arrDirection[arrPVPQ].real, arrDirection[arrPQ].imag])
+        nPosition = self._getparameterposition(tParameter, arrPVPQ, arrPQ)
+        mtxRow = sp.csr_matrix(([1.0], ([0], [nPosition])), shape=(1, nUnknowns + 1))
+        return sp.bmat([[mtxJacobian, sp.csc_matrix(arrColumn[:, None])], [mtxRow[:, :nUnknowns], mtxRow[:, nUnknowns:]]],
+                       format="csc")
+
+    def _factorise(self, arrVoltage, arrDirection, arrPVPQ, arrPQ, tParameter, dictCounters):
+        dictCounters["factorisations"] += 1
+        try:
+            return splu(self._getaugmentedjacobian(arrVoltage, arrDirection, arrPVPQ, arrPQ, tParameter))
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _gettangent(oFactor, arrPVPQ, arrPQ, arrPrevious):
+        """Unit tangent of the curve, oriented along the tangent of the previous point (busbar angles, magnitudes and
+        transfer, so busbars changing type in between compare), or towards more transfer at the first point"""
+        arrRight = np.zeros(len(arrPVPQ) + len(arrPQ) + 1)
+        arrRight[-1] = 1.0
+        arrTangent = oFactor.solve(arrRight)
+        arrTangent /= np.linalg.norm(arrTangent)
+        nBusbars = (len(arrPrevious) - 1) // 2
+        arrFull = np.zeros_like(arrPrevious)
+        arrFull[arrPVPQ] = arrTangent[:len(arrPVPQ)]
+        arrFull[nBusbars + arrPQ] = arrTangent[len(arrPVPQ):-1]
+        arrFull[-1] = arrTangent[-1]
+        fOrientation = arrFull @ arrPrevious if np.any(arrPrevious) else arrFull[-1]
+        if fOrientation < 0:
+            return -arrTangent, -arrFull
+        return arrTangent, arrFull
+
+    @staticmethod
+    def _getparameter(arrTangent, arrPQ):
+        """Next continuation parameter: the transfer or the PQ busbar voltage changing fastest along the tangent"""
+        arrTangentVm = arrTangent[len(arrTangent) - len(arrPQ) - 1:-1]
+        if not len(arrPQ) or abs(arrTangent[-1]) >= np.max(np.abs(arrTangentVm)):
+            return ("lambda",)
+        return ("vm", int(arrPQ[np.argmax(np.abs(arrTangentVm))]))
+
+    @staticmethod
+    def _getparameterposition(tParameter, arrPVPQ, arrPQ):
+        if tParameter[0] == "lambda":
+            return len(arrPVPQ) + len(arrPQ)
+        return len(arrPVPQ) + int(np.searchsorted(arrPQ, tParameter[1]))
+
+    @staticmethod
+    def _getparametervalue(arrVoltage, fLambda, tParameter, arrPQ):
+        return fLambda if tParameter[0] == "lambda" else float(np.abs(arrVoltage[tParameter[1]]))
+
+    def _getreactivelimitfraction(self, arrVoltage, arrNext):
+        """Share of the step from arrVoltage to arrNext at which the first PV busbar passes its reactive limit by half
+        the tolerance, 1 when no busbar passes a limit by more than the tolerance"""
+        oSolver = self.solver
+        arrPV = oSolver.m_arrType == oSolver.PV
+        arrQ0 = oSolver.getgenerationreactive(arrVoltage)[arrPV]
+        arrQ1 = oSolver.getgenerationreactive(arrNext)[arrPV]
+        arrQMax, arrQMin = oSolver.m_arrQMax[arrPV], oSolver.m_arrQMin[arrPV]
+        fTolerance = self.REACTIVE_LIMIT_TOLERANCE_PU
+        arrAbove, arrBelow = arrQ1 > arrQMax + fTolerance, arrQ1 < arrQMin - fTolerance
+        if not (arrAbove.any() or arrBelow.any()):
+            return 1.0
+        arrTarget = np.where(arrAbove, arrQMax + fTolerance / 2.0, arrQMin - fTolerance / 2.0)
+        arrCrossing = arrAbove | arrBelow
+        arrFraction = (arrTarget[arrCrossing] - arrQ0[arrCrossing]) / (arrQ1[arrCrossing] - arrQ0[arrCrossing])
+        return float(np.clip(np.min(arrFraction), 0.0, 1.0))
+
+    def _predict(self, arrVoltage, fLambda, arrTangent, fStep, arrPVPQ, arrPQ):
+        arrPredicted = self.solver.updatevoltage(arrVoltage, fStep * arrTangent[:-1], arrPVPQ, arrPQ)
+        return arrPredicted, fLambda + fStep * arrTangent[-1]
+
+    def _correct(self, arrVoltage, fLambda, arrDirection, arrPVPQ, arrPQ, tParameter, fTarget, oFactor, dictCounters):
+        """Newton corrector at a fixed continuation parameter, reusing the factorisation of the point while it
+        contracts, returns the voltages, transfer and iterations or None when it does not converge"""
+        oSolver = self.solver
+        arrSpecified = oSolver.getspecifiedinjection()
+        fTolerance = self.settings["tolerance_pu"]
+        fPrevious = np.inf
+        for nIteration in range(self.settings["max_corrector_iterations"] + 1):
+            arrMismatch = oSolver.getmismatch(arrVoltage, arrSpecified + fLambda * arrDirection, arrPVPQ, arrPQ)
+            fMismatch = np.max(np.abs(arrMismatch), initial=0.0)
+            if not np.isfinite(fMismatch) or np.any(np.abs(arrVoltage[arrPQ]) <= 0.0):
+                return None
+            if fMismatch < fTolerance:
+                dictCounters["iterations"] += nIteration
+                return arrVoltage, fLambda, nIteration
+            if nIteration == self.settings["max_corrector_iterations"]:
+                break
+            if fMismatch > self.CHORD_CONTRACTION * fPrevious:
+                oFactor = self._factorise(arrVoltage, arrDirection, arrPVPQ, arrPQ, tParameter, dictCounters)
+                if oFactor is None:
+                    break
+            fPrevious = fMismatch
+            fResidual = self._getparametervalue(arrVoltage, fLambda, tParameter, arrPQ) - fTarget
+            arrStep = oFactor.solve(-np.append(arrMismatch, fResidual))
+            arrVoltage = oSolver.updatevoltage(arrVoltage, arrStep[:-1], arrPVPQ, arrPQ)
+            fLambda += arrStep[-1]
+        dictCounters["iterations"] += self.settings["max_corrector_iterations"]
+        return None
+
+    def _getnose(self, listLambda, listVoltage, listCritical):
+        """Transfer at the nose, from a parabola through the highest point and its neighbours, and its point"""
+        nMax = int(np.argmax(listLambda))
+        nCritical = listCritical[nMax]
+        fNose = listLambda[nMax]
+        if 0 < nMax < len(listLambda) - 1 and nCritical >= 0:
+            arrV = np.array([listVoltage[nPoint][nCritical] for nPoint in (nMax - 1, nMax, nMax + 1)])
+            arrLambda = np.array(listLambda[nMax - 1:nMax + 2])
+            if np.ptp(arrV) > 0 and len(np.unique(arrV)) == 3:
+                fA, fB, fC = np.polyfit(arrV, arrLambda, 2)
+                if fA < 0:
+                    fNose = max(fNose, fC - fB * fB / (4.0 * fA))
+        return fNose, nMax
+
+    def _getrows(self, dictDirection, strStatus, listLambda, listVoltage, listCritical, dictCounters, fSeconds):
+        """Margin row and PV curve rows of a traced direction"""
+        oBusbarTab = gbl.DataModelManager.Busbar_TAB
+        fBase = self.solver.BASE_MVA
+        fNose, nNose = self._getnose(listLambda, listVoltage, listCritical)
+        nCritical = listCritical[nNose]
+        dictMargin = {
+            "direction": dictDirection["name"],
+            "source": self._getsidename(dictDirection.get("source")),
+            "sink": self._getsidename(dictDirection.get("sink")),
+            "margin_mw": float(fNose * fBase),
+            "status": strStatus,
+            "critical_busbar": str(oBusbarTab[nCritical].BusID) if nCritical >= 0 else "",
+            "critical_voltage_pu": float(listVoltage[nNose][nCritical]) if nCritical >= 0 else np.nan,
+            "points": len(listLambda),
+            "corrector_iterations": dictCounters["iterations"],
+            "factorisations": dictCounters["factorisations"],
+            "seconds": fSeconds,
+        }
+        if self.settings["monitored_busbars"] is None:
+            listMonitored = [nCritical] if nCritical >= 0 else []
+        else:
+            listMonitored = [gbl.DataModelManager.BusbarIdToIndex[self._tobusid(xBusId)]
+                             for xBusId in self.settings["monitored_busbars"]]
+        listCurves = [{"direction": dictDirection["name"], "point": nPoint, "transfer_mw": float(fLambda * fBase),
+                       "busbar": str(oBusbarTab[nBus].BusID), "voltage_pu": float(listVoltage[nPoint][nBus])}
+                      for nBus in listMonitored for nPoint, fLambda in enumerate(listLambda)]
+        return {"margins": [dictMargin], "pvcurves": listCurves}
+
+    #__________________________PARALLEL RUN________________________
+    def runtasks(self, listDirections):
+        """Traces the directions here or spread over worker processes, returns the joined result rows"""
+        nWorkers = int(self.settings["workers"] or 1)
+        if nWorkers <= 1 or len(listDirections) <= 1:
+            return self.tracepvcurves(listDirections)
+        from concurrent.futures import ProcessPoolExecutor
+        nChunks = min(len(listDirections), 4 * nWorkers)
+        listChunks = [listDirections[nChunk::nChunks] for nChunk in range(nChunks)]
+        oArrays = gbl.DataModelManager.toarrays()
+        strDataModelName = oArrays.tosharedmemory()
+        dictWorkerSettings = dict(self.settings, workers=1)
+        dictRows = {}
+        try:
+            with ProcessPoolExecutor(max_workers=min(nWorkers, nChunks), initializer=_initialiseworker,
+                                     initargs=(strDataModelName, dictWorkerSettings)) as oExecutor:
+                for oFuture in [oExecutor.submit(_runtaskinworker, listChunk) for listChunk in listChunks]:
+                    for strTable, listRows in oFuture.result().items():
+                        dictRows.setdefault(strTable, []).extend(listRows)
+        finally:
+            oArrays.unlink()
+        return dictRows
+
+
+# Study of the worker process, set up once per worker by _initialiseworker
+_WorkerStudy = None
+
+
+def _initialiseworker(strDataModelName, dictSettings):
+    """Worker process set-up: framework, DataModel from shared memory and the base case"""
+    global _WorkerStudy
+    from Code.BatchRunner import BatchRunner
+    from Code.DataModel.DataModelArrays import DataModelArrays
+    oRunner = BatchRunner(log_level="ERROR", use_result_store=False)
+    if not oRunner.initialise():
+        raise RuntimeError("Failed to initialise the framework in the voltage stability worker")
+    oArrays = DataModelArrays.attachsharedmemory(strDataModelName)
+    try:
+        gbl.DataModelManager = oArrays.todatamodel()
+    finally:
+        oArrays.close()
+    _WorkerStudy = VoltageStability(dictSettings)
+    _WorkerStudy.initializestudy()
+
+
+def _runtaskinworker(listDirections):
+    """Worker process task: trace a chunk of transfer directions"""
+    return _WorkerStudy.tracepvcurves(listDirections)
@@ -1,3 +1,9 @@
+import os
+
+# Stored results live in the user's home folder rather than wherever the framework is started from
+RESULTS_PATH = os.path.join(os.path.expanduser('~'), 'JessePowerFactoryModelling')
+
+
 class StudySettings:
 
     def __init__(self):
@@ -13,11 +19,23 @@ class StudySettings:
         self.DoTransientStability = False
         self.settings = {}
 
+        # Result store settings
+        self.resultstorepath = os.path.join(RESULTS_PATH, 'ResultStore')
+        self.UseResultCache = True
+        # None keeps the cache in a ResultCache folder of the result store
+        self.resultcachepath = None
+        self.resultcachemaxentries = 256
+        self.resultcachemaxsizemb = 1024.0
+
         # Web interface settings
         self.EnableWebInterface = True
         self.WebInterfacePort = 5000
         self.WebInterfaceHost = 'localhost'
 
+    def get_result_cache_path(self):
+        """Folder of the study result cache, by default inside the result store"""
+        return self.resultcachepath or os.path.join(self.resultstorepath, 'ResultCache')
+
     def set_setting(self, key, value):
         """Set a setting value"""
         self.settings[key] = value
@@ -172,20 +172,25 @@ def run_loadflow():
         if framework_instance is None or not framework_instance.backendinitialized:
             return jsonify({'success': False, 'message': 'Engine not initialized'}), 400
 
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         engine = framework_instance.selected_engine
+        settings = data.get('settings', {})
 
-        # TODO: Implement actual load flow execution logic
-        # This would call the appropriate engine's load flow method
+        # Identical repeat studies are served from the result cache
+        success = gbl.EngineLoadFlowContainer.runloadflowcached(**settings)
+        if not success:
+            return jsonify({'success': False, 'message': f'Load flow analysis failed using {engine.upper()}'}), 500
 
+        from datetime import datetime
         return jsonify({
             'success': True,
             'message': f'Load flow analysis completed using {engine.upper()}',
             'engine': engine,
             'results': {
                 'analysis_type': 'load_flow',
-                'timestamp': '2025-10-29T10:30:00Z',
-                'status': 'completed'
+                'timestamp': datetime.now().isoformat(),
+                'status': 'completed',
+                'cached': gbl.EngineLoadFlowContainer.m_bLastRunFromCache
             }
         })
 
@@ -193,6 +198,36 @@ def run_loadflow():
         return jsonify({'success': False, 'message': f'Error running load flow: {str(e)}'}), 500
 
 
+@app.route('/api/edcm-headroom', methods=['GET'])
+def get_edcm_headroom():
+    """Generation and demand headroom of the distribution busbars for the EDCM heat-maps"""
+    try:
+        if gbl.DataModelManager is None or not gbl.DataModelManager.Busbar_TAB:
+            return jsonify({'success': False, 'message': 'No network loaded'}), 400
+
+        # Served from the result store while the network and settings are unchanged. A GET must not edit the shared
+        # DataModel or the engine network, so a network not assessed yet gets the linear estimate without full solves
+        from Code.Studies.Implementation.DistCapacityAssessment import DistCapacityAssessment
+        assessment = DistCapacityAssessment()
+        refined = assessment.loadstoredresults()
+        if not refined:
+            assessment = DistCapacityAssessment({'max_full_solves': 0})
+            if not assessment.runcapacityassessment():
+                return jsonify({'success': False, 'message': 'Distribution capacity assessment failed'}), 500
+
+        headroom = assessment.getcapacityassessmentresults()
+        return jsonify({
+            'success': True,
+            'run_id': assessment.run_id,
+            'cached': assessment.m_bFromCache,
+            'refined': refined,
+            'busbars': headroom.astype(object).where(headroom.notna(), None).to_dict(orient='records')
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error assessing distribution headroom: {str(e)}'}), 500
+
+
 def start_web_server(host='localhost', port=5000):
     """Start the Flask web server"""
     app.run(host=host, port=port, debug=False, threaded=True, use_reloader=False)
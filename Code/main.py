@@ -37,6 +37,13 @@ if __name__ == "__main__":
             gbl.EngineLoadFlowContainer.getandupdateloadsloadflowresults()
             gbl.EngineLoadFlowContainer.getandupdateloadflowgeneratorresults()
             print("Completed running IPSA load flow.")
+        if gbl.StudySettingsContainer.DoVoltageStability:
+            # PV curves across every boundary between the Major Flop Zones, directions spread over the cores
+            # Imported here so the numerical stack is only loaded when the study runs
+            from Code.Studies.Implementation.VoltageStability import VoltageStability
+            voltagestability = VoltageStability({"workers": os.cpu_count() or 1})
+            voltagestability.runvoltagestability()
+            print("Completed running voltage stability.")
 
     if gbl.StudySettingsContainer.powerfactory:
         fw.initialize_backend("powerfactory")
@@ -0,0 +1,118 @@
+"""
+Test the headless batch runner
+Runs a small manifest on a synthetic ETYS workbook with the simulated load flow and checks that
+the parsed workbook and DataModel are reused and every study lands in the result store.
+"""
+import sys
+import os
+import json
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_test_manifest(folder):
+    """Write a three study manifest over one synthetic workbook"""
+    from Code.Benchmarks.SyntheticETYSNetworkGenerator import getsyntheticworkbook
+    workbook = getsyntheticworkbook(60, folder, seed=3)
+    manifest = {
+        'name': 'batch_test',
+        'result_store': 'store',
+        'defaults': {'engine': 'simulated', 'analyses': ['loadflow']},
+        'studies': [
+            {'name': 'base', 'etys_file': os.path.basename(workbook)},
+            {'name': 'base_repeat', 'etys_file': os.path.basename(workbook)},
+            {'name': 'base_csv', 'etys_file': os.path.basename(workbook),
+             'loadflow_settings': {'max_iterations': 30}, 'outputs': {'csv': 'csv'}},
+        ],
+    }
+    manifest_path = os.path.join(folder, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return manifest_path
+
+
+def test_manifest_validation():
+    """Test that invalid studies are rejected before anything runs"""
+    print("Testing manifest validation...")
+    try:
+        from Code.BatchRunner import loadmanifest
+        with tempfile.TemporaryDirectory() as folder:
+            manifest_path = os.path.join(folder, 'bad.json')
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({'studies': [{'name': 'x', 'etys_file': 'a.xlsx', 'analyses': ['harmonics']}]}, f)
+            try:
+                loadmanifest(manifest_path)
+                raise AssertionError("Unsupported analysis was accepted")
+            except ValueError:
+                pass
+        print("✓ Invalid manifest rejected")
+    except Exception as e:
+        print(f"✗ Manifest validation test failed: {e}")
+        raise
+
+
+def test_batch_reuses_warm_caches():
+    """Test that studies on the same workbook share the parse, DataModel and engine session"""
+    print("\nTesting batch run with warm caches...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        with tempfile.TemporaryDirectory() as folder:
+            manifest_path = write_test_manifest(folder)
+            runner = BatchRunner(log_level='ERROR')
+            summary = runner.runmanifest(manifest_path)
+            cache_path = gbl.ResultCache.store.root_path
+            gbl.ResultCache = None
+            assert summary['failed'] == 0, f"Studies failed: {summary['studies']}"
+            assert cache_path == os.path.join(folder, 'store', 'ResultCache'), "Result cache not kept with the store"
+            assert runner.statistics['source_misses'] == 1, "Workbook parsed more than once"
+            assert runner.statistics['datamodel_hits'] == 2, "DataModel not reused"
+            assert runner.statistics['engine_sessions'] == 1, "Engine session not reused"
+            runs = gbl.ResultStore.listruns('loadflow')
+            assert {run['metadata']['study'] for run in runs} == {'base', 'base_repeat', 'base_csv'}, \
+                "Not every study was stored"
+            assert os.path.isfile(os.path.join(folder, 'csv', 'base_csv_loadflow_busbars.csv')), "CSV not written"
+
+            # A later manifest naming another store writes there, not to the first manifest's store
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest.update({'name': 'second_store', 'result_store': 'store2', 'studies': manifest['studies'][:1]})
+            second_path = os.path.join(folder, 'second.json')
+            with open(second_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            summary = runner.runmanifest(second_path)
+            assert gbl.ResultCache.store.root_path == os.path.join(folder, 'store2', 'ResultCache'), \
+                "Result cache should move with the store"
+            gbl.ResultCache = None
+            assert summary['failed'] == 0, f"Studies failed: {summary['studies']}"
+            assert gbl.ResultStore.root_path == os.path.abspath(os.path.join(folder, 'store2')), \
+                "Second manifest store not opened"
+            assert len(gbl.ResultStore.listruns('loadflow')) == 1, "Second manifest should write to its own store"
+        print("✓ One parse and one DataModel served all studies, each manifest wrote to its own store")
+    except Exception as e:
+        print(f"✗ Batch runner test failed: {e}")
+        raise
+
+
+def main():
+    """Run all batch runner tests"""
+    print("=" * 60)
+    print("BATCH RUNNER TESTS")
+    print("=" * 60)
+    tests = [test_manifest_validation, test_batch_reuses_warm_caches]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Test the data exporter
+Checks that a DataModel exported as ETYS sheets to Parquet, Arrow and CSV streams back into the same DataModel, and
+that standardised data is written one file per element type, or one workbook tab per element type for Excel.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def datamodel_summary():
+    """Counts and value totals of the DataModel built by the last load"""
+    from Code import GlobalEngineRegistry as gbl
+    datamodel = gbl.DataModelManager
+    return {
+        'busbars': len(datamodel.Busbar_TAB), 'branches': len(datamodel.Branch_TAB),
+        'transformers': sum(1 for branch in datamodel.Branch_TAB if branch.IsTransformer),
+        'loads': len(datamodel.Load_TAB), 'generators': len(datamodel.Gen_TAB),
+        'kV': round(sum(busbar.kV for busbar in datamodel.Busbar_TAB), 3),
+        'R': round(sum(branch.R for branch in datamodel.Branch_TAB), 9),
+        'X': round(sum(branch.X for branch in datamodel.Branch_TAB), 9),
+        'ratings': round(sum(branch.WinterRating + branch.SummerRating for branch in datamodel.Branch_TAB), 3),
+        'demand': round(sum(load.MW + load.MVar for load in datamodel.Load_TAB), 3),
+        'generation': round(sum(gen.MW for gen in datamodel.Gen_TAB), 3),
+    }
+
+
+def test_datamodel_round_trip():
+    """Test a DataModel exported to Parquet, Arrow and CSV and streamed back"""
+    print("Testing DataModel export round trip...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.Benchmarks.PipelineBenchmark import _resetframework
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+        from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+        from Code.NetworkDataManager import NetworkDataManager
+        data = generatesyntheticetysdata(300, seed=9)
+        _resetframework()
+        standard = NetworkDataManager()._standardize_to_common_format(ETYSDataValidator().validate(data).cleaned_data,
+                                                                      'etys')
+        assert gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard), "Materialised load failed"
+        expected = datamodel_summary()
+        with tempfile.TemporaryDirectory() as data_path:
+            exports = {'parquet': 'zstd', 'arrow': 'lz4', 'csv': 'gzip'}
+            for export_format, compression in exports.items():
+                sheets = gbl.DataSourceInterfaceContainer.export_from_datamodel_to_source(
+                    export_format, os.path.join(data_path, export_format), compression)
+            assert sorted(sheets) == ['Demand Data', 'IC Register', 'Mechanically Switched Capacitor', 'Nodes', 'OHL',
+                                      'Shunt Reactor', 'TEC Register', 'Transformer'], f"Wrong sheets {sorted(sheets)}"
+            assert 'Nodes.csv.gz' in os.listdir(os.path.join(data_path, 'csv')), "CSV sheets should be compressed"
+            for export_format in exports:
+                _resetframework()
+                assert NetworkDataManager().stream_data_to_framework(
+                    export_format, chunk_size=64, file_path=os.path.join(data_path, export_format)), \
+                    f"Streaming the {export_format} export failed"
+                assert datamodel_summary() == expected, f"{export_format} round trip changed the DataModel"
+        print(f"✓ {len(sheets)} ETYS sheets, {expected['busbars']} busbars / {expected['branches']} branches "
+              f"identical after Parquet, Arrow and CSV round trips")
+    except Exception as e:
+        print(f"✗ DataModel export round trip test failed: {e}")
+        raise
+
+
+def test_standardised_export():
+    """Test standardised data exported per element type and to an Excel workbook"""
+    print("\nTesting standardised data export...")
+    try:
+        import pandas as pd
+        from openpyxl import load_workbook
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+        from Code.NetworkDataManager import NetworkDataManager
+        data = generatesyntheticetysdata(200, seed=4)
+        manager = NetworkDataManager()
+        with tempfile.TemporaryDirectory() as data_path:
+            source_path = os.path.join(data_path, 'source')
+            manager.export_data(data, source_path, 'parquet')
+            standard = manager.get_standardized_data('parquet', file_path=source_path)
+            written = manager.export_standardized_data('parquet', os.path.join(data_path, 'standard'), 'arrow',
+                                                       file_path=source_path)
+            assert sorted(written) == sorted(standard), "Every element type should be written"
+            for sheet_name, df in standard.items():
+                exported = pd.read_feather(written[sheet_name])
+                assert list(exported.columns) == [str(column) for column in df.columns] and len(exported) == len(df), \
+                    f"Exported {sheet_name} does not match the standardised sheet"
+            workbook_path = os.path.join(data_path, 'standard.xlsx')
+            manager.export_standardized_data_to_excel('parquet', workbook_path, file_path=source_path)
+            workbook = load_workbook(workbook_path, read_only=True)
+            assert workbook.sheetnames == list(standard), f"Wrong workbook tabs {workbook.sheetnames}"
+            nodes = list(workbook['nodes'].values)
+            assert len(nodes) == len(standard['nodes']) + 1, "Nodes tab should hold a header and every node"
+            assert nodes[1][nodes[0].index('node_id')] == standard['nodes']['node_id'].iloc[0], "Wrong node values"
+            workbook.close()
+            try:
+                manager.export_data(data, data_path, 'hdf5')
+                raise AssertionError("Unsupported format accepted")
+            except ValueError:
+                pass
+        print(f"✓ {len(standard)} standardised element types written to Arrow and to an Excel workbook")
+    except Exception as e:
+        print(f"✗ Standardised data export test failed: {e}")
+        raise
+
+
+def test_import_stays_lazy():
+    """Test the exporter is not imported with the data manager, which would load pandas and pyarrow"""
+    print("\nTesting exporter import on first use...")
+    try:
+        import subprocess
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = ("import sys; import Code.NetworkDataManager; "
+                  "print(sorted(name for name in ('pandas', 'pyarrow') if name in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == '[]', f"Importing NetworkDataManager loaded {output.stdout.strip()}"
+        print("✓ NetworkDataManager imports without pandas or pyarrow")
+    except Exception as e:
+        print(f"✗ Exporter import test failed: {e}")
+        raise
+
+
+def main():
+    """Run all data export tests"""
+    print("=" * 60)
+    print("DATA EXPORT TEST SUITE")
+    print("=" * 60)
+    tests = [test_datamodel_round_trip, test_standardised_export, test_import_stays_lazy]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("\n" + "=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    print("=" * 60)
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
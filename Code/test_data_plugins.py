@@ -0,0 +1,218 @@
+"""
+Test the streaming data source plugins
+Checks that CSV, Parquet and Arrow datasets streamed in small batches build the same DataModel as the materialised
+ETYS pipeline, that strict validation stops a stream before a failing batch is loaded, and that one network given
+as a MATPOWER case and as a PSS/E RAW case reaches the DataModel with the same values.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+# Four busbar network: two parallel 400 kV lines, a 400/132 kV transformer (tap 1.0) and a 132 kV line, with
+# demand at B2 and B3, a reactor at B3, a capacitor at B4, an out of service branch and an out of service generator
+MATPOWER_CASE = """function mpc = case4
+mpc.version = '2';
+%% system MVA base
+mpc.baseMVA = 100;
+%% bus data
+mpc.bus = [
+    1 3 0   0  0 0   1 1 0 400 1 1.1 0.9;
+    2 1 200 50 0 0   1 1 0 400 1 1.1 0.9;
+    3 1 100 20 0 -50 1 1 0 132 1 1.1 0.9;  % reactor
+    4 2 0   0  0 30  1 1 0 132 1 1.1 0.9;
+];
+%% generator data
+mpc.gen = [
+    1 150 0 300 -300 1 100 1 300 0;
+    4 80  0 100 -100 1 100 1 100 0;
+    4 0   0 100 -100 1 100 0 100 0;
+];
+%% branch data
+mpc.branch = [
+    1 2 0.001  0.01 0.2  1000 0 0 0   0 1 -360 360;
+    1 2 0.001  0.01 0.2  1000 0 0 0   0 1 -360 360;
+    2 3 0.0005 0.05 0    240  0 0 1.0 0 1 -360 360;
+    3 4 0.01   0.05 0.01 150  0 0 0   0 1 -360 360;
+    1 4 0.01   0.05 0.01 150  0 0 0   0 0 -360 360;
+];
+%% generator cost data
+mpc.gencost = [
+    2 0 0 3 0.11 5 150;
+];
+"""
+
+# The same network as a revision 33 RAW case, the transformer impedance on its 240 MVA winding base (CZ 2)
+PSSE_CASE = """0,   100.00, 33, 0, 1, 50.00     / PSS(R)E-33    RAW created
+FOUR BUS TEST CASE
+SAME NETWORK AS THE MATPOWER CASE
+1,'BUS1        ', 400.0000,3,   1,   1,   1,1.00000,   0.0000,1.10000,0.90000,1.10000,0.90000
+2,'BUS2        ', 400.0000,1,   1,   1,   1,1.00000,   0.0000,1.10000,0.90000,1.10000,0.90000
+3,'BUS3        ', 132.0000,1,   1,   1,   1,1.00000,   0.0000,1.10000,0.90000,1.10000,0.90000
+4,'BUS4 / GEN  ', 132.0000,2,   1,   1,   1,1.00000,   0.0000,1.10000,0.90000,1.10000,0.90000
+0 / END OF BUS DATA, BEGIN LOAD DATA
+2,'1 ',1,   1,   1,   200.000,    50.000,     0.000,     0.000,     0.000,     0.000,   1,1,0
+3,'1 ',1,   1,   1,   100.000,    20.000,     0.000,     0.000,     0.000,     0.000,   1,1,0
+0 / END OF LOAD DATA, BEGIN FIXED SHUNT DATA
+3,'1 ',     1,     0.000,   -50.000
+4,'1 ',     1,     0.000,    30.000
+0 / END OF FIXED SHUNT DATA, BEGIN GENERATOR DATA
+1,'1 ',   150.000,     0.000,   300.000,  -300.000,1.00000,     0,   100.000, 0.0, 1.0, 0.0, 0.0,1.0,1,  100.0,   300.000,     0.000,   1,1.0000
+4,'1 ',    80.000,     0.000,   100.000,  -100.000,1.00000,     0,   100.000, 0.0, 1.0, 0.0, 0.0,1.0,1,  100.0,   100.000,     0.000,   1,1.0000
+4,'2 ',     0.000,     0.000,   100.000,  -100.000,1.00000,     0,   100.000, 0.0, 1.0, 0.0, 0.0,1.0,0,  100.0,   100.000,     0.000,   1,1.0000
+0 / END OF GENERATOR DATA, BEGIN BRANCH DATA
+1,     2,'1 ', 1.00000E-3, 1.00000E-2,   0.20000,  1000.00,     0.00,     0.00,  0.0,  0.0,  0.0,  0.0,1,1,  12.50,   1,1.0000
+1,     2,'2 ', 1.00000E-3, 1.00000E-2,   0.20000,  1000.00,     0.00,     0.00,  0.0,  0.0,  0.0,  0.0,1,1,  12.50,   1,1.0000
+3,     4,'1 ', 1.00000E-2, 5.00000E-2,   0.01000,   150.00,     0.00,     0.00,  0.0,  0.0,  0.0,  0.0,1,1,   8.00,   1,1.0000
+1,     4,'1 ', 1.00000E-2, 5.00000E-2,   0.01000,   150.00,     0.00,     0.00,  0.0,  0.0,  0.0,  0.0,0,1,   8.00,   1,1.0000
+0 / END OF BRANCH DATA, BEGIN TRANSFORMER DATA
+2,     3,     0,'1 ',1,2,1,   0.00000E+0,   0.00000E+0,2,'TX 2-3      ',1,   1,1.0000
+ 1.20000E-3, 1.20000E-1,   240.00
+1.00000, 400.000,   0.000,   240.00,   240.00,   240.00, 0,      0, 1.10000, 0.90000, 1.10000, 0.90000,  33, 0, 0.00000, 0.00000,  0.000
+1.00000, 132.000
+0 / END OF TRANSFORMER DATA, BEGIN AREA DATA
+0 / END OF AREA DATA, BEGIN TWO-TERMINAL DC DATA
+Q
+"""
+
+
+def datamodel_summary():
+    """Counts and value totals of the DataModel built by the last load"""
+    from Code import GlobalEngineRegistry as gbl
+    datamodel = gbl.DataModelManager
+    return {
+        'busbars': len(datamodel.Busbar_TAB), 'branches': len(datamodel.Branch_TAB),
+        'loads': len(datamodel.Load_TAB), 'generators': len(datamodel.Gen_TAB),
+        'R': round(sum(branch.R for branch in datamodel.Branch_TAB), 9),
+        'ratings': round(sum(branch.WinterRating for branch in datamodel.Branch_TAB), 3),
+        'generation': round(sum(gen.MW for gen in datamodel.Gen_TAB), 3),
+    }
+
+
+def test_streamed_formats():
+    """Test CSV, Parquet and Arrow datasets streamed in batches against the materialised pipeline"""
+    print("Testing streamed CSV, Parquet and Arrow datasets...")
+    try:
+        import pandas as pd
+        import pyarrow.feather as feather
+        from Code import GlobalEngineRegistry as gbl
+        from Code.Benchmarks.PipelineBenchmark import _resetframework
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+        from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+        from Code.NetworkDataManager import NetworkDataManager
+        data = generatesyntheticetysdata(300, seed=5)
+        _resetframework()
+        standard = NetworkDataManager()._standardize_to_common_format(ETYSDataValidator().validate(data).cleaned_data,
+                                                                      'etys')
+        assert gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard), "Materialised load failed"
+        expected = datamodel_summary()
+        with tempfile.TemporaryDirectory() as data_path:
+            writers = {'csv': lambda df, path: df.to_csv(path, index=False),
+                       'parquet': lambda df, path: df.to_parquet(path, index=False),
+                       'arrow': lambda df, path: feather.write_feather(df, path, compression='uncompressed')}
+            for source_type, write in writers.items():
+                os.makedirs(os.path.join(data_path, source_type))
+                for sheet_name, df in data.items():
+                    write(df, os.path.join(data_path, source_type, f"{sheet_name}.{source_type}"))
+                manager = NetworkDataManager()
+                reader, _ = manager.get_data_source(source_type)
+                reader.chunk_size = 40
+                batches = list(reader.iter_batches(file_path=os.path.join(data_path, source_type)))
+                assert max(len(batch) for _, batch in batches) == 40, f"{source_type} batches exceed the chunk size"
+                assert batches[0][0] == 'Nodes', f"{source_type} should stream the nodes first"
+                _resetframework()
+                assert manager.stream_data_to_framework(source_type, chunk_size=40,
+                                                        file_path=os.path.join(data_path, source_type)), \
+                    f"Streaming {source_type} failed"
+                assert manager.stream_validation_result.is_valid, f"{source_type} stream should validate"
+                assert datamodel_summary() == expected, f"{source_type} DataModel differs from the materialised one"
+            # A node repeated in a later batch fails strict validation before that batch is loaded
+            nodes = data['Nodes']
+            pd.concat([nodes, nodes.iloc[[0]]], ignore_index=True).to_csv(os.path.join(data_path, 'csv', 'Nodes.csv'),
+                                                                          index=False)
+            _resetframework()
+            try:
+                NetworkDataManager().stream_data_to_framework('csv', strict_validation=True, chunk_size=100,
+                                                              file_path=os.path.join(data_path, 'csv'))
+                raise AssertionError("Duplicate node accepted by strict validation")
+            except ValueError:
+                pass
+            assert len(gbl.DataModelManager.Busbar_TAB) == 300 and not gbl.DataModelManager.Branch_TAB, \
+                "Only the batches before the failing one should be loaded"
+        print(f"✓ {len(batches)} batches per format, DataModel {expected['busbars']} busbars / "
+              f"{expected['branches']} branches identical to the materialised pipeline")
+    except Exception as e:
+        print(f"✗ Streamed datasets test failed: {e}")
+        raise
+
+
+def test_case_files():
+    """Test one network read from MATPOWER and PSS/E RAW case files"""
+    print("\nTesting MATPOWER and PSS/E RAW case files...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.Benchmarks.PipelineBenchmark import _resetframework
+        from Code.NetworkDataManager import NetworkDataManager
+        branches = {}
+        with tempfile.TemporaryDirectory() as data_path:
+            for source_type, file_name, text in (('matpower', 'case4.m', MATPOWER_CASE),
+                                                 ('psse', 'case4.raw', PSSE_CASE)):
+                case_path = os.path.join(data_path, file_name)
+                with open(case_path, 'w') as case_file:
+                    case_file.write(text)
+                _resetframework()
+                manager = NetworkDataManager()
+                sheets = manager.get_data_source(source_type)[0].load_data(file_path=case_path)
+                assert sorted(sheets) == ['Demand Data', 'Mechanically Switched Capacitor', 'Nodes', 'OHL',
+                                          'Shunt Reactor', 'TEC Register', 'Transformer'], \
+                    f"Wrong {source_type} sheets {sorted(sheets)}"
+                assert manager.stream_data_to_framework(source_type, chunk_size=2, file_path=case_path), \
+                    f"Streaming the {source_type} case failed"
+                datamodel = gbl.DataModelManager
+                assert [busbar.kV for busbar in datamodel.Busbar_TAB] == [400.0, 400.0, 132.0, 132.0], \
+                    f"Wrong {source_type} busbar voltages"
+                # Numeric node names become integer BusIDs in the DataModel
+                assert [(load.BusID, load.MW, load.MVar) for load in datamodel.Load_TAB] == \
+                    [(2, 200.0, 50.0), (3, 100.0, 20.0), (3, 0.0, 50.0), (4, 0.0, -30.0)], \
+                    f"Wrong {source_type} demand and shunts"
+                assert [(gen.BusID, gen.MW) for gen in datamodel.Gen_TAB] == [(1, 150.0), (4, 80.0)], \
+                    f"Wrong {source_type} generators"
+                branches[source_type] = [(branch.BusID1, branch.BusID2, bool(getattr(branch, 'IsTransformer', False)),
+                                          branch.R, branch.X, branch.B, branch.WinterRating)
+                                         for branch in datamodel.Branch_TAB]
+        assert len(branches['matpower']) == 4, "The out of service branch should be left out"
+        assert branches['matpower'][3][:3] == (2, 3, True), "Tapped branch should be a transformer"
+        # Per unit on 100 MVA in both, the RAW transformer converted from its winding base
+        for matpower_branch, psse_branch in zip(sorted(branches['matpower']), sorted(branches['psse'])):
+            assert matpower_branch[:3] == psse_branch[:3] and np.allclose(matpower_branch[3:], psse_branch[3:]), \
+                f"MATPOWER {matpower_branch} and PSS/E {psse_branch} differ"
+        print(f"✓ MATPOWER and PSS/E RAW give the same {len(branches['psse'])} branches, demand and generation")
+    except Exception as e:
+        print(f"✗ Case files test failed: {e}")
+        raise
+
+
+def main():
+    """Run all data plugin tests"""
+    print("=" * 60)
+    print("DATA PLUGIN TESTS")
+    print("=" * 60)
+    tests = [test_streamed_formats, test_case_files]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Test copy-on-write DataModel snapshots and the columnar DataModel serialisation
+Changes component parameters, switching and tab contents under a snapshot and checks that a restore
+puts back exactly the original state, including after a failed study. Then shares a packed DataModel
+with a worker process through shared memory.
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Code.test_result_store import build_test_datamodel
+
+
+def test_snapshot_restore():
+    """Test that a restore undoes attribute changes and appended components"""
+    print("Testing snapshot restore...")
+    try:
+        from Code.DataModel.ComponentManager import Busbar, ComponentBaseTemplate
+        datamodel = build_test_datamodel()
+        network_hash = datamodel.getnetworkhash()
+        snapshot = datamodel.snapshot()
+        datamodel.Branch_TAB[0].ON = False
+        datamodel.Load_TAB[0].MW = 150.0
+        datamodel.Busbar_TAB[1].scenario_tag = 'winter'
+        datamodel.addbusbartotab(Busbar('BUS4'))
+        other_datamodel = build_test_datamodel()
+        other_datamodel.Load_TAB[0].MW = 80.0
+        assert snapshot.getchangecount() == 3, "Expected three changed components"
+        assert len(snapshot.getaddedcomponents()['Busbar_TAB']) == 1, "Added busbar not reported"
+        assert snapshot.restore() == 3, "Expected three restored components"
+        assert other_datamodel.Load_TAB[0].MW == 80.0, "Another DataModel was journalled"
+        assert datamodel.getnetworkhash() == network_hash, "Network not restored"
+        assert not hasattr(datamodel.Busbar_TAB[1], 'scenario_tag'), "New attribute not removed"
+        assert 'BUS4' not in datamodel.BusbarIdToIndex, "Busbar map not restored"
+        datamodel.Gen_TAB[0].MW = 50.0
+        assert snapshot.restore() == 1 and datamodel.Gen_TAB[0].MW == 100.0, "Snapshot not reusable"
+        snapshot.release()
+        assert '__setattr__' not in ComponentBaseTemplate.__dict__, "Attribute hook left installed"
+        print("✓ Restore undid only the changed components")
+    except Exception as e:
+        print(f"✗ Snapshot restore test failed: {e}")
+        raise
+
+
+def test_snapshot_context_after_failure():
+    """Test that the context manager restores the DataModel when the study raises"""
+    print("\nTesting snapshot restore after a failed study...")
+    try:
+        datamodel = build_test_datamodel()
+        network_hash = datamodel.getnetworkhash()
+        try:
+            with datamodel.snapshot():
+                datamodel.Branch_TAB[1].ON = False
+                with datamodel.snapshot():
+                    datamodel.Branch_TAB[0].ON = False
+                assert datamodel.Branch_TAB[0].ON, "Inner snapshot not restored"
+                raise RuntimeError("load flow diverged")
+        except RuntimeError:
+            pass
+        assert datamodel.getnetworkhash() == network_hash, "Dirty model left after failure"
+        print("✓ Failed study left the DataModel clean")
+    except Exception as e:
+        print(f"✗ Snapshot context test failed: {e}")
+        raise
+
+
+def rebuild_in_worker(shared_memory_name):
+    """Worker process: attach to the packed DataModel and rebuild it"""
+    from Code.DataModel.DataModelArrays import DataModelArrays
+    arrays = DataModelArrays.attachsharedmemory(shared_memory_name)
+    try:
+        ratings = float(arrays.getcolumn('Branch_TAB', 'RatingA').sum())
+        return arrays.todatamodel().getnetworkhash(), ratings
+    finally:
+        arrays.close()
+
+
+def test_shared_memory_round_trip():
+    """Test that a worker attached to shared memory rebuilds an identical DataModel"""
+    print("\nTesting DataModel sharing through shared memory...")
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        datamodel = build_test_datamodel()
+        datamodel.Branch_TAB[0].RatingA = 250.0
+        datamodel.Busbar_TAB[0].BusID = datamodel.Gen_TAB[0].BusID = 101
+        datamodel.BusbarIdToIndex = {busbar.BusID: index for index, busbar in enumerate(datamodel.Busbar_TAB)}
+        arrays = datamodel.toarrays()
+        shared_memory_name = arrays.tosharedmemory()
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                network_hash, ratings = executor.submit(rebuild_in_worker, shared_memory_name).result()
+        finally:
+            arrays.unlink()
+        assert network_hash == datamodel.getnetworkhash(), "Worker rebuilt a different network"
+        assert ratings == 250.0, "Rating column not shared"
+        rebuilt = arrays.todatamodel()
+        assert rebuilt.Busbar_TAB[0].BusID == 101 and rebuilt.Busbar_TAB[1].BusID == 'BUS2', "Mixed IDs not preserved"
+        assert rebuilt.Gen_TAB[0].oBus1 is rebuilt.Busbar_TAB[0], "Bus references not rebuilt"
+        print("✓ Worker rebuilt the DataModel from shared memory")
+    except Exception as e:
+        print(f"✗ Shared memory round trip test failed: {e}")
+        raise
+
+
+def main():
+    """Run all DataModel snapshot tests"""
+    print("=" * 60)
+    print("DATAMODEL SNAPSHOT AND SERIALISATION TESTS")
+    print("=" * 60)
+    tests = [test_snapshot_restore, test_snapshot_context_after_failure, test_shared_memory_round_trip]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
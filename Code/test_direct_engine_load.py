@@ -0,0 +1,128 @@
+"""
+Test the direct load strategy
+Checks that standardised ETYS sheets streamed straight into the IPSA engine build the same network as the
+DataModel route while leaving the DataModel empty, and that the benchmark reports both strategies.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _cleanupfakeipsa():
+    from Code.LazyImports import resetlazymodule
+    resetlazymodule('ipsa')
+    for module_name in [name for name in sys.modules if name == 'ipsa' or name.startswith('Code.Framework.IPSA')]:
+        del sys.modules[module_name]
+
+
+def test_direct_matches_datamodel():
+    """Test the direct strategy builds the same IPSA network as the datamodel strategy"""
+    print("Testing direct load strategy against the DataModel route...")
+    from Code import GlobalEngineRegistry as gbl
+    previous_engine = gbl.EngineContainer
+    try:
+        from Code.Benchmarks.FakeIPSA import installfakeipsa
+        from Code.Benchmarks.PipelineBenchmark import _resetframework
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+        from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+        from Code.NetworkDataManager import NetworkDataManager
+        installfakeipsa(bForce=True)
+        from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+        data = generatesyntheticetysdata(300, seed=5)
+        _resetframework()
+        standard = NetworkDataManager()._standardize_to_common_format(ETYSDataValidator().validate(data).cleaned_data,
+                                                                      'etys')
+        assert gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, 'datamodel'), \
+            "DataModel load failed"
+        engine = EngineIPSA()
+        assert engine.load_network_from_datamodel(), "IPSA build from the DataModel failed"
+        expected = engine.m_network.getsnapshot()
+
+        _resetframework()
+        gbl.EngineContainer = EngineIPSA()
+        assert gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, 'direct'), \
+            "Direct load failed"
+        assert gbl.EngineContainer.m_network.getsnapshot() == expected, "Direct load built a different network"
+        assert not gbl.DataModelManager.Busbar_TAB and not gbl.DataModelManager.Branch_TAB, \
+            "Direct load should not fill the DataModel"
+
+        with tempfile.TemporaryDirectory() as data_path:
+            NetworkDataManager().export_data(data, data_path, 'parquet')
+            _resetframework()
+            gbl.EngineContainer = EngineIPSA()
+            assert NetworkDataManager().stream_data_to_framework('parquet', chunk_size=50, load_strategy='direct',
+                                                                 file_path=data_path), "Streamed direct load failed"
+            assert gbl.EngineContainer.m_network.getsnapshot() == expected, \
+                "Streamed direct load built a different network"
+
+        gbl.EngineContainer = None
+        try:
+            gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, 'direct')
+            raise AssertionError("Direct load without an engine accepted")
+        except RuntimeError:
+            pass
+        counts = {component_type: len(components) for component_type, components in expected.items()}
+        print(f"✓ Direct and streamed direct loads build the DataModel network {counts}")
+    except Exception as e:
+        print(f"✗ Direct load strategy test failed: {e}")
+        raise
+    finally:
+        gbl.EngineContainer = previous_engine
+        _cleanupfakeipsa()
+
+
+def test_strategy_benchmark():
+    """Test the benchmark comparison of the datamodel and direct strategies"""
+    print("\nTesting load strategy benchmark...")
+    try:
+        from Code.Benchmarks.FakeIPSA import installfakeipsa
+        from Code.Benchmarks.PipelineBenchmark import comparestrategies, formatstrategies, LOAD_STRATEGIES
+        from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+        from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+        from Code.NetworkDataManager import NetworkDataManager
+        installfakeipsa(bForce=True)
+        data = generatesyntheticetysdata(400, seed=2)
+        standard = NetworkDataManager()._standardize_to_common_format(ETYSDataValidator().validate(data).cleaned_data,
+                                                                      'etys')
+        results = comparestrategies(standard, repeats=1)
+        assert list(results) == LOAD_STRATEGIES, f"Wrong strategies {list(results)}"
+        for strategy, result in results.items():
+            assert result['seconds'] > 0 and result['peak_mb'] > 0, f"{strategy} not measured"
+        assert results['direct']['components'] == results['datamodel']['components'] > 0, \
+            "Both strategies should build the same number of components"
+        assert results['direct']['peak_mb'] < results['datamodel']['peak_mb'], \
+            "Direct load should peak below the datamodel strategy"
+        print(formatstrategies({'synthetic-400': results}))
+        print("✓ Build time and peak memory reported for both load strategies")
+    except Exception as e:
+        print(f"✗ Load strategy benchmark test failed: {e}")
+        raise
+    finally:
+        _cleanupfakeipsa()
+
+
+def main():
+    """Run all direct load tests"""
+    print("=" * 60)
+    print("DIRECT ENGINE LOAD TEST SUITE")
+    print("=" * 60)
+    tests = [test_direct_matches_datamodel, test_strategy_benchmark]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("\n" + "=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    print("=" * 60)
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
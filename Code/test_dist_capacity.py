@@ -0,0 +1,174 @@
+"""
+Test the distribution capacity assessment
+Checks the linear voltage and thermal headroom of a radial 33/11 kV feeder against hand calculation,
+the full load flow refinement of the busbars close to their limits and that an unchanged network
+is served from the result store.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def build_feeder_datamodel():
+    """Grid supply point with a 33 kV line to a primary and two 11 kV sections, 2 MW of demand at the end"""
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+    datamodel = DataModelManager()
+    for bus_id, voltage in (("GSP", 33.0), ("PRIMARY", 33.0), ("SEC1", 11.0), ("SEC2", 11.0)):
+        busbar = Busbar(bus_id)
+        busbar.kV = voltage
+        datamodel.addbusbartotab(busbar)
+    for bus1, bus2, resistance, reactance, rating in (("GSP", "PRIMARY", 0.01, 0.04, 60.0),
+                                                      ("PRIMARY", "SEC1", 0.05, 0.1, 20.0),
+                                                      ("SEC1", "SEC2", 0.1, 0.1, 10.0)):
+        branch = Branch(bus1, bus2, 0, f"{bus1}_{bus2}")
+        branch.R, branch.X, branch.RatingA = resistance, reactance, rating
+        datamodel.Branch_TAB.append(branch)
+    grid = Generator("GSP", "GRID")
+    grid.IsExternalGrid = True
+    datamodel.addgentotab(grid)
+    load = Load("SEC2", "L1")
+    load.MW = 2.0
+    datamodel.addloadtotab(load)
+    return datamodel
+
+
+def test_linear_headroom():
+    """Test the linear thermal and voltage rise headroom against hand calculation"""
+    print("Testing linear distribution headroom...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.DistCapacityAssessment import DistCapacityAssessment
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            runner.activateengine('simulated')
+            gbl.DataModelManager = datamodel = build_feeder_datamodel()
+            headroom = DistCapacityAssessment({"refine_below_mw": 0.0, "use_cache": False})
+            assert headroom.runcapacityassessment(), "Assessment failed"
+            table = headroom.getcapacityassessmentresults().set_index('busbar')
+            # Thermal: the 10 MVA end section carries the 2 MW demand
+            assert table.loc['SEC2', 'generation_limit_component'] == 'SEC1_SEC2', "Wrong limiting branch"
+            assert abs(table.loc['SEC2', 'generation_headroom_mw'] - 12.0) < 0.1, "Generation thermal headroom wrong"
+            assert abs(table.loc['SEC2', 'demand_headroom_mw'] - 8.0) < 0.1, "Demand thermal headroom wrong"
+            assert table.loc['GSP', 'generation_limit'] == 'max injection', "Grid supply point should be unconstrained"
+            # Voltage rise: dV = R P / 100 along the 0.16 pu feeder resistance once the ratings are lifted
+            for branch in datamodel.Branch_TAB:
+                branch.RatingA = 0.0
+            unrated = DistCapacityAssessment({"refine_below_mw": 0.0, "use_cache": False})
+            assert unrated.runcapacityassessment(), "Assessment failed"
+            sec2 = unrated.getcapacityassessmentresults().set_index('busbar').loc['SEC2']
+            expected = (1.06 - sec2['voltage_pu']) / 0.16 * 100.0
+            assert sec2['generation_limit'] == 'voltage_high', "Generation should be voltage rise limited"
+            assert abs(sec2['generation_headroom_mw'] - expected) < 0.02 * expected, "Voltage rise headroom wrong"
+            assert sec2['demand_limit'] == 'voltage_low', "Demand should be voltage drop limited"
+        print(f"✓ SEC2 headroom {table.loc['SEC2', 'generation_headroom_mw']:.1f} MW thermal, "
+              f"{sec2['generation_headroom_mw']:.1f} MW voltage rise")
+    except Exception as e:
+        print(f"✗ Linear distribution headroom test failed: {e}")
+        raise
+
+
+def test_refinement_and_cache():
+    """Test the full load flow refinement near limits and the result store cache per network hash"""
+    print("\nTesting distribution headroom refinement and cache...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.DistCapacityAssessment import DistCapacityAssessment
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            runner.activateengine('simulated')
+            gbl.DataModelManager = datamodel = build_feeder_datamodel()
+            assessment = DistCapacityAssessment({"refine_below_mw": 15.0})
+            assert assessment.runcapacityassessment() and not assessment.m_bFromCache, "Assessment failed"
+            table = assessment.getcapacityassessmentresults().set_index('busbar')
+            refined = table[table['generation_method'] == 'load flow']
+            assert list(refined.index) == ['SEC2'], "Only the busbar near its limit should be solved in full"
+            assert abs(refined.loc['SEC2', 'generation_headroom_mw'] - 12.0) <= 0.5, "Refined headroom off the limit"
+            assert [gen.GenID for gen in datamodel.Gen_TAB] == ['GRID'], "Headroom probe generator left behind"
+            cached = DistCapacityAssessment({"refine_below_mw": 15.0, "workers": 2})
+            assert cached.runcapacityassessment() and cached.m_bFromCache, "Unchanged network not served from the store"
+            assert cached.run_id == assessment.run_id, "Cached run differs"
+            assert np.allclose(cached.getcapacityassessmentresults()['demand_headroom_mw'], table['demand_headroom_mw']), \
+                "Cached headroom differs"
+            datamodel.Load_TAB[0].MW = 4.0
+            changed = DistCapacityAssessment({"refine_below_mw": 15.0})
+            assert changed.runcapacityassessment() and not changed.m_bFromCache, "Changed network served from the store"
+            # Seasonal ratings are not in the network hash, the active rating set is part of the key
+            for branch in datamodel.Branch_TAB:
+                branch.SummerRating = branch.RatingA * 0.6
+            datamodel.getratingengine(bRefresh=True).setactiveseason('summer')
+            summer = DistCapacityAssessment({"refine_below_mw": 15.0})
+            assert summer.runcapacityassessment() and not summer.m_bFromCache, "Summer ratings served winter results"
+            assert summer.getcapacityassessmentresults().set_index('busbar').loc['SEC2', 'generation_headroom_mw'] < \
+                changed.getcapacityassessmentresults().set_index('busbar').loc['SEC2', 'generation_headroom_mw'], \
+                "Summer headroom should be lower"
+        print("✓ Busbar near its limit refined with load flows, unchanged network and ratings served from the store")
+    except Exception as e:
+        print(f"✗ Distribution headroom refinement test failed: {e}")
+        raise
+
+
+def test_unpushed_engine_edits():
+    """Test that probe edits an engine never sees give the linear estimate and stored runs are served without solving"""
+    print("\nTesting distribution headroom without pushing edits to the engine...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.DistCapacityAssessment import DistCapacityAssessment
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            runner.activateengine('simulated')
+            gbl.DataModelManager = build_feeder_datamodel()
+            assert not DistCapacityAssessment({"refine_below_mw": 15.0}).loadstoredresults(), \
+                "Network not assessed yet should have no stored run"
+            gbl.EngineLoadFlowContainer.SOLVES_DATAMODEL = False
+            try:
+                linear = DistCapacityAssessment({"refine_below_mw": 15.0, "push_to_engine": False})
+                assert linear.runcapacityassessment(), "Assessment failed"
+                assert set(linear.getcapacityassessmentresults()['generation_method']) == {'linear'}, \
+                    "Probe edits the engine never sees should not be solved in full"
+            finally:
+                del gbl.EngineLoadFlowContainer.SOLVES_DATAMODEL
+            refined = DistCapacityAssessment({"refine_below_mw": 15.0})
+            assert refined.runcapacityassessment() and not refined.m_bFromCache, \
+                "Linear only run should not be served for a full assessment"
+            stored = DistCapacityAssessment({"refine_below_mw": 15.0})
+            assert stored.loadstoredresults() and stored.run_id == refined.run_id, "Stored run not loaded"
+            assert 'load flow' in set(stored.getcapacityassessmentresults()['generation_method']), \
+                "Stored run should hold the refined headroom"
+        print("✓ Unpushed probe edits give the linear estimate, stored runs load without solving")
+    except Exception as e:
+        print(f"✗ Unpushed engine edits test failed: {e}")
+        raise
+
+
+def main():
+    """Run all distribution capacity tests"""
+    print("=" * 60)
+    print("DISTRIBUTION CAPACITY ASSESSMENT TESTS")
+    print("=" * 60)
+    tests = [test_linear_headroom, test_refinement_and_cache, test_unpushed_engine_edits]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Test the fault sweep
+Runs three phase, single phase and phase to phase faults at every busbar and branch end of a small
+network, in one process and spread over worker processes, and checks the fault levels and branch
+contributions stored in the result store. Also checks that a large network sweep reuses one factorisation.
+"""
+import sys
+import os
+import time
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Code.test_result_store import build_test_datamodel
+
+
+def test_fault_sweep_sequential_and_parallel():
+    """Test the stored faults and contributions of a sweep and that workers give the same results"""
+    print("Testing fault sweep...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.FaultSweep import FaultSweep
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            runner.activateengine('simulated')
+            gbl.DataModelManager = build_test_datamodel()
+            for branch in gbl.DataModelManager.Branch_TAB:
+                branch.R, branch.X = 0.002, 0.02
+            sweep = FaultSweep(nChunkFaults=3)
+            run_id = sweep.runsweep()
+            faults = gbl.ResultStore.loadtable(run_id, 'faults').to_pandas()
+            contributions = gbl.ResultStore.loadtable(run_id, 'contributions').to_pandas()
+            # 3 busbars and 2 branches x 2 ends, 3 fault types each
+            assert list(faults['fault']) == list(range(21)), "Expected one row per location and fault type"
+            three_phase = faults[faults['fault_type'] == '3ph']
+            busbars = three_phase[three_phase['location_type'] == 'busbar'].set_index('location')
+            bus2 = busbars.loc['BUS2']
+            close_in = three_phase[(three_phase['location'] == 'BUS2_BUS3') & (three_phase['fraction'] == 0.0)]
+            assert np.isclose(close_in['ik_ka'].iloc[0], bus2['ik_ka']), "Close-in branch fault differs from the busbar fault"
+            feeding = contributions[(contributions['fault'] == bus2['fault']) & (contributions['branch'] == 'BUS1_BUS2')]
+            assert np.isclose(feeding['ik_ka'].iloc[0], bus2['ik_ka']), "Fault current not fed through BUS1_BUS2"
+            # The generator is delta connected, so single phase faults draw no current
+            assert (faults[faults['fault_type'] == 'slg']['ik_ka'] < 1e-3).all(), "Unexpected earth fault current"
+            phase_to_phase = faults[(faults['fault_type'] == 'll') & (faults['location'] == 'BUS2')]
+            assert np.isclose(phase_to_phase['ik_ka'].iloc[0], np.sqrt(3.0) / 2.0 * bus2['ik_ka']), "Phase to phase level wrong"
+            parallel_id = sweep.runsweep(nWorkers=2)
+            parallel = gbl.ResultStore.loadtable(parallel_id, 'contributions').to_pandas()
+            assert parallel.equals(contributions), "Workers returned different results"
+        print(f"✓ 21 faults stored, {len(contributions)} branch contributions, identical across workers")
+    except Exception as e:
+        print(f"✗ Fault sweep test failed: {e}")
+        raise
+
+
+def test_large_network_sweep():
+    """Test that busbar faults across a 2,500 busbar meshed network are solved from one factorisation"""
+    print("\nTesting fault sweep scaling...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.DataModel.DataModelManager import DataModelManager
+        from Code.DataModel.ComponentManager import Busbar, Branch, Generator
+        from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+        from Code.Studies.Implementation.FaultSweep import FaultSweep
+        datamodel = DataModelManager()
+        size = 50
+        for index in range(size * size):
+            busbar = Busbar(f"B{index}")
+            busbar.kV = 400.0
+            datamodel.addbusbartotab(busbar)
+        for row in range(size):
+            for column in range(size):
+                index = row * size + column
+                if column + 1 < size:
+                    datamodel.Branch_TAB.append(Branch(f"B{index}", f"B{index + 1}", 0, f"H{index}"))
+                if row + 1 < size:
+                    datamodel.Branch_TAB.append(Branch(f"B{index}", f"B{index + size}", 0, f"V{index}"))
+        for index in range(0, size * size, 100):
+            generator = Generator(f"B{index}", f"G{index}")
+            generator.MWCapacity = 1000.0
+            datamodel.addgentotab(generator)
+        gbl.DataModelManager = datamodel
+        engine = EngineNativeShortCircuit()
+        assert engine.runshortcircuitanalysisforallbusbars() and engine.getandupdateshortcircuitresults(), "Analysis failed"
+        sweep = FaultSweep(bBranchEndFaults=False)
+        start = time.perf_counter()
+        locations = sweep.buildlocations(datamodel)
+        assert engine.preparefaults(), "Factorisation failed"
+        results = engine.runfaults(locations)
+        elapsed = time.perf_counter() - start
+        faults = results['faults']
+        three_phase = faults['ik_ka'][faults['fault_type'] == '3ph']
+        expected = np.array([busbar.initialshortcircuitcurrent for busbar in datamodel.Busbar_TAB])
+        assert np.allclose(three_phase, expected), "Sweep differs from the all busbar analysis"
+        assert len(results['contributions']['ik_ka']) == 3 * 2 * len(datamodel.Branch_TAB), "Missing contributions"
+        assert elapsed < 20.0, f"{len(faults['ik_ka'])} faults took {elapsed:.1f} s"
+        print(f"✓ {len(faults['ik_ka'])} faults solved in {elapsed:.2f} s")
+    except Exception as e:
+        print(f"✗ Fault sweep scaling test failed: {e}")
+        raise
+
+
+def main():
+    """Run all fault sweep tests"""
+    print("=" * 60)
+    print("FAULT SWEEP TESTS")
+    print("=" * 60)
+    tests = [test_fault_sweep_sequential_and_parallel, test_large_network_sweep]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
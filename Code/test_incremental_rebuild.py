@@ -0,0 +1,177 @@
+"""
+Test incremental IPSA network rebuilds
+Checks that reloading an edited DataModel into an IPSA network built from it only creates, deletes or reconfigures
+the changed components and ends with the network a full build gives, using the fake ipsa module.
+"""
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _loadsyntheticdatamodel(nBuses, nSeed):
+    """Fresh framework with a synthetic ETYS network in the DataModel"""
+    from Code import GlobalEngineRegistry as gbl
+    from Code.Benchmarks.PipelineBenchmark import _resetframework
+    from Code.Benchmarks.SyntheticETYSNetworkGenerator import generatesyntheticetysdata
+    from Code.DataSources.ETYS.ETYSDataValidator import ETYSDataValidator
+    from Code.NetworkDataManager import NetworkDataManager
+    data = generatesyntheticetysdata(nBuses, seed=nSeed)
+    _resetframework()
+    standard = NetworkDataManager()._standardize_to_common_format(ETYSDataValidator().validate(data).cleaned_data,
+                                                                  'etys')
+    assert gbl.DataSourceInterfaceContainer.orchestrate_source_data_loading(standard, 'datamodel'), \
+        "DataModel load failed"
+    return gbl.DataModelManager
+
+
+def _fullbuildsnapshot():
+    """Network of a full build of the current DataModel in a new engine"""
+    from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+    engine = EngineIPSA()
+    assert engine.load_network_from_datamodel(), "Full build failed"
+    return engine.m_network.getsnapshot()
+
+
+def _cleanupfakeipsa():
+    from Code.LazyImports import resetlazymodule
+    resetlazymodule('ipsa')
+    for module_name in [name for name in sys.modules if name == 'ipsa' or name.startswith('Code.Framework.IPSA')]:
+        del sys.modules[module_name]
+
+
+def test_incremental_matches_full_build():
+    """Test reloads of an edited DataModel against full builds"""
+    print("Testing incremental rebuilds against full builds...")
+    try:
+        from Code.Benchmarks.FakeIPSA import installfakeipsa
+        installfakeipsa(bForce=True)
+        from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+        datamodel = _loadsyntheticdatamodel(300, 3)
+        engine = EngineIPSA()
+        assert engine.load_network_from_datamodel(), "Initial build failed"
+        nComponents = sum(engine.m_network.getcomponentcounts().values())
+        busbar_uids = dict(engine.bus_uids)
+
+        # Results written back to the DataModel are not inputs of the network
+        datamodel.Busbar_TAB[0].VMagPu = 0.97
+        datamodel.Busbar_TAB[0].THD = 2.5
+        datamodel.Busbar_TAB[0].initialshortcircuitmva = 15000.0
+        datamodel.Branch_TAB[0].loading = 85.0
+        datamodel.Gen_TAB[0].MWLoadFlow = 120.0
+        assert engine.load_network_from_datamodel(), "Reload after writing results failed"
+        assert engine.last_rebuild_counts['unchanged'] == nComponents, \
+            f"Results should not reconfigure components {engine.last_rebuild_counts}"
+
+        # Parameter edits are made in place
+        line = next(branch for branch in datamodel.Branch_TAB if not branch.IsTransformer)
+        line.R *= 2
+        line.WinterRating += 100
+        datamodel.Load_TAB[0].MW += 5
+        datamodel.Gen_TAB[0].ON = False
+        assert engine.load_network_from_datamodel(), "Reload after parameter edits failed"
+        assert engine.last_rebuild_counts == {'created': 0, 'deleted': 0, 'reconfigured': 3,
+                                              'unchanged': nComponents - 3, 'skipped': 0}, \
+            f"Wrong changes {engine.last_rebuild_counts}"
+        assert engine.bus_uids == busbar_uids, "Busbars should keep their UIDs"
+        assert engine.m_network.getsnapshot() == _fullbuildsnapshot(), "Parameter edits differ from a full build"
+
+        # Renamed, retyped and removed components are recreated or deleted
+        datamodel.Branch_TAB[1].BranchID += 'X'
+        transformer = next(branch for branch in datamodel.Branch_TAB if branch.IsTransformer)
+        transformer.IsTransformer = False
+        datamodel.Gen_TAB.pop()
+        assert engine.load_network_from_datamodel(), "Reload after structural edits failed"
+        counts = engine.last_rebuild_counts
+        assert (counts['created'], counts['deleted'], counts['reconfigured']) == (2, 3, 0), f"Wrong changes {counts}"
+        assert engine.m_network.getsnapshot() == _fullbuildsnapshot(), "Structural edits differ from a full build"
+
+        # A removed busbar takes the components connected to it, which a full build skips as well
+        busbar = datamodel.Busbar_TAB.pop(5)
+        assert engine.load_network_from_datamodel(), "Reload after removing a busbar failed"
+        counts = engine.last_rebuild_counts
+        assert counts['skipped'] > 0 and counts['deleted'] == counts['skipped'] + 1, f"Wrong changes {counts}"
+        assert engine.m_network.getsnapshot() == _fullbuildsnapshot(), "Busbar removal differs from a full build"
+        # Restoring it reconnects them
+        datamodel.Busbar_TAB.insert(5, busbar)
+        assert engine.load_network_from_datamodel(), "Reload after restoring a busbar failed"
+        assert engine.last_rebuild_counts['created'] == counts['skipped'] + 1, "Busbar components not recreated"
+        assert engine.m_network.getsnapshot() == _fullbuildsnapshot(), "Busbar restore differs from a full build"
+        print(f"✓ Parameter, structural and busbar edits of a {nComponents} component network match full builds")
+    except Exception as e:
+        print(f"✗ Incremental rebuild test failed: {e}")
+        raise
+    finally:
+        _cleanupfakeipsa()
+
+
+def test_rebuild_tracking():
+    """Test when the engine falls back to a full build"""
+    print("\nTesting incremental rebuild tracking...")
+    try:
+        import time
+        from Code.Benchmarks.FakeIPSA import installfakeipsa
+        installfakeipsa(bForce=True)
+        from Code.Framework.IPSA.EngineIPSA import EngineIPSA
+        _loadsyntheticdatamodel(1000, 4)
+        engine = EngineIPSA()
+        start = time.perf_counter()
+        assert engine.load_network_from_datamodel(), "Initial build failed"
+        full_seconds = time.perf_counter() - start
+        nComponents = len(engine.component_uids)
+
+        start = time.perf_counter()
+        assert engine.load_network_from_datamodel(), "Reload failed"
+        reload_seconds = time.perf_counter() - start
+        assert engine.last_rebuild_counts['unchanged'] == nComponents, "An unchanged DataModel should touch nothing"
+        assert reload_seconds < full_seconds, "Reloading should be faster than a full build"
+
+        # The network state cached results are keyed on is only known while the DataModel matches the build
+        from Code import GlobalEngineRegistry as gbl
+        state = engine.getnetworkstate(gbl.DataModelManager)
+        assert state is not None, "Network built from the DataModel should report its state"
+        gbl.DataModelManager.Load_TAB[0].MW += 5
+        assert engine.getnetworkstate(gbl.DataModelManager) is None, "Unsynced DataModel should have no state"
+        assert engine.load_network_from_datamodel(), "Reload after a load edit failed"
+        assert engine.getnetworkstate(gbl.DataModelManager) not in (None, state), "Reload should change the state"
+
+        # Forced rebuilds and networks replaced behind the tracking build everything again
+        network = engine.m_network
+        assert engine.load_network_from_datamodel(incremental=False), "Forced rebuild failed"
+        assert engine.m_network is not network and engine.last_rebuild_counts['created'] == nComponents, \
+            "incremental=False should rebuild the network"
+        engine.createnetwork()
+        assert engine.load_network_from_datamodel(), "Build after a new network failed"
+        assert engine.last_rebuild_counts['created'] == nComponents, "A new network should be built in full"
+        print(f"✓ Full build {full_seconds:.3f}s, unchanged reload {reload_seconds:.3f}s "
+              f"for {nComponents} components")
+    except Exception as e:
+        print(f"✗ Incremental rebuild tracking test failed: {e}")
+        raise
+    finally:
+        _cleanupfakeipsa()
+
+
+def main():
+    """Run all incremental rebuild tests"""
+    print("=" * 60)
+    print("INCREMENTAL REBUILD TEST SUITE")
+    print("=" * 60)
+    tests = [test_incremental_matches_full_build, test_rebuild_tracking]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("\n" + "=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    print("=" * 60)
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,87 @@
+"""
+Test the timing span instrumentation
+Records spans through a local recorder and checks the JSON report and Chrome trace exports.
+"""
+import sys
+import os
+import json
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_disabled_recorder():
+    """Test that a disabled recorder records nothing and passes calls straight through"""
+    print("Testing disabled instrumentation...")
+    try:
+        from Code.Instrumentation import SpanRecorder
+        recorder = SpanRecorder(bEnabled=False)
+
+        @recorder.timed("test.add")
+        def add(a, b):
+            return a + b
+
+        with recorder.span("test.block"):
+            assert add(1, 2) == 3, "Wrapped function returned the wrong value"
+        assert recorder.getreport() == {}, "Disabled recorder should not record spans"
+        print("✓ Disabled recorder is a pass-through")
+    except Exception as e:
+        print(f"✗ Disabled instrumentation test failed: {e}")
+        raise
+
+
+def test_report_and_trace_export():
+    """Test span statistics and both export formats"""
+    print("\nTesting span report and trace export...")
+    try:
+        from Code.Instrumentation import SpanRecorder
+        recorder = SpanRecorder(bEnabled=True, nMaxSamples=4)
+
+        @recorder.timed("test.step")
+        def step():
+            return sum(range(1000))
+
+        for _ in range(10):
+            step()
+        with recorder.span("test.block", sheet="Nodes"):
+            step()
+        report = recorder.getreport()
+        assert report["test.step"]["count"] == 11, "Expected eleven step spans"
+        assert report["test.block"]["count"] == 1, "Expected one block span"
+        assert report["test.block"]["total_ms"] >= report["test.block"]["max_ms"] > 0, "Invalid block timing"
+        with tempfile.TemporaryDirectory() as output_path:
+            report_path = recorder.exportjsonreport(os.path.join(output_path, "report.json"))
+            trace_path = recorder.exportchrometrace(os.path.join(output_path, "trace.json"))
+            with open(report_path, encoding="utf-8") as f:
+                assert "test.step" in json.load(f)["spans"], "Report missing span"
+            with open(trace_path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+        assert len(events) == 12 and all(e["ph"] == "X" for e in events), "Unexpected trace events"
+        assert [e for e in events if e["name"] == "test.block"][0]["args"] == {"sheet": "Nodes"}, "Span args lost"
+        print("✓ Span statistics and exports are consistent")
+    except Exception as e:
+        print(f"✗ Span report test failed: {e}")
+        raise
+
+
+def main():
+    """Run all instrumentation tests"""
+    print("=" * 60)
+    print("INSTRUMENTATION TESTS")
+    print("=" * 60)
+    tests = [test_disabled_recorder, test_report_and_trace_export]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
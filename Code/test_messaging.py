@@ -0,0 +1,162 @@
+"""
+Test the batched messaging writer
+Checks that repeated messages are aggregated, that messages below the log level are never formatted and that Flush
+returns only once every queued message has been written, on both the background writer and the synchronous path.
+"""
+import sys
+import os
+import io
+import re
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FormatCounter:
+    """Message argument counting how often it is formatted"""
+    nFormatted = 0
+
+    def __str__(self):
+        FormatCounter.nFormatted += 1
+        return "counted"
+
+
+class LogFile(io.StringIO):
+    """In-memory log file keeping what was written once it is closed"""
+    strClosedValue = None
+
+    def close(self):
+        self.strClosedValue = self.getvalue()
+        super().close()
+
+
+def _capturedmessaging(bAsync):
+    """Messaging instance writing to in-memory log files instead of the console"""
+    from Code.Messaging import Messaging
+    oMsg = Messaging()
+    oMsg.bAsync = bAsync
+    oMsg.bPrintMsgsToConsole = oMsg.bPrintWarningsToConsole = oMsg.bPrintErrorsToConsole = False
+    oMsg.oFileMsgs, oMsg.oFileWarnings, oMsg.oFileErrors = LogFile(), LogFile(), LogFile()
+    return oMsg
+
+
+def _writtencount(strLog):
+    """Messages written to a log, counting an aggregated line as its repeats"""
+    nCount = 0
+    for strLine in strLog.splitlines():
+        if strLine:
+            oMatch = re.search(r": ([\d,]+) × ", strLine)
+            nCount += int(oMatch.group(1).replace(",", "")) if oMatch else 1
+    return nCount
+
+
+def test_aggregation_and_levels():
+    """Test that repeats collapse into one line and filtered messages are never formatted"""
+    print("Testing message aggregation and level filtering...")
+    try:
+        import time
+        from Code.Messaging import LEVEL_WARNING, LEVEL_ERROR
+        oMsg = _capturedmessaging(bAsync=False)
+        fTime = time.time()
+        lBatch = [(LEVEL_WARNING, fTime, "Busbar %s not found in the tab.", (f"B{i}",), "Busbar not found in the tab")
+                  for i in range(1500)]
+        lBatch += [(LEVEL_WARNING, fTime, "Duplicate warning", (), None)] * 3
+        lBatch += [(LEVEL_WARNING, fTime, "Branch %s tripped", ("L1",), None),
+                   (LEVEL_WARNING, fTime, "Branch %s tripped", ("L2",), None),
+                   (LEVEL_ERROR, fTime, "Duplicate warning", (), None)]
+        oMsg._writebatch(lBatch)
+        lWarnings = oMsg.oFileWarnings.getvalue().strip().splitlines()
+        assert len(lWarnings) == 4, f"Repeats should collapse into four lines, got {lWarnings}"
+        assert lWarnings[0].endswith("WARNING: 1,500 × Busbar not found in the tab (e.g. Busbar B0 not found in the tab.)"), \
+            f"Category not aggregated: {lWarnings[0]}"
+        assert lWarnings[1].endswith("WARNING: 3 × Duplicate warning"), f"Repeats not aggregated: {lWarnings[1]}"
+        assert lWarnings[2].endswith("WARNING: Branch L1 tripped") and lWarnings[3].endswith("WARNING: Branch L2 tripped"), \
+            "Messages with different args should not be aggregated"
+        assert oMsg.oFileErrors.getvalue().strip().endswith("ERROR: Duplicate warning"), "Levels should not be merged"
+
+        oMsg = _capturedmessaging(bAsync=False)
+        oMsg.set_log_level("error")
+        FormatCounter.nFormatted = 0
+        oMsg.AddInfo("Info %s", FormatCounter())
+        oMsg.AddWarning("Warning %s", FormatCounter(), strCategory="Filtered")
+        oMsg.add_warning("Warning %s", FormatCounter())
+        assert FormatCounter.nFormatted == 0, "Messages below the log level should never be formatted"
+        assert oMsg.nWarningCount == 2 and oMsg.nInfoCount == 1, "Filtered messages should still be counted"
+        assert not oMsg.oFileMsgs.getvalue() and not oMsg.oFileWarnings.getvalue(), "Filtered messages written"
+        oMsg.AddError("Error %s", FormatCounter())
+        assert FormatCounter.nFormatted == 1 and oMsg.oFileErrors.getvalue().strip().endswith("ERROR: Error counted"), \
+            "Errors should be written at the ERROR level"
+        oMsg.AddError("100% %s", "done")
+        assert "Error formatting message" in oMsg.oFileErrors.getvalue(), "Bad format should be reported, not raised"
+        print("✓ 1,500 categorised and 3 repeated warnings collapsed, filtered messages never formatted")
+    except Exception as e:
+        print(f"✗ Message aggregation test failed: {e}")
+        raise
+
+
+def test_flush_writes_everything():
+    """Test that Flush and closing the log files wait for the background writer"""
+    print("\nTesting the background writer flush...")
+    try:
+        import threading
+        from Code import Messaging as MessagingModule
+        oMsg = _capturedmessaging(bAsync=True)
+        nThreads, nPerThread = 4, 2500
+
+        def produce(nThread):
+            for i in range(nPerThread):
+                oMsg.AddWarning("Load %s not found in the tab.", f"L{nThread}_{i}", strCategory="Load not found in the tab")
+
+        lThreads = [threading.Thread(target=produce, args=(n,)) for n in range(nThreads)]
+        for oThread in lThreads:
+            oThread.start()
+        for oThread in lThreads:
+            oThread.join()
+        oMsg.AddInfo("Last message")
+        oMsg.Flush()
+        assert _writtencount(oMsg.oFileWarnings.getvalue()) == nThreads * nPerThread, \
+            "Flush returned before every warning was written"
+        assert oMsg.oFileMsgs.getvalue().strip().endswith("INFO: Last message"), "Flush returned before the last message"
+        assert oMsg.oWriterThread.is_alive(), "Writer should keep running after a flush"
+
+        # A forked child forgets the parent's writer and starts its own
+        MessagingModule._resetallwriters()
+        assert oMsg.oWriterThread is None, "Fork handler should reset the writer"
+        oMsg.AddWarning("After fork")
+        assert oMsg.oWriterThread is not None, "Writer not restarted after the fork reset"
+
+        # Exit handler flushes every live instance before closing its files
+        oFileWarnings = oMsg.oFileWarnings
+        for i in range(500):
+            oMsg.AddWarning("Exit warning %s", i)
+        MessagingModule._closeallinstances()
+        assert oMsg.oFileWarnings is None and oMsg.oWriterThread is None, "Exit handler should close the instance"
+        assert oFileWarnings.closed, "Exit handler should close the log files"
+        assert _writtencount(oFileWarnings.strClosedValue) == nThreads * nPerThread + 501, \
+            "Exit handler closed the log files before every warning was written"
+        print(f"✓ {nThreads * nPerThread:,} warnings from {nThreads} threads written before Flush returned")
+    except Exception as e:
+        print(f"✗ Background writer flush test failed: {e}")
+        raise
+
+
+def main():
+    """Run all messaging tests"""
+    print("=" * 60)
+    print("MESSAGING TESTS")
+    print("=" * 60)
+    tests = [test_aggregation_and_levels, test_flush_writes_everything]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Test the native sparse short circuit engine
+Checks the fault levels of a small radial network against hand calculated values and that
+a 10,000 busbar meshed network is solved from the sparse factors within seconds.
+"""
+import sys
+import os
+import math
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Code.test_result_store import build_test_datamodel
+
+
+def test_radial_fault_levels():
+    """Test three phase and single phase fault levels on a feeder supplied by an external grid"""
+    print("Testing native fault levels...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+        datamodel = build_test_datamodel()
+        source = datamodel.Gen_TAB[0]
+        source.IsExternalGrid = True
+        source.FaultLevelMVA = 5000.0
+        for branch in datamodel.Branch_TAB:
+            branch.R, branch.X = 0.0, 0.02
+        gbl.DataModelManager = datamodel
+        engine = EngineNativeShortCircuit()
+        assert engine.runshortcircuitcached(), "Short circuit analysis failed"
+        base_ka = 100.0 / (math.sqrt(3.0) * 275.0)
+        bus1, bus3 = datamodel.Busbar_TAB[0], datamodel.Busbar_TAB[2]
+        assert abs(bus1.initialshortcircuitmva - 5000.0) < 1.0, f"Source busbar {bus1.initialshortcircuitmva} MVA"
+        z_source = 1.1 * 100.0 / 5000.0 * complex(0.1, 1.0) / abs(complex(0.1, 1.0))
+        expected_ka = 1.1 / abs(z_source + 0.04j) * base_ka
+        assert abs(bus3.initialshortcircuitcurrent - expected_ka) < 1e-3, "Remote busbar fault current wrong"
+        assert bus1.peakshortcircuitcurrent > math.sqrt(2.0) * bus1.initialshortcircuitcurrent, "Peak current too low"
+        # Single phase: 3c / |2 Z1 + Z0| with Z0 = Z1 at the source and three times the line impedance
+        expected_1ph = 3.0 * 1.1 / abs(3.0 * z_source + 0.2j) * base_ka
+        assert abs(bus3.singlephaseshortcircuitcurrent - expected_1ph) < 1e-3, "Single phase fault current wrong"
+        print(f"✓ Fault levels match hand calculation ({bus3.initialshortcircuitcurrent:.2f} kA at BUS3)")
+    except Exception as e:
+        print(f"✗ Native fault level test failed: {e}")
+        raise
+
+
+def test_large_network_scaling():
+    """Test that a 10,000 busbar meshed network is solved in seconds"""
+    print("\nTesting native short circuit scaling...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.DataModel.DataModelManager import DataModelManager
+        from Code.DataModel.ComponentManager import Busbar, Branch, Generator
+        from Code.Framework.Native.EngineNativeShortCircuit import EngineNativeShortCircuit
+        datamodel = DataModelManager()
+        size = 100
+        for index in range(size * size):
+            busbar = Busbar(f"B{index}")
+            busbar.kV = 400.0
+            datamodel.addbusbartotab(busbar)
+        for row in range(size):
+            for column in range(size):
+                index = row * size + column
+                if column + 1 < size:
+                    datamodel.Branch_TAB.append(Branch(f"B{index}", f"B{index + 1}", 0, f"H{index}"))
+                if row + 1 < size:
+                    datamodel.Branch_TAB.append(Branch(f"B{index}", f"B{index + size}", 0, f"V{index}"))
+        for index in range(0, size * size, 500):
+            generator = Generator(f"B{index}", f"G{index}")
+            generator.MWCapacity = 1000.0
+            datamodel.addgentotab(generator)
+        gbl.DataModelManager = datamodel
+        engine = EngineNativeShortCircuit()
+        start = time.perf_counter()
+        assert engine.runshortcircuitanalysisforallbusbars() and engine.getandupdateshortcircuitresults(), "Analysis failed"
+        elapsed = time.perf_counter() - start
+        assert all(busbar.initialshortcircuitcurrent > 0 for busbar in datamodel.Busbar_TAB), "Busbars without results"
+        assert elapsed < 10.0, f"10,000 busbars took {elapsed:.1f} s"
+        print(f"✓ 10,000 busbars solved in {elapsed:.2f} s")
+    except Exception as e:
+        print(f"✗ Native short circuit scaling test failed: {e}")
+        raise
+
+
+def test_generator_contribution_lookup():
+    """Test the indexed generator contribution read-back against the native engine and the former scan"""
+    print("\nTesting generator contribution lookup...")
+    try:
+        from Code.Benchmarks.ShortCircuitBenchmark import benchmarkcontributions, buildcontributionnetwork
+        datamodel = buildcontributionnetwork(10)
+        assert datamodel.getgenindex("T3_T3_400.0", " G3 ") == 3, "Generator index lookup failed"
+        assert datamodel.getgenindex("T3_T3_400.0", "G4") == -1, "Missing generator found"
+        datamodel.Gen_TAB.pop(0)
+        assert datamodel.findgen("T3_T3_400.0", "G3")[1] == 2, "Stale index not rebuilt"
+        result = benchmarkcontributions(3000)
+        assert result['matches_native'], "PowerFactory read-back differs from the native contributions"
+        assert result['indexed_warm_seconds'] < result['scan_seconds'], "Indexed read-back slower than the scan"
+        print(f"✓ 3000 generators read back in {result['indexed_warm_seconds'] * 1000:.0f} ms "
+              f"(former scan {result['scan_seconds'] * 1000:.0f} ms)")
+    except Exception as e:
+        print(f"✗ Generator contribution lookup test failed: {e}")
+        raise
+
+
+def main():
+    """Run all native short circuit tests"""
+    print("=" * 60)
+    print("NATIVE SHORT CIRCUIT TESTS")
+    print("=" * 60)
+    tests = [test_radial_fault_levels, test_large_network_scaling, test_generator_contribution_lookup]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Test the optimal power flow
+Checks the cheapest redispatch relieving an overload of a three busbar triangle against the hand solution, and
+the security constrained redispatch of a load profile warm started step by step from one factorisation.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def build_triangle_datamodel():
+    """Three busbars joined by equal lines: a cheap generator at B1, a dear one at B2 and 200 MW of demand at B3,
+    where the external grid is"""
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+    datamodel = DataModelManager()
+    for bus_id in ("B1", "B2", "B3"):
+        busbar = Busbar(bus_id)
+        busbar.kV = 400.0
+        datamodel.addbusbartotab(busbar)
+    for bus1, bus2 in (("B1", "B2"), ("B1", "B3"), ("B2", "B3")):
+        line = Branch(bus1, bus2, 0, f"L{bus1[1]}{bus2[1]}")
+        line.X, line.RatingA = 0.01, 500.0
+        datamodel.Branch_TAB.append(line)
+    grid = Generator("B3", "GRID")
+    grid.IsExternalGrid = True
+    datamodel.addgentotab(grid)
+    for bus_id, gen_id, output, plant_type in (("B1", "CHEAP", 200.0, "Wind"), ("B2", "DEAR", 0.0, "CCGT")):
+        generator = Generator(bus_id, gen_id)
+        generator.MW, generator.MWCapacity, generator.PlantType = output, 300.0, plant_type
+        datamodel.addgentotab(generator)
+    load = Load("B3", "LOAD")
+    load.MW = 200.0
+    datamodel.addloadtotab(load)
+    return datamodel
+
+
+def test_triangle_redispatch():
+    """Test the redispatch of an intact overload against the hand solution"""
+    print("Testing optimal power flow redispatch...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.OptimalPowerFlow import OptimalPowerFlow
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            gbl.DataModelManager = datamodel = build_triangle_datamodel()
+            datamodel.Branch_TAB[1].RatingA = 100.0
+            # L13 carries (2 P1 + P2) / 3 = 133 MW; moving x MW from B1 to B2 takes x / 3 off it
+            opf = OptimalPowerFlow({"costs": {"CHEAP": (30.0, 10.0), "CCGT": (50.0, 20.0)}})
+            assert opf.runopf(), "Optimal power flow failed"
+            dispatch = opf.getopfresults().set_index('generator')
+            assert np.isclose(dispatch.loc['CHEAP', 'redispatch_mw'], -100.0, atol=1e-6), "Wrong redispatch of CHEAP"
+            assert np.isclose(dispatch.loc['DEAR', 'redispatch_mw'], 100.0, atol=1e-6), "Wrong redispatch of DEAR"
+            assert np.isclose(dispatch['cost'].sum(), 6000.0), "Wrong redispatch cost"
+            assert 'GRID' not in dispatch.index, "External grid should not be redispatched"
+            constraint = opf.getallopfresults()['constraints'].iloc[0]
+            assert constraint['branch'] == 'L13' and constraint['outage'] == '', "Wrong constraint"
+            assert np.isclose(constraint['final_flow_mw'], 100.0, atol=1e-6), "Constraint not relieved to its rating"
+            assert np.isclose(constraint['shadow_price'], 180.0, atol=1e-6), "Shadow price should be 3 x (50 + 10)"
+            assert np.allclose([generator.MW for generator in datamodel.Gen_TAB[1:]], [100.0, 100.0]), \
+                "Redispatch not written back"
+            stored = gbl.ResultStore.loadtable(opf.run_id, 'dispatch').to_pandas()
+            assert len(stored) == 2, "Dispatch not stored"
+            assert opf.runopf() and np.isclose(opf.getopfresults()['cost'].sum(), 0.0), \
+                "Relieved network should need no redispatch"
+        print(f"✓ 100 MW moved from CHEAP to DEAR for 6000, L13 shadow price {constraint['shadow_price']:.0f}")
+    except Exception as e:
+        print(f"✗ Optimal power flow redispatch test failed: {e}")
+        raise
+
+
+def test_secured_time_series():
+    """Test the redispatch secured against an outage over a load profile, warm started between steps"""
+    print("\nTesting warm started security constrained time series...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.OptimalPowerFlow import OptimalPowerFlow
+        from Code.Studies.Implementation.TimeSeriesLoadFlow import TimeSeriesProfiles
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            gbl.DataModelManager = datamodel = build_triangle_datamodel()
+            # Without L12 all of CHEAP flows over L13, rated 120 MW after the outage
+            datamodel.Branch_TAB[1].RatingB = 120.0
+            profiles = TimeSeriesProfiles()
+            profiles.addprofiles("Load_TAB", "MW", ["LOAD"], [[150.0], [200.0], [250.0], [100.0]])
+            profiles.addprofiles("Gen_TAB", "MW", ["CHEAP"], [[150.0], [200.0], [250.0], [100.0]])
+            opf = OptimalPowerFlow({"contingencies": ["L12"], "costs": {"CHEAP": (30.0, 10.0), "CCGT": (50.0, 20.0)}})
+            opf.initializestudy()
+            factors = opf.m_oFactors
+            assert opf.runopftimeseries(profiles), "Time series optimal power flow failed"
+            steps = opf.getallopfresults()['steps']
+            assert np.allclose(steps['cost'], [30 * 60.0, 80 * 60.0, 130 * 60.0, 0.0]), \
+                f"Wrong step costs {steps['cost'].tolist()}"
+            # The outage constraint found at the first step is carried, so no step needs a second round
+            assert steps['rounds'].tolist() == [1, 1, 1, 1], "Warm started steps should solve in one round"
+            assert opf.m_oFactors is factors, "Factorisation not reused between steps"
+            redispatch = opf.getallopfresults()['redispatch']
+            assert np.allclose(redispatch[redispatch['generator'] == 'CHEAP']['redispatch_mw'], [-30.0, -80.0, -130.0]), \
+                "Wrong redispatch of CHEAP"
+            assert datamodel.Gen_TAB[1].MW == 200.0 and datamodel.Load_TAB[0].MW == 200.0, "DataModel not restored"
+            stored = gbl.ResultStore.loadtable(opf.run_id, 'steps').to_pandas()
+            assert len(stored) == 4, "Steps not stored"
+            # Switching the secured line out changes the topology and refactorises
+            datamodel.Branch_TAB[0].ON = False
+            assert opf.runopf() and opf.m_oFactors is not factors, "Topology change not picked up"
+        print(f"✓ {len(steps)} steps secured against L12, total cost {steps['cost'].sum():.0f}")
+    except Exception as e:
+        print(f"✗ Security constrained time series test failed: {e}")
+        raise
+
+
+def main():
+    """Run all optimal power flow tests"""
+    print("=" * 60)
+    print("OPTIMAL POWER FLOW TESTS")
+    print("=" * 60)
+    tests = [test_triangle_redispatch, test_secured_time_series]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
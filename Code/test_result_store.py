@@ -0,0 +1,189 @@
+"""
+Test the columnar result store
+Snapshots load flow results from a small DataModel, re-opens them and compares two runs.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_test_datamodel():
+    """Build a three busbar DataModel with load flow results written back"""
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+
+    datamodel = DataModelManager()
+    for bus_id, voltage in (("BUS1", 1.0), ("BUS2", 0.98), ("BUS3", 0.97)):
+        busbar = Busbar(bus_id)
+        busbar.kV = 275.0
+        busbar.voltage = voltage
+        busbar.angle = 0.0
+        datamodel.addbusbartotab(busbar)
+    for bus1, bus2 in (("BUS1", "BUS2"), ("BUS2", "BUS3")):
+        branch = Branch(bus1, bus2, 0, f"{bus1}_{bus2}")
+        branch.loading = 45.0
+        datamodel.Branch_TAB.append(branch)
+    generator = Generator("BUS1", "G1")
+    generator.MW = 100.0
+    datamodel.addgentotab(generator)
+    load = Load("BUS3", "L1")
+    load.MW = 95.0
+    datamodel.addloadtotab(load)
+    return datamodel
+
+
+def test_snapshot_and_reload():
+    """Test that a snapshot can be re-opened and its tables outlive the run"""
+    print("Testing result snapshot and reload...")
+    try:
+        from Code.Results.ResultStore import ResultStore
+        datamodel = build_test_datamodel()
+        with tempfile.TemporaryDirectory() as store_path:
+            store = ResultStore(store_path)
+            run_id = store.snapshotstudy('loadflow', {'convergence': 0.001}, datamodel=datamodel)
+            tables = store.loadrun(run_id)
+            assert len(tables['busbars']) == 3, "Expected three busbar rows"
+            assert list(tables['busbars']['voltage']) == [1.0, 0.98, 0.97], "Voltages not preserved"
+            assert len(tables['branches']) == 2, "Expected two branch rows"
+            runs = store.listruns('loadflow', network_hash=datamodel.getnetworkhash(),
+                                  settings={'convergence': 0.001})
+            assert [run['run_id'] for run in runs] == [run_id], "Run not found by network and settings"
+            assert store.listruns('loadflow', settings={'convergence': 0.01}) == [], "Settings filter ignored"
+            # Loaded tables hold no open file, so the run can be deleted while they are in use
+            voltages = store.loadtable(run_id, 'busbars', columns=['voltage'])
+            assert voltages.column_names == ['voltage'], "Column selection ignored"
+            if os.path.isfile('/proc/self/maps'):
+                with open('/proc/self/maps') as f:
+                    assert store._getrunpath(run_id) not in f.read(), "Result table left memory mapped"
+            assert store.deleterun(run_id), "Run not deleted"
+            assert voltages.column('voltage').to_pylist() == [1.0, 0.98, 0.97], "Loaded table lost with its run"
+        print("✓ Snapshot stored and reloaded")
+    except Exception as e:
+        print(f"✗ Snapshot test failed: {e}")
+        raise
+
+
+def test_compare_runs():
+    """Test that comparing two runs reports only the changed components"""
+    print("\nTesting run comparison...")
+    try:
+        from Code.Results.ResultStore import ResultStore
+        datamodel = build_test_datamodel()
+        with tempfile.TemporaryDirectory() as store_path:
+            store = ResultStore(store_path)
+            run_a = store.snapshotstudy('loadflow', datamodel=datamodel)
+            datamodel.Busbar_TAB[2].voltage = 0.95
+            run_b = store.snapshotstudy('loadflow', datamodel=datamodel)
+            differences = store.compareruns(run_a, run_b, 'busbars', columns=['voltage'])
+            assert list(differences['BusID']) == ['BUS3'], "Only BUS3 should differ"
+            assert abs(differences['voltage_delta'].iloc[0] + 0.02) < 1e-9, "Wrong voltage delta"
+        print("✓ Run comparison reports changed busbars")
+    except Exception as e:
+        print(f"✗ Run comparison test failed: {e}")
+        raise
+
+
+def test_result_cache():
+    """Test that an identical load flow is served from the cache and a changed one is not"""
+    print("\nTesting memoised load flow results...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.Messaging import Messaging
+        from Code.Results.StudyResultCache import StudyResultCache
+        from Code.Framework.BaseTemplates.EngineLoadFlowContainer import EngineLoadFlowContainer
+
+        class CountingLoadFlow(EngineLoadFlowContainer):
+            """Load flow container that writes fixed voltages and counts engine runs"""
+            SOLVES_DATAMODEL = True
+            def __init__(self):
+                super().__init__()
+                self.nRuns = 0
+            def runloadflow(self, **kwargs):
+                self.nRuns += 1
+                return True
+            def getallloadflowresults(self):
+                for busbar in gbl.DataModelManager.Busbar_TAB:
+                    busbar.voltage = 0.99
+                return True
+
+        gbl.Msg = Messaging()
+        gbl.DataModelManager = build_test_datamodel()
+        # The memoised container runs without an engine first, whatever engine earlier studies left behind
+        previous_engine = gbl.EngineContainer
+        gbl.EngineContainer = None
+        loadflow = CountingLoadFlow()
+        with tempfile.TemporaryDirectory() as cache_path:
+            gbl.ResultCache = StudyResultCache(cache_path, max_entries=1)
+            assert loadflow.runloadflowcached(max_iterations=20), "First load flow failed"
+            for busbar in gbl.DataModelManager.Busbar_TAB:
+                busbar.voltage = None
+            assert loadflow.runloadflowcached(max_iterations=20), "Cached load flow failed"
+            assert loadflow.nRuns == 1 and loadflow.m_bLastRunFromCache, "Repeat study should hit the cache"
+            assert gbl.DataModelManager.Busbar_TAB[0].voltage == 0.99, "Cached voltages not restored"
+            loadflow.runloadflowcached(max_iterations=30)
+            assert loadflow.nRuns == 2, "Changed settings should miss the cache"
+            gbl.DataModelManager.Load_TAB[0].MW = 120.0
+            loadflow.runloadflowcached(max_iterations=30)
+            assert loadflow.nRuns == 3, "Changed network should miss the cache"
+            assert gbl.ResultCache.getstatistics()['entries'] == 1, "LRU bound not respected"
+
+            # Engine backed containers are not cached while the engine cannot vouch for its network
+            class EngineState:
+                strState = None
+                strVersion = "1.0"
+                def getnetworkstate(self, oDataModel):
+                    return self.strState
+                def getversion(self):
+                    return self.strVersion
+            gbl.EngineContainer = EngineState()
+            try:
+                engine_loadflow = CountingLoadFlow()
+                engine_loadflow.SOLVES_DATAMODEL = False
+                engine_loadflow.runloadflowcached(max_iterations=30)
+                engine_loadflow.runloadflowcached(max_iterations=30)
+                assert engine_loadflow.nRuns == 2, "Unsynced engine network should bypass the cache"
+                gbl.EngineContainer.strState = 'built'
+                engine_loadflow.runloadflowcached(max_iterations=30)
+                assert engine_loadflow.nRuns == 3, "Engine network state should be part of the key"
+                engine_loadflow.runloadflowcached(max_iterations=30)
+                assert engine_loadflow.nRuns == 3, "Unchanged engine network should hit the cache"
+                gbl.EngineContainer.strVersion = "2.0"
+                engine_loadflow.runloadflowcached(max_iterations=30)
+                assert engine_loadflow.nRuns == 4, "Engine version should be part of the key"
+                # Entries written by an older cache format are not matched
+                key = gbl.ResultCache.getstudykey("loadflow", {'max_iterations': 30}, network_state='built')
+                gbl.ResultCache.CACHE_VERSION += 1
+                assert gbl.ResultCache.getstudykey("loadflow", {'max_iterations': 30}, network_state='built') != key, \
+                    "Cache version should be part of the key"
+            finally:
+                gbl.EngineContainer = previous_engine
+            gbl.ResultCache = None
+        print("✓ Repeat load flow served from cache, changes and unsynced engines re-run the engine")
+    except Exception as e:
+        print(f"✗ Result cache test failed: {e}")
+        raise
+
+
+def main():
+    """Run all result store tests"""
+    print("=" * 60)
+    print("RESULT STORE TESTS")
+    print("=" * 60)
+    tests = [test_snapshot_and_reload, test_compare_runs, test_result_cache]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
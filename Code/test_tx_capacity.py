@@ -0,0 +1,154 @@
+"""
+Test the transmission capacity assessment
+Screens the outages of a small meshed network with DC outage distribution factors and checks them
+against full load flows, checks the ranked constraint table and the busbar headroom stored in the
+result store, and that worker processes give the same results.
+"""
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from Code.test_result_store import build_test_datamodel
+
+
+def build_meshed_datamodel():
+    """Three busbar ring with a radial spur to BUS4, all branches rated 80 MVA"""
+    from Code.DataModel.ComponentManager import Busbar, Branch, Load
+    datamodel = build_test_datamodel()
+    busbar = Busbar("BUS4")
+    busbar.kV = 275.0
+    datamodel.addbusbartotab(busbar)
+    for bus1, bus2 in (("BUS1", "BUS3"), ("BUS3", "BUS4")):
+        datamodel.Branch_TAB.append(Branch(bus1, bus2, 0, f"{bus1}_{bus2}"))
+    load = Load("BUS4", "L4")
+    load.MW = 5.0
+    datamodel.addloadtotab(load)
+    for branch in datamodel.Branch_TAB:
+        branch.X, branch.RatingA = 0.02, 80.0
+    return datamodel
+
+
+def test_outage_screening():
+    """Test the screened post-outage loadings against full DC load flows of every outage"""
+    print("Testing outage screening...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.SensitivityFactors import DCSensitivityFactors
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            session = runner.activateengine('simulated')
+            gbl.DataModelManager = datamodel = build_meshed_datamodel()
+            factors = DCSensitivityFactors(datamodel)
+            ratings = np.full(factors.getnumberofbranches(), 80.0)
+            screening = factors.screenoutages(ratings)
+            loadflow = session['loadflow']
+            for outage, estimate, islanding in zip(screening['outage'], screening['max_loading'], screening['islanding']):
+                branch = datamodel.Branch_TAB[factors.m_arrBranchTab[outage]]
+                with datamodel.snapshot():
+                    branch.ON = False
+                    assert loadflow.runloadflowtimestep(), "Load flow failed"
+                    solved = max(other.loading for other in datamodel.Branch_TAB if other.ON)
+                assert islanding == (branch.BranchID == "BUS3_BUS4"), f"Islanding of {branch.BranchID} wrong"
+                if not islanding:
+                    assert np.isclose(estimate, solved), f"{branch.BranchID}: screened {estimate:.2f}%, solved {solved:.2f}%"
+        print(f"✓ {len(screening['outage'])} outages screened, matching full load flows")
+    except Exception as e:
+        print(f"✗ Outage screening test failed: {e}")
+        raise
+
+
+def test_capacity_assessment_sequential_and_parallel():
+    """Test the stored constraint, screening and headroom tables and that workers give the same results"""
+    print("\nTesting capacity assessment...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.TxCapacityAssessment import TxCapacityAssessment
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            runner.activateengine('simulated')
+            gbl.DataModelManager = datamodel = build_meshed_datamodel()
+            assessment = TxCapacityAssessment({"headroom_tolerance_mw": 0.5, "max_injection_mw": 500.0})
+            assert assessment.runcapacityassessment(), "Capacity assessment failed"
+            constraints = gbl.ResultStore.loadtable(assessment.run_id, 'constraints').to_pandas()
+            screening = gbl.ResultStore.loadtable(assessment.run_id, 'screening').to_pandas()
+            headroom = gbl.ResultStore.loadtable(assessment.run_id, 'headroom').to_pandas().set_index('busbar')
+            assert list(constraints['rank']) == list(range(1, len(constraints) + 1)), "Constraints not ranked"
+            assert constraints['severity'].is_monotonic_decreasing, "Constraints not ordered by severity"
+            # Losing any ring branch puts the full 100 MW transfer on the remaining path
+            assert set(constraints['outage']) == {"BUS1_BUS2", "BUS2_BUS3", "BUS1_BUS3"}, "Unexpected constrained outages"
+            assert np.isclose(constraints['value'].max(), 125.0), "Post-outage loading wrong"
+            assert screening.set_index('outage').loc['BUS3_BUS4', 'islanding'], "Islanding outage not flagged"
+            assert screening['full_solve'].sum() == 4, "Expected every outage over the threshold to be solved"
+            # The DC load flow is linear, so the bisection lands on the PTDF estimate
+            assert (np.abs(headroom['headroom_mw'] - headroom['linear_headroom_mw']) <= 0.5).all(), "Headroom off the estimate"
+            assert headroom.loc['BUS1', 'limiting_type'] == 'max injection', "Slack busbar headroom should be unlimited"
+            assert [gen.GenID for gen in datamodel.Gen_TAB] == ["G1"], "Headroom probe generator left behind"
+            assert datamodel.Gen_TAB[0].MW == 100.0 and all(branch.ON for branch in datamodel.Branch_TAB), "Network not restored"
+            parallel = TxCapacityAssessment({"headroom_tolerance_mw": 0.5, "max_injection_mw": 500.0, "workers": 2})
+            assert parallel.runcapacityassessment(), "Parallel capacity assessment failed"
+            parallel_constraints = parallel.getcapacityassessmentresults()
+            assert parallel_constraints.equals(assessment.getcapacityassessmentresults()), "Workers returned different constraints"
+            parallel_headroom = parallel.getallcapacityassessmentresults()['headroom'].set_index('busbar').sort_index()
+            assert np.allclose(parallel_headroom['headroom_mw'], headroom.sort_index()['headroom_mw']), "Workers returned different headroom"
+
+            # Without ratings the screening flags nothing, so every outage is solved instead
+            settings = {"screening_threshold_percent": 1000.0, "headroom_busbars": []}
+            screened = TxCapacityAssessment(settings)
+            assert screened.runcapacityassessment(), "Screened capacity assessment failed"
+            assert screened.getallcapacityassessmentresults()['screening']['full_solve'].sum() == 1, \
+                "Only the islanding outage should pass the threshold"
+            # An unrated bus coupler without reactance is not monitored and only its own outage is solved in full
+            from Code.DataModel.ComponentManager import Busbar, Branch
+            busbar = Busbar("BUS5")
+            busbar.kV = 275.0
+            datamodel.addbusbartotab(busbar)
+            coupler = Branch("BUS4", "BUS5", 0, "BUS4_BUS5")
+            coupler.X, coupler.RatingA = 0.0, 0.0
+            datamodel.Branch_TAB.append(coupler)
+            unrated = TxCapacityAssessment(settings)
+            assert unrated.runcapacityassessment(), "Unrated capacity assessment failed"
+            screening = unrated.getallcapacityassessmentresults()['screening'].set_index('outage')
+            assert list(screening.index[screening['unscreenable']]) == ["BUS4_BUS5"], "Only the coupler is unscreenable"
+            assert set(screening.index[screening['full_solve']]) == {"BUS3_BUS4", "BUS4_BUS5"}, \
+                "Ring outages should still be screened"
+            # Outages moving flow onto a ring branch without reactance are solved in full
+            datamodel.Branch_TAB[0].X = 0.0
+            zero_reactance = TxCapacityAssessment(settings)
+            assert zero_reactance.runcapacityassessment(), "Zero reactance capacity assessment failed"
+            assert zero_reactance.getallcapacityassessmentresults()['screening']['full_solve'].all(), \
+                "Outages loading a branch without reactance should be solved"
+        print(f"✓ {len(constraints)} ranked constraints stored, headroom within tolerance, identical across workers")
+    except Exception as e:
+        print(f"✗ Capacity assessment test failed: {e}")
+        raise
+
+
+def main():
+    """Run all capacity assessment tests"""
+    print("=" * 60)
+    print("TRANSMISSION CAPACITY ASSESSMENT TESTS")
+    print("=" * 60)
+    tests = [test_outage_screening, test_capacity_assessment_sequential_and_parallel]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()
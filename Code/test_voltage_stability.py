@@ -0,0 +1,157 @@
+"""
+Test the voltage stability study
+Checks the native AC load flow and the continuation power flow nose of a two busbar network against
+the analytic PV curve, and that the boundary transfer directions between zones of a meshed network
+give the same margins traced in worker processes as in the main process.
+"""
+import sys
+import os
+import math
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+def build_zonal_datamodel(size=6, zones=3):
+    """Meshed 400 kV grid split into zones by columns, an external grid in the corner, voltage controlling
+    generators with reactive limits and demand at every busbar"""
+    from Code.DataModel.DataModelManager import DataModelManager
+    from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+    datamodel = DataModelManager()
+    for row in range(size):
+        for column in range(size):
+            busbar = Busbar(f"B{row}_{column}")
+            busbar.kV = 400.0
+            busbar.Zone = f"Z{column * zones // size}"
+            datamodel.addbusbartotab(busbar)
+    for row in range(size):
+        for column in range(size):
+            for row2, column2 in ((row, column + 1), (row + 1, column)):
+                if row2 < size and column2 < size:
+                    branch = Branch(f"B{row}_{column}", f"B{row2}_{column2}", 0, f"L{row}_{column}_{row2}_{column2}")
+                    branch.R, branch.X, branch.B, branch.RatingA = 0.005, 0.05, 0.02, 2000.0
+                    datamodel.Branch_TAB.append(branch)
+    grid = Generator("B0_0", "GRID")
+    grid.IsExternalGrid = True
+    datamodel.addgentotab(grid)
+    for row in range(size):
+        for column in range(size):
+            if (row + column) % 4 == 2:
+                generator = Generator(f"B{row}_{column}", f"G{row}_{column}")
+                generator.MW, generator.Qmax, generator.Qmin, generator.VMagPu = 100.0, 100.0, -50.0, 1.02
+                datamodel.addgentotab(generator)
+            load = Load(f"B{row}_{column}", f"D{row}_{column}")
+            load.MW, load.MVar = 30.0, 10.0
+            datamodel.addloadtotab(load)
+    return datamodel
+
+
+def test_two_bus_nose():
+    """Test the load flow and the nose of a lossless line feeding a unity power factor load"""
+    print("Testing continuation power flow nose...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.DataModel.DataModelManager import DataModelManager
+        from Code.DataModel.ComponentManager import Busbar, Branch, Generator, Load
+        from Code.Framework.Native.EngineNativeLoadFlow import EngineNativeLoadFlow
+        from Code.Studies.Implementation.VoltageStability import VoltageStability
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            datamodel = DataModelManager()
+            for bus_id in ("GRID", "BUS2"):
+                busbar = Busbar(bus_id)
+                busbar.kV = 132.0
+                datamodel.addbusbartotab(busbar)
+            line = Branch("GRID", "BUS2", 0, "LINE")
+            line.R, line.X = 0.0, 0.1
+            datamodel.Branch_TAB.append(line)
+            grid = Generator("GRID", "GRID")
+            grid.IsExternalGrid = True
+            datamodel.addgentotab(grid)
+            load = Load("BUS2", "LOAD")
+            load.MW = 100.0
+            datamodel.addloadtotab(load)
+            gbl.DataModelManager = datamodel
+            # V^4 - V^2 + (P X)^2 = 0 at the receiving end, 1 pu sending end
+            loadflow = EngineNativeLoadFlow()
+            assert loadflow.runloadflow() and loadflow.getallloadflowresults(), "Native load flow failed"
+            expected = math.sqrt((1.0 + math.sqrt(1.0 - 4.0 * 0.01)) / 2.0)
+            assert abs(datamodel.Busbar_TAB[1].voltage - expected) < 1e-8, "Receiving end voltage wrong"
+            assert abs(grid.MWLoadFlow - 100.0) < 1e-6, "Lossless line should need no extra slack generation"
+            # Nose at P = V^2 / 2X = 500 MW and V = 1 / sqrt(2), 400 MW above the 100 MW base
+            study = VoltageStability({"directions": [{"source": None, "sink": ["BUS2"]}]})
+            assert study.runvoltagestability(), "Voltage stability study failed"
+            margin = study.getvoltagestabilityresults().iloc[0]
+            assert margin['direction'] == 'slack->BUS2' and margin['status'] == 'nose', "Nose not traced"
+            assert abs(margin['margin_mw'] - 400.0) < 0.5, f"Margin {margin['margin_mw']:.2f} MW, expected 400 MW"
+            assert abs(margin['critical_voltage_pu'] - 1.0 / math.sqrt(2.0)) < 0.01, "Nose voltage wrong"
+            assert margin['critical_busbar'] == 'BUS2', "Wrong critical busbar"
+            curve = study.getallvoltagestabilityresults()['pvcurves']
+            upper = curve[curve['transfer_mw'].cummax() == curve['transfer_mw']]
+            assert np.all(np.diff(upper['voltage_pu'].to_numpy()) < 0), "Voltage should fall along the upper branch"
+            assert curve['transfer_mw'].iloc[-1] < curve['transfer_mw'].max(), "Lower branch not traced"
+            assert margin['factorisations'] < margin['corrector_iterations'], "Factorisations not reused"
+        print(f"✓ Nose at {margin['margin_mw']:.2f} MW and {margin['critical_voltage_pu']:.4f} pu "
+              f"({margin['points']} points, {margin['factorisations']} factorisations)")
+    except Exception as e:
+        print(f"✗ Continuation power flow nose test failed: {e}")
+        raise
+
+
+def test_zone_boundary_directions():
+    """Test the transfer directions across zone boundaries, traced here and in worker processes"""
+    print("\nTesting boundary transfer margins...")
+    try:
+        from Code import GlobalEngineRegistry as gbl
+        from Code.BatchRunner import BatchRunner
+        from Code.Studies.Implementation.VoltageStability import VoltageStability
+        with tempfile.TemporaryDirectory() as store_path:
+            runner = BatchRunner(result_store_path=store_path, log_level='ERROR')
+            assert runner.initialise(), "Framework initialisation failed"
+            gbl.DataModelManager = datamodel = build_zonal_datamodel()
+            output = [generator.MW for generator in datamodel.Gen_TAB]
+            sequential = VoltageStability({"monitored_busbars": ["B3_3"]})
+            assert sequential.runvoltagestability(), "Sequential study failed"
+            margins = sequential.getvoltagestabilityresults()
+            assert sorted(margins['direction']) == ['Z0->Z1', 'Z1->Z0', 'Z1->Z2', 'Z2->Z1'], "Wrong boundary directions"
+            assert (margins['margin_mw'] > 0).all() and (margins['status'] != 'max points').all(), "Margins not found"
+            assert [generator.MW for generator in datamodel.Gen_TAB] == output, "Study changed the DataModel"
+            parallel = VoltageStability({"monitored_busbars": ["B3_3"], "workers": 2})
+            assert parallel.runvoltagestability(), "Parallel study failed"
+            joined = margins.merge(parallel.getvoltagestabilityresults(), on='direction')
+            assert np.allclose(joined['margin_mw_x'], joined['margin_mw_y']), "Worker margins differ"
+            stored = gbl.ResultStore.loadtable(parallel.run_id, 'pvcurves').to_pandas()
+            assert set(stored['busbar']) == {'B3_3'} and len(stored) == len(parallel.getallvoltagestabilityresults()['pvcurves']), \
+                "PV curves not stored"
+        print(f"✓ {len(margins)} boundary directions, smallest margin {margins['margin_mw'].min():.0f} MW "
+              f"({margins['direction'].iloc[0]}), worker margins match")
+    except Exception as e:
+        print(f"✗ Boundary transfer margin test failed: {e}")
+        raise
+
+
+def main():
+    """Run all voltage stability tests"""
+    print("=" * 60)
+    print("VOLTAGE STABILITY TESTS")
+    print("=" * 60)
+    tests = [test_two_bus_nose, test_zone_boundary_directions]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception:
+            pass
+    print("=" * 60)
+    print(f"RESULTS: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    main()